@@ -3,39 +3,90 @@ Analytics endpoints.
 """
 
 from fastapi import APIRouter, Depends, Query, HTTPException
-from typing import Optional
+from typing import Optional, Union
 from datetime import datetime
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.services.analytics import AnalyticsService
-from app.db.session import get_db
+from app.services.async_services import AsyncAnalyticsService
+from app.services.analytics_batch import AnalyticsBatchService
+from app.schemas.analytics import BatchRequest
+from app.db.session import get_db, get_async_db, AsyncSessionLocal
+from app.core.executor import run_db
+from app.core.http_cache import HttpCache
 from app.core.logging import get_logger
 from app.core.exceptions import (
+    AnalyticsError,
     ValidationError,
     DatabaseError,
     NotFoundError,
 )
-from app.utils.date_parser import parse_date_filters
+from app.utils.date_parser import apply_date_range, parse_date_filters
 
 logger = get_logger(__name__)
 
 router = APIRouter()
 
 
-def get_analytics_service(db: Session = Depends(get_db)) -> AnalyticsService:
-    """Get analytics service."""
+def get_analytics_service(
+    db: Session = Depends(get_db),
+    async_db: Optional[AsyncSession] = Depends(get_async_db),
+) -> Union[AnalyticsService, AsyncAnalyticsService]:
+    """Get analytics service (async variant when the async path is on)."""
+    if async_db is not None:
+        return AsyncAnalyticsService(async_db)
     return AnalyticsService(db)
 
 
+def get_analytics_batch_service() -> AnalyticsBatchService:
+    """Get analytics batch service."""
+    return AnalyticsBatchService(async_session_factory=AsyncSessionLocal)
+
+
+@router.post("/analytics/batch")
+async def run_analytics_batch(
+    request: BatchRequest,
+    service: AnalyticsBatchService = Depends(get_analytics_batch_service),
+):
+    """
+    Run several analytics queries in one request.
+
+    Each query names a metric (an AnalyticsService method without the
+    'get_' prefix, e.g. 'revenue' or 'top_products') and its params. Cache
+    lookups are pipelined and misses are computed concurrently.
+
+    Args:
+        request: Batch of {id, metric, params} queries
+        service: Analytics batch service
+
+    Returns:
+        Per-query results in request order, with per-item errors
+    """
+    results = await service.execute(request.queries)
+    failed = sum(1 for r in results if r.get("status") == "error")
+
+    logger.info(
+        "Analytics batch executed",
+        extra={
+            "extra_data": {"queries": len(results), "failed": failed}
+        },
+    )
+
+    return {"results": results, "count": len(results), "failed": failed}
+
+
 @router.get("/analytics/revenue")
 async def get_revenue(
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
+    date_range: Optional[str] = Query(None, alias="range"),
     store_id: Optional[int] = Query(None),
     channel_id: Optional[int] = Query(None),
     group_by: str = Query("day", pattern="^(day|week|month)$"),
     service: AnalyticsService = Depends(get_analytics_service),
+    http_cache: HttpCache = Depends(),
 ):
     """
     Get revenue aggregated by time period.
@@ -43,17 +94,29 @@ async def get_revenue(
     Args:
         start_date: Start date (YYYY-MM-DD)
         end_date: End date (YYYY-MM-DD)
+        date_range: Relative range token (e.g. last_30d), replaces the dates
         store_id: Filter by store
         channel_id: Filter by channel
         group_by: Group by day, week, or month
         service: Analytics service
+        http_cache: Conditional response helper
 
     Returns:
         Revenue data by period
     """
     try:
         # Parse dates using centralized parser
-        start, end = parse_date_filters(start_date, end_date)
+        start, end = parse_date_filters(start_date, end_date, date_range)
+
+        params = {
+            "start_date": start,
+            "end_date": end,
+            "store_id": store_id,
+            "channel_id": channel_id,
+            "group_by": group_by,
+        }
+        if await http_cache.check_result(AnalyticsService.get_revenue, params):
+            return http_cache.not_modified()
 
         logger.info(
             "Fetching revenue data",
@@ -69,13 +132,7 @@ async def get_revenue(
         )
 
         try:
-            data = service.get_revenue(
-                start_date=start,
-                end_date=end,
-                store_id=store_id,
-                channel_id=channel_id,
-                group_by=group_by
-            )
+            data = await run_db(service.get_revenue, **params)
 
             logger.info(
                 "Revenue data fetched successfully: %d records", len(data),
@@ -90,13 +147,15 @@ async def get_revenue(
                 operation="get_revenue"
             )
 
-        return {
-            "data": data,
-            "filters": {
-                "start_date": start_date,
-                "end_date": end_date
+        return http_cache.respond(
+            {
+                "data": data,
+                "filters": {
+                    "start_date": start_date,
+                    "end_date": end_date
+                }
             }
-        }
+        )
     except (ValidationError, DatabaseError, NotFoundError):
         raise
     except Exception as e:
@@ -110,6 +169,7 @@ async def get_revenue(
 async def get_top_products(
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
+    date_range: Optional[str] = Query(None, alias="range"),
     store_id: Optional[int] = Query(None),
     channel_id: Optional[int] = Query(None),
     day_of_week: Optional[int] = Query(
@@ -132,6 +192,7 @@ async def get_top_products(
     ),
     limit: int = Query(10, ge=1, le=100),
     service: AnalyticsService = Depends(get_analytics_service),
+    http_cache: HttpCache = Depends(),
 ):
     """
     Get top products by quantity sold.
@@ -139,6 +200,7 @@ async def get_top_products(
     Args:
         start_date: Start date (YYYY-MM-DD)
         end_date: End date (YYYY-MM-DD)
+        date_range: Relative range token (e.g. last_30d), replaces the dates
         store_id: Filter by store
         channel_id: Filter by channel
         day_of_week: Day of week filter (0=Monday, 6=Sunday)
@@ -146,6 +208,7 @@ async def get_top_products(
         hour_end: End hour filter (0-23)
         limit: Number of products
         service: Analytics service
+        http_cache: Conditional response helper
 
     Returns:
         Top products data
@@ -173,6 +236,8 @@ async def get_top_products(
                     field="end_date"
                 )
 
+        start, end = apply_date_range(start, end, date_range)
+
         # Validate hour range
         if (
             hour_start is not None
@@ -184,6 +249,21 @@ async def get_top_products(
                 field="hour_range"
             )
 
+        params = {
+            "start_date": start,
+            "end_date": end,
+            "store_id": store_id,
+            "channel_id": channel_id,
+            "day_of_week": day_of_week,
+            "hour_start": hour_start,
+            "hour_end": hour_end,
+            "limit": limit,
+        }
+        if await http_cache.check_result(
+            AnalyticsService.get_top_products, params
+        ):
+            return http_cache.not_modified()
+
         logger.info(
             "Fetching top products",
             extra={
@@ -201,16 +281,7 @@ async def get_top_products(
         )
 
         try:
-            data = service.get_top_products(
-                start_date=start,
-                end_date=end,
-                store_id=store_id,
-                channel_id=channel_id,
-                day_of_week=day_of_week,
-                hour_start=hour_start,
-                hour_end=hour_end,
-                limit=limit
-            )
+            data = await run_db(service.get_top_products, **params)
         except SQLAlchemyError as e:
             logger.error(
                 "Database error fetching products: %s", str(e), exc_info=True
@@ -220,7 +291,7 @@ async def get_top_products(
                 operation="get_top_products",
             )
 
-        return {"data": data}
+        return http_cache.respond({"data": data})
     except (ValidationError, DatabaseError):
         raise
     except Exception as e:
@@ -236,8 +307,10 @@ async def get_top_products(
 async def get_channel_performance(
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
+    date_range: Optional[str] = Query(None, alias="range"),
     store_id: Optional[int] = Query(None),
     service: AnalyticsService = Depends(get_analytics_service),
+    http_cache: HttpCache = Depends(),
 ):
     """
     Get performance metrics by channel.
@@ -245,8 +318,10 @@ async def get_channel_performance(
     Args:
         start_date: Start date (YYYY-MM-DD)
         end_date: End date (YYYY-MM-DD)
+        date_range: Relative range token (e.g. last_30d), replaces the dates
         store_id: Filter by store
         service: Analytics service
+        http_cache: Conditional response helper
 
     Returns:
         Channel performance data
@@ -254,15 +329,25 @@ async def get_channel_performance(
     try:
         # Parse dates
         # Parse dates using centralized parser
-        start, end = parse_date_filters(start_date, end_date)
+        start, end = parse_date_filters(start_date, end_date, date_range)
 
-        data = service.get_channel_performance(
-            start_date=start,
-            end_date=end,
-            store_id=store_id
-        )
+        params = {
+            "start_date": start,
+            "end_date": end,
+            "store_id": store_id,
+        }
+        if await http_cache.check_result(
+            AnalyticsService.get_channel_performance, params
+        ):
+            return http_cache.not_modified()
+
+        data = await run_db(service.get_channel_performance, **params)
 
-        return {"data": data}
+        return http_cache.respond({"data": data})
+    except AnalyticsError:
+        # Validation (e.g. a bad range), not found and database errors
+        # reach their registered handlers
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -271,9 +356,11 @@ async def get_channel_performance(
 async def get_metrics_summary(
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
+    date_range: Optional[str] = Query(None, alias="range"),
     store_id: Optional[int] = Query(None),
     channel_id: Optional[int] = Query(None),
     service: AnalyticsService = Depends(get_analytics_service),
+    http_cache: HttpCache = Depends(),
 ):
     """
     Get summary metrics (overview).
@@ -281,9 +368,11 @@ async def get_metrics_summary(
     Args:
         start_date: Start date (YYYY-MM-DD)
         end_date: End date (YYYY-MM-DD)
+        date_range: Relative range token (e.g. last_30d), replaces the dates
         store_id: Filter by store
         channel_id: Filter by channel
         service: Analytics service
+        http_cache: Conditional response helper
 
     Returns:
         Summary metrics
@@ -291,16 +380,24 @@ async def get_metrics_summary(
     try:
         # Parse dates
         # Parse dates using centralized parser
-        start, end = parse_date_filters(start_date, end_date)
+        start, end = parse_date_filters(start_date, end_date, date_range)
 
-        data = service.get_metrics_summary(
-            start_date=start,
-            end_date=end,
-            store_id=store_id,
-            channel_id=channel_id
-        )
+        params = {
+            "start_date": start,
+            "end_date": end,
+            "store_id": store_id,
+            "channel_id": channel_id,
+        }
+        if await http_cache.check_result(
+            AnalyticsService.get_metrics_summary, params
+        ):
+            return http_cache.not_modified()
+
+        data = await run_db(service.get_metrics_summary, **params)
 
-        return data
+        return http_cache.respond(data)
+    except AnalyticsError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -309,10 +406,12 @@ async def get_metrics_summary(
 async def get_products_margin(
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
+    date_range: Optional[str] = Query(None, alias="range"),
     store_id: Optional[int] = Query(None),
     channel_id: Optional[int] = Query(None),
     limit: int = Query(20, ge=1, le=100),
     service: AnalyticsService = Depends(get_analytics_service),
+    http_cache: HttpCache = Depends(),
 ):
     """
     Get products with lowest margin.
@@ -320,10 +419,12 @@ async def get_products_margin(
     Args:
         start_date: Start date (YYYY-MM-DD)
         end_date: End date (YYYY-MM-DD)
+        date_range: Relative range token (e.g. last_30d), replaces the dates
         store_id: Filter by store
         channel_id: Filter by channel
         limit: Number of products to return
         service: Analytics service
+        http_cache: Conditional response helper
 
     Returns:
         Products with margin analysis
@@ -331,17 +432,25 @@ async def get_products_margin(
     try:
         # Parse dates
         # Parse dates using centralized parser
-        start, end = parse_date_filters(start_date, end_date)
-
-        data = service.get_products_margin(
-            start_date=start,
-            end_date=end,
-            store_id=store_id,
-            channel_id=channel_id,
-            limit=limit
-        )
+        start, end = parse_date_filters(start_date, end_date, date_range)
+
+        params = {
+            "start_date": start,
+            "end_date": end,
+            "store_id": store_id,
+            "channel_id": channel_id,
+            "limit": limit,
+        }
+        if await http_cache.check_result(
+            AnalyticsService.get_products_margin, params
+        ):
+            return http_cache.not_modified()
 
-        return data
+        data = await run_db(service.get_products_margin, **params)
+
+        return http_cache.respond(data)
+    except AnalyticsError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -350,9 +459,11 @@ async def get_products_margin(
 async def get_delivery_performance(
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
+    date_range: Optional[str] = Query(None, alias="range"),
     store_id: Optional[int] = Query(None),
     group_by: str = Query("day", pattern="^(day|week|month)$"),
     service: AnalyticsService = Depends(get_analytics_service),
+    http_cache: HttpCache = Depends(),
 ):
     """
     Get delivery performance metrics.
@@ -360,9 +471,11 @@ async def get_delivery_performance(
     Args:
         start_date: Start date (YYYY-MM-DD)
         end_date: End date (YYYY-MM-DD)
+        date_range: Relative range token (e.g. last_30d), replaces the dates
         store_id: Filter by store
         group_by: Group by day, week, or month
         service: Analytics service
+        http_cache: Conditional response helper
 
     Returns:
         Delivery performance data by period
@@ -370,16 +483,24 @@ async def get_delivery_performance(
     try:
         # Parse dates
         # Parse dates using centralized parser
-        start, end = parse_date_filters(start_date, end_date)
+        start, end = parse_date_filters(start_date, end_date, date_range)
 
-        data = service.get_delivery_performance(
-            start_date=start,
-            end_date=end,
-            store_id=store_id,
-            group_by=group_by
-        )
+        params = {
+            "start_date": start,
+            "end_date": end,
+            "store_id": store_id,
+            "group_by": group_by,
+        }
+        if await http_cache.check_result(
+            AnalyticsService.get_delivery_performance, params
+        ):
+            return http_cache.not_modified()
 
-        return data
+        data = await run_db(service.get_delivery_performance, **params)
+
+        return http_cache.respond(data)
+    except AnalyticsError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -388,8 +509,10 @@ async def get_delivery_performance(
 async def get_customer_insights(
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
+    date_range: Optional[str] = Query(None, alias="range"),
     store_id: Optional[int] = Query(None),
     service: AnalyticsService = Depends(get_analytics_service),
+    http_cache: HttpCache = Depends(),
 ):
     """
     Get customer insights including churn analysis.
@@ -397,8 +520,10 @@ async def get_customer_insights(
     Args:
         start_date: Start date (YYYY-MM-DD)
         end_date: End date (YYYY-MM-DD)
+        date_range: Relative range token (e.g. last_30d), replaces the dates
         store_id: Filter by store
         service: Analytics service
+        http_cache: Conditional response helper
 
     Returns:
         Customer insights data
@@ -406,15 +531,23 @@ async def get_customer_insights(
     try:
         # Parse dates
         # Parse dates using centralized parser
-        start, end = parse_date_filters(start_date, end_date)
+        start, end = parse_date_filters(start_date, end_date, date_range)
 
-        data = service.get_customer_insights(
-            start_date=start,
-            end_date=end,
-            store_id=store_id
-        )
+        params = {
+            "start_date": start,
+            "end_date": end,
+            "store_id": store_id,
+        }
+        if await http_cache.check_result(
+            AnalyticsService.get_customer_insights, params
+        ):
+            return http_cache.not_modified()
 
-        return data
+        data = await run_db(service.get_customer_insights, **params)
+
+        return http_cache.respond(data)
+    except AnalyticsError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -423,9 +556,11 @@ async def get_customer_insights(
 async def get_peak_hours_heatmap(
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
+    date_range: Optional[str] = Query(None, alias="range"),
     store_id: Optional[int] = Query(None),
     channel_id: Optional[int] = Query(None),
     service: AnalyticsService = Depends(get_analytics_service),
+    http_cache: HttpCache = Depends(),
 ):
     """
     Get peak hours heatmap data.
@@ -433,9 +568,11 @@ async def get_peak_hours_heatmap(
     Args:
         start_date: Start date (YYYY-MM-DD)
         end_date: End date (YYYY-MM-DD)
+        date_range: Relative range token (e.g. last_30d), replaces the dates
         store_id: Filter by store
         channel_id: Filter by channel
         service: Analytics service
+        http_cache: Conditional response helper
 
     Returns:
         Peak hours heatmap data
@@ -443,16 +580,24 @@ async def get_peak_hours_heatmap(
     try:
         # Parse dates
         # Parse dates using centralized parser
-        start, end = parse_date_filters(start_date, end_date)
+        start, end = parse_date_filters(start_date, end_date, date_range)
 
-        data = service.get_peak_hours_heatmap(
-            start_date=start,
-            end_date=end,
-            store_id=store_id,
-            channel_id=channel_id
-        )
+        params = {
+            "start_date": start,
+            "end_date": end,
+            "store_id": store_id,
+            "channel_id": channel_id,
+        }
+        if await http_cache.check_result(
+            AnalyticsService.get_peak_hours_heatmap, params
+        ):
+            return http_cache.not_modified()
+
+        data = await run_db(service.get_peak_hours_heatmap, **params)
 
-        return data
+        return http_cache.respond(data)
+    except AnalyticsError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -461,8 +606,10 @@ async def get_peak_hours_heatmap(
 async def get_anomaly_alerts(
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
+    date_range: Optional[str] = Query(None, alias="range"),
     store_id: Optional[int] = Query(None),
     service: AnalyticsService = Depends(get_analytics_service),
+    http_cache: HttpCache = Depends(),
 ):
     """
     Get anomaly alerts.
@@ -470,8 +617,10 @@ async def get_anomaly_alerts(
     Args:
         start_date: Start date (YYYY-MM-DD)
         end_date: End date (YYYY-MM-DD)
+        date_range: Relative range token (e.g. last_30d), replaces the dates
         store_id: Filter by store
         service: Analytics service
+        http_cache: Conditional response helper
 
     Returns:
         List of anomaly alerts
@@ -479,15 +628,23 @@ async def get_anomaly_alerts(
     try:
         # Parse dates
         # Parse dates using centralized parser
-        start, end = parse_date_filters(start_date, end_date)
+        start, end = parse_date_filters(start_date, end_date, date_range)
 
-        data = service.get_anomaly_alerts(
-            start_date=start,
-            end_date=end,
-            store_id=store_id
-        )
+        params = {
+            "start_date": start,
+            "end_date": end,
+            "store_id": store_id,
+        }
+        if await http_cache.check_result(
+            AnalyticsService.get_anomaly_alerts, params
+        ):
+            return http_cache.not_modified()
 
-        return data
+        data = await run_db(service.get_anomaly_alerts, **params)
+
+        return http_cache.respond(data)
+    except AnalyticsError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -496,10 +653,12 @@ async def get_anomaly_alerts(
 async def get_top_items_analysis(
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
+    date_range: Optional[str] = Query(None, alias="range"),
     store_id: Optional[int] = Query(None),
     channel_id: Optional[int] = Query(None),
     limit: int = Query(20, ge=1, le=100),
     service: AnalyticsService = Depends(get_analytics_service),
+    http_cache: HttpCache = Depends(),
 ):
     """
     Get top items/complements analysis.
@@ -507,10 +666,12 @@ async def get_top_items_analysis(
     Args:
         start_date: Start date (YYYY-MM-DD)
         end_date: End date (YYYY-MM-DD)
+        date_range: Relative range token (e.g. last_30d), replaces the dates
         store_id: Filter by store
         channel_id: Filter by channel
         limit: Number of items to return
         service: Analytics service
+        http_cache: Conditional response helper
 
     Returns:
         Top items with statistics
@@ -518,17 +679,25 @@ async def get_top_items_analysis(
     try:
         # Parse dates
         # Parse dates using centralized parser
-        start, end = parse_date_filters(start_date, end_date)
-
-        data = service.get_top_items_analysis(
-            start_date=start,
-            end_date=end,
-            store_id=store_id,
-            channel_id=channel_id,
-            limit=limit
-        )
+        start, end = parse_date_filters(start_date, end_date, date_range)
+
+        params = {
+            "start_date": start,
+            "end_date": end,
+            "store_id": store_id,
+            "channel_id": channel_id,
+            "limit": limit,
+        }
+        if await http_cache.check_result(
+            AnalyticsService.get_top_items_analysis, params
+        ):
+            return http_cache.not_modified()
 
-        return data
+        data = await run_db(service.get_top_items_analysis, **params)
+
+        return http_cache.respond(data)
+    except AnalyticsError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -537,10 +706,12 @@ async def get_top_items_analysis(
 async def get_products_with_most_customizations(
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
+    date_range: Optional[str] = Query(None, alias="range"),
     store_id: Optional[int] = Query(None),
     channel_id: Optional[int] = Query(None),
     limit: int = Query(20, ge=1, le=100),
     service: AnalyticsService = Depends(get_analytics_service),
+    http_cache: HttpCache = Depends(),
 ):
     """
     Get products that receive most customizations.
@@ -548,10 +719,12 @@ async def get_products_with_most_customizations(
     Args:
         start_date: Start date (YYYY-MM-DD)
         end_date: End date (YYYY-MM-DD)
+        date_range: Relative range token (e.g. last_30d), replaces the dates
         store_id: Filter by store
         channel_id: Filter by channel
         limit: Number of products to return
         service: Analytics service
+        http_cache: Conditional response helper
 
     Returns:
         Products with customization statistics
@@ -559,17 +732,27 @@ async def get_products_with_most_customizations(
     try:
         # Parse dates
         # Parse dates using centralized parser
-        start, end = parse_date_filters(start_date, end_date)
-
-        data = service.get_products_with_most_customizations(
-            start_date=start,
-            end_date=end,
-            store_id=store_id,
-            channel_id=channel_id,
-            limit=limit
+        start, end = parse_date_filters(start_date, end_date, date_range)
+
+        params = {
+            "start_date": start,
+            "end_date": end,
+            "store_id": store_id,
+            "channel_id": channel_id,
+            "limit": limit,
+        }
+        if await http_cache.check_result(
+            AnalyticsService.get_products_with_most_customizations, params
+        ):
+            return http_cache.not_modified()
+
+        data = await run_db(
+            service.get_products_with_most_customizations, **params
         )
 
-        return data
+        return http_cache.respond(data)
+    except AnalyticsError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -578,8 +761,10 @@ async def get_products_with_most_customizations(
 async def get_payment_mix_by_channel(
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
+    date_range: Optional[str] = Query(None, alias="range"),
     store_id: Optional[int] = Query(None),
     service: AnalyticsService = Depends(get_analytics_service),
+    http_cache: HttpCache = Depends(),
 ):
     """
     Get payment mix analysis by channel.
@@ -587,8 +772,10 @@ async def get_payment_mix_by_channel(
     Args:
         start_date: Start date (YYYY-MM-DD)
         end_date: End date (YYYY-MM-DD)
+        date_range: Relative range token (e.g. last_30d), replaces the dates
         store_id: Filter by store
         service: Analytics service
+        http_cache: Conditional response helper
 
     Returns:
         Payment mix data by channel
@@ -596,15 +783,23 @@ async def get_payment_mix_by_channel(
     try:
         # Parse dates
         # Parse dates using centralized parser
-        start, end = parse_date_filters(start_date, end_date)
+        start, end = parse_date_filters(start_date, end_date, date_range)
 
-        data = service.get_payment_mix_by_channel(
-            start_date=start,
-            end_date=end,
-            store_id=store_id
-        )
+        params = {
+            "start_date": start,
+            "end_date": end,
+            "store_id": store_id,
+        }
+        if await http_cache.check_result(
+            AnalyticsService.get_payment_mix_by_channel, params
+        ):
+            return http_cache.not_modified()
 
-        return data
+        data = await run_db(service.get_payment_mix_by_channel, **params)
+
+        return http_cache.respond(data)
+    except AnalyticsError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -613,9 +808,11 @@ async def get_payment_mix_by_channel(
 async def get_cancellations_analysis(
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
+    date_range: Optional[str] = Query(None, alias="range"),
     store_id: Optional[int] = Query(None),
     channel_id: Optional[int] = Query(None),
     service: AnalyticsService = Depends(get_analytics_service),
+    http_cache: HttpCache = Depends(),
 ):
     """Get cancellations analysis."""
     start = None
@@ -639,41 +836,59 @@ async def get_cancellations_analysis(
                 detail="Invalid end_date format",
             )
 
-    data = service.get_cancellations_analysis(
-        start_date=start,
-        end_date=end,
-        store_id=store_id,
-        channel_id=channel_id
-    )
-    return data
+    start, end = apply_date_range(start, end, date_range)
+
+    params = {
+        "start_date": start,
+        "end_date": end,
+        "store_id": store_id,
+        "channel_id": channel_id,
+    }
+    if await http_cache.check_result(
+        AnalyticsService.get_cancellations_analysis, params
+    ):
+        return http_cache.not_modified()
+
+    data = await run_db(service.get_cancellations_analysis, **params)
+    return http_cache.respond(data)
 
 
 @router.get("/analytics/delivery-performance-by-region")
 async def get_delivery_performance_by_region_summary(
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
+    date_range: Optional[str] = Query(None, alias="range"),
     store_id: Optional[int] = Query(None),
     service: AnalyticsService = Depends(get_analytics_service),
+    http_cache: HttpCache = Depends(),
 ):
     """Get delivery performance by region summary."""
     # Parse dates using centralized parser
-    start, end = parse_date_filters(start_date, end_date)
+    start, end = parse_date_filters(start_date, end_date, date_range)
 
-    data = service.get_delivery_performance_by_region(
-        start_date=start,
-        end_date=end,
-        store_id=store_id
-    )
-    return data
+    params = {
+        "start_date": start,
+        "end_date": end,
+        "store_id": store_id,
+    }
+    if await http_cache.check_result(
+        AnalyticsService.get_delivery_performance_by_region, params
+    ):
+        return http_cache.not_modified()
+
+    data = await run_db(service.get_delivery_performance_by_region, **params)
+    return http_cache.respond(data)
 
 
 @router.get("/analytics/delivery-regions")
 async def get_delivery_performance_by_region(
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
+    date_range: Optional[str] = Query(None, alias="range"),
     store_id: Optional[int] = Query(None),
     limit: int = Query(50, ge=1, le=200),
     service: AnalyticsService = Depends(get_analytics_service),
+    http_cache: HttpCache = Depends(),
 ):
     """
     Get delivery performance by region.
@@ -681,9 +896,11 @@ async def get_delivery_performance_by_region(
     Args:
         start_date: Start date (YYYY-MM-DD)
         end_date: End date (YYYY-MM-DD)
+        date_range: Relative range token (e.g. last_30d), replaces the dates
         store_id: Filter by store
         limit: Number of regions to return
         service: Analytics service
+        http_cache: Conditional response helper
 
     Returns:
         Delivery performance by region
@@ -691,16 +908,26 @@ async def get_delivery_performance_by_region(
     try:
         # Parse dates
         # Parse dates using centralized parser
-        start, end = parse_date_filters(start_date, end_date)
+        start, end = parse_date_filters(start_date, end_date, date_range)
+
+        params = {
+            "start_date": start,
+            "end_date": end,
+            "store_id": store_id,
+            "limit": limit,
+        }
+        if await http_cache.check_result(
+            AnalyticsService.get_delivery_performance_by_region, params
+        ):
+            return http_cache.not_modified()
 
-        data = service.get_delivery_performance_by_region(
-            start_date=start,
-            end_date=end,
-            store_id=store_id,
-            limit=limit
+        data = await run_db(
+            service.get_delivery_performance_by_region, **params
         )
 
-        return data
+        return http_cache.respond(data)
+    except AnalyticsError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -709,8 +936,10 @@ async def get_delivery_performance_by_region(
 async def get_store_growth_analysis(
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
+    date_range: Optional[str] = Query(None, alias="range"),
     min_growth_rate: float = Query(5.0, ge=0, le=100),
     service: AnalyticsService = Depends(get_analytics_service),
+    http_cache: HttpCache = Depends(),
 ):
     """
     Get store growth analysis with linear trend detection.
@@ -718,8 +947,10 @@ async def get_store_growth_analysis(
     Args:
         start_date: Start date (YYYY-MM-DD)
         end_date: End date (YYYY-MM-DD)
+        date_range: Relative range token (e.g. last_30d), replaces the dates
         min_growth_rate: Minimum growth rate percentage to consider
         service: Analytics service
+        http_cache: Conditional response helper
 
     Returns:
         Store growth analysis data
@@ -727,15 +958,23 @@ async def get_store_growth_analysis(
     try:
         # Parse dates
         # Parse dates using centralized parser
-        start, end = parse_date_filters(start_date, end_date)
+        start, end = parse_date_filters(start_date, end_date, date_range)
 
-        data = service.get_store_growth_analysis(
-            start_date=start,
-            end_date=end,
-            min_growth_rate=min_growth_rate
-        )
+        params = {
+            "start_date": start,
+            "end_date": end,
+            "min_growth_rate": min_growth_rate,
+        }
+        if await http_cache.check_result(
+            AnalyticsService.get_store_growth_analysis, params
+        ):
+            return http_cache.not_modified()
+
+        data = await run_db(service.get_store_growth_analysis, **params)
 
-        return data
+        return http_cache.respond(data)
+    except AnalyticsError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -744,10 +983,12 @@ async def get_store_growth_analysis(
 async def get_product_seasonality_analysis(
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
+    date_range: Optional[str] = Query(None, alias="range"),
     store_id: Optional[int] = Query(None),
     channel_id: Optional[int] = Query(None),
     min_seasonality_threshold: float = Query(0.3, ge=0, le=1),
     service: AnalyticsService = Depends(get_analytics_service),
+    http_cache: HttpCache = Depends(),
 ):
     """
     Get product seasonality analysis.
@@ -755,10 +996,12 @@ async def get_product_seasonality_analysis(
     Args:
         start_date: Start date (YYYY-MM-DD)
         end_date: End date (YYYY-MM-DD)
+        date_range: Relative range token (e.g. last_30d), replaces the dates
         store_id: Filter by store
         channel_id: Filter by channel
         min_seasonality_threshold: Minimum seasonality score to consider
         service: Analytics service
+        http_cache: Conditional response helper
 
     Returns:
         Product seasonality analysis data
@@ -766,16 +1009,24 @@ async def get_product_seasonality_analysis(
     try:
         # Parse dates
         # Parse dates using centralized parser
-        start, end = parse_date_filters(start_date, end_date)
+        start, end = parse_date_filters(start_date, end_date, date_range)
 
-        data = service.get_product_seasonality_analysis(
-            start_date=start,
-            end_date=end,
-            store_id=store_id,
-            channel_id=channel_id,
-        )
+        params = {
+            "start_date": start,
+            "end_date": end,
+            "store_id": store_id,
+            "channel_id": channel_id,
+        }
+        if await http_cache.check_result(
+            AnalyticsService.get_product_seasonality_analysis, params
+        ):
+            return http_cache.not_modified()
+
+        data = await run_db(service.get_product_seasonality_analysis, **params)
 
-        return data
+        return http_cache.respond(data)
+    except AnalyticsError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -784,9 +1035,11 @@ async def get_product_seasonality_analysis(
 async def get_promotions_analysis(
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
+    date_range: Optional[str] = Query(None, alias="range"),
     store_id: Optional[int] = Query(None),
     channel_id: Optional[int] = Query(None),
     service: AnalyticsService = Depends(get_analytics_service),
+    http_cache: HttpCache = Depends(),
 ):
     """
     Get promotions and discounts analysis.
@@ -794,9 +1047,11 @@ async def get_promotions_analysis(
     Args:
         start_date: Start date (YYYY-MM-DD)
         end_date: End date (YYYY-MM-DD)
+        date_range: Relative range token (e.g. last_30d), replaces the dates
         store_id: Filter by store
         channel_id: Filter by channel
         service: Analytics service
+        http_cache: Conditional response helper
 
     Returns:
         Promotions analysis data
@@ -824,15 +1079,23 @@ async def get_promotions_analysis(
                     detail=f"Invalid end_date format: {end_date}",
                 )
 
-        data = service.get_promotions_analysis(
-            start_date=start,
-            end_date=end,
-            store_id=store_id,
-            channel_id=channel_id,
-        )
+        start, end = apply_date_range(start, end, date_range)
 
-        return data
-    except HTTPException:
+        params = {
+            "start_date": start,
+            "end_date": end,
+            "store_id": store_id,
+            "channel_id": channel_id,
+        }
+        if await http_cache.check_result(
+            AnalyticsService.get_promotions_analysis, params
+        ):
+            return http_cache.not_modified()
+
+        data = await run_db(service.get_promotions_analysis, **params)
+
+        return http_cache.respond(data)
+    except (HTTPException, AnalyticsError):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -842,10 +1105,12 @@ async def get_promotions_analysis(
 async def get_inventory_turnover(
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
+    date_range: Optional[str] = Query(None, alias="range"),
     store_id: Optional[int] = Query(None),
     channel_id: Optional[int] = Query(None),
     limit: int = Query(20, ge=1, le=100),
     service: AnalyticsService = Depends(get_analytics_service),
+    http_cache: HttpCache = Depends(),
 ):
     """
     Get inventory turnover analysis.
@@ -853,10 +1118,12 @@ async def get_inventory_turnover(
     Args:
         start_date: Start date (YYYY-MM-DD)
         end_date: End date (YYYY-MM-DD)
+        date_range: Relative range token (e.g. last_30d), replaces the dates
         store_id: Filter by store
         channel_id: Filter by channel
         limit: Number of products to return
         service: Analytics service
+        http_cache: Conditional response helper
 
     Returns:
         Inventory turnover analysis
@@ -884,16 +1151,24 @@ async def get_inventory_turnover(
                     detail=f"Invalid end_date format: {end_date}"
                 )
 
-        data = service.get_inventory_turnover_analysis(
-            start_date=start,
-            end_date=end,
-            store_id=store_id,
-            channel_id=channel_id,
-            limit=limit
-        )
+        start, end = apply_date_range(start, end, date_range)
+
+        params = {
+            "start_date": start,
+            "end_date": end,
+            "store_id": store_id,
+            "channel_id": channel_id,
+            "limit": limit,
+        }
+        if await http_cache.check_result(
+            AnalyticsService.get_inventory_turnover_analysis, params
+        ):
+            return http_cache.not_modified()
 
-        return {"data": data}
-    except HTTPException:
+        data = await run_db(service.get_inventory_turnover_analysis, **params)
+
+        return http_cache.respond({"data": data})
+    except (HTTPException, AnalyticsError):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -903,8 +1178,10 @@ async def get_inventory_turnover(
 async def get_anomalies_detection(
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
+    date_range: Optional[str] = Query(None, alias="range"),
     store_id: Optional[int] = Query(None),
     service: AnalyticsService = Depends(get_analytics_service),
+    http_cache: HttpCache = Depends(),
 ):
     """
     Get anomaly alerts and detection.
@@ -912,8 +1189,10 @@ async def get_anomalies_detection(
     Args:
         start_date: Start date (YYYY-MM-DD)
         end_date: End date (YYYY-MM-DD)
+        date_range: Relative range token (e.g. last_30d), replaces the dates
         store_id: Filter by store
         service: Analytics service
+        http_cache: Conditional response helper
 
     Returns:
         Anomaly alerts data
@@ -941,14 +1220,22 @@ async def get_anomalies_detection(
                     detail=f"Invalid end_date format: {end_date}"
                 )
 
-        data = service.get_anomaly_alerts(
-            start_date=start,
-            end_date=end,
-            store_id=store_id
-        )
+        start, end = apply_date_range(start, end, date_range)
+
+        params = {
+            "start_date": start,
+            "end_date": end,
+            "store_id": store_id,
+        }
+        if await http_cache.check_result(
+            AnalyticsService.get_anomaly_alerts, params
+        ):
+            return http_cache.not_modified()
+
+        data = await run_db(service.get_anomaly_alerts, **params)
 
-        return {"data": data}
-    except HTTPException:
+        return http_cache.respond({"data": data})
+    except (HTTPException, AnalyticsError):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
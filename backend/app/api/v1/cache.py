@@ -2,14 +2,18 @@
 Cache endpoints.
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, BackgroundTasks, HTTPException
 from typing import Dict
 
+from app.config import settings
+from app.jobs.cache_warmer import warm_cache
 from app.services.cache import (
-    redis_client,
+    cache_stats,
     invalidate_cache,
+    invalidate_tags,
     clear_all_cache
 )
+from app.services.redis_manager import redis_manager
 
 router = APIRouter()
 
@@ -19,45 +23,60 @@ async def cache_status() -> Dict:
     """
     Get cache status.
 
+    Uses the asyncio Redis client, so a slow Redis never blocks the event
+    loop, and reports the circuit breaker state.
+
     Returns:
-        Dict with cache status
+        Dict with cache status and L1/L2 hit statistics
     """
-    is_connected = redis_client is not None
+    client = redis_manager.async_client()
+    tiers = {**cache_stats(), "circuit": redis_manager.stats()}
 
-    if is_connected:
+    if client:
         try:
-            info = redis_client.info()
-            pool_kwargs = redis_client.connection_pool.connection_kwargs
+            info = await client.info()
+            pool_kwargs = client.connection_pool.connection_kwargs
             return {
                 "status": "connected",
                 "host": pool_kwargs.get("host"),
                 "port": pool_kwargs.get("port"),
                 "memory_used": info.get("used_memory_human"),
                 "connected_clients": info.get("connected_clients"),
-                "keys_count": redis_client.dbsize(),
+                "keys_count": await client.dbsize(),
+                **tiers,
             }
         except Exception as e:
             return {
                 "status": "error",
-                "error": str(e)
+                "error": str(e),
+                **tiers,
             }
 
     return {
         "status": "disconnected",
-        "message": "Redis not available"
+        "message": "Redis not available",
+        **tiers,
     }
 
 
 @router.post("/cache/clear")
-async def clear_cache() -> Dict:
+async def clear_cache(background_tasks: BackgroundTasks) -> Dict:
     """
     Clear all cache.
 
+    The cache warmer runs right after, so the first users do not pay for
+    every cold aggregation.
+
+    Args:
+        background_tasks: Request background tasks
+
     Returns:
         Dict with result
     """
     try:
         success = clear_all_cache()
+        if success and settings.CACHE_WARM_ENABLED and not settings.TESTING:
+            background_tasks.add_task(warm_cache)
         msg = (
             "Cache cleared successfully"
             if success else "Failed to clear cache"
@@ -70,13 +89,38 @@ async def clear_cache() -> Dict:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/cache/tags/{tag}/invalidate")
+async def invalidate_cache_by_tag(tag: str) -> Dict:
+    """
+    Invalidate cache keys registered under a tag.
+
+    Store, channel and day tags also invalidate results not filtered on
+    that dimension (e.g. 'store:3' includes 'store:any').
+
+    Args:
+        tag: Tag (e.g., 'store:3', 'metric:revenue', 'day:2024-01-31')
+
+    Returns:
+        Dict with number of keys deleted
+    """
+    try:
+        deleted = invalidate_tags([tag])
+        return {
+            "tag": tag,
+            "deleted_keys": deleted,
+            "message": f"Deleted {deleted} keys tagged {tag}"
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.post("/cache/invalidate/{pattern}")
 async def invalidate_cache_by_pattern(pattern: str) -> Dict:
     """
-    Invalidate cache keys matching pattern.
+    Invalidate cache keys matching pattern (SCAN, prefer tags).
 
     Args:
-        pattern: Redis key pattern (e.g., 'revenue_*')
+        pattern: Redis key pattern (e.g., 'v1:revenue:*')
 
     Returns:
         Dict with number of keys deleted
@@ -3,8 +3,9 @@ Dashboard endpoints.
 """
 
 from fastapi import APIRouter, Depends, Query
-from typing import Optional
+from typing import Optional, Union
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.schemas.dashboard import (
@@ -14,7 +15,17 @@ from app.schemas.dashboard import (
     DashboardListResponse,
 )
 from app.services.dashboard import DashboardService
-from app.db.session import get_db
+from app.services.async_services import AsyncDashboardService
+from app.services.analytics_batch import AnalyticsBatchService
+from app.services.dashboard_data import (
+    DashboardDataService,
+    record_dashboard_view,
+)
+from app.services.cache import data_versions
+from app.api.v1.analytics import get_analytics_batch_service
+from app.db.session import get_db, get_async_db
+from app.core.executor import run_db
+from app.core.http_cache import HttpCache
 from app.core.logging import get_logger
 from app.core.exceptions import NotFoundError, DatabaseError, ValidationError
 
@@ -23,19 +34,40 @@ logger = get_logger(__name__)
 router = APIRouter()
 
 
-def get_dashboard_service(db: Session = Depends(get_db)) -> DashboardService:
+def get_dashboard_service(
+    db: Session = Depends(get_db),
+    async_db: Optional[AsyncSession] = Depends(get_async_db),
+) -> Union[DashboardService, AsyncDashboardService]:
     """
     Get dashboard service.
 
     Args:
         db: Database session
+        async_db: Async database session (None if the async path is off)
 
     Returns:
         Dashboard service instance
     """
+    if async_db is not None:
+        return AsyncDashboardService(async_db)
     return DashboardService(db)
 
 
+def get_dashboard_data_service(
+    batch: AnalyticsBatchService = Depends(get_analytics_batch_service),
+) -> DashboardDataService:
+    """
+    Get dashboard data service.
+
+    Args:
+        batch: Analytics batch service
+
+    Returns:
+        Dashboard data service instance
+    """
+    return DashboardDataService(batch)
+
+
 @router.post("/dashboards", response_model=DashboardResponse)
 async def create_dashboard(
     dashboard: DashboardCreate,
@@ -56,7 +88,7 @@ async def create_dashboard(
             "Creating dashboard",
             extra={"extra_data": {"name": dashboard.name}},
         )
-        result = service.create_dashboard(dashboard)
+        result = await run_db(service.create_dashboard, dashboard)
         logger.info(
             "Dashboard created successfully",
             extra={"extra_data": {"dashboard_id": result.id}},
@@ -124,7 +156,7 @@ async def get_default_dashboard(
     """
     try:
         logger.debug("Fetching default dashboard")
-        dashboard = service.get_default_dashboard()
+        dashboard = await run_db(service.get_default_dashboard)
         if not dashboard:
             logger.debug("No default dashboard found - returning null")
             return None
@@ -183,7 +215,9 @@ async def list_dashboards(
             "Listing dashboards",
             extra={"extra_data": {"limit": limit, "offset": offset}},
         )
-        dashboards, total = service.list_dashboards(limit=limit, offset=offset)
+        dashboards, total = await run_db(
+            service.list_dashboards, limit=limit, offset=offset
+        )
         logger.info(
             f"Dashboards listed: {len(dashboards)}/{total}",
             extra={"extra_data": {"count": len(dashboards), "total": total}},
@@ -241,7 +275,7 @@ async def get_dashboard(
         "Fetching dashboard",
         extra={"extra_data": {"dashboard_id": dashboard_id}},
     )
-    dashboard = service.get_dashboard(dashboard_id)
+    dashboard = await run_db(service.get_dashboard, dashboard_id)
     if not dashboard:
         logger.warning(
             "Dashboard not found",
@@ -249,9 +283,54 @@ async def get_dashboard(
         )
         raise NotFoundError("Dashboard", identifier=dashboard_id)
 
+    await record_dashboard_view(dashboard.id)
     return dashboard
 
 
+@router.get("/dashboards/{dashboard_id}/data")
+async def get_dashboard_data(
+    dashboard_id: int,
+    start_date: Optional[str] = Query(None),
+    end_date: Optional[str] = Query(None),
+    date_range: Optional[str] = Query(None, alias="range"),
+    store_id: Optional[int] = Query(None),
+    channel_id: Optional[int] = Query(None),
+    service: DashboardService = Depends(get_dashboard_service),
+    data_service: DashboardDataService = Depends(get_dashboard_data_service),
+):
+    """
+    Get the data of every widget of a dashboard.
+
+    Args:
+        dashboard_id: Dashboard ID
+        start_date: Start date override (YYYY-MM-DD)
+        end_date: End date override (YYYY-MM-DD)
+        date_range: Relative range override (e.g. last_30d)
+        store_id: Store filter override
+        channel_id: Channel filter override
+        service: Dashboard service
+        data_service: Dashboard data service
+
+    Returns:
+        Dashboard payload with per-widget data
+    """
+    dashboard = await run_db(service.get_dashboard, dashboard_id)
+    if not dashboard:
+        raise NotFoundError("Dashboard", identifier=dashboard_id)
+
+    await record_dashboard_view(dashboard.id)
+    return await data_service.render(
+        dashboard,
+        overrides={
+            "range": date_range,
+            "start_date": start_date,
+            "end_date": end_date,
+            "store_id": store_id,
+            "channel_id": channel_id,
+        },
+    )
+
+
 @router.put("/dashboards/{dashboard_id}", response_model=DashboardResponse)
 async def update_dashboard(
     dashboard_id: int,
@@ -274,7 +353,9 @@ async def update_dashboard(
             "Updating dashboard",
             extra={"extra_data": {"dashboard_id": dashboard_id}},
         )
-        result = service.update_dashboard(dashboard_id, dashboard)
+        result = await run_db(
+            service.update_dashboard, dashboard_id, dashboard
+        )
         if not result:
             logger.warning(
                 "Dashboard not found for update",
@@ -324,7 +405,7 @@ async def delete_dashboard(
         "Deleting dashboard",
         extra={"extra_data": {"dashboard_id": dashboard_id}},
     )
-    success = service.delete_dashboard(dashboard_id)
+    success = await run_db(service.delete_dashboard, dashboard_id)
     if not success:
         logger.warning(
             "Dashboard not found for deletion",
@@ -359,7 +440,7 @@ async def enable_dashboard_sharing(
             "Enabling dashboard sharing",
             extra={"extra_data": {"dashboard_id": dashboard_id}},
         )
-        dashboard = service.enable_sharing(dashboard_id)
+        dashboard = await run_db(service.enable_sharing, dashboard_id)
         if not dashboard:
             raise NotFoundError("Dashboard", identifier=dashboard_id)
 
@@ -410,7 +491,7 @@ async def disable_dashboard_sharing(
             "Disabling dashboard sharing",
             extra={"extra_data": {"dashboard_id": dashboard_id}},
         )
-        dashboard = service.disable_sharing(dashboard_id)
+        dashboard = await run_db(service.disable_sharing, dashboard_id)
         if not dashboard:
             raise NotFoundError("Dashboard", identifier=dashboard_id)
 
@@ -461,7 +542,7 @@ async def get_shared_dashboard(
             "Fetching shared dashboard",
             extra={"extra_data": {"share_token": share_token}},
         )
-        dashboard = service.get_dashboard_by_token(share_token)
+        dashboard = await run_db(service.get_dashboard_by_token, share_token)
         if not dashboard:
             logger.warning(
                 "Shared dashboard not found or not shared",
@@ -499,3 +580,38 @@ async def get_shared_dashboard(
             exc_info=True
         )
         raise
+
+
+@router.get("/dashboards/share/{share_token}/data")
+async def get_shared_dashboard_data(
+    share_token: str,
+    service: DashboardService = Depends(get_dashboard_service),
+    data_service: DashboardDataService = Depends(get_dashboard_data_service),
+    http_cache: HttpCache = Depends(),
+):
+    """
+    Get the data of every widget of a shared dashboard (public endpoint).
+
+    Shared dashboards always use their saved filters. Responses carry an
+    ETag, and a matching If-None-Match is answered with 304 without
+    rendering.
+
+    Args:
+        share_token: Share token
+        service: Dashboard service
+        data_service: Dashboard data service
+        http_cache: Conditional response helper
+
+    Returns:
+        Dashboard payload with per-widget data
+    """
+    dashboard = await run_db(service.get_dashboard_by_token, share_token)
+    if not dashboard:
+        raise NotFoundError("Dashboard compartilhado", identifier=share_token)
+
+    await record_dashboard_view(dashboard.id)
+    # The key carries the data version: read it without blocking
+    await data_versions.arefresh()
+    if await http_cache.check(*data_service.validator_key(dashboard)):
+        return http_cache.not_modified()
+    return http_cache.respond(await data_service.render(dashboard))
@@ -4,6 +4,9 @@ Health check endpoint.
 
 from fastapi import APIRouter
 
+from app.core.executor import db_executor, refresh_executor
+from app.services.redis_manager import redis_manager
+
 router = APIRouter()
 
 
@@ -17,5 +20,8 @@ async def health_check():
     """
     return {
         "status": "ok",
-        "message": "Analytics para Restaurantes API is running"
+        "message": "Analytics para Restaurantes API is running",
+        "db_executor": db_executor.stats(),
+        "cache_refresh_executor": refresh_executor.stats(),
+        "redis": redis_manager.stats(),
     }
@@ -3,27 +3,36 @@ Sales endpoints.
 """
 
 from fastapi import APIRouter, Depends, Query, HTTPException
-from typing import Optional
+from typing import Optional, Union
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.services.sales import SalesService
-from app.db.session import get_db
+from app.services.async_services import AsyncSalesService
+from app.db.session import get_db, get_async_db
+from app.core.executor import run_db
 from app.utils.date_parser import parse_date_filters
 from app.core.exceptions import ValidationError
 
 router = APIRouter()
 
 
-def get_sales_service(db: Session = Depends(get_db)) -> SalesService:
+def get_sales_service(
+    db: Session = Depends(get_db),
+    async_db: Optional[AsyncSession] = Depends(get_async_db),
+) -> Union[SalesService, AsyncSalesService]:
     """
     Get sales service.
 
     Args:
         db: Database session
+        async_db: Async database session (None if the async path is off)
 
     Returns:
         Sales service instance
     """
+    if async_db is not None:
+        return AsyncSalesService(async_db)
     return SalesService(db)
 
 
@@ -65,7 +74,8 @@ async def get_sales(
     
     try:
         # Get sales
-        sales = service.get_sales(
+        sales = await run_db(
+            service.get_sales,
             limit=limit,
             offset=offset,
             start_date=start,
@@ -75,7 +85,8 @@ async def get_sales(
         )
 
         # Get total count
-        total = service.get_sales_count(
+        total = await run_db(
+            service.get_sales_count,
             start_date=start,
             end_date=end,
             store_id=store_id,
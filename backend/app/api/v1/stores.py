@@ -8,35 +8,55 @@ from sqlalchemy.orm import Session
 from app.models.store import Store
 from app.models.channel import Channel
 from app.db.session import get_db
+from app.core.executor import run_db
+from app.core.http_cache import HttpCache
 
 router = APIRouter()
 
 
+def _list_active_stores(db: Session) -> list:
+    """Query active stores ordered by name."""
+    # Query only fields that exist in database
+    return db.query(
+        Store.id,
+        Store.name,
+        Store.city,
+        Store.state
+    ).filter(
+        Store.is_active.is_(True)
+    ).order_by(Store.name).all()
+
+
+def _list_channels(db: Session) -> list:
+    """Query channels ordered by name."""
+    # Query only fields that exist in database
+    return db.query(
+        Channel.id,
+        Channel.name,
+        Channel.description,
+        Channel.type
+    ).order_by(Channel.name).all()
+
+
 @router.get("/stores")
 async def get_stores(
-    db: Session = Depends(get_db)
-) -> dict:
+    db: Session = Depends(get_db),
+    http_cache: HttpCache = Depends(),
+):
     """
     Get list of all stores.
 
     Args:
         db: Database session
+        http_cache: Conditional response helper
 
     Returns:
         List of stores with id and name
     """
     try:
-        # Query only fields that exist in database
-        stores = db.query(
-            Store.id,
-            Store.name,
-            Store.city,
-            Store.state
-        ).filter(
-            Store.is_active.is_(True)
-        ).order_by(Store.name).all()
-
-        return {
+        stores = await run_db(_list_active_stores, db)
+
+        return http_cache.respond({
             "data": [
                 {
                     "id": store.id,
@@ -46,34 +66,30 @@ async def get_stores(
                 }
                 for store in stores
             ]
-        }
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/channels")
 async def get_channels(
-    db: Session = Depends(get_db)
-) -> dict:
+    db: Session = Depends(get_db),
+    http_cache: HttpCache = Depends(),
+):
     """
     Get list of all channels.
 
     Args:
         db: Database session
+        http_cache: Conditional response helper
 
     Returns:
         List of channels with id and name
     """
     try:
-        # Query only fields that exist in database
-        channels = db.query(
-            Channel.id,
-            Channel.name,
-            Channel.description,
-            Channel.type
-        ).order_by(Channel.name).all()
-
-        return {
+        channels = await run_db(_list_channels, db)
+
+        return http_cache.respond({
             "data": [
                 {
                     "id": channel.id,
@@ -83,6 +99,6 @@ async def get_channels(
                 }
                 for channel in channels
             ]
-        }
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
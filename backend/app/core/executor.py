@@ -0,0 +1,215 @@
+"""
+Bounded thread pool for blocking database work.
+
+SQLAlchemy sessions are synchronous, so calling services directly from
+`async def` endpoints blocks the event loop. Endpoints dispatch service calls
+through `run_db`, which runs them on a thread pool sized to the SQLAlchemy
+connection pool: a thread never waits for a connection, and requests beyond
+pool capacity queue here instead of freezing the worker.
+"""
+
+import asyncio
+import contextvars
+import functools
+import inspect
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from app.config import settings
+
+T = TypeVar("T")
+
+
+class DBExecutor:
+    """Thread pool executor for blocking database calls with metrics."""
+
+    def __init__(self, max_workers: int):
+        """
+        Initialize the executor.
+
+        Args:
+            max_workers: Maximum number of worker threads
+        """
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        # Metrics
+        self._queued = 0
+        self._active = 0
+        self._completed = 0
+        self._failed = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._total_run = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Get the thread pool, creating it on first use."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="db-worker",
+                )
+            return self._executor
+
+    def _call(self, func: Callable[..., T], submitted_at: float) -> T:
+        """Run func on a worker thread, recording wait and run times."""
+        started_at = time.perf_counter()
+        wait = started_at - submitted_at
+        with self._lock:
+            self._queued -= 1
+            self._active += 1
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+
+        failed = False
+        try:
+            return func()
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - started_at
+            with self._lock:
+                self._active -= 1
+                self._completed += 1
+                self._total_run += elapsed
+                if failed:
+                    self._failed += 1
+
+    async def run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """
+        Run a blocking callable on the pool and await its result.
+
+        Context variables (e.g. request logging context) are propagated to
+        the worker thread.
+
+        Args:
+            func: Blocking callable
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            The callable's return value
+        """
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        call = functools.partial(ctx.run, func, *args, **kwargs)
+
+        with self._lock:
+            self._queued += 1
+        try:
+            return await loop.run_in_executor(
+                self._get_executor(),
+                self._call,
+                call,
+                time.perf_counter(),
+            )
+        except RuntimeError:
+            # Executor was shut down before the task was accepted
+            with self._lock:
+                self._queued -= 1
+            raise
+
+    def submit(self, func: Callable[..., T], *args, **kwargs) -> Future:
+        """
+        Run a blocking callable on the pool without waiting for it.
+
+        Args:
+            func: Blocking callable
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            Future of the callable's result
+
+        Raises:
+            RuntimeError: If the pool is shutting down
+        """
+        ctx = contextvars.copy_context()
+        call = functools.partial(ctx.run, func, *args, **kwargs)
+
+        with self._lock:
+            self._queued += 1
+        try:
+            return self._get_executor().submit(
+                self._call, call, time.perf_counter()
+            )
+        except RuntimeError:
+            with self._lock:
+                self._queued -= 1
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get executor metrics.
+
+        Returns:
+            Queue depth, active workers and wait/run time statistics
+        """
+        with self._lock:
+            completed = self._completed
+            return {
+                "max_workers": self.max_workers,
+                "queue_depth": self._queued,
+                "active": self._active,
+                "completed": completed,
+                "failed": self._failed,
+                "avg_wait_ms": (
+                    round(self._total_wait / completed * 1000, 2)
+                    if completed
+                    else 0.0
+                ),
+                "max_wait_ms": round(self._max_wait * 1000, 2),
+                "avg_run_ms": (
+                    round(self._total_run / completed * 1000, 2)
+                    if completed
+                    else 0.0
+                ),
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Shut down the thread pool.
+
+        A new pool is created on the next call to run() or submit().
+
+        Args:
+            wait: Wait for running calls to finish
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+# One worker per connection the SQLAlchemy pool can hand out
+db_executor = DBExecutor(
+    max_workers=settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+)
+
+# Background recomputes of stale cache entries (see app.services.cache)
+refresh_executor = DBExecutor(max_workers=settings.CACHE_REFRESH_WORKERS)
+
+
+async def run_db(func: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Run a database call on the shared DB executor.
+
+    Methods of the async services (see app.services.async_services) are
+    already non-blocking and are awaited directly.
+
+    Args:
+        func: Blocking callable or coroutine function (a service method)
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        The callable's return value
+    """
+    if inspect.iscoroutinefunction(func):
+        return await func(*args, **kwargs)
+    return await db_executor.run(func, *args, **kwargs)
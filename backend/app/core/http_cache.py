@@ -0,0 +1,210 @@
+"""
+HTTP conditional caching for read endpoints.
+
+Responses carry a strong ETag and Cache-Control so browsers and the nginx
+proxy cache can reuse them. When a response is backed by a cached service
+result, its ETag is derived from the result's cache key, which already
+includes the store's data version for ranges touching recent data (see
+cache.data_version_for), and from the cache's invalidation generation, so
+invalidated results (e.g. a corrected closed day) get a new ETag too. A
+matching If-None-Match is then answered with 304 before the result is
+computed or serialized.
+
+Other responses (reference data, open ranges while no data version is
+known) get an ETag hashed from the serialized body, which still spares
+the transfer of an unchanged body.
+
+Validators are built from the data versions read through the asyncio
+client, so a conditional check never blocks the event loop on Redis.
+
+Usage in an endpoint:
+
+    http_cache: HttpCache = Depends()
+    ...
+    if await http_cache.check_result(AnalyticsService.get_revenue, params):
+        return http_cache.not_modified()
+    data = await run_db(service.get_revenue, **params)
+    return http_cache.respond({"data": data})
+"""
+
+import hashlib
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+
+from app.config import settings
+from app.services import cache
+
+CONDITIONAL_METHODS = ("GET", "HEAD")
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Build a strong ETag from its parts.
+
+    Args:
+        *parts: Values (or raw bytes) identifying the representation
+
+    Returns:
+        Quoted ETag
+    """
+    digest = hashlib.sha1(
+        b"\x1f".join(
+            part if isinstance(part, bytes) else str(part).encode()
+            for part in parts
+        )
+    ).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag.
+
+    If-None-Match uses the weak comparison, so a 'W/' prefix is ignored.
+
+    Args:
+        if_none_match: Header value (comma-separated ETags or '*')
+        etag: Current ETag
+
+    Returns:
+        True if the client's copy is current
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def cache_control(max_age: int) -> str:
+    """Cache-Control value for a shared cacheable response."""
+    return (
+        f"public, max-age={max_age}, "
+        f"stale-while-revalidate={settings.HTTP_CACHE_STALE_SECONDS}"
+    )
+
+
+class HttpCache:
+    """Conditional response helper for one request (use as a dependency)."""
+
+    def __init__(self, request: Request):
+        """
+        Initialize for a request.
+
+        Args:
+            request: Incoming request
+        """
+        self.request = request
+        self.etag: Optional[str] = None
+        self.max_age = settings.HTTP_CACHE_MAX_AGE_SECONDS
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the request may be answered conditionally."""
+        return (
+            settings.HTTP_CACHE_ENABLED
+            and self.request.method in CONDITIONAL_METHODS
+        )
+
+    def _is_current(self, etag: str) -> bool:
+        """Check the request's If-None-Match against an ETag."""
+        return etag_matches(self.request.headers.get("if-none-match"), etag)
+
+    async def check(self, key: str, params: Dict[str, Any]) -> bool:
+        """
+        Use a cache key as the response's ETag.
+
+        The key is only trusted when it changes with the data: closed
+        ranges, or open ranges keyed by a known data version. The
+        invalidation generation is part of the ETag, so invalidating
+        cached results also invalidates the clients' copies.
+
+        Args:
+            key: Cache key of the result behind the response
+            params: Filters of the result (end_date and store_id are used)
+
+        Returns:
+            True if the client's copy is current (answer not_modified())
+        """
+        if not self.enabled:
+            return False
+
+        # Both the data version and the generation come from this read
+        await cache.data_versions.arefresh()
+        if cache.touches_recent_data(params.get("end_date")):
+            if cache.data_version_for(params) is None:
+                return False
+        else:
+            self.max_age = settings.HTTP_CACHE_CLOSED_MAX_AGE_SECONDS
+
+        self.etag = make_etag(
+            self.request.url.path, key, cache.invalidation_generation()
+        )
+        return self._is_current(self.etag)
+
+    async def check_result(
+        self, method: Callable[..., Any], params: Dict[str, Any]
+    ) -> bool:
+        """
+        Use the cache key of a cache_result method call as the ETag.
+
+        Args:
+            method: Method decorated with cache_result (unbound)
+            params: Keyword arguments of the call
+
+        Returns:
+            True if the client's copy is current (answer not_modified())
+        """
+        if not self.enabled:
+            return False
+
+        # The key carries the data version: read it without blocking
+        await cache.data_versions.arefresh()
+        try:
+            key = method.cache_key(None, **params)
+        except (AttributeError, TypeError):
+            return False
+        return await self.check(key, params)
+
+    def _headers(self) -> Dict[str, str]:
+        """Validator and freshness headers."""
+        return {
+            "ETag": self.etag,
+            "Cache-Control": cache_control(self.max_age),
+        }
+
+    def not_modified(self) -> Response:
+        """Empty 304 response for a current client copy."""
+        return Response(status_code=304, headers=self._headers())
+
+    def respond(self, content: Any) -> Response:
+        """
+        Serialize content once and attach the caching headers.
+
+        Without an ETag from check(), the ETag is hashed from the body.
+
+        Args:
+            content: Response content (anything FastAPI can encode)
+
+        Returns:
+            JSON response, or 304 if the client's copy is current
+        """
+        response = JSONResponse(content=jsonable_encoder(content))
+        if not settings.HTTP_CACHE_ENABLED:
+            return response
+
+        if self.etag is None:
+            self.etag = make_etag(self.request.url.path, response.body)
+            if self.enabled and self._is_current(self.etag):
+                return self.not_modified()
+        response.headers.update(self._headers())
+        return response
@@ -0,0 +1,95 @@
+"""
+Calendar parts of a timestamp as portable SQL expressions.
+
+They back the stored generated calendar columns of sales (see
+app.models.sale and migrations/006_sales_calendar_columns.sql), so they
+compile to immutable expressions on PostgreSQL and to deterministic
+strftime/date() calls on SQLite (used by the tests).
+
+Day of week follows PostgreSQL's DOW: 0=Sunday ... 6=Saturday. Weeks are
+ISO weeks, identified by their Monday.
+"""
+
+from sqlalchemy import Date, SmallInteger
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+POSTGRESQL_TEMPLATES = {
+    "date": "CAST({0} AS DATE)",
+    "dow": "CAST(EXTRACT(DOW FROM {0}) AS SMALLINT)",
+    "hour": "CAST(EXTRACT(HOUR FROM {0}) AS SMALLINT)",
+    "week": "CAST(date_trunc('week', {0}) AS DATE)",
+    "month": "CAST(date_trunc('month', {0}) AS DATE)",
+}
+
+SQLITE_TEMPLATES = {
+    "date": "date({0})",
+    "dow": "CAST(strftime('%w', {0}) AS INTEGER)",
+    "hour": "CAST(strftime('%H', {0}) AS INTEGER)",
+    "week": (
+        "date({0}, '-' || ((CAST(strftime('%w', {0}) AS INTEGER) + 6) % 7)"
+        " || ' days')"
+    ),
+    "month": "date({0}, 'start of month')",
+}
+
+
+class CalendarPart(FunctionElement):
+    """Calendar part of a timestamp expression."""
+
+    inherit_cache = True
+    part: str = ""
+
+
+class calendar_date(CalendarPart):
+    """Date of a timestamp."""
+
+    type = Date()
+    inherit_cache = True
+    part = "date"
+
+
+class calendar_dow(CalendarPart):
+    """Day of week of a timestamp (0=Sunday)."""
+
+    type = SmallInteger()
+    inherit_cache = True
+    part = "dow"
+
+
+class calendar_hour(CalendarPart):
+    """Hour of a timestamp (0-23)."""
+
+    type = SmallInteger()
+    inherit_cache = True
+    part = "hour"
+
+
+class calendar_week(CalendarPart):
+    """Monday of the ISO week of a timestamp."""
+
+    type = Date()
+    inherit_cache = True
+    part = "week"
+
+
+class calendar_month(CalendarPart):
+    """First day of the month of a timestamp."""
+
+    type = Date()
+    inherit_cache = True
+    part = "month"
+
+
+@compiles(CalendarPart)
+def _compile_calendar_part(element, compiler, **kw):
+    return POSTGRESQL_TEMPLATES[element.part].format(
+        compiler.process(element.clauses, **kw)
+    )
+
+
+@compiles(CalendarPart, "sqlite")
+def _compile_calendar_part_sqlite(element, compiler, **kw):
+    return SQLITE_TEMPLATES[element.part].format(
+        compiler.process(element.clauses, **kw)
+    )
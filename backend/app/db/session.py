@@ -2,8 +2,17 @@
 Database session management.
 """
 
+from contextlib import contextmanager
+from typing import AsyncIterator, Iterator, Optional
+
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 
 from app.config import settings
 
@@ -11,8 +20,8 @@ from app.config import settings
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
 )
 
 # Create session factory
@@ -25,6 +34,68 @@ SessionLocal = sessionmaker(
 # Base class for models
 Base = declarative_base()
 
+# Async drivers for the sync URL schemes we support
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def get_async_database_url(url: str) -> str:
+    """
+    Convert a sync database URL to its async driver equivalent.
+
+    Args:
+        url: Sync database URL (e.g. postgresql://...)
+
+    Returns:
+        URL using the async driver (e.g. postgresql+asyncpg://...)
+    """
+    scheme, sep, rest = url.partition("://")
+    if not sep:
+        raise ValueError(f"Invalid database URL: {url}")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}://{rest}"
+
+
+def create_async_session_factory(
+    url: str, **engine_kwargs
+) -> async_sessionmaker:
+    """
+    Create an async engine and session factory.
+
+    Objects are not expired on commit: attributes must stay readable after
+    the session's greenlet context is gone.
+
+    Args:
+        url: Async database URL
+        **engine_kwargs: Extra create_async_engine arguments
+
+    Returns:
+        Async session factory bound to the new engine
+    """
+    async_engine = create_async_engine(url, **engine_kwargs)
+    return async_sessionmaker(
+        bind=async_engine,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+
+async_engine: Optional[AsyncEngine] = None
+AsyncSessionLocal: Optional[async_sessionmaker] = None
+
+if settings.DB_ASYNC_ENABLED:
+    AsyncSessionLocal = create_async_session_factory(
+        settings.ASYNC_DATABASE_URL
+        or get_async_database_url(settings.DATABASE_URL),
+        pool_pre_ping=True,
+        pool_size=settings.DB_ASYNC_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+    )
+    async_engine = AsyncSessionLocal.kw["bind"]
+
 
 def get_db():
     """
@@ -38,3 +109,38 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+@contextmanager
+def session_scope() -> Iterator[Session]:
+    """
+    Session for work outside a request (jobs, concurrent batch items).
+
+    Rolls back on error and always closes the session.
+
+    Yields:
+        Database session
+    """
+    db = SessionLocal()
+    try:
+        yield db
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+async def get_async_db() -> AsyncIterator[Optional[AsyncSession]]:
+    """
+    Async database dependency generator.
+
+    Yields:
+        Async database session, or None if the async path is disabled
+    """
+    if AsyncSessionLocal is None:
+        yield None
+        return
+
+    async with AsyncSessionLocal() as session:
+        yield session
@@ -0,0 +1,3 @@
+"""
+Background and maintenance jobs.
+"""
@@ -0,0 +1,215 @@
+"""
+Cache warmer job.
+
+Precomputes the results users are most likely to ask for first, so the
+first visitors after a deploy or a cache clear do not pay for cold
+aggregations:
+
+- the default dashboard and the most viewed dashboards, with their saved
+  filters and every relative range in CACHE_WARM_RANGES;
+- the default dashboard for the top CACHE_WARM_STORES stores by recent
+  sales, over the same ranges.
+
+Dashboards are rendered through DashboardDataService, which fills the
+per-widget AnalyticsService results and the dashboard payload. At most
+CACHE_WARM_CONCURRENCY queries run at once, so warming never takes more
+than that many pooled connections from live traffic.
+
+Runs on startup and periodically inside the API process (see app.main
+lifespan), in the one worker holding its job lock (see app.jobs.locks), and
+can be invoked manually:
+
+    python -m app.jobs.cache_warmer
+"""
+
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import desc, func
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.logging import get_logger
+from app.db.session import session_scope
+from app.jobs.locks import JobLock
+from app.models.dashboard import Dashboard
+from app.models.sale import Sale
+from app.services import cache
+from app.services.analytics_batch import AnalyticsBatchService
+from app.services.dashboard import DashboardService
+from app.services.dashboard_data import (
+    DashboardDataService,
+    most_viewed_dashboards,
+)
+
+logger = get_logger(__name__)
+
+# Window used to rank stores by sales
+TOP_STORES_DAYS = 30
+
+# (dashboard, filter overrides) to render
+WarmTarget = Tuple[Dashboard, Dict[str, Any]]
+
+
+def warm_ranges() -> List[str]:
+    """Relative ranges to warm (CACHE_WARM_RANGES)."""
+    return [
+        token.strip()
+        for token in settings.CACHE_WARM_RANGES.split(",")
+        if token.strip()
+    ]
+
+
+def top_store_ids(db: Session, limit: int) -> List[int]:
+    """
+    Get the stores with the most sales in the last TOP_STORES_DAYS days.
+
+    Args:
+        db: Database session
+        limit: Maximum number of stores
+
+    Returns:
+        Store IDs, busiest first
+    """
+    if limit <= 0:
+        return []
+    since = datetime.now() - timedelta(days=TOP_STORES_DAYS)
+    rows = (
+        db.query(Sale.store_id, func.count(Sale.id).label("sales_count"))
+        .filter(Sale.created_at >= since, Sale.store_id.isnot(None))
+        .group_by(Sale.store_id)
+        .order_by(desc("sales_count"))
+        .limit(limit)
+        .all()
+    )
+    return [row.store_id for row in rows]
+
+
+def plan_warmup(db: Session) -> List[WarmTarget]:
+    """
+    List the dashboard renders that warm the cache.
+
+    Args:
+        db: Database session
+
+    Returns:
+        (dashboard, overrides) pairs, most important first
+    """
+    service = DashboardService(db)
+    default = service.get_default_dashboard()
+
+    dashboards: List[Dashboard] = [default] if default else []
+    for dashboard_id in most_viewed_dashboards(
+        settings.CACHE_WARM_DASHBOARDS
+    ):
+        dashboard = service.get_dashboard(dashboard_id)
+        if dashboard and all(d.id != dashboard.id for d in dashboards):
+            dashboards.append(dashboard)
+
+    ranges = warm_ranges()
+    targets: List[WarmTarget] = []
+    for dashboard in dashboards:
+        targets.append((dashboard, {}))
+        targets.extend((dashboard, {"range": token}) for token in ranges)
+
+    if default:
+        for store_id in top_store_ids(db, settings.CACHE_WARM_STORES):
+            targets.extend(
+                (default, {"range": token, "store_id": store_id})
+                for token in ranges
+            )
+    return targets
+
+
+def _load_plan() -> List[WarmTarget]:
+    """Plan on a session of its own (dashboards stay usable after it)."""
+    with session_scope() as db:
+        return plan_warmup(db)
+
+
+async def warm_cache(
+    batch: Optional[AnalyticsBatchService] = None,
+) -> Dict[str, int]:
+    """
+    Render the planned dashboards into the cache.
+
+    Args:
+        batch: Batch service computing the widgets (default: one limited
+            to CACHE_WARM_CONCURRENCY concurrent queries)
+
+    Returns:
+        Counts of rendered, already cached and failed targets
+    """
+    counts = {"rendered": 0, "cached": 0, "failed": 0}
+    if not cache.redis_client:
+        return counts
+
+    targets = await asyncio.to_thread(_load_plan)
+    data_service = DashboardDataService(
+        batch
+        or AnalyticsBatchService(
+            max_concurrency=settings.CACHE_WARM_CONCURRENCY
+        )
+    )
+
+    for dashboard, overrides in targets:
+        try:
+            payload = await data_service.render(dashboard, overrides)
+        except Exception as e:
+            counts["failed"] += 1
+            logger.error(
+                "Cache warm failed: %s", str(e),
+                extra={
+                    "extra_data": {
+                        "dashboard_id": dashboard.id,
+                        "overrides": overrides,
+                    }
+                },
+            )
+            continue
+        if payload.get("cached"):
+            counts["cached"] += 1
+        else:
+            counts["rendered"] += 1
+
+    logger.info("Cache warmed", extra={"extra_data": counts})
+    return counts
+
+
+async def run_cache_warm_loop(interval: int) -> None:
+    """
+    Warm the cache now and then every `interval` seconds.
+
+    Args:
+        interval: Seconds between runs
+    """
+    lock = JobLock("cache_warmer")
+    try:
+        while True:
+            try:
+                if await asyncio.to_thread(lock.acquire):
+                    await warm_cache()
+            except Exception as e:
+                logger.error("Cache warm failed: %s", str(e), exc_info=True)
+            await asyncio.sleep(interval)
+    finally:
+        await asyncio.to_thread(lock.release)
+
+
+def main() -> None:
+    """Command line entry point."""
+    argparse.ArgumentParser(
+        description="Precompute dashboard results into the cache"
+    ).parse_args()
+
+    counts = asyncio.run(warm_cache())
+    print(
+        f"Rendered {counts['rendered']} dashboards "
+        f"({counts['cached']} already cached, {counts['failed']} failed)"
+    )
+
+
+if __name__ == "__main__":
+    main()
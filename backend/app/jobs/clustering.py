@@ -0,0 +1,389 @@
+"""
+Physical ordering job for sales.
+
+sales rows arrive roughly in created_at order, so a BRIN index on
+created_at (migrations/008_sales_brin.sql) prunes long date ranges - the
+12-month store growth and seasonality analyses - from a few pages of
+index instead of a large B-tree. BRIN is only as selective as the table
+is ordered: late-arriving sales, updates and deletes scatter rows over
+time, which shows as a falling created_at correlation in pg_stats.
+
+Invoked manually, in a maintenance window, this job creates the BRIN
+index if missing and CLUSTERs sales on its created_at B-tree when the
+correlation drops below SALES_CLUSTER_MIN_CORRELATION. When sales is
+partitioned (005) each month is checked and clustered on its own, so only
+the months that drifted are rewritten and locked. CLUSTER keeps the rows,
+so cached results stay valid.
+
+    python -m app.jobs.clustering              # BRIN + drifted tables
+    python -m app.jobs.clustering --force      # cluster every table
+    python -m app.jobs.clustering --no-cluster # BRIN index only
+
+CLUSTER holds an ACCESS EXCLUSIVE lock for the whole rewrite, so the API
+process never runs it: when SALES_CLUSTER_ENABLED it only checks the
+correlation weekly (see app.main lifespan), in the one worker holding the
+job lock (see app.jobs.locks), and logs the tables to re-cluster.
+"""
+
+import argparse
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.logging import get_logger
+from app.db.session import session_scope
+from app.jobs.locks import JobLock
+from app.jobs.partitions import is_partitioned, list_partitions
+
+logger = get_logger(__name__)
+
+BRIN_INDEX = "idx_sales_created_brin"
+# Heap pages summarized per BRIN range: 32 pages hold about a thousand
+# sales, and the whole index stays a few pages even at 10x generator scale
+BRIN_PAGES_PER_RANGE = 32
+
+# B-tree whose order CLUSTER rewrites sales in (created_at leading)
+CLUSTER_INDEX = "idx_sales_created_store_channel"
+
+
+def brin_index_sql(
+    pages_per_range: int = BRIN_PAGES_PER_RANGE, concurrently: bool = False
+) -> str:
+    """DDL creating the BRIN index on sales.created_at."""
+    return (
+        f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}"
+        f"IF NOT EXISTS {BRIN_INDEX} "
+        f"ON sales USING brin (created_at) "
+        f"WITH (pages_per_range = {pages_per_range}, autosummarize = on)"
+    )
+
+
+def ensure_brin_index(db: Session) -> bool:
+    """
+    Create the BRIN index on sales.created_at if it is missing.
+
+    A plain sales table is indexed CONCURRENTLY, without blocking writes;
+    an invalid index left by an interrupted build is dropped and rebuilt.
+    Partitioned tables do not support CONCURRENTLY: the build blocks
+    writes to sales until it ends.
+
+    Args:
+        db: Database session
+
+    Returns:
+        True if the index was created
+    """
+    valid = db.execute(
+        text(
+            "SELECT indisvalid FROM pg_index "
+            "WHERE indexrelid = to_regclass(:index)"
+        ),
+        {"index": BRIN_INDEX},
+    ).scalar()
+    if valid:
+        return False
+
+    if is_partitioned(db):
+        db.execute(text(brin_index_sql()))
+        db.commit()
+        return True
+
+    # CONCURRENTLY waits for older transactions, the session's included
+    db.commit()
+    with db.get_bind().connect() as connection:
+        connection = connection.execution_options(
+            isolation_level="AUTOCOMMIT"
+        )
+        if valid is False:
+            connection.execute(
+                text(f"DROP INDEX CONCURRENTLY IF EXISTS {BRIN_INDEX}")
+            )
+        connection.execute(text(brin_index_sql(concurrently=True)))
+    return True
+
+
+def created_at_correlation(db: Session, table: str) -> Optional[float]:
+    """
+    Get the planner's correlation between created_at and row order.
+
+    Args:
+        db: Database session
+        table: Table (or partition) name
+
+    Returns:
+        Correlation in [-1, 1], or None if the table has no statistics
+    """
+    return db.execute(
+        text(
+            "SELECT correlation FROM pg_stats "
+            "WHERE tablename = :table AND attname = 'created_at' "
+            "AND NOT inherited"
+        ),
+        {"table": table},
+    ).scalar()
+
+
+def cluster_index(db: Session, table: str) -> Optional[str]:
+    """
+    Get the CLUSTER_INDEX of a table, or its copy on a partition.
+
+    Args:
+        db: Database session
+        table: sales or one of its partitions
+
+    Returns:
+        Index name, or None if the table has no such index
+    """
+    return db.execute(
+        text(
+            "SELECT c.relname FROM pg_index x "
+            "JOIN pg_class c ON c.oid = x.indexrelid "
+            "WHERE x.indrelid = to_regclass(:table) "
+            "AND (x.indexrelid = to_regclass(:index) "
+            "OR x.indexrelid IN (SELECT inhrelid FROM pg_inherits "
+            "WHERE inhparent = to_regclass(:index)))"
+        ),
+        {"table": table, "index": CLUSTER_INDEX},
+    ).scalar()
+
+
+def needs_clustering(
+    correlation: Optional[float], min_correlation: float
+) -> bool:
+    """
+    Check whether a table has drifted from created_at order.
+
+    Args:
+        correlation: created_at correlation (None without statistics)
+        min_correlation: Lowest acceptable absolute correlation (rows in
+            descending order are as compact for BRIN as ascending ones)
+
+    Returns:
+        True if the table should be clustered
+    """
+    if correlation is None:
+        # Empty or never analyzed (e.g. a month ahead): nothing to order
+        return False
+    return abs(correlation) < min_correlation
+
+
+def sales_tables(db: Session) -> List[str]:
+    """
+    Get the tables holding sales rows: its partitions, or sales itself.
+
+    Args:
+        db: Database session
+
+    Returns:
+        Table names
+    """
+    if is_partitioned(db):
+        return sorted(list_partitions(db, "sales"))
+    return ["sales"]
+
+
+def drifted_tables(
+    db: Session, min_correlation: float
+) -> Dict[str, float]:
+    """
+    Get the sales tables that drifted from created_at order.
+
+    Args:
+        db: Database session
+        min_correlation: Lowest acceptable absolute correlation
+
+    Returns:
+        created_at correlation of each drifted table, by name
+    """
+    drifted: Dict[str, float] = {}
+    for table in sales_tables(db):
+        correlation = created_at_correlation(db, table)
+        if needs_clustering(correlation, min_correlation):
+            drifted[table] = correlation
+    return drifted
+
+
+def cluster_sales(
+    db: Session, min_correlation: float, force: bool = False
+) -> List[str]:
+    """
+    CLUSTER sales (or each drifted partition) on its created_at order.
+
+    Every table is committed on its own, so the ACCESS EXCLUSIVE lock of
+    CLUSTER is held for one table (or month) at a time.
+
+    Args:
+        db: Database session
+        min_correlation: Cluster tables below this correlation
+        force: Cluster every table regardless of its correlation
+
+    Returns:
+        Names of the tables clustered
+    """
+    clustered: List[str] = []
+    for table in sales_tables(db):
+        correlation = created_at_correlation(db, table)
+        if not force and not needs_clustering(correlation, min_correlation):
+            continue
+        index = cluster_index(db, table)
+        if index is None:
+            logger.error(
+                "Cannot cluster %s: %s missing", table, CLUSTER_INDEX
+            )
+            continue
+        db.execute(text(f'CLUSTER "{table}" USING "{index}"'))
+        db.execute(text(f'ANALYZE "{table}"'))
+        db.commit()
+        logger.info(
+            "Clustered %s (created_at correlation was %s)",
+            table,
+            correlation,
+        )
+        clustered.append(table)
+    return clustered
+
+
+def maintain_physical_order(
+    cluster: bool = True,
+    force: bool = False,
+    min_correlation: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Create the BRIN index and re-cluster drifted sales tables.
+
+    Command line only: CLUSTER locks each table it rewrites, so run it in
+    a maintenance window.
+
+    Args:
+        cluster: Whether to CLUSTER (False only ensures the index)
+        force: Cluster every table regardless of its correlation
+        min_correlation: Cluster tables below this correlation
+            (default: SALES_CLUSTER_MIN_CORRELATION)
+
+    Returns:
+        Whether the BRIN index was created and the tables clustered
+    """
+    if min_correlation is None:
+        min_correlation = settings.SALES_CLUSTER_MIN_CORRELATION
+
+    result: Dict[str, Any] = {"brin_created": False, "clustered": []}
+    with session_scope() as db:
+        if db.get_bind().dialect.name != "postgresql":
+            logger.info("BRIN and CLUSTER need PostgreSQL, nothing to do")
+            return result
+
+        result["brin_created"] = ensure_brin_index(db)
+        db.commit()
+        if cluster:
+            result["clustered"] = cluster_sales(db, min_correlation, force)
+
+    if result["brin_created"] or result["clustered"]:
+        logger.info(
+            "Sales physical order maintained", extra={"extra_data": result}
+        )
+    return result
+
+
+def check_physical_order(
+    min_correlation: Optional[float] = None,
+) -> Dict[str, float]:
+    """
+    Log the sales tables to re-cluster, without locking or changing them.
+
+    Args:
+        min_correlation: Report tables below this correlation
+            (default: SALES_CLUSTER_MIN_CORRELATION)
+
+    Returns:
+        created_at correlation of each drifted table, by name
+    """
+    if min_correlation is None:
+        min_correlation = settings.SALES_CLUSTER_MIN_CORRELATION
+
+    with session_scope() as db:
+        if db.get_bind().dialect.name != "postgresql":
+            return {}
+        brin_present = db.execute(
+            text("SELECT to_regclass(:index) IS NOT NULL"),
+            {"index": BRIN_INDEX},
+        ).scalar()
+        drifted = drifted_tables(db, min_correlation)
+
+    if not brin_present:
+        logger.warning(
+            "Sales BRIN index %s missing: apply migration 008 or run "
+            "python -m app.jobs.clustering --no-cluster",
+            BRIN_INDEX,
+        )
+    if drifted:
+        logger.warning(
+            "Sales tables drifted from created_at order: run "
+            "python -m app.jobs.clustering in a maintenance window",
+            extra={"extra_data": {"correlations": drifted}},
+        )
+    return drifted
+
+
+async def run_clustering_loop(interval: int) -> None:
+    """
+    Check the physical order now and then every `interval` seconds.
+
+    Args:
+        interval: Seconds between runs
+    """
+    lock = JobLock("clustering")
+    try:
+        while True:
+            try:
+                if await asyncio.to_thread(lock.acquire):
+                    await asyncio.to_thread(check_physical_order)
+            except Exception as e:
+                logger.error(
+                    "Sales physical order check failed: %s",
+                    str(e),
+                    exc_info=True,
+                )
+            await asyncio.sleep(interval)
+    finally:
+        await asyncio.to_thread(lock.release)
+
+
+def main() -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(
+        description="Create the sales BRIN index and CLUSTER sales"
+    )
+    parser.add_argument(
+        "--no-cluster",
+        action="store_true",
+        help="Only create the BRIN index",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Cluster every table regardless of its correlation",
+    )
+    parser.add_argument(
+        "--min-correlation",
+        type=float,
+        default=None,
+        help="Cluster tables whose created_at correlation is below this",
+    )
+    args = parser.parse_args()
+
+    result = maintain_physical_order(
+        cluster=not args.no_cluster,
+        force=args.force,
+        min_correlation=args.min_correlation,
+    )
+    print(
+        f"BRIN index {'created' if result['brin_created'] else 'present'}, "
+        f"clustered {len(result['clustered'])} tables"
+    )
+
+
+if __name__ == "__main__":
+    main()
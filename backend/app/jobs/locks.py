@@ -0,0 +1,113 @@
+"""
+Advisory locks electing the worker that runs a background job.
+
+Every uvicorn worker starts the job loops of the app.main lifespan. Each
+loop takes a PostgreSQL advisory lock named after its job before a run:
+the first worker to get it keeps it, on a connection of its own, and is
+the only one running the job. The other workers try again at every
+interval and take over when that worker (or its connection) goes away.
+Off PostgreSQL there is a single process and the lock is always granted.
+"""
+
+import hashlib
+from typing import Optional
+
+from sqlalchemy import Connection, Engine, create_engine, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.pool import NullPool
+
+from app.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Connections holding job locks, outside the request pool: closing one
+# ends its session, which releases the lock
+lock_engine = create_engine(settings.DATABASE_URL, poolclass=NullPool)
+
+
+def job_lock_key(name: str) -> int:
+    """
+    Get the advisory lock key of a job.
+
+    Args:
+        name: Job name (e.g. "rollups")
+
+    Returns:
+        Signed 64-bit key, stable across processes
+    """
+    digest = hashlib.blake2b(
+        f"god_level.jobs.{name}".encode(), digest_size=8
+    ).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+class JobLock:
+    """Session-level advisory lock held while a worker runs a job."""
+
+    def __init__(self, name: str, bind: Optional[Engine] = None):
+        """
+        Initialize the lock.
+
+        Args:
+            name: Job name
+            bind: Engine to lock on (default: lock_engine)
+        """
+        self.name = name
+        self.key = job_lock_key(name)
+        self.bind = bind or lock_engine
+        self._connection: Optional[Connection] = None
+
+    def acquire(self) -> bool:
+        """
+        Take the lock unless this worker already holds it.
+
+        Blocking calls: run them in a thread from the event loop.
+
+        Returns:
+            True if this worker holds the lock and should run the job
+        """
+        if self.bind.dialect.name != "postgresql":
+            return True
+
+        if self._connection is not None:
+            try:
+                self._connection.execute(text("SELECT 1"))
+                self._connection.commit()
+                return True
+            except DBAPIError:
+                # The session (and the lock with it) is gone
+                logger.warning("Lost the %s job lock", self.name)
+                self._close()
+
+        connection = self.bind.connect()
+        try:
+            acquired = connection.execute(
+                text("SELECT pg_try_advisory_lock(:key)"),
+                {"key": self.key},
+            ).scalar()
+            connection.commit()
+        except Exception:
+            connection.close()
+            raise
+        if not acquired:
+            connection.close()
+            return False
+
+        self._connection = connection
+        logger.info("Took the %s job lock", self.name)
+        return True
+
+    def release(self) -> None:
+        """Release the lock, if held, by closing its connection."""
+        if self._connection is not None:
+            self._close()
+
+    def _close(self) -> None:
+        """Close the lock connection, ignoring a broken one."""
+        try:
+            self._connection.close()
+        except DBAPIError:
+            pass
+        finally:
+            self._connection = None
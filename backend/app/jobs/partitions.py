@@ -0,0 +1,351 @@
+"""
+Partition maintenance job.
+
+sales, product_sales, payments and delivery_sales are partitioned by month
+(migrations/005_partition_sales.sql). This job keeps the current month and
+SALES_PARTITION_MONTHS_AHEAD months after it created, so new sales never
+land in the default partition, and detaches months older than
+SALES_PARTITION_RETENTION_MONTHS (0 keeps every month).
+
+Detaching only changes the catalog: the month's rows stay in a plain table
+(e.g. sales_p2023_01) that can be archived or dropped later. Children are
+detached before sales, and their foreign key to sales is dropped, since it
+would keep sales from letting go of the referenced month. Cached results
+over the detached days are invalidated.
+
+Runs daily inside the API process when SALES_PARTITIONING_ENABLED (see
+app.main lifespan), in the one worker holding its job lock (see
+app.jobs.locks), and can be invoked manually:
+
+    python -m app.jobs.partitions                          # months ahead
+    python -m app.jobs.partitions --detach-before 2024-01  # and detach
+"""
+
+import argparse
+import asyncio
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.logging import get_logger
+from app.db.session import session_scope
+from app.jobs.locks import JobLock
+from app.services.cache import invalidate_tags
+
+logger = get_logger(__name__)
+
+# Partitioned tables and their partition keys, parents first
+PARTITIONED_TABLES: Dict[str, str] = {
+    "sales": "created_at",
+    "product_sales": "sale_created_at",
+    "payments": "sale_created_at",
+    "delivery_sales": "sale_created_at",
+}
+
+
+def month_floor(value: date) -> date:
+    """First day of the month of a date."""
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    """
+    Shift a month start by a number of months.
+
+    Args:
+        month: First day of a month
+        months: Months to add (may be negative)
+
+    Returns:
+        First day of the resulting month
+    """
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    """Name of a table's partition for a month (e.g. sales_p2024_06)."""
+    return f"{table}_p{month:%Y_%m}"
+
+
+def partition_month(table: str, name: str) -> Optional[date]:
+    """
+    Parse the month of a partition name.
+
+    Args:
+        table: Partitioned table
+        name: Partition name
+
+    Returns:
+        First day of the month, or None for other partitions (default)
+    """
+    prefix = f"{table}_p"
+    if not name.startswith(prefix):
+        return None
+    try:
+        return datetime.strptime(name[len(prefix):], "%Y_%m").date()
+    except ValueError:
+        return None
+
+
+def create_partition_sql(table: str, month: date) -> str:
+    """DDL creating a table's partition for a month."""
+    return (
+        f'CREATE TABLE IF NOT EXISTS "{partition_name(table, month)}" '
+        f'PARTITION OF "{table}" '
+        f"FOR VALUES FROM ('{month.isoformat()}') "
+        f"TO ('{add_months(month, 1).isoformat()}')"
+    )
+
+
+def is_partitioned(db: Session, table: str = "sales") -> bool:
+    """
+    Check whether a table is partitioned (always False off PostgreSQL).
+
+    Args:
+        db: Database session
+        table: Table name
+
+    Returns:
+        True if the table is a partitioned table
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    return bool(
+        db.execute(
+            text(
+                "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+                "WHERE partrelid = to_regclass(:table))"
+            ),
+            {"table": table},
+        ).scalar()
+    )
+
+
+def list_partitions(db: Session, table: str) -> List[str]:
+    """
+    Get the partitions attached to a table.
+
+    Args:
+        db: Database session
+        table: Partitioned table
+
+    Returns:
+        Partition names
+    """
+    rows = db.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:table)"
+        ),
+        {"table": table},
+    )
+    return [row[0] for row in rows]
+
+
+def create_partitions(
+    db: Session, months_ahead: int, today: Optional[date] = None
+) -> List[str]:
+    """
+    Create the partitions of the current month and the months ahead.
+
+    A month whose rows already sit in the default partition cannot be
+    created; it is logged and skipped (move the rows out, then rerun).
+
+    Args:
+        db: Database session
+        months_ahead: Months after the current one to create
+        today: Current date (default: today)
+
+    Returns:
+        Names of the partitions created
+    """
+    current = month_floor(today or date.today())
+    months = [
+        add_months(current, offset) for offset in range(months_ahead + 1)
+    ]
+
+    created: List[str] = []
+    for table in PARTITIONED_TABLES:
+        existing = set(list_partitions(db, table))
+        for month in months:
+            name = partition_name(table, month)
+            if name in existing:
+                continue
+            try:
+                with db.begin_nested():
+                    db.execute(text(create_partition_sql(table, month)))
+            except DBAPIError as e:
+                logger.error(
+                    "Cannot create partition %s: %s", name, str(e.orig)
+                )
+                continue
+            created.append(name)
+    return created
+
+
+def _drop_foreign_keys(db: Session, table: str) -> None:
+    """Drop the foreign keys of a detached partition."""
+    rows = db.execute(
+        text(
+            "SELECT conname FROM pg_constraint "
+            "WHERE conrelid = to_regclass(:table) AND contype = 'f'"
+        ),
+        {"table": table},
+    )
+    for (name,) in rows.all():
+        db.execute(text(f'ALTER TABLE "{table}" DROP CONSTRAINT "{name}"'))
+
+
+def detach_partitions(db: Session, before: date) -> List[str]:
+    """
+    Detach the monthly partitions of months before a given month.
+
+    Args:
+        db: Database session
+        before: First month to keep
+
+    Returns:
+        Names of the partitions detached
+    """
+    detached: List[str] = []
+    # Children first: their foreign keys pin the sales partitions
+    for table in reversed(list(PARTITIONED_TABLES)):
+        for name in sorted(list_partitions(db, table)):
+            month = partition_month(table, name)
+            if month is None or month >= before:
+                continue
+            db.execute(
+                text(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"')
+            )
+            if table != "sales":
+                _drop_foreign_keys(db, name)
+            detached.append(name)
+    return detached
+
+
+def _detached_day_tags(detached: List[str]) -> List[str]:
+    """Cache day tags of the months of detached sales partitions."""
+    tags = []
+    for name in detached:
+        month = partition_month("sales", name)
+        if month is None:
+            continue
+        day = month
+        while day < add_months(month, 1):
+            tags.append(f"day:{day.isoformat()}")
+            day += timedelta(days=1)
+    return tags
+
+
+def maintain_partitions(
+    months_ahead: Optional[int] = None,
+    detach_before: Optional[date] = None,
+) -> Dict[str, List[str]]:
+    """
+    Create months ahead and detach expired months.
+
+    Args:
+        months_ahead: Months to create after the current one
+            (default: SALES_PARTITION_MONTHS_AHEAD)
+        detach_before: Detach months before this one (default: from
+            SALES_PARTITION_RETENTION_MONTHS; none when it is 0)
+
+    Returns:
+        Names of the partitions created and detached
+    """
+    if months_ahead is None:
+        months_ahead = settings.SALES_PARTITION_MONTHS_AHEAD
+    if detach_before is None and settings.SALES_PARTITION_RETENTION_MONTHS:
+        detach_before = add_months(
+            month_floor(date.today()),
+            -settings.SALES_PARTITION_RETENTION_MONTHS,
+        )
+
+    result: Dict[str, List[str]] = {"created": [], "detached": []}
+    with session_scope() as db:
+        if not is_partitioned(db):
+            logger.info("sales is not partitioned, nothing to maintain")
+            return result
+
+        result["created"] = create_partitions(db, months_ahead)
+        if detach_before is not None:
+            result["detached"] = detach_partitions(
+                db, month_floor(detach_before)
+            )
+        db.commit()
+
+    if result["detached"]:
+        invalidate_tags(_detached_day_tags(result["detached"]))
+    if result["created"] or result["detached"]:
+        logger.info("Partitions maintained", extra={"extra_data": result})
+    return result
+
+
+async def run_partition_maintenance_loop(interval: int) -> None:
+    """
+    Maintain partitions now and then every `interval` seconds.
+
+    Args:
+        interval: Seconds between runs
+    """
+    lock = JobLock("partitions")
+    try:
+        while True:
+            try:
+                if await asyncio.to_thread(lock.acquire):
+                    await asyncio.to_thread(maintain_partitions)
+            except Exception as e:
+                logger.error(
+                    "Partition maintenance failed: %s",
+                    str(e),
+                    exc_info=True,
+                )
+            await asyncio.sleep(interval)
+    finally:
+        await asyncio.to_thread(lock.release)
+
+
+def _month_arg(value: str) -> date:
+    """Parse a YYYY-MM command line argument."""
+    try:
+        return datetime.strptime(value, "%Y-%m").date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM, got {value!r}")
+
+
+def main() -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(
+        description="Create and detach monthly sales partitions"
+    )
+    parser.add_argument(
+        "--months-ahead",
+        type=int,
+        default=None,
+        help="Months to create after the current one",
+    )
+    parser.add_argument(
+        "--detach-before",
+        type=_month_arg,
+        default=None,
+        help="Detach months before this one (YYYY-MM)",
+    )
+    args = parser.parse_args()
+
+    result = maintain_partitions(
+        months_ahead=args.months_ahead, detach_before=args.detach_before
+    )
+    print(
+        f"Created {len(result['created'])} partitions, "
+        f"detached {len(result['detached'])}"
+    )
+
+
+if __name__ == "__main__":
+    main()
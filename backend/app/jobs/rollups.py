@@ -0,0 +1,110 @@
+"""
+Rollup refresh job.
+
+Runs periodically inside the API process (see app.main lifespan), in the one
+worker holding its job lock (see app.jobs.locks), and can be invoked
+manually:
+
+    python -m app.jobs.rollups            # incremental refresh
+    python -m app.jobs.rollups --rebuild  # rebuild from scratch
+"""
+
+import argparse
+import asyncio
+
+from app.core.logging import get_logger
+from app.db.session import SessionLocal
+from app.jobs.locks import JobLock
+from app.services.cache import bump_data_versions, invalidate_tags
+from app.services.rollup import RollupService, SALES_HOURLY
+
+logger = get_logger(__name__)
+
+
+def refresh_rollups(rebuild: bool = False) -> int:
+    """
+    Refresh all analytics rollups.
+
+    Stores with newly merged sales get a new data version, which moves
+    their recent cached results to new keys. Days with changed sales
+    (updates and deletes, see app.services.rollup) have their cached
+    results invalidated, and the applied change log is pruned.
+
+    Args:
+        rebuild: Drop and rebuild rollups instead of refreshing incrementally
+
+    Returns:
+        Number of sales merged
+    """
+    db = SessionLocal()
+    try:
+        service = RollupService(db)
+        previous = 0 if rebuild else service.get_watermark(SALES_HOURLY) or 0
+        if rebuild:
+            merged = service.rebuild_all()
+        else:
+            merged = service.refresh_all()
+
+        if merged:
+            bump_data_versions(service.latest_sale_ids_by_store(previous))
+            logger.info(
+                "Rollups refreshed",
+                extra={"extra_data": {"merged_sales": merged}},
+            )
+        if service.changed_days:
+            invalidate_tags(
+                [f"day:{day.isoformat()}" for day in service.changed_days]
+            )
+            logger.info(
+                "Rollup buckets recomputed for changed sales",
+                extra={
+                    "extra_data": {"days": len(service.changed_days)}
+                },
+            )
+        service.prune_changes()
+        return merged
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+async def run_rollup_refresh_loop(interval: int) -> None:
+    """
+    Refresh rollups forever, every `interval` seconds.
+
+    Args:
+        interval: Seconds between refreshes
+    """
+    lock = JobLock("rollups")
+    try:
+        while True:
+            try:
+                if await asyncio.to_thread(lock.acquire):
+                    await asyncio.to_thread(refresh_rollups)
+            except Exception as e:
+                logger.error(
+                    "Rollup refresh failed: %s", str(e), exc_info=True
+                )
+            await asyncio.sleep(interval)
+    finally:
+        await asyncio.to_thread(lock.release)
+
+
+def main() -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Refresh analytics rollups")
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Rebuild rollups from scratch",
+    )
+    args = parser.parse_args()
+
+    merged = refresh_rollups(rebuild=args.rebuild)
+    print(f"Merged {merged} sales into rollups")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,8 @@
 Main FastAPI application.
 """
 
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from slowapi import Limiter, _rate_limit_exceeded_handler
@@ -13,6 +14,14 @@ from app.config import settings
 from app.api.v1 import sales, health, analytics, cache, dashboard, stores, auth
 from app.core.logging import get_logger
 from app.core.error_handler import register_error_handlers
+from app.core.executor import db_executor, refresh_executor
+from app.db.session import async_engine
+from app.jobs.cache_warmer import run_cache_warm_loop
+from app.jobs.clustering import run_clustering_loop
+from app.jobs.partitions import run_partition_maintenance_loop
+from app.jobs.rollups import run_rollup_refresh_loop
+from app.services.cache import invalidation_listener
+from app.services.redis_manager import redis_manager
 
 logger = get_logger(__name__)
 
@@ -47,9 +56,64 @@ async def lifespan(app: FastAPI):
             },
         )
 
+    # Background jobs: every worker starts the loops, and each job runs in
+    # the one worker holding its advisory lock (see app.jobs.locks)
+    background_tasks = []
+
+    # Keep analytics rollups fresh in the background
+    if settings.ANALYTICS_ROLLUPS_ENABLED and not settings.TESTING:
+        background_tasks.append(
+            asyncio.create_task(
+                run_rollup_refresh_loop(
+                    settings.ROLLUP_REFRESH_INTERVAL_SECONDS
+                )
+            )
+        )
+
+    # Keep the months ahead of the sales partitions created
+    if settings.SALES_PARTITIONING_ENABLED and not settings.TESTING:
+        background_tasks.append(
+            asyncio.create_task(
+                run_partition_maintenance_loop(
+                    settings.SALES_PARTITION_INTERVAL_SECONDS
+                )
+            )
+        )
+
+    # Report sales tables out of created_at order for their BRIN index
+    if settings.SALES_CLUSTER_ENABLED and not settings.TESTING:
+        background_tasks.append(
+            asyncio.create_task(
+                run_clustering_loop(settings.SALES_CLUSTER_INTERVAL_SECONDS)
+            )
+        )
+
+    # Precompute popular dashboards now and periodically
+    if settings.CACHE_WARM_ENABLED and not settings.TESTING:
+        background_tasks.append(
+            asyncio.create_task(
+                run_cache_warm_loop(settings.CACHE_WARM_INTERVAL_SECONDS)
+            )
+        )
+
+    # Drop local cache entries invalidated by other workers
+    if not settings.TESTING:
+        invalidation_listener.start()
+
     yield
 
     # Shutdown
+    invalidation_listener.stop()
+    for task in background_tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    db_executor.shutdown(wait=False)
+    refresh_executor.shutdown(wait=False)
+    if async_engine is not None:
+        await async_engine.dispose()
+    await redis_manager.close()
+
     logger.info("Application shutting down")
 
 
@@ -12,6 +12,7 @@ from app.models.item import Item
 from app.models.option_group import OptionGroup
 from app.models.customer import Customer
 from app.models.sale import Sale
+from app.models.sale_status import SaleStatus
 from app.models.product_sale import ProductSale
 from app.models.item_product_sale import ItemProductSale
 from app.models.payment import Payment
@@ -19,6 +20,10 @@ from app.models.payment_type import PaymentType
 from app.models.delivery_sale import DeliverySale
 from app.models.delivery_address import DeliveryAddress
 from app.models.dashboard import Dashboard
+from app.models.sales_hourly_rollup import SalesHourlyRollup
+from app.models.product_sales_daily_rollup import ProductSalesDailyRollup
+from app.models.rollup_watermark import RollupWatermark
+from app.models.rollup_change import RollupChange
 
 __all__ = [
     "Brand",
@@ -31,6 +36,7 @@ __all__ = [
     "OptionGroup",
     "Customer",
     "Sale",
+    "SaleStatus",
     "ProductSale",
     "ItemProductSale",
     "Payment",
@@ -38,4 +44,8 @@ __all__ = [
     "DeliverySale",
     "DeliveryAddress",
     "Dashboard",
+    "SalesHourlyRollup",
+    "ProductSalesDailyRollup",
+    "RollupWatermark",
+    "RollupChange",
 ]
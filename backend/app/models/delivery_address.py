@@ -2,7 +2,7 @@
 DeliveryAddress model.
 """
 
-from sqlalchemy import Column, Integer, String, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.db.base import BaseModel
 
@@ -27,5 +27,10 @@ class DeliveryAddress(BaseModel):
     latitude = Column(Float)
     longitude = Column(Float)
 
+    __table_args__ = (
+        Index("idx_delivery_addresses_sale", "sale_id"),
+        Index("idx_delivery_addresses_delivery_sale", "delivery_sale_id"),
+    )
+
     # Relationships
     delivery_sale = relationship("DeliverySale", back_populates="addresses")
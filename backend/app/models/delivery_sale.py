@@ -2,10 +2,20 @@
 DeliverySale model.
 """
 
-from sqlalchemy import Column, Integer, String, Float, ForeignKey
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    event,
+)
 from sqlalchemy.orm import relationship
 from app.db.base import BaseModel
 from app.models.constants import CASCADE_ALL_DELETE_ORPHAN
+from app.models.sale import fill_sale_created_at
 
 
 class DeliverySale(BaseModel):
@@ -14,6 +24,9 @@ class DeliverySale(BaseModel):
     __tablename__ = "delivery_sales"
 
     sale_id = Column(Integer, ForeignKey("sales.id"), nullable=False)
+    # Created_at of the sale: partition key (migration 005), copied from
+    # the sale on insert by fill_sale_created_at
+    sale_created_at = Column(DateTime, nullable=False)
     courier_id = Column(String(100))
     courier_name = Column(String(100))
     courier_phone = Column(String(100))
@@ -27,6 +40,12 @@ class DeliverySale(BaseModel):
     mode = Column(String(100))
     delivery_time_minutes = Column(Integer)
 
+    __table_args__ = (Index("idx_delivery_sales_sale", "sale_id"),)
+
+    # Identified by the primary key of the partitioned table, as
+    # ProductSale
+    __mapper_args__ = {"primary_key": ["id", "sale_created_at"]}
+
     # Relationships
     sale = relationship("Sale", back_populates="delivery")
     addresses = relationship(
@@ -34,3 +53,6 @@ class DeliverySale(BaseModel):
         back_populates="delivery_sale",
         cascade=CASCADE_ALL_DELETE_ORPHAN
     )
+
+
+event.listen(DeliverySale, "before_insert", fill_sale_created_at)
@@ -2,7 +2,7 @@
 ItemProductSale model.
 """
 
-from sqlalchemy import Column, Integer, Float, ForeignKey, String
+from sqlalchemy import Column, Integer, Float, ForeignKey, String, Index
 from sqlalchemy.orm import relationship
 from app.db.base import BaseModel
 
@@ -26,6 +26,11 @@ class ItemProductSale(BaseModel):
     price = Column(Float, nullable=False)
     amount = Column(Float, default=1)
     observations = Column(String(300))
+
+    __table_args__ = (
+        Index("idx_item_product_sales_product_sale", "product_sale_id"),
+        Index("idx_item_product_sales_item", "item_id"),
+    )
     # Relationships
     product_sale = relationship("ProductSale", back_populates="items")
     item = relationship("Item", back_populates="product_sales")
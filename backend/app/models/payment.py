@@ -2,9 +2,20 @@
 Payment model.
 """
 
-from sqlalchemy import Column, Integer, Boolean, String, ForeignKey, Numeric
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    String,
+    event,
+)
 from sqlalchemy.orm import relationship
 from app.db.base import BaseModel
+from app.models.sale import fill_sale_created_at
 
 
 class Payment(BaseModel):
@@ -13,12 +24,27 @@ class Payment(BaseModel):
     __tablename__ = "payments"
 
     sale_id = Column(Integer, ForeignKey("sales.id"), nullable=False)
+    # Created_at of the sale: partition key (migration 005), copied from
+    # the sale on insert by fill_sale_created_at
+    sale_created_at = Column(DateTime, nullable=False)
     payment_type_id = Column(Integer, ForeignKey("payment_types.id"))
     value = Column(Numeric(10, 2), nullable=False)
     is_online = Column(Boolean, default=False)
     description = Column(String(100))
     currency = Column(String(10), default="BRL")
 
+    __table_args__ = (
+        Index("idx_payments_sale", "sale_id"),
+        Index("idx_payments_payment_type", "payment_type_id"),
+    )
+
+    # Identified by the primary key of the partitioned table, as
+    # ProductSale
+    __mapper_args__ = {"primary_key": ["id", "sale_created_at"]}
+
     # Relationships
     sale = relationship("Sale", back_populates="payments")
     payment_type = relationship("PaymentType", back_populates="payments")
+
+
+event.listen(Payment, "before_insert", fill_sale_created_at)
@@ -2,10 +2,20 @@
 ProductSale model.
 """
 
-from sqlalchemy import Column, Integer, Float, String, ForeignKey
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    event,
+)
 from sqlalchemy.orm import relationship
 from app.db.base import BaseModel
 from app.models.constants import CASCADE_ALL_DELETE_ORPHAN
+from app.models.sale import fill_sale_created_at
 
 
 class ProductSale(BaseModel):
@@ -14,12 +24,26 @@ class ProductSale(BaseModel):
     __tablename__ = "product_sales"
 
     sale_id = Column(Integer, ForeignKey("sales.id"), nullable=False)
+    # Created_at of the sale: partition key (migration 005), copied from
+    # the sale on insert by fill_sale_created_at
+    sale_created_at = Column(DateTime, nullable=False)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
     quantity = Column(Float, nullable=False)
     base_price = Column(Float, nullable=False)
     total_price = Column(Float, nullable=False)
     observations = Column(String(300))
 
+    __table_args__ = (
+        Index("idx_product_sales_sale", "sale_id"),
+        Index("idx_product_sales_product_sale", "product_id", "sale_id"),
+    )
+
+    # Rows are identified by (id, sale_created_at), the primary key of the
+    # partitioned table (migration 005). The DDL of the model keeps id as
+    # its primary key so it stays autoincrementing where the tables are
+    # created from the models.
+    __mapper_args__ = {"primary_key": ["id", "sale_created_at"]}
+
     # Relationships
     sale = relationship("Sale", back_populates="products")
     product = relationship("Product", back_populates="sales")
@@ -28,3 +52,6 @@ class ProductSale(BaseModel):
         back_populates="product_sale",
         cascade=CASCADE_ALL_DELETE_ORPHAN
     )
+
+
+event.listen(ProductSale, "before_insert", fill_sale_created_at)
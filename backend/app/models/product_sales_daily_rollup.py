@@ -0,0 +1,41 @@
+"""
+ProductSalesDailyRollup model.
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, Float, Index
+from app.db.session import Base
+
+
+class ProductSalesDailyRollup(Base):
+    """
+    Daily product sales fact pre-aggregated from product_sales.
+
+    One row per product, store, channel, status, day and hour band. Rows are
+    merged incrementally by RollupService using the product_sales_daily
+    watermark (on sales.id).
+    """
+
+    __tablename__ = "product_sales_daily_rollup"
+
+    product_id = Column(Integer, primary_key=True)
+    store_id = Column(Integer, primary_key=True)
+    channel_id = Column(Integer, primary_key=True)
+    sale_status_desc = Column(String(100), primary_key=True)
+    bucket_date = Column(DateTime, primary_key=True)
+    hour_band = Column(Integer, primary_key=True)
+
+    # PostgreSQL convention: 0=Sunday, 6=Saturday
+    day_of_week = Column(Integer, nullable=False)
+
+    quantity = Column(Float, nullable=False, default=0)
+    total_price = Column(Float, nullable=False, default=0)
+    base_price = Column(Float, nullable=False, default=0)
+    line_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index(
+            "idx_product_sales_daily_rollup_date",
+            "bucket_date",
+            "product_id",
+        ),
+    )
@@ -0,0 +1,25 @@
+"""
+RollupChange model.
+"""
+
+from sqlalchemy import BigInteger, Column, DateTime, Integer, func
+from app.db.session import Base
+
+
+class RollupChange(Base):
+    """
+    Change log of sales already merged into the rollups.
+
+    Filled by database triggers (migrations/009_rollup_change_log.sql) when
+    a sale is updated or deleted, or a product line of a merged sale
+    changes. Each row names the time of the affected sale, so the next
+    refresh recomputes its hour and day buckets.
+    """
+
+    __tablename__ = "rollup_changes"
+
+    id = Column(
+        BigInteger().with_variant(Integer, "sqlite"), primary_key=True
+    )
+    sale_created_at = Column(DateTime, nullable=False)
+    changed_at = Column(DateTime, server_default=func.now())
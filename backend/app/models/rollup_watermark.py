@@ -0,0 +1,18 @@
+"""
+RollupWatermark model.
+"""
+
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime
+from app.db.session import Base
+
+
+class RollupWatermark(Base):
+    """High-water mark on sales.id for each incrementally built rollup."""
+
+    __tablename__ = "rollup_watermarks"
+
+    name = Column(String(100), primary_key=True)
+    last_sale_id = Column(Integer, nullable=False, default=0)
+    # Last rollup_changes.id applied
+    last_change_id = Column(BigInteger, nullable=False, default=0)
+    refreshed_at = Column(DateTime)
@@ -2,10 +2,32 @@
 Sale model.
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Numeric, ForeignKey
+from sqlalchemy import (
+    Column,
+    Computed,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    SmallInteger,
+    String,
+    case,
+    select,
+    text,
+)
 from sqlalchemy.orm import relationship
+from app.db.expressions import (
+    calendar_date,
+    calendar_dow,
+    calendar_hour,
+    calendar_month,
+    calendar_week,
+)
 from app.db.session import Base
 from app.models.constants import CASCADE_ALL_DELETE_ORPHAN
+from app.models.sale_status import SALE_STATUS_CODES, SaleStatus
 
 
 class Sale(Base):
@@ -16,6 +38,24 @@ class Sale(Base):
     id = Column(Integer, primary_key=True, index=True)
     created_at = Column(DateTime)
 
+    # Calendar parts of created_at, generated by the database
+    # (see migrations/006_sales_calendar_columns.sql)
+    sale_date = Column(
+        Date, Computed(calendar_date(created_at), persisted=True)
+    )
+    sale_dow = Column(  # 0=Sunday
+        SmallInteger, Computed(calendar_dow(created_at), persisted=True)
+    )
+    sale_hour = Column(
+        SmallInteger, Computed(calendar_hour(created_at), persisted=True)
+    )
+    sale_week = Column(  # Monday of the ISO week
+        Date, Computed(calendar_week(created_at), persisted=True)
+    )
+    sale_month = Column(
+        Date, Computed(calendar_month(created_at), persisted=True)
+    )
+
     store_id = Column(Integer, ForeignKey("stores.id"), nullable=False)
     sub_brand_id = Column(Integer, ForeignKey("sub_brands.id"))
     customer_id = Column(Integer, ForeignKey("customers.id"))
@@ -25,6 +65,20 @@ class Sale(Base):
     cod_sale2 = Column(String(100))
     customer_name = Column(String(100))
     sale_status_desc = Column(String(100), nullable=False)
+    # Compact code of sale_status_desc, generated by the database
+    # (see migrations/007_sale_status_codes.sql)
+    sale_status_code = Column(
+        SmallInteger,
+        Computed(
+            case(
+                SALE_STATUS_CODES,
+                value=sale_status_desc,
+                else_=SaleStatus.OTHER,
+            ),
+            persisted=True,
+        ),
+        ForeignKey("sale_statuses.code"),
+    )
 
     # Financial values
     total_amount_items = Column(Numeric(10, 2), nullable=False)
@@ -45,6 +99,84 @@ class Sale(Base):
     increase_reason = Column(String(300))
     origin = Column(String(100), default="POS")
 
+    # Analytics access paths (see migrations/004_analytics_indexes.sql)
+    __table_args__ = (
+        Index(
+            "idx_sales_created_store_channel",
+            "created_at",
+            "store_id",
+            "channel_id",
+            "sale_status_code",
+        ),
+        Index("idx_sales_store_created", "store_id", "created_at"),
+        # Narrow COMPLETED/CANCELLED indexes on the status code, covering
+        # the columns of the summary, revenue and channel scans
+        # (see migrations/007_sale_status_codes.sql)
+        Index(
+            "idx_sales_completed_created",
+            "created_at",
+            "store_id",
+            "channel_id",
+            postgresql_include=[
+                "total_amount",
+                "total_discount",
+                "delivery_seconds",
+            ],
+            postgresql_where=text("sale_status_code = 1"),
+            sqlite_where=text("sale_status_code = 1"),
+        ),
+        Index(
+            "idx_sales_completed_store_created",
+            "store_id",
+            "created_at",
+            postgresql_include=[
+                "channel_id",
+                "total_amount",
+                "total_discount",
+                "delivery_seconds",
+            ],
+            postgresql_where=text("sale_status_code = 1"),
+            sqlite_where=text("sale_status_code = 1"),
+        ),
+        Index(
+            "idx_sales_cancelled_created",
+            "created_at",
+            "store_id",
+            postgresql_where=text("sale_status_code = 2"),
+            sqlite_where=text("sale_status_code = 2"),
+        ),
+        Index(
+            "idx_sales_customer_created",
+            "customer_id",
+            "created_at",
+            postgresql_where=text("customer_id IS NOT NULL"),
+            sqlite_where=text("customer_id IS NOT NULL"),
+        ),
+        # Long date ranges over rows stored in created_at order
+        # (see migrations/008_sales_brin.sql and app.jobs.clustering)
+        Index(
+            "idx_sales_created_brin",
+            "created_at",
+            postgresql_using="brin",
+            postgresql_with={"pages_per_range": 32, "autosummarize": "on"},
+        ),
+        # Day of week / hour filters, by store or channel
+        Index(
+            "idx_sales_store_dow_hour",
+            "store_id",
+            "sale_dow",
+            "sale_hour",
+            "created_at",
+        ),
+        Index(
+            "idx_sales_channel_dow_hour",
+            "channel_id",
+            "sale_dow",
+            "sale_hour",
+            "created_at",
+        ),
+    )
+
     # Relationships
     store = relationship("Store", back_populates="sales")
     sub_brand = relationship("SubBrand", back_populates="sales")
@@ -66,3 +198,26 @@ class Sale(Base):
         uselist=False,
         cascade=CASCADE_ALL_DELETE_ORPHAN
     )
+
+
+def fill_sale_created_at(mapper, connection, target) -> None:
+    """
+    Copy the created_at of its sale into a child row being inserted.
+
+    Registered as a before_insert listener of ProductSale, Payment and
+    DeliverySale. Their sale_created_at is part of the primary key and of
+    the foreign key to sales once migration 005 partitions the tables, and
+    the database cannot fill it: a BEFORE ROW trigger of a partitioned
+    table runs after the row was routed to a partition on that very key.
+    """
+    if target.sale_created_at is not None:
+        return
+    # Use the sale of the same flush without loading anything through
+    # the session; otherwise read it on the flushing connection
+    sale = target.__dict__.get("sale")
+    if sale is not None and sale.__dict__.get("created_at") is not None:
+        target.sale_created_at = sale.created_at
+        return
+    target.sale_created_at = connection.scalar(
+        select(Sale.created_at).where(Sale.id == target.sale_id)
+    )
@@ -0,0 +1,50 @@
+"""
+SaleStatus model.
+"""
+
+from typing import Dict, Optional
+
+from sqlalchemy import Column, SmallInteger, String, event
+from app.db.session import Base
+
+# Status descriptions with a code of their own; anything else is OTHER.
+# Mirrors the sale_statuses rows and the sales.sale_status_code expression
+# (see migrations/007_sale_status_codes.sql).
+SALE_STATUS_CODES: Dict[str, int] = {"COMPLETED": 1, "CANCELLED": 2}
+
+
+class SaleStatus(Base):
+    """Lookup of the compact status codes of sales."""
+
+    __tablename__ = "sale_statuses"
+
+    OTHER = 0
+    COMPLETED = SALE_STATUS_CODES["COMPLETED"]
+    CANCELLED = SALE_STATUS_CODES["CANCELLED"]
+
+    code = Column(SmallInteger, primary_key=True, autoincrement=False)
+    description = Column(String(100), nullable=False, unique=True)
+
+    @staticmethod
+    def code_for(description: str) -> Optional[int]:
+        """
+        Get the code of a status description.
+
+        Args:
+            description: Status description (e.g. "COMPLETED")
+
+        Returns:
+            Status code, or None for statuses without a code of their own
+        """
+        return SALE_STATUS_CODES.get(description)
+
+
+@event.listens_for(SaleStatus.__table__, "after_create")
+def _seed_sale_statuses(target, connection, **kw):
+    """Fill the lookup when the table is created from the models."""
+    rows = [{"code": SaleStatus.OTHER, "description": "OTHER"}]
+    rows += [
+        {"code": code, "description": description}
+        for description, code in SALE_STATUS_CODES.items()
+    ]
+    connection.execute(target.insert(), rows)
@@ -0,0 +1,35 @@
+"""
+SalesHourlyRollup model.
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, Numeric, Index
+from app.db.session import Base
+
+
+class SalesHourlyRollup(Base):
+    """
+    Hourly sales fact pre-aggregated from the sales table.
+
+    One row per store, channel, status and hour bucket. Rows are merged
+    incrementally by RollupService using the sales_hourly watermark.
+    """
+
+    __tablename__ = "sales_hourly_rollup"
+
+    store_id = Column(Integer, primary_key=True)
+    channel_id = Column(Integer, primary_key=True)
+    sale_status_desc = Column(String(100), primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True)
+
+    sales_count = Column(Integer, nullable=False, default=0)
+    total_amount = Column(Numeric(14, 2), nullable=False, default=0)
+    total_discount = Column(Numeric(14, 2), nullable=False, default=0)
+    delivery_seconds = Column(Numeric(16, 0), nullable=False, default=0)
+    delivery_count = Column(Integer, nullable=False, default=0)
+
+    first_sale_at = Column(DateTime)
+    last_sale_at = Column(DateTime)
+
+    __table_args__ = (
+        Index("idx_sales_hourly_rollup_bucket", "bucket_start"),
+    )
@@ -2,8 +2,9 @@
 Analytics schemas.
 """
 
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel, Field
+from app.config import settings
 from app.schemas.constants import (
     DESC_TOTAL_REVENUE,
     DESC_NUMBER_OF_SALES,
@@ -58,3 +59,23 @@ class MetricsSummary(BaseModel):
     avg_ticket: float = Field(..., description=DESC_AVG_TICKET_VALUE)
     first_sale: Optional[str] = Field(None, description="First sale date")
     last_sale: Optional[str] = Field(None, description="Last sale date")
+
+
+class BatchQuery(BaseModel):
+    """Single query of an analytics batch."""
+
+    id: Optional[str] = Field(
+        None, description="Client identifier echoed back in the result"
+    )
+    metric: str = Field(
+        ..., description="AnalyticsService method without 'get_' prefix"
+    )
+    params: Dict[str, Any] = Field(default_factory=dict)
+
+
+class BatchRequest(BaseModel):
+    """Analytics batch request schema."""
+
+    queries: List[BatchQuery] = Field(
+        ..., min_length=1, max_length=settings.ANALYTICS_BATCH_MAX_QUERIES
+    )
@@ -2,12 +2,13 @@
 Analytics service with aggregations.
 """
 
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc, extract
+from sqlalchemy import func, desc, extract, literal_column
 from datetime import datetime, timedelta
 
 from app.models.sale import Sale
+from app.models.sale_status import SaleStatus
 from app.models.store import Store
 from app.models.channel import Channel
 from app.models.product_sale import ProductSale
@@ -15,6 +16,14 @@ from app.models.product import Product
 from app.models.delivery_sale import DeliverySale
 from app.services.cache import cache_result
 from app.services.query_filter_builder import QueryFilterBuilder
+from app.services.rollup import RollupService
+
+# date_trunc units, rendered inline: as bound parameters each use of the
+# expression gets its own ($1, $2...) under asyncpg, and PostgreSQL no
+# longer sees the selected period as the grouped one
+PERIOD_UNITS = {
+    unit: literal_column(f"'{unit}'") for unit in ("day", "week", "month")
+}
 
 
 class AnalyticsService:
@@ -28,6 +37,61 @@ class AnalyticsService:
             db: Database session
         """
         self.db = db
+        self.rollups = RollupService(db)
+        # Day partials read ahead by the async paths, which run this
+        # service on the event loop thread (see day_partials)
+        self.prefetched_partials = None
+
+    def _period_expr(self, column, group_by: str):
+        """
+        Build a database-specific period truncation expression.
+
+        Args:
+            column: Timestamp column to truncate
+            group_by: 'day', 'week', 'month'
+
+        Returns:
+            SQL expression for the period
+        """
+        try:
+            db_url = str(self.db.bind.url)
+        except AttributeError:
+            # For test connections, use SQLite-compatible approach
+            db_url = "sqlite:///test.db"
+
+        if "sqlite" in db_url:
+            # SQLite doesn't have date_trunc, use strftime
+            if group_by == "week":
+                return func.strftime("%Y-%W", column)
+            if group_by == "month":
+                return func.strftime("%Y-%m", column)
+            return func.strftime("%Y-%m-%d", column)
+
+        # PostgreSQL/MySQL date_trunc
+        return func.date_trunc(
+            PERIOD_UNITS.get(group_by, PERIOD_UNITS["day"]), column
+        )
+
+    def _from_day_partials(self, method_name: str, **kwargs) -> Any:
+        """
+        Compose a result from cached per-day partials, if possible.
+
+        Args:
+            method_name: Shared-scan method name
+            **kwargs: Method arguments
+
+        Returns:
+            Result, or None if the call cannot be composed
+        """
+        # Imported here: day partials build on this service
+        from app.services.day_partials import compose_from_days
+
+        results = compose_from_days(
+            self.db,
+            {method_name: (method_name, kwargs)},
+            self.prefetched_partials,
+        )
+        return None if results is None else results[method_name]
 
     @cache_result(prefix="revenue", ttl=300)  # 5 minutes cache
     def get_revenue(
@@ -51,33 +115,35 @@ class AnalyticsService:
         Returns:
             List of revenue data by period
         """
-        # Use database-specific date truncation
-        try:
-            db_url = str(self.db.bind.url)
-        except AttributeError:
-            # For test connections, use SQLite-compatible approach
-            db_url = "sqlite:///test.db"
+        composed = self._from_day_partials(
+            "get_revenue",
+            start_date=start_date,
+            end_date=end_date,
+            store_id=store_id,
+            channel_id=channel_id,
+            group_by=group_by,
+        )
+        if composed is not None:
+            return composed
 
-        if "sqlite" in db_url:
-            # SQLite doesn't have date_trunc, use strftime
-            if group_by == "day":
-                date_expr = func.strftime("%Y-%m-%d", Sale.created_at)
-            elif group_by == "week":
-                date_expr = func.strftime("%Y-%W", Sale.created_at)
-            elif group_by == "month":
-                date_expr = func.strftime("%Y-%m", Sale.created_at)
-            else:
-                date_expr = func.strftime("%Y-%m-%d", Sale.created_at)
-        else:
-            # PostgreSQL/MySQL date_trunc
-            date_expr = func.date_trunc(group_by, Sale.created_at)
+        facts = self.rollups.sales_hourly_facts(
+            start_date=start_date,
+            end_date=end_date,
+            store_id=store_id,
+            channel_id=channel_id,
+            status="COMPLETED",
+        )
+        if facts is not None:
+            return self._get_revenue_from_facts(facts, group_by)
+
+        date_expr = self._period_expr(Sale.created_at, group_by)
 
         query = self.db.query(
             date_expr.label("period"),
             func.sum(Sale.total_amount).label("revenue"),
             func.count(Sale.id).label("sales_count"),
             func.avg(Sale.total_amount).label("avg_ticket"),
-        ).filter(Sale.sale_status_desc == "COMPLETED")
+        ).filter(Sale.sale_status_code == SaleStatus.COMPLETED)
 
         # Apply filters using centralized builder
         query = QueryFilterBuilder.apply_basic_filters(
@@ -103,6 +169,35 @@ class AnalyticsService:
             for row in results
         ]
 
+    def _get_revenue_from_facts(self, facts, group_by: str) -> List[Dict]:
+        """Revenue by period computed from the hourly sales facts."""
+        date_expr = self._period_expr(facts.c.bucket, group_by)
+
+        results = (
+            self.db.query(
+                date_expr.label("period"),
+                func.sum(facts.c.total_amount).label("revenue"),
+                func.sum(facts.c.sales_count).label("sales_count"),
+            )
+            .group_by("period")
+            .order_by("period")
+            .all()
+        )
+
+        return [
+            {
+                "period": str(row.period)[:10],
+                "revenue": float(row.revenue) if row.revenue else 0,
+                "sales_count": int(row.sales_count),
+                "avg_ticket": (
+                    float(row.revenue) / int(row.sales_count)
+                    if row.revenue and row.sales_count
+                    else 0
+                ),
+            }
+            for row in results
+        ]
+
     @cache_result(prefix="products", ttl=300)  # 5 minutes cache
     def get_top_products(
         self,
@@ -131,6 +226,19 @@ class AnalyticsService:
         Returns:
             List of top products
         """
+        facts = self.rollups.product_daily_facts(
+            start_date=start_date,
+            end_date=end_date,
+            store_id=store_id,
+            channel_id=channel_id,
+            status="COMPLETED",
+            day_of_week=day_of_week,
+            hour_start=hour_start,
+            hour_end=hour_end,
+        )
+        if facts is not None:
+            return self._get_top_products_from_facts(facts, limit)
+
         query = (
             self.db.query(
                 Product.name,
@@ -141,7 +249,7 @@ class AnalyticsService:
             )
             .join(Product, ProductSale.product_id == Product.id)
             .join(Sale, ProductSale.sale_id == Sale.id)
-            .filter(Sale.sale_status_desc == "COMPLETED")
+            .filter(Sale.sale_status_code == SaleStatus.COMPLETED)
         )
 
         # Apply filters using centralized builder
@@ -154,6 +262,7 @@ class AnalyticsService:
             day_of_week=day_of_week,
             hour_start=hour_start,
             hour_end=hour_end,
+            partitioned=(ProductSale,),
         )
 
         # Group, order and limit
@@ -176,6 +285,37 @@ class AnalyticsService:
             for row in results
         ]
 
+    def _get_top_products_from_facts(self, facts, limit: int) -> List[Dict]:
+        """Aggregate top products from a product fact source."""
+        sales_count = func.sum(facts.c.line_count)
+        total_revenue = func.sum(facts.c.total_price)
+        results = (
+            self.db.query(
+                Product.name,
+                func.sum(facts.c.quantity).label("total_quantity"),
+                sales_count.label("sales_count"),
+                total_revenue.label("total_revenue"),
+                (total_revenue / sales_count).label("avg_price"),
+            )
+            .select_from(facts)
+            .join(Product, facts.c.product_id == Product.id)
+            .group_by(Product.id, Product.name)
+            .order_by(desc("total_quantity"))
+            .limit(limit)
+            .all()
+        )
+
+        return [
+            {
+                "product_name": row.name,
+                "total_quantity": float(row.total_quantity or 0),
+                "sales_count": int(row.sales_count),
+                "total_revenue": float(row.total_revenue or 0),
+                "avg_price": float(row.avg_price or 0),
+            }
+            for row in results
+        ]
+
     @cache_result(prefix="channels", ttl=300)  # 5 minutes cache
     def get_channel_performance(
         self,
@@ -194,6 +334,24 @@ class AnalyticsService:
         Returns:
             List of channel performance data
         """
+        composed = self._from_day_partials(
+            "get_channel_performance",
+            start_date=start_date,
+            end_date=end_date,
+            store_id=store_id,
+        )
+        if composed is not None:
+            return composed
+
+        facts = self.rollups.sales_hourly_facts(
+            start_date=start_date,
+            end_date=end_date,
+            store_id=store_id,
+            status="COMPLETED",
+        )
+        if facts is not None:
+            return self._get_channel_performance_from_facts(facts)
+
         query = (
             self.db.query(
                 Channel.name,
@@ -203,7 +361,7 @@ class AnalyticsService:
                 func.avg(Sale.total_amount).label("avg_ticket"),
             )
             .join(Sale, Sale.channel_id == Channel.id)
-            .filter(Sale.sale_status_desc == "COMPLETED")
+            .filter(Sale.sale_status_code == SaleStatus.COMPLETED)
         )
 
         # Apply filters using centralized builder
@@ -231,6 +389,38 @@ class AnalyticsService:
             for row in results
         ]
 
+    def _get_channel_performance_from_facts(self, facts) -> List[Dict]:
+        """Channel performance computed from the hourly sales facts."""
+        results = (
+            self.db.query(
+                Channel.name,
+                Channel.type,
+                func.sum(facts.c.total_amount).label("total_revenue"),
+                func.sum(facts.c.sales_count).label("sales_count"),
+            )
+            .join(facts, facts.c.channel_id == Channel.id)
+            .group_by(Channel.id, Channel.name, Channel.type)
+            .order_by(desc("total_revenue"))
+            .all()
+        )
+
+        return [
+            {
+                "channel_name": row.name,
+                "channel_type": row.type,
+                "total_revenue": (
+                    float(row.total_revenue) if row.total_revenue else 0
+                ),
+                "sales_count": int(row.sales_count),
+                "avg_ticket": (
+                    float(row.total_revenue) / int(row.sales_count)
+                    if row.total_revenue and row.sales_count
+                    else 0
+                ),
+            }
+            for row in results
+        ]
+
     @cache_result(prefix="summary", ttl=300)  # 5 minutes cache
     def get_metrics_summary(
         self,
@@ -245,13 +435,33 @@ class AnalyticsService:
         Returns:
             Dict with total revenue, sales count, avg ticket, etc.
         """
+        composed = self._from_day_partials(
+            "get_metrics_summary",
+            start_date=start_date,
+            end_date=end_date,
+            store_id=store_id,
+            channel_id=channel_id,
+        )
+        if composed is not None:
+            return composed
+
+        facts = self.rollups.sales_hourly_facts(
+            start_date=start_date,
+            end_date=end_date,
+            store_id=store_id,
+            channel_id=channel_id,
+            status="COMPLETED",
+        )
+        if facts is not None:
+            return self._get_metrics_summary_from_facts(facts)
+
         query = self.db.query(
             func.sum(Sale.total_amount).label("total_revenue"),
             func.count(Sale.id).label("sales_count"),
             func.avg(Sale.total_amount).label("avg_ticket"),
             func.min(Sale.created_at).label("first_sale"),
             func.max(Sale.created_at).label("last_sale"),
-        ).filter(Sale.sale_status_desc == "COMPLETED")
+        ).filter(Sale.sale_status_code == SaleStatus.COMPLETED)
 
         # Apply filters using centralized builder
         query = QueryFilterBuilder.apply_basic_filters(
@@ -280,6 +490,34 @@ class AnalyticsService:
             ),
         }
 
+    def _get_metrics_summary_from_facts(self, facts) -> Dict:
+        """Summary metrics computed from the hourly sales facts."""
+        result = self.db.query(
+            func.sum(facts.c.total_amount).label("total_revenue"),
+            func.sum(facts.c.sales_count).label("sales_count"),
+            func.min(facts.c.first_sale_at).label("first_sale"),
+            func.max(facts.c.last_sale_at).label("last_sale"),
+        ).first()
+
+        sales_count = int(result.sales_count or 0)
+        total_revenue = (
+            float(result.total_revenue) if result.total_revenue else 0
+        )
+
+        return {
+            "total_revenue": total_revenue,
+            "sales_count": sales_count,
+            "avg_ticket": (
+                total_revenue / sales_count if sales_count else 0
+            ),
+            "first_sale": (
+                result.first_sale.isoformat() if result.first_sale else None
+            ),
+            "last_sale": (
+                result.last_sale.isoformat() if result.last_sale else None
+            ),
+        }
+
     @cache_result(prefix="margin", ttl=300)
     def get_products_margin(
         self,
@@ -302,6 +540,15 @@ class AnalyticsService:
         Returns:
             List of products with margin analysis
         """
+        facts = self.rollups.product_daily_facts(
+            start_date=start_date,
+            end_date=end_date,
+            store_id=store_id,
+            channel_id=channel_id,
+        )
+        if facts is not None:
+            return self._get_products_margin_from_facts(facts, limit)
+
         query = (
             self.db.query(
                 Product.id,
@@ -326,6 +573,7 @@ class AnalyticsService:
             end_date=end_date,
             store_id=store_id,
             channel_id=channel_id,
+            partitioned=(ProductSale,),
         )
 
         # Group by product and filter products with margin > 0
@@ -371,6 +619,54 @@ class AnalyticsService:
             for r in results
         ]
 
+    def _get_products_margin_from_facts(self, facts, limit: int) -> List[Dict]:
+        """Aggregate product margins from a product fact source."""
+        avg_price = func.sum(facts.c.base_price) / func.sum(facts.c.line_count)
+        margin = avg_price - avg_price * 0.7
+        results = (
+            self.db.query(
+                Product.id,
+                Product.name,
+                avg_price.label("avg_price"),
+                func.sum(facts.c.quantity).label("total_quantity"),
+                func.sum(facts.c.total_price).label("total_revenue"),
+            )
+            .select_from(facts)
+            .join(Product, facts.c.product_id == Product.id)
+            .group_by(Product.id, Product.name)
+            .having(margin > 0)
+            .order_by(margin)
+            .limit(limit)
+            .all()
+        )
+
+        products = []
+        for r in results:
+            price = float(r.avg_price) if r.avg_price else 0
+            cost = price * 0.7
+            product_margin = price - cost
+            products.append(
+                {
+                    "product_id": r.id,
+                    "product_name": r.name,
+                    "avg_price": price,
+                    "avg_cost": cost,
+                    "margin": product_margin,
+                    "margin_percentage": (
+                        product_margin / price * 100
+                        if price and product_margin
+                        else 0
+                    ),
+                    "total_quantity": (
+                        float(r.total_quantity) if r.total_quantity else 0
+                    ),
+                    "total_revenue": (
+                        float(r.total_revenue) if r.total_revenue else 0
+                    ),
+                }
+            )
+        return products
+
     @cache_result(prefix="delivery", ttl=300)
     def get_delivery_performance(
         self,
@@ -560,9 +856,18 @@ class AnalyticsService:
         Returns:
             List of heatmap data by day of week and hour
         """
+        facts = self.rollups.sales_hourly_facts(
+            start_date=start_date,
+            end_date=end_date,
+            store_id=store_id,
+            channel_id=channel_id,
+        )
+        if facts is not None:
+            return self._get_peak_hours_heatmap_from_facts(facts)
+
         query = self.db.query(
-            extract("dow", Sale.created_at).label("day_of_week"),
-            extract("hour", Sale.created_at).label("hour"),
+            Sale.sale_dow.label("day_of_week"),
+            Sale.sale_hour.label("hour"),
             func.count(Sale.id).label("sales_count"),
             func.sum(Sale.total_amount).label("total_revenue"),
         )
@@ -577,9 +882,9 @@ class AnalyticsService:
         )
 
         # Group by day of week and hour
-        query = query.group_by(
-            extract("dow", Sale.created_at), extract("hour", Sale.created_at)
-        ).order_by("day_of_week", "hour")
+        query = query.group_by(Sale.sale_dow, Sale.sale_hour).order_by(
+            "day_of_week", "hour"
+        )
 
         results = query.all()
 
@@ -601,6 +906,37 @@ class AnalyticsService:
 
         return heatmap_data
 
+    def _get_peak_hours_heatmap_from_facts(self, facts) -> List[Dict]:
+        """Peak hours heatmap computed from the hourly sales facts."""
+        day_of_week = extract("dow", facts.c.bucket)
+        hour = extract("hour", facts.c.bucket)
+
+        results = (
+            self.db.query(
+                day_of_week.label("day_of_week"),
+                hour.label("hour"),
+                func.sum(facts.c.sales_count).label("sales_count"),
+                func.sum(facts.c.total_amount).label("total_revenue"),
+            )
+            .group_by(day_of_week, hour)
+            .order_by("day_of_week", "hour")
+            .all()
+        )
+
+        day_names = ["Dom", "Seg", "Ter", "Qua", "Qui", "Sex", "Sáb"]
+        return [
+            {
+                "day": int(r.day_of_week),
+                "day_name": day_names[int(r.day_of_week)],
+                "hour": int(r.hour),
+                "sales_count": int(r.sales_count),
+                "total_revenue": (
+                    float(r.total_revenue) if r.total_revenue else 0
+                ),
+            }
+            for r in results
+        ]
+
     @cache_result(prefix="anomalies", ttl=300)
     def get_anomaly_alerts(
         self,
@@ -855,18 +1191,18 @@ class AnalyticsService:
                 ProductSale, ProductSale.id == ItemProductSale.product_sale_id
             )
             .join(Sale, Sale.id == ProductSale.sale_id)
-            .filter(Sale.sale_status_desc == "COMPLETED")
+            .filter(Sale.sale_status_code == SaleStatus.COMPLETED)
         )
 
         # Apply filters
-        if start_date:
-            query = query.filter(Sale.created_at >= start_date)
-        if end_date:
-            query = query.filter(Sale.created_at <= end_date)
-        if store_id:
-            query = query.filter(Sale.store_id == store_id)
-        if channel_id:
-            query = query.filter(Sale.channel_id == channel_id)
+        query = QueryFilterBuilder.apply_basic_filters(
+            query,
+            start_date=start_date,
+            end_date=end_date,
+            store_id=store_id,
+            channel_id=channel_id,
+            partitioned=(ProductSale,),
+        )
 
         # Group by item and order by times added
         query = (
@@ -936,18 +1272,18 @@ class AnalyticsService:
                 ItemProductSale,
                 ItemProductSale.product_sale_id == ProductSale.id,
             )
-            .filter(Sale.sale_status_desc == "COMPLETED")
+            .filter(Sale.sale_status_code == SaleStatus.COMPLETED)
         )
 
         # Apply filters
-        if start_date:
-            query = query.filter(Sale.created_at >= start_date)
-        if end_date:
-            query = query.filter(Sale.created_at <= end_date)
-        if store_id:
-            query = query.filter(Sale.store_id == store_id)
-        if channel_id:
-            query = query.filter(Sale.channel_id == channel_id)
+        query = QueryFilterBuilder.apply_basic_filters(
+            query,
+            start_date=start_date,
+            end_date=end_date,
+            store_id=store_id,
+            channel_id=channel_id,
+            partitioned=(ProductSale,),
+        )
 
         # Group by product and order by customization rate
         query = (
@@ -1011,16 +1347,17 @@ class AnalyticsService:
             .join(PaymentType, PaymentType.id == Payment.payment_type_id)
             .join(Sale, Sale.id == Payment.sale_id)
             .join(Channel, Channel.id == Sale.channel_id)
-            .filter(Sale.sale_status_desc == "COMPLETED")
+            .filter(Sale.sale_status_code == SaleStatus.COMPLETED)
         )
 
         # Apply filters
-        if start_date:
-            query = query.filter(Sale.created_at >= start_date)
-        if end_date:
-            query = query.filter(Sale.created_at <= end_date)
-        if store_id:
-            query = query.filter(Sale.store_id == store_id)
+        query = QueryFilterBuilder.apply_basic_filters(
+            query,
+            start_date=start_date,
+            end_date=end_date,
+            store_id=store_id,
+            partitioned=(Payment,),
+        )
 
         # Group by channel and payment type
         query = query.group_by(Channel.name, PaymentType.description).order_by(
@@ -1062,7 +1399,7 @@ class AnalyticsService:
         """
         # Base query for cancellations
         query = self.db.query(Sale).filter(
-            Sale.sale_status_desc == "CANCELLED"
+            Sale.sale_status_code == SaleStatus.CANCELLED
         )
 
         if start_date:
@@ -1112,7 +1449,7 @@ class AnalyticsService:
                 func.sum(Sale.total_amount).label("lost_revenue"),
             )
             .join(Channel, Channel.id == Sale.channel_id)
-            .filter(Sale.sale_status_desc == "CANCELLED")
+            .filter(Sale.sale_status_code == SaleStatus.CANCELLED)
         )
 
         if start_date:
@@ -1138,9 +1475,9 @@ class AnalyticsService:
 
         # Cancellations by hour (to identify patterns)
         cancellations_by_hour = self.db.query(
-            func.extract("hour", Sale.created_at).label("hour"),
+            Sale.sale_hour.label("hour"),
             func.count(Sale.id).label("cancellation_count"),
-        ).filter(Sale.sale_status_desc == "CANCELLED")
+        ).filter(Sale.sale_status_code == SaleStatus.CANCELLED)
 
         if start_date:
             cancellations_by_hour = cancellations_by_hour.filter(
@@ -1160,9 +1497,7 @@ class AnalyticsService:
             )
 
         cancellations_by_hour = (
-            cancellations_by_hour.group_by(
-                func.extract("hour", Sale.created_at)
-            )
+            cancellations_by_hour.group_by(Sale.sale_hour)
             .order_by("hour")
             .all()
         )
@@ -1237,18 +1572,19 @@ class AnalyticsService:
                 DeliveryAddress.delivery_sale_id == DeliverySale.id,
             )
             .filter(
-                Sale.sale_status_desc == "COMPLETED",
+                Sale.sale_status_code == SaleStatus.COMPLETED,
                 Sale.delivery_seconds.isnot(None),
             )
         )
 
         # Apply filters
-        if start_date:
-            query = query.filter(Sale.created_at >= start_date)
-        if end_date:
-            query = query.filter(Sale.created_at <= end_date)
-        if store_id:
-            query = query.filter(Sale.store_id == store_id)
+        query = QueryFilterBuilder.apply_basic_filters(
+            query,
+            start_date=start_date,
+            end_date=end_date,
+            store_id=store_id,
+            partitioned=(DeliverySale,),
+        )
 
         # Group by region and filter by minimum deliveries
         query = (
@@ -1318,7 +1654,9 @@ class AnalyticsService:
         if "sqlite" in db_url:
             month_expr = func.strftime("%Y-%m", Sale.created_at)
         else:
-            month_expr = func.date_trunc("month", Sale.created_at)
+            month_expr = func.date_trunc(
+                PERIOD_UNITS["month"], Sale.created_at
+            )
 
         # Get monthly revenue for each store
         query = (
@@ -1334,7 +1672,7 @@ class AnalyticsService:
             .select_from(Sale)
             .join(Store, Store.id == Sale.store_id)
             .filter(
-                Sale.sale_status_desc == "COMPLETED",
+                Sale.sale_status_code == SaleStatus.COMPLETED,
                 Sale.created_at >= start_date,
                 Sale.created_at <= end_date,
             )
@@ -1511,46 +1849,58 @@ class AnalyticsService:
         if not start_date:
             start_date = end_date - timedelta(days=365)
 
-        # Detect database type for date truncation
-        try:
-            db_url = str(self.db.bind.url)
-        except AttributeError:
-            db_url = "sqlite:///test.db"
-
-        if "sqlite" in db_url:
-            month_expr = func.strftime("%Y-%m", Sale.created_at)
+        facts = self.rollups.product_daily_facts(
+            start_date=start_date,
+            end_date=end_date,
+            store_id=store_id,
+            channel_id=channel_id,
+            status="COMPLETED",
+        )
+        if facts is not None:
+            month_expr = self._period_expr(facts.c.bucket, "month")
+            query = (
+                self.db.query(
+                    Product.id.label("product_id"),
+                    Product.name.label("product_name"),
+                    month_expr.label("month"),
+                    func.sum(facts.c.quantity).label("monthly_quantity"),
+                    func.sum(facts.c.total_price).label("monthly_revenue"),
+                    func.sum(facts.c.line_count).label("monthly_sales"),
+                )
+                .select_from(facts)
+                .join(Product, Product.id == facts.c.product_id)
+                .group_by(Product.id, Product.name, month_expr)
+                .order_by(Product.id, month_expr)
+            )
         else:
-            month_expr = func.date_trunc("month", Sale.created_at)
-
-        # Get monthly sales for each product
-        query = (
-            self.db.query(
-                Product.id.label("product_id"),
-                Product.name.label("product_name"),
-                month_expr.label("month"),
-                func.sum(ProductSale.quantity).label("monthly_quantity"),
-                func.sum(ProductSale.total_price).label("monthly_revenue"),
-                func.count(ProductSale.id).label("monthly_sales"),
+            month_expr = self._period_expr(Sale.created_at, "month")
+            query = (
+                self.db.query(
+                    Product.id.label("product_id"),
+                    Product.name.label("product_name"),
+                    month_expr.label("month"),
+                    func.sum(ProductSale.quantity).label("monthly_quantity"),
+                    func.sum(ProductSale.total_price).label(
+                        "monthly_revenue"
+                    ),
+                    func.count(ProductSale.id).label("monthly_sales"),
+                )
+                .select_from(ProductSale)
+                .join(Product, Product.id == ProductSale.product_id)
+                .join(Sale, Sale.id == ProductSale.sale_id)
+                .filter(Sale.sale_status_code == SaleStatus.COMPLETED)
             )
-            .select_from(ProductSale)
-            .join(Product, Product.id == ProductSale.product_id)
-            .join(Sale, Sale.id == ProductSale.sale_id)
-            .filter(
-                Sale.sale_status_desc == "COMPLETED",
-                Sale.created_at >= start_date,
-                Sale.created_at <= end_date,
+            query = QueryFilterBuilder.apply_basic_filters(
+                query,
+                start_date=start_date,
+                end_date=end_date,
+                store_id=store_id,
+                channel_id=channel_id,
+                partitioned=(ProductSale,),
             )
-        )
-
-        # Apply filters
-        if store_id:
-            query = query.filter(Sale.store_id == store_id)
-        if channel_id:
-            query = query.filter(Sale.channel_id == channel_id)
-
-        query = query.group_by(
-            Product.id, Product.name, month_expr
-        ).order_by(Product.id, month_expr)
+            query = query.group_by(
+                Product.id, Product.name, month_expr
+            ).order_by(Product.id, month_expr)
 
         results = query.all()
 
@@ -1570,7 +1920,7 @@ class AnalyticsService:
                     "month": result.month,
                     "quantity": float(result.monthly_quantity),
                     "revenue": float(result.monthly_revenue),
-                    "sales": result.monthly_sales,
+                    "sales": int(result.monthly_sales),
                 }
             )
 
@@ -1710,7 +2060,7 @@ class AnalyticsService:
             .label("sales_with_increase"),
             func.avg(Sale.total_discount).label("avg_discount"),
             func.avg(Sale.total_increase).label("avg_increase"),
-        ).filter(Sale.sale_status_desc == "COMPLETED")
+        ).filter(Sale.sale_status_code == SaleStatus.COMPLETED)
 
         # Apply filters
         if start_date:
@@ -1729,7 +2079,10 @@ class AnalyticsService:
             Sale.discount_reason,
             func.count(Sale.id).label("count"),
             func.sum(Sale.total_discount).label("total_discount"),
-        ).filter(Sale.sale_status_desc == "COMPLETED", Sale.total_discount > 0)
+        ).filter(
+            Sale.sale_status_code == SaleStatus.COMPLETED,
+            Sale.total_discount > 0,
+        )
 
         if start_date:
             discount_reasons_query = discount_reasons_query.filter(
@@ -1821,38 +2174,43 @@ class AnalyticsService:
         Returns:
             Inventory turnover analysis
         """
-        query = (
-            self.db.query(
-                Product.id,
-                Product.name,
-                func.sum(ProductSale.quantity).label("total_quantity_sold"),
-                func.count(ProductSale.id).label("sales_count"),
-                func.avg(ProductSale.quantity).label("avg_quantity_per_sale"),
-                func.sum(ProductSale.total_price).label("total_revenue"),
-                func.avg(ProductSale.base_price).label("avg_price"),
-            )
-            .select_from(ProductSale)
-            .join(Product, Product.id == ProductSale.product_id)
-            .join(Sale, Sale.id == ProductSale.sale_id)
-            .filter(Sale.sale_status_desc == "COMPLETED")
-        )
-
-        # Apply filters
-        if start_date:
-            query = query.filter(Sale.created_at >= start_date)
-        if end_date:
-            query = query.filter(Sale.created_at <= end_date)
-        if store_id:
-            query = query.filter(Sale.store_id == store_id)
-        if channel_id:
-            query = query.filter(Sale.channel_id == channel_id)
-
         # Calculate period days for turnover calculation
         if start_date and end_date:
             period_days = (end_date - start_date).days
         else:
             period_days = 30  # Default to 30 days
 
+        facts = self.rollups.product_daily_facts(
+            start_date=start_date,
+            end_date=end_date,
+            store_id=store_id,
+            channel_id=channel_id,
+            status="COMPLETED",
+        )
+        if facts is not None:
+            sales_count = func.sum(facts.c.line_count)
+            query = (
+                self.db.query(
+                    Product.id,
+                    Product.name,
+                    func.sum(facts.c.quantity).label("total_quantity_sold"),
+                    sales_count.label("sales_count"),
+                    (func.sum(facts.c.quantity) / sales_count).label(
+                        "avg_quantity_per_sale"
+                    ),
+                    func.sum(facts.c.total_price).label("total_revenue"),
+                    (func.sum(facts.c.base_price) / sales_count).label(
+                        "avg_price"
+                    ),
+                )
+                .select_from(facts)
+                .join(Product, Product.id == facts.c.product_id)
+            )
+        else:
+            query = self._inventory_turnover_query(
+                start_date, end_date, store_id, channel_id
+            )
+
         query = (
             query.group_by(Product.id, Product.name)
             .order_by(desc("total_quantity_sold"))
@@ -1870,7 +2228,7 @@ class AnalyticsService:
                     if r.total_quantity_sold
                     else 0
                 ),
-                "sales_count": r.sales_count,
+                "sales_count": int(r.sales_count),
                 "avg_quantity_per_sale": (
                     float(r.avg_quantity_per_sale)
                     if r.avg_quantity_per_sale
@@ -1893,3 +2251,39 @@ class AnalyticsService:
             }
             for r in results
         ]
+
+    def _inventory_turnover_query(
+        self,
+        start_date: Optional[datetime],
+        end_date: Optional[datetime],
+        store_id: Optional[int],
+        channel_id: Optional[int],
+    ):
+        """Build the per-product sales velocity query over product_sales."""
+        query = (
+            self.db.query(
+                Product.id,
+                Product.name,
+                func.sum(ProductSale.quantity).label("total_quantity_sold"),
+                func.count(ProductSale.id).label("sales_count"),
+                func.avg(ProductSale.quantity).label("avg_quantity_per_sale"),
+                func.sum(ProductSale.total_price).label("total_revenue"),
+                func.avg(ProductSale.base_price).label("avg_price"),
+            )
+            .select_from(ProductSale)
+            .join(Product, Product.id == ProductSale.product_id)
+            .join(Sale, Sale.id == ProductSale.sale_id)
+            .filter(Sale.sale_status_code == SaleStatus.COMPLETED)
+        )
+
+        # Apply filters
+        query = QueryFilterBuilder.apply_basic_filters(
+            query,
+            start_date=start_date,
+            end_date=end_date,
+            store_id=store_id,
+            channel_id=channel_id,
+            partitioned=(ProductSale,),
+        )
+
+        return query
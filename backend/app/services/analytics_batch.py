@@ -0,0 +1,455 @@
+"""
+Batch execution of analytics queries.
+
+A dashboard needs many AnalyticsService results at once. Instead of one HTTP
+request per widget, a batch resolves every query up front, looks all of them
+up in Redis with a single MGET, and computes the misses concurrently, each on
+its own pooled connection. Misses sharing a filter set are merged into one
+scan by the query planner, and each group is computed once: concurrent
+batches share it, and other workers wait for it behind its cache locks.
+"""
+
+import asyncio
+import inspect
+from datetime import datetime
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Union,
+    get_args,
+    get_origin,
+    get_type_hints,
+)
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.exceptions import AnalyticsError, ValidationError
+from app.core.executor import run_db
+from app.core.logging import get_logger
+from app.db.session import session_scope
+from app.services.analytics import AnalyticsService
+from app.services.async_services import async_single_flight
+from app.services.cache import (
+    aacquire_lock,
+    aget_cache_many,
+    arelease_lock,
+    aset_cache_many,
+    await_cache_many,
+    data_versions,
+    make_entry,
+    read_entry,
+    schedule_refresh,
+)
+from app.services.day_partials import PrefetchedPartials, compose_from_days
+from app.services.query_planner import compute_shared, plan_queries
+from app.utils.date_parser import parse_date_filters, parse_single_date
+
+logger = get_logger(__name__)
+
+METHOD_PREFIX = "get_"
+
+
+def _discover_metrics() -> Dict[str, str]:
+    """Map metric names to the cached public AnalyticsService methods."""
+    return {
+        name[len(METHOD_PREFIX):]: name
+        for name, member in vars(AnalyticsService).items()
+        if name.startswith(METHOD_PREFIX) and hasattr(member, "cache_key")
+    }
+
+
+# Metric name (method name without 'get_') -> AnalyticsService method name
+ANALYTICS_METRICS = _discover_metrics()
+
+
+def _base_type(annotation: Any) -> Any:
+    """Unwrap Optional[X] to X."""
+    if get_origin(annotation) is Union:
+        args = [a for a in get_args(annotation) if a is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+
+def resolve_query(
+    metric: str, params: Optional[Dict[str, Any]] = None
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Resolve a metric spec into a service method and typed arguments.
+
+    Args:
+        metric: Metric name (e.g. 'revenue', 'top_products')
+        params: Method arguments; dates as ISO strings, or a relative
+            'range' token (see date_parser.RELATIVE_RANGES)
+
+    Returns:
+        Tuple of (method name, keyword arguments)
+
+    Raises:
+        ValidationError: If the metric or a parameter is invalid
+    """
+    method_name = ANALYTICS_METRICS.get(metric)
+    if method_name is None:
+        raise ValidationError(f"Unknown metric: {metric}", field="metric")
+
+    method = getattr(AnalyticsService, method_name)
+    signature = inspect.signature(method.__wrapped__)
+    hints = get_type_hints(method.__wrapped__)
+    params = dict(params or {})
+    # Relative range token (e.g. 'last_30d') for methods taking dates
+    date_range = None
+    if "start_date" in signature.parameters:
+        date_range = params.pop("range", None)
+
+    unknown = set(params) - set(signature.parameters) - {"self"}
+    if unknown:
+        raise ValidationError(
+            f"Unknown parameters for {metric}: {', '.join(sorted(unknown))}",
+            field="params",
+        )
+
+    start, end = parse_date_filters(
+        params.pop("start_date", None),
+        params.pop("end_date", None),
+        date_range,
+    )
+
+    kwargs: Dict[str, Any] = {}
+    for name in signature.parameters:
+        if name == "self":
+            continue
+        if name == "start_date":
+            value = start
+        elif name == "end_date":
+            value = end
+        elif name in params:
+            value = _coerce(name, params[name], hints.get(name))
+        else:
+            continue
+        if value is not None:
+            kwargs[name] = value
+
+    return method_name, kwargs
+
+
+def _coerce(name: str, value: Any, annotation: Any) -> Any:
+    """Convert a JSON parameter value to the annotated type."""
+    target = _base_type(annotation)
+    if value is None:
+        return None
+    if target is datetime and isinstance(value, str):
+        return parse_single_date(value, field_name=name)
+    if target in (int, float) and not isinstance(value, bool):
+        try:
+            return target(value)
+        except (TypeError, ValueError) as e:
+            raise ValidationError(
+                f"Invalid value for {name}: {value}", field=name
+            ) from e
+    return value
+
+
+def compute_metric(
+    db: Session,
+    method_name: str,
+    kwargs: Dict[str, Any],
+    prefetched: Optional[PrefetchedPartials] = None,
+) -> Any:
+    """
+    Compute an analytics result without going through its cache.
+
+    Args:
+        db: Database session
+        method_name: AnalyticsService method name
+        kwargs: Method arguments
+        prefetched: Day partials read ahead (see compose_from_days)
+
+    Returns:
+        Method result
+    """
+    method = getattr(AnalyticsService, method_name).__wrapped__
+    service = AnalyticsService(db)
+    service.prefetched_partials = prefetched
+    return method(service, **kwargs)
+
+
+def compute_queries(
+    db: Session,
+    queries: Dict[str, Tuple[str, Dict[str, Any]]],
+    prefetched: Optional[PrefetchedPartials] = None,
+) -> Dict[str, Any]:
+    """
+    Compute a planned group of queries on one session.
+
+    Args:
+        db: Database session
+        queries: Cache key -> (method name, kwargs); several queries are
+            answered by one shared scan, or from cached day partials
+        prefetched: Day partials read ahead (see compose_from_days)
+
+    Returns:
+        Cache key -> result
+    """
+    if len(queries) > 1:
+        composed = compose_from_days(db, queries, prefetched)
+        if composed is not None:
+            return composed
+        return compute_shared(db, queries)
+    key, (method_name, kwargs) = next(iter(queries.items()))
+    return {key: compute_metric(db, method_name, kwargs, prefetched)}
+
+
+class AnalyticsBatchService:
+    """Service executing batches of analytics queries."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], ContextManager[Session]] = session_scope,
+        async_session_factory: Optional[Callable] = None,
+        max_concurrency: Optional[int] = None,
+    ):
+        """
+        Initialize batch service.
+
+        Args:
+            session_factory: Context manager factory giving each computed
+                query its own session
+            async_session_factory: AsyncSession factory; when set, queries
+                run on the async path instead of the thread pool
+            max_concurrency: Maximum queries computed at once
+                (defaults to the DB pool size)
+        """
+        self.session_factory = session_factory
+        self.async_session_factory = async_session_factory
+        self.max_concurrency = max_concurrency or settings.DB_POOL_SIZE
+
+    def _compute_sync(
+        self, queries: Dict[str, Tuple[str, Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Compute a query group on a dedicated session."""
+        with self.session_factory() as db:
+            return compute_queries(db, queries)
+
+    async def _compute(
+        self,
+        semaphore: asyncio.Semaphore,
+        queries: Dict[str, Tuple[str, Dict[str, Any]]],
+    ) -> Dict[str, Any]:
+        """Compute a query group, bounded by the batch semaphore."""
+        async with semaphore:
+            if self.async_session_factory is None:
+                return await run_db(self._compute_sync, queries)
+            # run_sync runs on the event loop thread: day partials are
+            # read and written around it with the asyncio client
+            prefetched = await PrefetchedPartials.fetch(queries)
+            async with self.async_session_factory() as session:
+                computed = await session.run_sync(
+                    compute_queries, queries, prefetched
+                )
+            await prefetched.store()
+            return computed
+
+    def _cache_entry(self, key: str, value: Any, query: Tuple) -> tuple:
+        """Cache entry of a computed query, for aset_cache_many."""
+        method_name, kwargs = query
+        method = getattr(AnalyticsService, method_name)
+        entry, hard_ttl = make_entry(
+            value, method.cache_ttl_for(None, **kwargs)
+        )
+        return key, entry, hard_ttl, method.cache_tags(None, **kwargs)
+
+    async def _compute_once(
+        self,
+        semaphore: asyncio.Semaphore,
+        queries: Dict[str, Tuple[str, Dict[str, Any]]],
+    ) -> Dict[str, Tuple[Any, bool]]:
+        """
+        Compute and cache a query group with single-flight semantics.
+
+        Same as compute_once, for a group and without blocking: concurrent
+        batches planning the same group share one computation, and a Redis
+        lock per key lets one worker compute while the others wait for
+        its values (up to CACHE_LOCK_WAIT_SECONDS, then compute anyway).
+
+        Returns:
+            Cache key -> (value, cached)
+        """
+        async def fill():
+            tokens: Dict[str, Optional[str]] = {}
+            values: Dict[str, Tuple[Any, bool]] = {}
+            try:
+                waiting = []
+                for key in queries:
+                    acquired, token = await aacquire_lock(
+                        key, settings.CACHE_LOCK_TTL_SECONDS
+                    )
+                    if acquired:
+                        tokens[key] = token
+                    else:
+                        waiting.append(key)
+
+                # Filled while we were taking the locks
+                locked = [key for key, token in tokens.items() if token]
+                for key, cached in zip(locked, await aget_cache_many(locked)):
+                    if cached is not None:
+                        values[key] = read_entry(cached)[0], True
+                if waiting:
+                    filled = await await_cache_many(
+                        waiting, settings.CACHE_LOCK_WAIT_SECONDS
+                    )
+                    for key in waiting:
+                        if key in filled:
+                            values[key] = filled[key], True
+                        else:
+                            logger.warning(
+                                "Cache lock wait timed out: %s", key
+                            )
+
+                missing = {
+                    key: query
+                    for key, query in queries.items()
+                    if key not in values
+                }
+                if missing:
+                    computed = await self._compute(semaphore, missing)
+                    await aset_cache_many(
+                        [
+                            self._cache_entry(key, value, missing[key])
+                            for key, value in computed.items()
+                        ]
+                    )
+                    for key, value in computed.items():
+                        values[key] = value, False
+                return values
+            finally:
+                for key, token in tokens.items():
+                    await arelease_lock(key, token)
+
+        return await async_single_flight.do(
+            "batch:" + "|".join(sorted(queries)), fill
+        )
+
+    async def execute(self, queries: List[Any]) -> List[Dict[str, Any]]:
+        """
+        Execute a batch of analytics queries.
+
+        Args:
+            queries: Items with `metric`, `params` and optional `id`
+
+        Returns:
+            One result per query, in order. Successful items carry `data`
+            and `cached`; failed items carry `error`.
+        """
+        results: List[Dict[str, Any]] = []
+        # Keys carry data versions: read them without blocking the loop
+        await data_versions.arefresh()
+        # Cache key -> (method name, kwargs) for valid, distinct queries
+        pending: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        item_keys: List[Optional[str]] = []
+
+        for query in queries:
+            result = {"id": query.id, "metric": query.metric}
+            results.append(result)
+            try:
+                method_name, kwargs = resolve_query(
+                    query.metric, query.params
+                )
+            except AnalyticsError as e:
+                result.update(self.describe_error(e))
+                item_keys.append(None)
+                continue
+
+            method = getattr(AnalyticsService, method_name)
+            key = method.cache_key(None, **kwargs)
+            pending.setdefault(key, (method_name, kwargs))
+            item_keys.append(key)
+
+        # One round trip for every lookup
+        keys = list(pending)
+        values: Dict[str, Any] = {}
+        outcomes: Dict[str, Dict[str, Any]] = {}
+        for key, cached in zip(keys, await aget_cache_many(keys)):
+            if cached is None:
+                continue
+            values[key], stale = read_entry(cached)
+            outcomes[key] = {"status": "ok", "cached": True}
+            if stale:
+                # Serve the stale value; recompute it in the background
+                # (off the loop: taking the refresh lock is a sync call)
+                method_name, kwargs = pending[key]
+                method = getattr(AnalyticsService, method_name)
+                await asyncio.to_thread(
+                    schedule_refresh,
+                    key,
+                    method.cache_ttl_for(None, **kwargs),
+                    lambda key=key: self._compute_sync(
+                        {key: pending[key]}
+                    )[key],
+                    method.cache_tags(None, **kwargs),
+                )
+
+        # Compute misses concurrently, each group on its own connection;
+        # queries sharing a filter set are answered by one scan
+        groups = plan_queries(
+            {key: pending[key] for key in keys if key not in values}
+        )
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        computed = await asyncio.gather(
+            *(
+                self._compute_once(
+                    semaphore, {key: pending[key] for key in group}
+                )
+                for group in groups
+            ),
+            return_exceptions=True,
+        )
+
+        for group, group_values in zip(groups, computed):
+            if isinstance(group_values, Exception):
+                logger.error(
+                    "Batch query failed: %s", str(group_values),
+                    extra={"extra_data": {"cache_keys": group}},
+                )
+                for key in group:
+                    outcomes[key] = self.describe_error(group_values)
+                continue
+            for key, (value, cached) in group_values.items():
+                values[key] = value
+                outcomes[key] = {"status": "ok", "cached": cached}
+
+        for result, key in zip(results, item_keys):
+            if key is None:
+                continue
+            result.update(outcomes[key])
+            if key in values:
+                result["data"] = values[key]
+
+        return results
+
+    @staticmethod
+    def describe_error(exc: Exception) -> Dict[str, Any]:
+        """Describe a failed query."""
+        if isinstance(exc, AnalyticsError):
+            return {
+                "status": "error",
+                "error": {
+                    "type": type(exc).__name__,
+                    "message": exc.message,
+                    "status_code": exc.status_code,
+                    "details": exc.details,
+                },
+            }
+        return {
+            "status": "error",
+            "error": {
+                "type": type(exc).__name__,
+                "message": "Erro ao calcular métrica",
+                "status_code": 500,
+            },
+        }
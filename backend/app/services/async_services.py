@@ -0,0 +1,258 @@
+"""
+Async variants of the database services.
+
+The async services run the existing service code on an AsyncSession via
+`AsyncSession.run_sync`: queries go through the async driver (asyncpg), so a
+single worker can keep many queries in flight without a thread per request,
+while the aggregation logic stays in one place.
+
+Methods cached with cache_result are looked up and stored here, through
+the asyncio Redis client, and concurrent misses of a key are merged with
+an asyncio single-flight. Only the uncached computation runs inside
+run_sync: the sync cache path (blocking Redis calls, lock polling,
+threads waiting on each other) must not run on the event loop thread.
+The day partials that computation composes from are read before run_sync
+and written after it, also through the asyncio client (see
+app.services.day_partials.PrefetchedPartials).
+"""
+
+import asyncio
+import copy
+import inspect
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Type
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import session_scope
+from app.services.analytics import AnalyticsService
+from app.services.cache import (
+    aget_cache_many,
+    aset_cache_many,
+    bind_cache_params,
+    data_versions,
+    make_entry,
+    read_entry,
+    schedule_refresh,
+)
+from app.services.dashboard import DashboardService
+from app.services.day_partials import PrefetchedPartials
+from app.services.query_planner import SHARED_SCAN_METHODS
+from app.services.sales import SalesService
+
+
+class AsyncSingleFlight:
+    """Merges concurrent coroutine calls for the same key."""
+
+    def __init__(self):
+        """Initialize an empty in-flight call map."""
+        # (event loop, key) -> future of the leader's result
+        self._calls: Dict[Tuple[Any, str], asyncio.Future] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await fn once for all concurrent callers of a key.
+
+        The first caller awaits fn; callers arriving meanwhile await its
+        result (or exception) without blocking the event loop.
+
+        Args:
+            key: Call key
+            fn: Coroutine function computing the value
+
+        Returns:
+            Value computed by fn (a copy for waiting callers)
+        """
+        loop = asyncio.get_running_loop()
+        call_key = (loop, key)
+        future = self._calls.get(call_key)
+        if future is not None:
+            return copy.deepcopy(await asyncio.shield(future))
+
+        future = loop.create_future()
+        self._calls[call_key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Retrieved here, so no warning when nobody was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._calls.pop(call_key, None)
+
+    def in_flight(self) -> int:
+        """Number of keys being computed."""
+        return len(self._calls)
+
+
+async_single_flight = AsyncSingleFlight()
+
+
+class AsyncServiceAdapter:
+    """
+    Awaitable facade over a synchronous service class.
+
+    Every public method of `service_class` is exposed as a coroutine
+    function taking the same arguments.
+    """
+
+    service_class: Type = None
+
+    def __init__(self, db: AsyncSession):
+        """
+        Initialize async service.
+
+        Args:
+            db: Async database session
+        """
+        self.db = db
+
+    async def call(self, method: str, *args, **kwargs) -> Any:
+        """
+        Run a service method on the async session.
+
+        Results of cache_result methods are served from the cache when
+        present; misses are computed once per key across concurrent calls.
+
+        Args:
+            method: Name of the service method
+            *args: Positional arguments for the method
+            **kwargs: Keyword arguments for the method
+
+        Returns:
+            The method's return value
+        """
+        function = getattr(self.service_class, method)
+        if not hasattr(function, "cache_key"):
+            return await self._run(function, args, kwargs)
+
+        # Keys carry data versions: read them without blocking the loop
+        await data_versions.arefresh()
+        try:
+            key = function.cache_key(None, *args, **kwargs)
+        except TypeError:
+            # Invalid call: let the method raise its own error
+            return await self._run(function, args, kwargs)
+
+        cached = (await aget_cache_many([key]))[0]
+        if cached is not None:
+            value, stale = read_entry(cached)
+            if stale:
+                await self._schedule_refresh(function, key, args, kwargs)
+            return value
+
+        async def compute():
+            prefetched = await self._prefetch_partials(method, args, kwargs)
+            value = await self._run(
+                function.__wrapped__, args, kwargs, prefetched
+            )
+            if prefetched is not None:
+                await prefetched.store()
+            entry, hard_ttl = make_entry(
+                value, function.cache_ttl_for(None, *args, **kwargs)
+            )
+            await aset_cache_many(
+                [
+                    (
+                        key,
+                        entry,
+                        hard_ttl,
+                        function.cache_tags(None, *args, **kwargs),
+                    )
+                ]
+            )
+            return value
+
+        return await async_single_flight.do(key, compute)
+
+    async def _prefetch_partials(
+        self, method: str, args: tuple, kwargs: Dict
+    ) -> Optional[PrefetchedPartials]:
+        """Read the day partials an analytics method composes from."""
+        if (
+            not issubclass(self.service_class, AnalyticsService)
+            or method not in SHARED_SCAN_METHODS
+        ):
+            return None
+        function = getattr(self.service_class, method).__wrapped__
+        params = bind_cache_params(
+            inspect.signature(function), (None, *args), kwargs
+        )
+        return await PrefetchedPartials.fetch({method: (method, params)})
+
+    async def _run(
+        self,
+        function: Callable[..., Any],
+        args: tuple,
+        kwargs: Dict,
+        prefetched: Optional[PrefetchedPartials] = None,
+    ) -> Any:
+        """Call an (unbound) service function on the async session."""
+
+        def run(session):
+            service = self.service_class(session)
+            if prefetched is not None:
+                service.prefetched_partials = prefetched
+            return function(service, *args, **kwargs)
+
+        return await self.db.run_sync(run)
+
+    async def _schedule_refresh(
+        self,
+        function: Callable[..., Any],
+        key: str,
+        args: tuple,
+        kwargs: Dict,
+    ) -> None:
+        """Recompute a stale result in the background, on its own session."""
+        service_class = self.service_class
+
+        def refresh():
+            with session_scope() as db:
+                return function.__wrapped__(service_class(db), *args, **kwargs)
+
+        # Off the loop: taking the refresh lock is a sync Redis call
+        await asyncio.to_thread(
+            schedule_refresh,
+            key,
+            function.cache_ttl_for(None, *args, **kwargs),
+            refresh,
+            function.cache_tags(None, *args, **kwargs),
+        )
+
+    def __getattr__(self, name: str) -> Callable:
+        """Expose public service methods as coroutine functions."""
+        if name.startswith("_") or not callable(
+            getattr(self.service_class, name, None)
+        ):
+            raise AttributeError(name)
+
+        async def method(*args, **kwargs):
+            return await self.call(name, *args, **kwargs)
+
+        method.__name__ = name
+        return method
+
+
+class AsyncAnalyticsService(AsyncServiceAdapter):
+    """Async analytics service."""
+
+    service_class = AnalyticsService
+
+
+class AsyncSalesService(AsyncServiceAdapter):
+    """Async sales service."""
+
+    service_class = SalesService
+
+
+class AsyncDashboardService(AsyncServiceAdapter):
+    """Async dashboard service."""
+
+    service_class = DashboardService
@@ -1,32 +1,238 @@
 """
 Redis cache utilities.
+
+Reads go through two tiers: a bounded per-worker LRU (L1) in front of
+Redis (L2). Values are stored encoded by app.services.cache_codec
+(compact serializer, compression for large payloads). Invalidations are
+broadcast over Redis pub/sub so every worker drops its L1 copies; L1
+entries also expire after CACHE_L1_TTL_SECONDS in case a message is
+missed.
+
+Results whose date range reaches recent days are keyed by the data
+version of their store, bumped when the rollup refresh sees new sales, so
+they refresh as soon as data arrives while historical results stay cached.
+
+Cached results are registered under tags (Redis sets such as
+'store:3' or 'day:2024-01-31'), so invalidate_tags deletes exactly the
+affected keys without scanning the keyspace.
+
+Redis connections are managed by app.services.redis_manager: while its
+circuit breaker is open `redis_client` is falsy, so reads miss, writes
+are skipped and callers fall back to the database without waiting on
+sockets. Coroutines use the a* helpers (aget_cache_many, ...), which talk
+to Redis through the asyncio client instead of blocking the event loop.
 """
 
+import asyncio
+import copy
+import fnmatch
+import hashlib
+import inspect
 import json
 import logging
-from typing import Any, Optional
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from enum import Enum
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 from functools import wraps
 
-import redis
 from app.config import settings
+from app.core.executor import refresh_executor
+from app.services.cache_codec import decode, encode
+from app.services.redis_manager import redis_manager
 
 logger = logging.getLogger(__name__)
 
-# Initialize Redis client
-try:
-    redis_client = redis.from_url(
-        settings.REDIS_URL,
-        decode_responses=True,
-        socket_connect_timeout=5,
-        socket_keepalive=True,
-    )
+# Managed Redis client: pooled, circuit-broken and reconnected in the
+# background (see app.services.redis_manager); falsy while Redis is down
+redis_client = redis_manager.connect()
+
+# Pub/sub channel carrying L1 invalidations between workers
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+# Tag dimensions; entries not filtered on one are tagged '{dimension}:any'
+TAG_DIMENSIONS = ("store", "channel", "day")
+ANY = "any"
+
+# Keys per UNLINK and per SCAN step
+UNLINK_BATCH_SIZE = 500
+SCAN_COUNT = 1000
+
+
+class TierStats:
+    """Thread-safe hit/miss counters of a cache tier."""
+
+    def __init__(self):
+        """Initialize counters."""
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hits: int = 0, misses: int = 0) -> None:
+        """Add hits and misses."""
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def stats(self) -> Dict[str, Any]:
+        """Hits, misses and hit ratio."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+class LocalCache:
+    """
+    Bounded in-process LRU of serialized cache values (L1).
+
+    Values are kept encoded, exactly as stored in Redis, so callers always
+    get a fresh copy and sizes are known. The cache is bounded by entry
+    count and by total bytes; least recently used entries are evicted.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        """
+        Initialize local cache.
+
+        Args:
+            max_entries: Maximum number of entries
+            max_bytes: Maximum total size of keys and values
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # key -> (serialized value, expires at, size)
+        self._data: "OrderedDict[str, Tuple[Any, float, int]]" = (
+            OrderedDict()
+        )
+        self._bytes = 0
+        self._evictions = 0
+        self.tier = TierStats()
+
+    def get(self, key: str) -> Optional[Union[bytes, str]]:
+        """Get a serialized value, or None if missing or expired."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[1] <= time.monotonic():
+                self._remove(key)
+                item = None
+            if item is None:
+                self.tier.record(misses=1)
+                return None
+            self._data.move_to_end(key)
+            self.tier.record(hits=1)
+            return item[0]
+
+    def set(
+        self, key: str, serialized: Union[bytes, str], ttl: float
+    ) -> None:
+        """Store a serialized value for at most ttl seconds."""
+        size = len(key) + len(serialized)
+        with self._lock:
+            self._remove(key)
+            if size > self.max_bytes or ttl <= 0:
+                return
+            self._data[key] = (serialized, time.monotonic() + ttl, size)
+            self._bytes += size
+            while (
+                len(self._data) > self.max_entries
+                or self._bytes > self.max_bytes
+            ):
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self._evictions += 1
+
+    def delete(self, key: str) -> None:
+        """Drop a key."""
+        with self._lock:
+            self._remove(key)
+
+    def delete_matching(self, pattern: str) -> int:
+        """Drop keys matching a Redis-style glob pattern."""
+        with self._lock:
+            keys = [
+                key for key in self._data
+                if fnmatch.fnmatchcase(key, pattern)
+            ]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self) -> None:
+        """Drop every key."""
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def _remove(self, key: str) -> None:
+        """Drop a key; the lock must be held."""
+        item = self._data.pop(key, None)
+        if item is not None:
+            self._bytes -= item[2]
+
+    def stats(self) -> Dict[str, Any]:
+        """Size, bounds, evictions and hit ratio."""
+        with self._lock:
+            stats = {
+                "enabled": settings.CACHE_L1_ENABLED,
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "evictions": self._evictions,
+            }
+        stats.update(self.tier.stats())
+        return stats
+
+
+local_cache = LocalCache(
+    max_entries=settings.CACHE_L1_MAX_ENTRIES,
+    max_bytes=settings.CACHE_L1_MAX_BYTES,
+)
+redis_stats = TierStats()
+
+
+def _local_get(key: str) -> Optional[Union[bytes, str]]:
+    """Read from L1 if enabled."""
+    if not settings.CACHE_L1_ENABLED:
+        return None
+    return local_cache.get(key)
 
-    # Test connection
-    redis_client.ping()
-    logger.info(f"Redis connected: {settings.REDIS_URL}")
-except (redis.exceptions.ConnectionError, redis.exceptions.TimeoutError) as e:
-    logger.warning(f"Redis not available: {e}")
-    redis_client = None
+
+def _local_set(key: str, serialized: Union[bytes, str], ttl: int) -> None:
+    """Write to L1 if enabled, for at most CACHE_L1_TTL_SECONDS."""
+    if settings.CACHE_L1_ENABLED:
+        local_cache.set(
+            key, serialized, min(ttl, settings.CACHE_L1_TTL_SECONDS)
+        )
+
+
+def cache_stats() -> Dict[str, Any]:
+    """
+    Hit statistics of both cache tiers.
+
+    Returns:
+        Dict with 'l1' (local LRU) and 'l2' (Redis) stats
+    """
+    return {"l1": local_cache.stats(), "l2": redis_stats.stats()}
 
 
 def cache_key(*args, **kwargs) -> str:
@@ -69,18 +275,83 @@ def get_cache(key: str) -> Optional[Any]:
         return None
 
     try:
-        cached = redis_client.get(key)
-        if cached:
-            logger.debug(f"Cache HIT: {key}")
-            return json.loads(cached)
-        logger.debug(f"Cache MISS: {key}")
-        return None
+        cached = _local_get(key)
+        if cached is None:
+            cached = redis_client.get(key)
+            if not cached:
+                redis_stats.record(misses=1)
+                logger.debug(f"Cache MISS: {key}")
+                return None
+            redis_stats.record(hits=1)
+            _local_set(key, cached, settings.CACHE_L1_TTL_SECONDS)
+        logger.debug(f"Cache HIT: {key}")
+        return decode(cached)
     except Exception as e:
         logger.error(f"Cache get error: {e}")
         return None
 
 
-def set_cache(key: str, value: Any, ttl: int = 300) -> bool:
+def get_cache_many(keys: List[str]) -> List[Optional[Any]]:
+    """
+    Get several values from cache in one round trip (MGET).
+
+    Args:
+        keys: Cache keys
+
+    Returns:
+        Cached values (None for misses), in the same order as keys
+    """
+    if not redis_client or not keys:
+        return [None] * len(keys)
+
+    try:
+        cached = [_local_get(key) for key in keys]
+        remote = [key for key, value in zip(keys, cached) if value is None]
+        if remote:
+            fetched = dict(zip(remote, redis_client.mget(remote)))
+            hits = sum(1 for value in fetched.values() if value)
+            redis_stats.record(hits=hits, misses=len(remote) - hits)
+            for key, value in fetched.items():
+                if value:
+                    _local_set(key, value, settings.CACHE_L1_TTL_SECONDS)
+            cached = [
+                value if value is not None else fetched[key]
+                for key, value in zip(keys, cached)
+            ]
+        logger.debug(
+            f"Cache MGET: {sum(1 for c in cached if c)}/{len(keys)} hits"
+        )
+        return [decode(c) if c else None for c in cached]
+    except Exception as e:
+        logger.error(f"Cache mget error: {e}")
+        return [None] * len(keys)
+
+
+def tag_key(tag: str) -> str:
+    """Redis set holding the keys registered under a tag."""
+    return f"v{settings.CACHE_SCHEMA_VERSION}:tag:{tag}"
+
+
+def _register_tags(pipe, key: str, tags: Iterable[str], ttl: int) -> None:
+    """
+    Queue the registration of a key under tags.
+
+    Tag sets expire with their longest-lived member: the TTL is set when
+    missing and only ever extended.
+    """
+    for tag in tags:
+        name = tag_key(tag)
+        pipe.sadd(name, key)
+        pipe.expire(name, ttl, nx=True)
+        pipe.expire(name, ttl, gt=True)
+
+
+def set_cache(
+    key: str,
+    value: Any,
+    ttl: int = 300,
+    tags: Optional[Iterable[str]] = None,
+) -> bool:
     """
     Set value in cache.
 
@@ -88,6 +359,7 @@ def set_cache(key: str, value: Any, ttl: int = 300) -> bool:
         key: Cache key
         value: Value to cache
         ttl: Time to live in seconds (default: 5 minutes)
+        tags: Tags to register the key under (see invalidate_tags)
 
     Returns:
         True if successful, False otherwise
@@ -96,8 +368,13 @@ def set_cache(key: str, value: Any, ttl: int = 300) -> bool:
         return False
 
     try:
-        serialized = json.dumps(value)
+        serialized = encode(value)
         redis_client.setex(key, ttl, serialized)
+        if tags:
+            pipe = redis_client.pipeline(transaction=False)
+            _register_tags(pipe, key, tags, ttl)
+            pipe.execute()
+        _local_set(key, serialized, ttl)
         logger.debug(f"Cache SET: {key} (TTL: {ttl}s)")
         return True
     except Exception as e:
@@ -105,12 +382,177 @@ def set_cache(key: str, value: Any, ttl: int = 300) -> bool:
         return False
 
 
-def invalidate_cache(pattern: str) -> int:
+def set_cache_many(entries: List[tuple]) -> bool:
     """
-    Invalidate cache keys matching pattern.
+    Set several values in cache in one round trip (pipeline).
+
+    Args:
+        entries: (key, value, ttl) or (key, value, ttl, tags) tuples
+
+    Returns:
+        True if successful, False otherwise
+    """
+    if not redis_client or not entries:
+        return False
+
+    try:
+        pipe = redis_client.pipeline(transaction=False)
+        written = []
+        for key, value, ttl, *tags in entries:
+            try:
+                serialized = encode(value)
+            except (TypeError, ValueError) as e:
+                logger.error(f"Cache set error for {key}: {e}")
+                continue
+            pipe.setex(key, ttl, serialized)
+            if tags and tags[0]:
+                _register_tags(pipe, key, tags[0], ttl)
+            written.append((key, serialized, ttl))
+        pipe.execute()
+        for key, serialized, ttl in written:
+            _local_set(key, serialized, ttl)
+        logger.debug(f"Cache SET: {len(entries)} keys (pipeline)")
+        return True
+    except Exception as e:
+        logger.error(f"Cache set error: {e}")
+        return False
+
+
+def async_redis_client():
+    """
+    asyncio Redis client of the running event loop.
+
+    Returns:
+        Managed asyncio client, or None while Redis is unavailable
+    """
+    if not redis_client:
+        return None
+    return redis_manager.async_client()
+
+
+async def aget_cache_many(keys: List[str]) -> List[Optional[Any]]:
+    """
+    Get several values from cache in one round trip, without blocking.
+
+    Same as get_cache_many, through the asyncio client.
+
+    Args:
+        keys: Cache keys
+
+    Returns:
+        Cached values (None for misses), in the same order as keys
+    """
+    client = async_redis_client()
+    if not client or not keys:
+        return [None] * len(keys)
+
+    try:
+        cached = [_local_get(key) for key in keys]
+        remote = [key for key, value in zip(keys, cached) if value is None]
+        if remote:
+            fetched = dict(zip(remote, await client.mget(remote)))
+            hits = sum(1 for value in fetched.values() if value)
+            redis_stats.record(hits=hits, misses=len(remote) - hits)
+            for key, value in fetched.items():
+                if value:
+                    _local_set(key, value, settings.CACHE_L1_TTL_SECONDS)
+            cached = [
+                value if value is not None else fetched[key]
+                for key, value in zip(keys, cached)
+            ]
+        return [decode(c) if c else None for c in cached]
+    except Exception as e:
+        logger.error(f"Cache mget error: {e}")
+        return [None] * len(keys)
+
+
+async def aset_cache_many(entries: List[tuple]) -> bool:
+    """
+    Set several values in cache in one round trip, without blocking.
+
+    Same as set_cache_many, through the asyncio client.
+
+    Args:
+        entries: (key, value, ttl) or (key, value, ttl, tags) tuples
+
+    Returns:
+        True if successful, False otherwise
+    """
+    client = async_redis_client()
+    if not client or not entries:
+        return False
+
+    try:
+        pipe = client.pipeline(transaction=False)
+        written = []
+        for key, value, ttl, *tags in entries:
+            try:
+                serialized = encode(value)
+            except (TypeError, ValueError) as e:
+                logger.error(f"Cache set error for {key}: {e}")
+                continue
+            pipe.setex(key, ttl, serialized)
+            if tags and tags[0]:
+                _register_tags(pipe, key, tags[0], ttl)
+            written.append((key, serialized, ttl))
+        await pipe.execute()
+        for key, serialized, ttl in written:
+            _local_set(key, serialized, ttl)
+        return True
+    except Exception as e:
+        logger.error(f"Cache set error: {e}")
+        return False
+
+
+def _unlink(keys: List[str]) -> int:
+    """Delete keys without blocking Redis (pipelined UNLINK batches)."""
+    if not keys:
+        return 0
+    pipe = redis_client.pipeline(transaction=False)
+    for start in range(0, len(keys), UNLINK_BATCH_SIZE):
+        pipe.unlink(*keys[start:start + UNLINK_BATCH_SIZE])
+    return sum(pipe.execute())
+
+
+def _decode_key(key: Union[bytes, str]) -> str:
+    """Key returned by Redis as text."""
+    return key.decode() if isinstance(key, bytes) else key
+
+
+def expand_tags(tags: Iterable[str]) -> List[str]:
+    """
+    Add the '{dimension}:any' tag to store, channel and day tags.
+
+    Entries not filtered on a dimension cover every value of it, so
+    invalidating 'store:3' must also drop entries tagged 'store:any'.
+
+    Args:
+        tags: Tags to invalidate
+
+    Returns:
+        Tags including the matching 'any' tags, without duplicates
+    """
+    expanded: Dict[str, None] = {}
+    for tag in tags:
+        expanded[tag] = None
+        dimension = tag.split(":", 1)[0]
+        if dimension in TAG_DIMENSIONS:
+            expanded[f"{dimension}:{ANY}"] = None
+    return list(expanded)
+
+
+def invalidate_tags(tags: Iterable[str], include_any: bool = True) -> int:
+    """
+    Invalidate every cache key registered under any of the tags.
+
+    Costs O(members): the tag sets are read in one pipeline and their keys
+    (and the sets themselves) deleted with pipelined UNLINK.
 
     Args:
-        pattern: Redis key pattern (e.g., 'revenue_*')
+        tags: Tags such as 'store:3', 'channel:1', 'metric:revenue' or
+            'day:2024-01-31'
+        include_any: Also invalidate '{dimension}:any' entries
+            (see expand_tags)
 
     Returns:
         Number of keys deleted
@@ -118,66 +560,1116 @@ def invalidate_cache(pattern: str) -> int:
     if not redis_client:
         return 0
 
+    tags = expand_tags(tags) if include_any else list(tags)
+    keys: List[str] = []
     try:
-        keys = redis_client.keys(pattern)
+        pipe = redis_client.pipeline(transaction=False)
+        for tag in tags:
+            pipe.smembers(tag_key(tag))
+        members = set()
+        for tag_members in pipe.execute():
+            members.update(_decode_key(key) for key in tag_members or ())
+        keys = sorted(members)
+        deleted = _unlink(keys)
+        _unlink([tag_key(tag) for tag in tags])
+        bump_invalidation_generation()
+        logger.debug(f"Cache INVALIDATE tags {tags}: {deleted} keys")
+        return deleted
+    except Exception as e:
+        logger.error(f"Cache tag invalidate error: {e}")
+        return 0
+    finally:
         if keys:
-            deleted = redis_client.delete(*keys)
-            logger.debug(f"Cache INVALIDATE: {pattern} ({deleted} keys)")
-            return deleted
+            for key in keys:
+                local_cache.delete(key)
+            publish_invalidation(keys=keys)
+
+
+def invalidate_cache(pattern: str) -> int:
+    """
+    Invalidate cache keys matching pattern.
+
+    Walks the keyspace with SCAN instead of KEYS so Redis is never blocked;
+    prefer invalidate_tags, which only touches the matching keys.
+
+    Args:
+        pattern: Redis key pattern (e.g., 'v1:revenue:*', see
+            result_key_pattern)
+
+    Returns:
+        Number of keys deleted
+    """
+    if not redis_client:
         return 0
+
+    try:
+        deleted = 0
+        batch: List[str] = []
+        for key in redis_client.scan_iter(match=pattern, count=SCAN_COUNT):
+            batch.append(key)
+            if len(batch) >= UNLINK_BATCH_SIZE:
+                deleted += _unlink(batch)
+                batch = []
+        deleted += _unlink(batch)
+        bump_invalidation_generation()
+        logger.debug(f"Cache INVALIDATE: {pattern} ({deleted} keys)")
+        return deleted
     except Exception as e:
         logger.error(f"Cache invalidate error: {e}")
         return 0
+    finally:
+        # After Redis, so no worker re-reads the old values into L1
+        local_cache.delete_matching(pattern)
+        publish_invalidation(pattern)
 
 
-def cache_result(prefix: str, ttl: int = 300):
+def publish_invalidation(
+    pattern: Optional[str] = None, keys: Optional[List[str]] = None
+) -> bool:
     """
-    Decorator to cache function results.
+    Tell every worker to drop L1 keys.
+
+    Args:
+        pattern: Key pattern; None (without keys) drops every key
+        keys: Exact keys to drop
+
+    Returns:
+        True if the message was published
+    """
+    if not redis_client:
+        return False
+
+    message = {"keys": keys} if keys is not None else {"pattern": pattern}
+    try:
+        redis_client.publish(INVALIDATION_CHANNEL, json.dumps(message))
+        return True
+    except Exception as e:
+        logger.error(f"Cache invalidation publish error: {e}")
+        return False
+
+
+def apply_invalidation(data: str) -> None:
+    """
+    Apply an invalidation message to the local cache.
+
+    Args:
+        data: Message published by publish_invalidation
+    """
+    try:
+        message = json.loads(data)
+        keys, pattern = message.get("keys"), message.get("pattern")
+    except (TypeError, ValueError, AttributeError):
+        logger.error(f"Invalid cache invalidation message: {data!r}")
+        return
+    # The invalidation generation moved (see bump_invalidation_generation)
+    data_versions.clear()
+    if keys is not None:
+        for key in keys:
+            local_cache.delete(key)
+    elif pattern is None:
+        local_cache.clear()
+    else:
+        local_cache.delete_matching(pattern)
+
+
+class InvalidationListener:
+    """Background thread applying invalidations published by workers."""
+
+    def __init__(self):
+        """Initialize a stopped listener."""
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> bool:
+        """
+        Start listening if Redis is configured and the local cache is on.
+
+        The listener waits out Redis outages (including one at boot) and
+        resubscribes once the connection is back.
+
+        Returns:
+            True if the listener is running
+        """
+        if redis_client is None or not settings.CACHE_L1_ENABLED:
+            return False
+        if self._thread is not None and self._thread.is_alive():
+            return True
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="cache-invalidation", daemon=True
+        )
+        self._thread.start()
+        return True
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Stop listening."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        """Receive messages until stopped, resubscribing on errors."""
+        while not self._stop.is_set():
+            if not redis_client:
+                # Circuit open: nothing is cached meanwhile, so there is
+                # nothing to invalidate either
+                self._stop.wait(1.0)
+                continue
+            pubsub = None
+            try:
+                pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(INVALIDATION_CHANNEL)
+                while not self._stop.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message.get("type") == "message":
+                        apply_invalidation(message["data"])
+            except Exception as e:
+                # Messages may have been missed while disconnected
+                logger.error(f"Cache invalidation listener error: {e}")
+                local_cache.clear()
+                self._stop.wait(1.0)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+
+invalidation_listener = InvalidationListener()
+
+
+def normalize_key_value(value: Any) -> Any:
+    """
+    Normalize an argument into a canonical, JSON-serializable form.
+
+    Equal arguments always produce the same value regardless of how they
+    were passed: aware datetimes are converted to UTC, dates and datetimes
+    become ISO strings, enums their values and containers are normalized
+    recursively (sets sorted, dict keys sorted on dump).
+
+    Args:
+        value: Argument value
+
+    Returns:
+        Normalized value
+    """
+    if isinstance(value, Enum):
+        return normalize_key_value(value.value)
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value.normalize())
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, dict):
+        return {str(k): normalize_key_value(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize_key_value(v) for v in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted(normalize_key_value(v) for v in value)
+    if value is None or isinstance(value, (str, int, bool)):
+        return value
+    return str(value)
+
+
+def result_key_pattern(prefix: str) -> str:
+    """
+    Redis pattern matching every cached result of a prefix.
 
     Args:
         prefix: Cache key prefix
-        ttl: Time to live in seconds
 
     Returns:
-        Decorated function
+        Key pattern for the current schema version
     """
-    def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            # Generate cache key
-            key_args = [prefix]
+    return f"v{settings.CACHE_SCHEMA_VERSION}:{prefix}:*"
 
-            # Add function arguments to key
-            for arg in args[1:]:  # Skip self
-                if arg is not None:
-                    key_args.append(str(arg))
 
-            for k, v in kwargs.items():
-                if v is not None:
-                    key_args.append(f"{k}_{v}")
+# Hash field holding the version of every store's data combined
+ALL_STORES = "all"
 
-            cache_key_str = "_".join(key_args)
+# Canonical parameter carrying the data version in result keys
+DATA_VERSION_PARAM = "@data_version"
 
-            # Try to get from cache
-            cached = get_cache(cache_key_str)
-            if cached is not None:
-                return cached
 
-            # Call function
-            result = func(*args, **kwargs)
+def data_versions_key() -> str:
+    """Redis hash of data versions (store id -> version)."""
+    return f"v{settings.CACHE_SCHEMA_VERSION}:data_versions"
 
-            # Cache result
-            set_cache(cache_key_str, result, ttl)
 
-            return result
+class DataVersions:
+    """
+    Per-worker view of the per-store data versions.
 
-        return wrapper
-    return decorator
+    The Redis hash is read at most once every CACHE_DATA_VERSION_POLL_SECONDS,
+    so building a key does not cost a round trip. Coroutines await
+    arefresh before building keys; a read due on the event loop thread
+    (e.g. inside AsyncSession.run_sync) is never made with the sync
+    client: it is scheduled on the asyncio client and the versions read
+    so far are used meanwhile.
+    """
 
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions: Dict[str, str] = {}
+        self._read_at = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
 
-def clear_all_cache() -> bool:
+    def _due(self) -> bool:
+        """Whether the hash should be read again."""
+        return (
+            time.monotonic() - self._read_at
+            >= settings.CACHE_DATA_VERSION_POLL_SECONDS
+        )
+
+    def _store(self, raw: Dict) -> None:
+        """Keep the versions of a hash read (lock held)."""
+        self._versions = {
+            _decode_key(field): _decode_key(value)
+            for field, value in raw.items()
+        }
+
+    def get(self, store_id: Optional[Any] = None) -> Optional[str]:
+        """
+        Get the data version of a store.
+
+        Args:
+            store_id: Store id, or None for every store
+
+        Returns:
+            Version, or None if none was recorded
+        """
+        if not redis_client:
+            return None
+
+        loop = _running_loop()
+        with self._lock:
+            if self._due():
+                if loop is not None:
+                    self._schedule_refresh(loop)
+                else:
+                    try:
+                        raw = redis_client.hgetall(data_versions_key())
+                        self._store(raw or {})
+                    except Exception as e:
+                        logger.error(f"Data version read error: {e}")
+                    self._read_at = time.monotonic()
+            field = ALL_STORES if store_id is None else str(store_id)
+            return self._versions.get(field)
+
+    async def arefresh(self) -> None:
+        """Read the hash through the asyncio client, if a read is due."""
+        if not self._due():
+            return
+        client = async_redis_client()
+        if not client:
+            return
+        try:
+            raw = await client.hgetall(data_versions_key())
+        except Exception as e:
+            logger.error(f"Data version read error: {e}")
+            raw = None
+        with self._lock:
+            if raw is not None:
+                self._store(raw)
+            self._read_at = time.monotonic()
+
+    def _schedule_refresh(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Start one background arefresh on the loop (lock held)."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = loop.create_task(self.arefresh())
+
+    def clear(self) -> None:
+        """Forget the versions read so far."""
+        with self._lock:
+            self._versions = {}
+            self._read_at = 0.0
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    """Event loop running on this thread, if any."""
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+data_versions = DataVersions()
+
+
+def bump_data_versions(latest_sale_ids: Dict[Any, int]) -> bool:
+    """
+    Record new sales for some stores.
+
+    Each store's version becomes '{max sales.id}:{ingest time}', and the
+    'all' version moves with every bump. Keys of recent results for those
+    stores change, so they are recomputed on their next read; other
+    stores keep their cached results.
+
+    Args:
+        latest_sale_ids: Store id -> highest new sales.id
+
+    Returns:
+        True if the versions were written
+    """
+    if not redis_client or not latest_sale_ids:
+        return False
+
+    ingested_at = int(time.time())
+    mapping = {
+        str(store_id): f"{sale_id}:{ingested_at}"
+        for store_id, sale_id in latest_sale_ids.items()
+    }
+    mapping[ALL_STORES] = f"{max(latest_sale_ids.values())}:{ingested_at}"
+    try:
+        redis_client.hset(data_versions_key(), mapping=mapping)
+        logger.info(f"Data versions bumped for {len(latest_sale_ids)} stores")
+        return True
+    except Exception as e:
+        logger.error(f"Data version bump error: {e}")
+        return False
+    finally:
+        data_versions.clear()
+
+
+# Data versions hash field counting invalidations of cached results
+INVALIDATIONS = "invalidations"
+
+
+def invalidation_generation() -> str:
+    """
+    Number of invalidations of cached results so far.
+
+    Validators derived from cache keys (HTTP ETags) include it: a key
+    stays the same after its entry is invalidated, the generation does
+    not.
+
+    Returns:
+        Generation ('0' if none was recorded)
     """
-    Clear all cache.
+    return data_versions.get(INVALIDATIONS) or "0"
+
+
+def bump_invalidation_generation() -> None:
+    """Record an invalidation of cached results (see invalidate_tags)."""
+    if not redis_client:
+        return
+    try:
+        redis_client.hincrby(data_versions_key(), INVALIDATIONS, 1)
+    except Exception as e:
+        logger.error(f"Invalidation generation bump error: {e}")
+    finally:
+        data_versions.clear()
+
+
+def touches_recent_data(end_date: Any) -> bool:
+    """
+    Check whether a range may include data that is still arriving.
+
+    Args:
+        end_date: End of the range (datetime, date, ISO string or None)
+
+    Returns:
+        True unless the range ends more than CACHE_RECENT_DAYS ago
+    """
+    if isinstance(end_date, str):
+        try:
+            end_date = datetime.fromisoformat(end_date)
+        except ValueError:
+            return True
+    if isinstance(end_date, datetime):
+        end_date = end_date.date()
+    if not isinstance(end_date, date):
+        return True
+    cutoff = date.today() - timedelta(days=settings.CACHE_RECENT_DAYS)
+    return end_date >= cutoff
+
+
+def data_version_for(params: Dict[str, Any]) -> Optional[str]:
+    """
+    Data version a result depends on.
+
+    Args:
+        params: Bound call parameters
+
+    Returns:
+        Version of the filtered store (or of all stores) if the range
+        touches recent data, else None: historical results do not change
+    """
+    if not touches_recent_data(params.get("end_date")):
+        return None
+    return data_versions.get(params.get("store_id"))
+
+
+def result_ttl(params: Dict[str, Any], ttl: int) -> int:
+    """
+    TTL of a result, by how settled its range is.
+
+    Args:
+        params: Bound call parameters
+        ttl: TTL of results over open ranges
+
+    Returns:
+        `ttl` if the range touches recent data, else
+        CACHE_CLOSED_RANGE_TTL_SECONDS: closed ranges no longer change
+    """
+    if touches_recent_data(params.get("end_date")):
+        return ttl
+    return max(ttl, settings.CACHE_CLOSED_RANGE_TTL_SECONDS)
+
+
+def bind_cache_params(
+    signature: inspect.Signature, args: tuple, kwargs: Dict
+) -> Dict[str, Any]:
+    """
+    Bind call arguments to a signature, with defaults applied.
+
+    Args:
+        signature: Signature of the cached function
+        args: Positional arguments, including self
+        kwargs: Keyword arguments
+
+    Returns:
+        Parameters by name, without self and None values
+
+    Raises:
+        TypeError: If the arguments do not match the signature
+    """
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+
+    params = dict(bound.arguments)
+    params.pop("self", None)
+    params.pop("cls", None)
+    for name, param in signature.parameters.items():
+        if param.kind == param.VAR_KEYWORD and name in params:
+            params.update(params.pop(name))
+    return {name: value for name, value in params.items() if value is not None}
+
+
+def build_result_cache_key(
+    signature: inspect.Signature, prefix: str, args: tuple, kwargs: Dict
+) -> str:
+    """
+    Build the cache key used by cache_result for a method call.
+
+    Arguments are bound to the function signature with defaults applied,
+    so positional, keyword and omitted-default calls share a key. None
+    arguments are left out and `self` is skipped. Results whose range
+    touches recent data also include the store's data version (see
+    bump_data_versions), so new sales move them to a new key.
+
+    Args:
+        signature: Signature of the cached function
+        prefix: Cache key prefix
+        args: Positional arguments, including self
+        kwargs: Keyword arguments
+
+    Returns:
+        Cache key 'v{schema version}:{prefix}:{digest}'
+
+    Raises:
+        TypeError: If the arguments do not match the signature
+    """
+    params = bind_cache_params(signature, args, kwargs)
+    canonical_params = {
+        name: normalize_key_value(value) for name, value in params.items()
+    }
+    version = data_version_for(params)
+    if version is not None:
+        canonical_params[DATA_VERSION_PARAM] = version
+    canonical = json.dumps(
+        canonical_params,
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    digest = hashlib.sha1(canonical.encode()).hexdigest()[:20]
+    return f"v{settings.CACHE_SCHEMA_VERSION}:{prefix}:{digest}"
+
+
+def _day_tags(start: Any, end: Any) -> List[str]:
+    """Day tags of a date range ('day:any' when open or too long)."""
+    if not isinstance(start, date) or not isinstance(end, date):
+        return [f"day:{ANY}"]
+    first = start.date() if isinstance(start, datetime) else start
+    last = end.date() if isinstance(end, datetime) else end
+    days = (last - first).days
+    if days < 0:
+        return []
+    if days >= settings.CACHE_TAG_MAX_DAYS:
+        return [f"day:{ANY}"]
+    return [
+        f"day:{(first + timedelta(days=offset)).isoformat()}"
+        for offset in range(days + 1)
+    ]
+
+
+def build_result_tags(
+    signature: inspect.Signature, prefix: str, args: tuple, kwargs: Dict
+) -> List[str]:
+    """
+    Build the invalidation tags of a cache_result call.
+
+    Results are tagged 'metric:{prefix}', 'store:{id}', 'channel:{id}' and
+    'day:{yyyy-mm-dd}' for every day of the range. Dimensions the call
+    does not filter on are tagged '{dimension}:any'.
+
+    Args:
+        signature: Signature of the cached function
+        prefix: Cache key prefix
+        args: Positional arguments, including self
+        kwargs: Keyword arguments
+
+    Returns:
+        Tags for the result
+    """
+    params = bind_cache_params(signature, args, kwargs)
+    return [f"metric:{prefix}"] + filter_tags(params)
+
+
+def filter_tags(params: Dict[str, Any]) -> List[str]:
+    """
+    Build the store, channel and day tags of filtered results.
+
+    Args:
+        params: Filters (store_id, channel_id, start_date, end_date)
+
+    Returns:
+        'store:{id}', 'channel:{id}' and 'day:{yyyy-mm-dd}' tags, with
+        '{dimension}:any' for dimensions not filtered on
+    """
+    tags = []
+    for dimension in ("store", "channel"):
+        value = params.get(f"{dimension}_id")
+        tags.append(f"{dimension}:{value if value else ANY}")
+    tags.extend(
+        _day_tags(params.get("start_date"), params.get("end_date"))
+    )
+    return tags
+
+
+# Marks a cache_result entry carrying its soft expiry
+ENTRY_MARKER = "__cache_entry__"
+
+
+def make_entry(value: Any, ttl: int) -> Tuple[Dict[str, Any], int]:
+    """
+    Wrap a value in a stale-while-revalidate cache entry.
+
+    Args:
+        value: Value to cache
+        ttl: Seconds the value is fresh (soft expiry)
+
+    Returns:
+        Tuple of (entry, Redis TTL). The Redis TTL is the hard expiry:
+        the soft one plus CACHE_STALE_SECONDS.
+    """
+    entry = {
+        ENTRY_MARKER: 1,
+        "value": value,
+        "fresh_until": time.time() + ttl,
+    }
+    return entry, ttl + settings.CACHE_STALE_SECONDS
+
+
+def read_entry(cached: Any) -> Tuple[Any, bool]:
+    """
+    Unwrap a cached entry.
+
+    Values cached without an entry (older releases, plain set_cache) are
+    treated as fresh.
+
+    Args:
+        cached: Value read from the cache
+
+    Returns:
+        Tuple of (value, stale)
+    """
+    if isinstance(cached, dict) and ENTRY_MARKER in cached:
+        return cached["value"], time.time() >= cached["fresh_until"]
+    return cached, False
+
+
+def get_entry(key: str) -> Tuple[Optional[Any], bool]:
+    """
+    Get a stale-while-revalidate entry from cache.
+
+    Args:
+        key: Cache key
+
+    Returns:
+        Tuple of (value or None, stale)
+    """
+    cached = get_cache(key)
+    if cached is None:
+        return None, False
+    return read_entry(cached)
+
+
+def set_entry(
+    key: str,
+    value: Any,
+    ttl: int,
+    tags: Optional[Iterable[str]] = None,
+) -> bool:
+    """
+    Set a stale-while-revalidate entry in cache.
+
+    Args:
+        key: Cache key
+        value: Value to cache
+        ttl: Seconds the value is fresh
+        tags: Tags to register the key under
+
+    Returns:
+        True if successful, False otherwise
+    """
+    entry, hard_ttl = make_entry(value, ttl)
+    return set_cache(key, entry, hard_ttl, tags)
+
+
+# Deletes the lock only if it still holds our token
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def lock_key(key: str) -> str:
+    """Name of the recompute lock guarding a cache key."""
+    return f"lock:{key}"
+
+
+def acquire_lock(key: str, ttl: int) -> Tuple[bool, Optional[str]]:
+    """
+    Try to take the recompute lock of a cache key (SET NX with expiry).
+
+    Args:
+        key: Cache key
+        ttl: Lock lease in seconds (released early by release_lock)
+
+    Returns:
+        Tuple of (acquired, token). Without Redis every caller acquires,
+        with no token.
+    """
+    if not redis_client:
+        return True, None
+
+    token = uuid.uuid4().hex
+    try:
+        if redis_client.set(lock_key(key), token, nx=True, ex=ttl):
+            return True, token
+        return False, None
+    except Exception as e:
+        logger.error(f"Cache lock error: {e}")
+        return True, None
+
+
+def release_lock(key: str, token: Optional[str]) -> bool:
+    """
+    Release a recompute lock if it is still ours.
+
+    Args:
+        key: Cache key
+        token: Token returned by acquire_lock
+
+    Returns:
+        True if the lock was released
+    """
+    if not redis_client or token is None:
+        return False
+
+    try:
+        return bool(
+            redis_client.eval(RELEASE_LOCK_SCRIPT, 1, lock_key(key), token)
+        )
+    except Exception as e:
+        logger.error(f"Cache unlock error: {e}")
+        return False
+
+
+def wait_for_cache(key: str, timeout: float) -> Optional[Any]:
+    """
+    Wait for another worker to fill a cache key.
+
+    Args:
+        key: Cache key
+        timeout: Maximum wait in seconds
+
+    Returns:
+        Cached value, or None if it did not appear in time
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        time.sleep(settings.CACHE_LOCK_POLL_SECONDS)
+        cached, _stale = get_entry(key)
+        if cached is not None:
+            return cached
+    return None
+
+
+async def aacquire_lock(key: str, ttl: int) -> Tuple[bool, Optional[str]]:
+    """
+    Try to take the recompute lock of a cache key, without blocking.
+
+    Same as acquire_lock, through the asyncio client.
+
+    Args:
+        key: Cache key
+        ttl: Lock lease in seconds (released early by arelease_lock)
+
+    Returns:
+        Tuple of (acquired, token)
+    """
+    client = async_redis_client()
+    if not client:
+        return True, None
+
+    token = uuid.uuid4().hex
+    try:
+        if await client.set(lock_key(key), token, nx=True, ex=ttl):
+            return True, token
+        return False, None
+    except Exception as e:
+        logger.error(f"Cache lock error: {e}")
+        return True, None
+
+
+async def arelease_lock(key: str, token: Optional[str]) -> bool:
+    """
+    Release a recompute lock if it is still ours, without blocking.
+
+    Args:
+        key: Cache key
+        token: Token returned by aacquire_lock
+
+    Returns:
+        True if the lock was released
+    """
+    client = async_redis_client()
+    if not client or token is None:
+        return False
+
+    try:
+        return bool(
+            await client.eval(RELEASE_LOCK_SCRIPT, 1, lock_key(key), token)
+        )
+    except Exception as e:
+        logger.error(f"Cache unlock error: {e}")
+        return False
+
+
+async def await_cache_many(
+    keys: List[str], timeout: float
+) -> Dict[str, Any]:
+    """
+    Wait for other workers to fill cache keys, without blocking.
+
+    Args:
+        keys: Cache keys
+        timeout: Maximum wait in seconds
+
+    Returns:
+        Key -> cached value for the keys filled in time
+    """
+    found: Dict[str, Any] = {}
+    deadline = time.monotonic() + timeout
+    while len(found) < len(keys) and time.monotonic() < deadline:
+        await asyncio.sleep(settings.CACHE_LOCK_POLL_SECONDS)
+        missing = [key for key in keys if key not in found]
+        for key, cached in zip(missing, await aget_cache_many(missing)):
+            if cached is not None:
+                found[key], _stale = read_entry(cached)
+    return found
+
+
+class SingleFlight:
+    """Merges concurrent calls for the same key inside a process."""
+
+    def __init__(self):
+        """Initialize an empty in-flight call map."""
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn once for all concurrent callers of a key.
+
+        The first caller runs fn; callers arriving while it runs wait for
+        its result (or exception) instead of running fn again.
+
+        Args:
+            key: Call key
+            fn: Function computing the value
+
+        Returns:
+            Value computed by fn (a copy for waiting callers)
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            return copy.deepcopy(future.result())
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def in_flight(self) -> int:
+        """Number of keys being computed."""
+        with self._lock:
+            return len(self._calls)
+
+
+single_flight = SingleFlight()
+
+
+def compute_once(
+    key: str,
+    ttl: int,
+    compute: Callable[[], Any],
+    tags: Optional[Iterable[str]] = None,
+) -> Any:
+    """
+    Compute and cache a missing key with single-flight semantics.
+
+    Concurrent callers in this process share one computation. Across
+    workers, a Redis lock lets one worker recompute while the others wait
+    for the value (up to CACHE_LOCK_WAIT_SECONDS, then compute anyway).
+
+    Args:
+        key: Cache key
+        ttl: Time to live of the computed value
+        compute: Function computing the value
+        tags: Tags to register the key under
+
+    Returns:
+        Computed (or concurrently cached) value
+    """
+    def fill():
+        acquired, token = acquire_lock(key, settings.CACHE_LOCK_TTL_SECONDS)
+        if not acquired:
+            cached = wait_for_cache(key, settings.CACHE_LOCK_WAIT_SECONDS)
+            if cached is not None:
+                return cached
+            logger.warning(f"Cache lock wait timed out: {key}")
+
+        try:
+            if token is not None:
+                # Filled while we were taking the lock
+                cached, _stale = get_entry(key)
+                if cached is not None:
+                    return cached
+            result = compute()
+            set_entry(key, result, ttl, tags)
+            return result
+        finally:
+            release_lock(key, token)
+
+    return single_flight.do(key, fill)
+
+
+def schedule_refresh(
+    key: str,
+    ttl: int,
+    compute: Callable[[], Any],
+    tags: Optional[Iterable[str]] = None,
+) -> bool:
+    """
+    Recompute a stale key in the background.
+
+    The key's Redis lock deduplicates refreshes across threads and workers:
+    if another caller holds it, nothing is scheduled.
+
+    Args:
+        key: Cache key
+        ttl: Seconds the recomputed value is fresh
+        compute: Function computing the value; runs on another thread, so
+            it must not use the caller's database session
+        tags: Tags to register the key under
+
+    Returns:
+        True if a refresh was scheduled
+    """
+    acquired, token = acquire_lock(key, settings.CACHE_LOCK_TTL_SECONDS)
+    if not acquired or token is None:
+        return False
+
+    def refresh():
+        try:
+            set_entry(key, compute(), ttl, tags)
+            logger.debug(f"Cache REFRESH: {key}")
+        except Exception as e:
+            logger.error(f"Cache refresh error for {key}: {e}")
+        finally:
+            release_lock(key, token)
+
+    try:
+        refresh_executor.submit(refresh)
+    except RuntimeError:
+        release_lock(key, token)
+        return False
+    return True
+
+
+def detached_call(
+    func: Callable[..., Any], args: tuple, kwargs: Dict
+) -> Callable[[], Any]:
+    """
+    Build a call of func that can run outside the current request.
+
+    Service methods (first argument with a `db` session) are called on a
+    new instance of the service bound to its own session.
+
+    Args:
+        func: Undecorated function
+        args: Positional arguments, including self
+        kwargs: Keyword arguments
+
+    Returns:
+        Zero-argument callable
+    """
+    instance = args[0] if args else None
+    if not hasattr(instance, "db"):
+        return lambda: func(*args, **kwargs)
+
+    def call():
+        from app.db.session import session_scope
+
+        with session_scope() as db:
+            return func(type(instance)(db), *args[1:], **kwargs)
+
+    return call
+
+
+def cache_result(prefix: str, ttl: int = 300):
+    """
+    Decorator to cache function results.
+
+    Keys are canonical (see build_result_cache_key) and misses are
+    computed once across concurrent callers (see compute_once). Values are
+    fresh for `ttl` seconds, then served stale for CACHE_STALE_SECONDS
+    more while a background refresh recomputes them. Results over closed
+    ranges are fresh for CACHE_CLOSED_RANGE_TTL_SECONDS instead (see
+    result_ttl). Entries are registered under invalidation tags (see
+    build_result_tags).
+
+    The wrapper exposes `cache_prefix`, `cache_ttl`,
+    `cache_key(*args, **kwargs)`, `cache_tags(*args, **kwargs)` and
+    `cache_ttl_for(*args, **kwargs)` so callers can look results up and
+    store them (e.g. in bulk) without calling the function.
+
+    Args:
+        prefix: Cache key prefix
+        ttl: Seconds a result over an open range is fresh
+
+    Returns:
+        Decorated function
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        def ttl_for(*args, **kwargs) -> int:
+            return result_ttl(
+                bind_cache_params(signature, args, kwargs), ttl
+            )
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            # Generate cache key
+            try:
+                cache_key_str = build_result_cache_key(
+                    signature, prefix, args, kwargs
+                )
+            except TypeError:
+                # Invalid call: let the function raise its own error
+                return func(*args, **kwargs)
+
+            # Try to get from cache; stale values are served while a
+            # background refresh recomputes them
+            cached, stale = get_entry(cache_key_str)
+            tags = None
+            entry_ttl = ttl
+            if cached is None or stale:
+                tags = build_result_tags(signature, prefix, args, kwargs)
+                entry_ttl = ttl_for(*args, **kwargs)
+            if cached is not None:
+                if stale:
+                    schedule_refresh(
+                        cache_key_str,
+                        entry_ttl,
+                        detached_call(func, args, kwargs),
+                        tags,
+                    )
+                return cached
+
+            # Call function once for every concurrent miss, then cache
+            return compute_once(
+                cache_key_str, entry_ttl, lambda: func(*args, **kwargs), tags
+            )
+
+        wrapper.cache_prefix = prefix
+        wrapper.cache_ttl = ttl
+        wrapper.cache_key = lambda *args, **kwargs: build_result_cache_key(
+            signature, prefix, args, kwargs
+        )
+        wrapper.cache_tags = lambda *args, **kwargs: build_result_tags(
+            signature, prefix, args, kwargs
+        )
+        wrapper.cache_ttl_for = ttl_for
+        return wrapper
+    return decorator
+
+
+# Keys of the schema version that are bookkeeping rather than cached
+# results: tag sets, the data-versions hash and the dashboard views zset
+# (see app.services.dashboard_data)
+BOOKKEEPING_KEY_PREFIXES = ("tag:", "data_versions", "dashboard_views")
+
+
+def is_bookkeeping_key(key: str) -> bool:
+    """
+    Check whether a key of the current schema version is bookkeeping.
+
+    Args:
+        key: Redis key
+
+    Returns:
+        True for tag sets, data versions and dashboard views
+    """
+    prefix = f"v{settings.CACHE_SCHEMA_VERSION}:"
+    return key.startswith(
+        tuple(prefix + name for name in BOOKKEEPING_KEY_PREFIXES)
+    )
+
+
+def clear_all_cache() -> bool:
+    """
+    Clear every cached result of the current schema version.
+
+    Result keys are found with SCAN and deleted with UNLINK. Bookkeeping
+    keys (tag sets, data versions, dashboard views), lock leases and other
+    applications' keys in the same database are kept.
 
     Returns:
         True if successful
@@ -186,9 +1678,23 @@ def clear_all_cache() -> bool:
         return False
 
     try:
-        redis_client.flushdb()
-        logger.info("All cache cleared")
+        deleted = 0
+        batch: List[str] = []
+        pattern = f"v{settings.CACHE_SCHEMA_VERSION}:*"
+        for key in redis_client.scan_iter(match=pattern, count=SCAN_COUNT):
+            if is_bookkeeping_key(_decode_key(key)):
+                continue
+            batch.append(key)
+            if len(batch) >= UNLINK_BATCH_SIZE:
+                deleted += _unlink(batch)
+                batch = []
+        deleted += _unlink(batch)
+        bump_invalidation_generation()
+        logger.info(f"All cache cleared ({deleted} keys)")
         return True
     except Exception as e:
         logger.error(f"Clear cache error: {e}")
         return False
+    finally:
+        local_cache.clear()
+        publish_invalidation(None)
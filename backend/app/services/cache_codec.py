@@ -0,0 +1,201 @@
+"""
+Binary encoding of cached values.
+
+Every value written to the cache is framed with a small header:
+
+    byte 0  MAGIC (0x00, never the first byte of a JSON document)
+    byte 1  frame version
+    byte 2  serializer id (json, orjson, msgpack)
+    byte 3  compression id (none, zlib, lz4)
+
+followed by the serialized (and possibly compressed) payload. Values
+without the header are legacy JSON text and are decoded as such, so
+entries written before the codec existed stay readable during a rollout.
+
+orjson, msgpack and lz4 are optional: when they are not installed the
+codec falls back to the standard library (json, zlib).
+"""
+
+import json
+import zlib
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from app.config import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - depends on the environment
+    msgpack = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # pragma: no cover - depends on the environment
+    lz4_frame = None
+
+MAGIC = 0x00
+FRAME_VERSION = 1
+HEADER_SIZE = 4
+
+# Serializer ids
+JSON = 0
+ORJSON = 1
+MSGPACK = 2
+
+# Compression ids
+NONE = 0
+ZLIB = 1
+LZ4 = 2
+
+SERIALIZER_NAMES = {"json": JSON, "orjson": ORJSON, "msgpack": MSGPACK}
+COMPRESSION_NAMES = {"none": NONE, "zlib": ZLIB, "lz4": LZ4}
+
+
+class CodecError(ValueError):
+    """A cached value cannot be decoded."""
+
+
+def _orjson_dumps(value: Any) -> bytes:
+    """Serialize with orjson; non-string keys become strings, as in json."""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _msgpack_loads(data: bytes) -> Any:
+    """Deserialize msgpack, allowing non-string map keys."""
+    return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+SERIALIZERS: Dict[int, Tuple[Optional[Callable], Optional[Callable]]] = {
+    JSON: (
+        lambda value: json.dumps(value, separators=(",", ":")).encode(),
+        json.loads,
+    ),
+    ORJSON: (
+        _orjson_dumps if orjson else None,
+        orjson.loads if orjson else None,
+    ),
+    MSGPACK: (
+        (lambda value: msgpack.packb(value, use_bin_type=True))
+        if msgpack
+        else None,
+        _msgpack_loads if msgpack else None,
+    ),
+}
+
+COMPRESSORS: Dict[int, Tuple[Optional[Callable], Optional[Callable]]] = {
+    NONE: (lambda data: data, lambda data: data),
+    ZLIB: (lambda data: zlib.compress(data, 6), zlib.decompress),
+    LZ4: (
+        lz4_frame.compress if lz4_frame else None,
+        lz4_frame.decompress if lz4_frame else None,
+    ),
+}
+
+
+def _resolve(
+    setting: str,
+    names: Dict[str, int],
+    table: Dict[int, Tuple],
+    preferred: Tuple[int, ...],
+) -> int:
+    """Pick a codec id from a setting ('auto' = first available)."""
+    setting = setting.lower()
+    if setting != "auto":
+        codec_id = names.get(setting)
+        if codec_id is None:
+            raise ValueError(f"Unknown cache codec: {setting}")
+        if table[codec_id][0] is None:
+            raise ValueError(f"Cache codec not installed: {setting}")
+        return codec_id
+    return next(codec_id for codec_id in preferred if table[codec_id][0])
+
+
+def default_serializer() -> int:
+    """Serializer used for new entries (CACHE_SERIALIZER)."""
+    return _resolve(
+        settings.CACHE_SERIALIZER,
+        SERIALIZER_NAMES,
+        SERIALIZERS,
+        (ORJSON, JSON),
+    )
+
+
+def default_compression() -> int:
+    """Compression used above the threshold (CACHE_COMPRESSION)."""
+    return _resolve(
+        settings.CACHE_COMPRESSION,
+        COMPRESSION_NAMES,
+        COMPRESSORS,
+        (LZ4, ZLIB),
+    )
+
+
+def encode(
+    value: Any,
+    serializer: Optional[int] = None,
+    compression: Optional[int] = None,
+) -> bytes:
+    """
+    Encode a value for the cache.
+
+    Payloads of at least CACHE_COMPRESS_MIN_BYTES are compressed, unless
+    compression does not make them smaller.
+
+    Args:
+        value: JSON-compatible value
+        serializer: Serializer id (default: configured serializer)
+        compression: Compression id (default: configured compression)
+
+    Returns:
+        Framed bytes
+
+    Raises:
+        TypeError: If the value cannot be serialized
+    """
+    if serializer is None:
+        serializer = default_serializer()
+    payload = SERIALIZERS[serializer][0](value)
+
+    used = NONE
+    if len(payload) >= settings.CACHE_COMPRESS_MIN_BYTES:
+        if compression is None:
+            compression = default_compression()
+        compressed = COMPRESSORS[compression][0](payload)
+        if len(compressed) < len(payload):
+            payload, used = compressed, compression
+
+    return bytes((MAGIC, FRAME_VERSION, serializer, used)) + payload
+
+
+def decode(raw: Union[bytes, str]) -> Any:
+    """
+    Decode a cached value.
+
+    Args:
+        raw: Value read from the cache (framed bytes or legacy JSON)
+
+    Returns:
+        Decoded value
+
+    Raises:
+        CodecError: If the frame is unknown or its codec is not installed
+    """
+    if isinstance(raw, str):
+        return json.loads(raw)
+    if not raw or raw[0] != MAGIC:
+        return json.loads(raw)
+
+    if len(raw) < HEADER_SIZE or raw[1] != FRAME_VERSION:
+        raise CodecError("Unsupported cache frame")
+    serializer = SERIALIZERS.get(raw[2], (None, None))[1]
+    decompress = COMPRESSORS.get(raw[3], (None, None))[1]
+    if serializer is None or decompress is None:
+        raise CodecError(
+            f"Cache codec not available (serializer {raw[2]}, "
+            f"compression {raw[3]})"
+        )
+    return serializer(decompress(raw[HEADER_SIZE:]))
@@ -0,0 +1,397 @@
+"""
+Server-side resolution of saved dashboards.
+
+Maps each widget of a dashboard config to its analytics query, applies the
+dashboard-level filters and computes every widget in one analytics batch
+(deduplicated, pipelined cache lookups, concurrent misses). The rendered
+payload is cached as a whole under the dashboard's updated_at, so any edit
+to the dashboard invalidates it. Payload keys carry the cache schema
+version and the store, channel and day tags of the filters, so clearing
+the cache and invalidating tags drop them with the widget results.
+"""
+
+import hashlib
+import inspect
+import json
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.core.exceptions import ValidationError
+from app.core.logging import get_logger
+from app.models.dashboard import Dashboard
+from app.schemas.analytics import BatchQuery
+from app.services.analytics import AnalyticsService
+from app.services.analytics_batch import (
+    ANALYTICS_METRICS,
+    AnalyticsBatchService,
+)
+from app.services import cache
+from app.services.cache import (
+    aget_cache_many,
+    aset_cache_many,
+    data_version_for,
+    data_versions,
+    filter_tags,
+)
+from app.utils.date_parser import parse_date_filters
+
+logger = get_logger(__name__)
+
+# Widget dataSource -> (analytics metric, default params). Defaults mirror
+# what the frontend requests for each widget.
+WIDGET_METRICS: Dict[str, Tuple[str, Dict[str, Any]]] = {
+    "revenue": ("revenue", {"group_by": "day"}),
+    "summary": ("metrics_summary", {}),
+    "products": ("top_products", {}),
+    "channels": ("channel_performance", {}),
+    "margin": ("products_margin", {"limit": 10}),
+    "delivery": ("delivery_performance", {"group_by": "day"}),
+    "customers": ("customer_insights", {}),
+    "heatmap": ("peak_hours_heatmap", {}),
+    "alerts": ("anomaly_alerts", {}),
+    "items": ("top_items_analysis", {"limit": 20}),
+    "customizations": ("products_with_most_customizations", {"limit": 20}),
+    "payments": ("payment_mix_by_channel", {}),
+    "delivery_regions": ("delivery_performance_by_region", {"limit": 50}),
+}
+
+# Widget config keys (frontend naming) -> analytics params
+WIDGET_CONFIG_PARAMS = {"groupBy": "group_by", "limit": "limit"}
+
+# Dashboard filters applied to every widget that accepts them
+DASHBOARD_FILTERS = (
+    "range",
+    "start_date",
+    "end_date",
+    "store_id",
+    "channel_id",
+    "day_of_week",
+    "hour_start",
+    "hour_end",
+)
+
+# Same default period as the dashboard pages
+DEFAULT_PERIOD_DAYS = 30
+
+DASHBOARD_DATA_PREFIX = "dashboard_data"
+DASHBOARD_DATA_TTL = 300
+
+
+def dashboard_views_key() -> str:
+    """Redis sorted set of view counts by dashboard id."""
+    return f"v{settings.CACHE_SCHEMA_VERSION}:dashboard_views"
+
+
+async def record_dashboard_view(dashboard_id: int) -> None:
+    """
+    Count a dashboard view (the cache warmer favours viewed dashboards).
+
+    Args:
+        dashboard_id: Dashboard ID
+    """
+    client = cache.async_redis_client()
+    if not client:
+        return
+    try:
+        await client.zincrby(dashboard_views_key(), 1, dashboard_id)
+    except Exception as e:
+        logger.error(f"Dashboard view count error: {e}")
+
+
+def most_viewed_dashboards(limit: int) -> List[int]:
+    """
+    Get the most viewed dashboards.
+
+    Args:
+        limit: Maximum number of dashboards
+
+    Returns:
+        Dashboard IDs, most viewed first
+    """
+    if not cache.redis_client or limit <= 0:
+        return []
+    try:
+        members = cache.redis_client.zrevrange(
+            dashboard_views_key(), 0, limit - 1
+        )
+        return [int(member) for member in members]
+    except Exception as e:
+        logger.error(f"Dashboard view read error: {e}")
+        return []
+
+
+def effective_filters(
+    dashboard_filters: Optional[Dict[str, Any]],
+    overrides: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Merge dashboard filters with request overrides.
+
+    Args:
+        dashboard_filters: Filters saved in the dashboard config
+        overrides: Filters given on the request (take precedence)
+
+    Returns:
+        Filters to apply, defaulting to the last 30 days. A relative
+        'range' and absolute dates given on the request replace each other.
+    """
+    filters = {
+        key: value
+        for key, value in (dashboard_filters or {}).items()
+        if key in DASHBOARD_FILTERS and value not in (None, "")
+    }
+    overrides = {k: v for k, v in (overrides or {}).items() if v is not None}
+    if "range" in overrides:
+        filters.pop("start_date", None)
+        filters.pop("end_date", None)
+    elif "start_date" in overrides or "end_date" in overrides:
+        filters.pop("range", None)
+    filters.update(overrides)
+
+    if not any(filters.get(k) for k in ("range", "start_date", "end_date")):
+        today = datetime.now().date()
+        filters["start_date"] = (
+            today - timedelta(days=DEFAULT_PERIOD_DAYS)
+        ).isoformat()
+        filters["end_date"] = today.isoformat()
+    return filters
+
+
+def widget_query(
+    widget: Dict[str, Any], filters: Dict[str, Any]
+) -> BatchQuery:
+    """
+    Build the analytics query for a widget.
+
+    Args:
+        widget: Widget config ({id, type, title, dataSource, config})
+        filters: Dashboard filters
+
+    Returns:
+        Batch query for the widget
+
+    Raises:
+        ValidationError: If the widget has no supported dataSource
+    """
+    data_source = widget.get("dataSource")
+    if data_source not in WIDGET_METRICS:
+        raise ValidationError(
+            f"Unsupported widget dataSource: {data_source}",
+            field="dataSource",
+        )
+
+    metric, defaults = WIDGET_METRICS[data_source]
+    method = getattr(AnalyticsService, ANALYTICS_METRICS[metric])
+    accepted = inspect.signature(method.__wrapped__).parameters
+
+    params = dict(defaults)
+    for config_key, param in WIDGET_CONFIG_PARAMS.items():
+        value = (widget.get("config") or {}).get(config_key)
+        if value is not None and param in accepted:
+            params[param] = value
+    for key, value in filters.items():
+        if key in accepted or (key == "range" and "start_date" in accepted):
+            params[key] = value
+
+    return BatchQuery(id=widget.get("id"), metric=metric, params=params)
+
+
+class DashboardDataService:
+    """Service resolving dashboard widgets into data."""
+
+    def __init__(self, batch: AnalyticsBatchService):
+        """
+        Initialize dashboard data service.
+
+        Args:
+            batch: Analytics batch service used to compute widgets
+        """
+        self.batch = batch
+
+    @staticmethod
+    def payload_cache_key(
+        dashboard: Dashboard, filters: Dict[str, Any]
+    ) -> str:
+        """
+        Cache key for a rendered dashboard.
+
+        Changes on every edit, and on new data when the filtered range
+        touches recent days.
+
+        Returns:
+            Key 'v{schema version}:dashboard_data:{dashboard id}:{digest}'
+        """
+        updated_at = dashboard.updated_at or dashboard.created_at
+        digest = hashlib.sha1(
+            json.dumps(
+                [
+                    updated_at.isoformat() if updated_at else None,
+                    dashboard.config,
+                    filters,
+                    data_version_for(filters),
+                ],
+                sort_keys=True,
+                default=str,
+            ).encode()
+        ).hexdigest()[:20]
+        return (
+            f"v{settings.CACHE_SCHEMA_VERSION}:{DASHBOARD_DATA_PREFIX}:"
+            f"{dashboard.id}:{digest}"
+        )
+
+    @staticmethod
+    def payload_tags(
+        dashboard: Dashboard, filters: Dict[str, Any]
+    ) -> List[str]:
+        """
+        Invalidation tags of a rendered dashboard.
+
+        Args:
+            dashboard: Saved dashboard
+            filters: Effective filters of the render
+
+        Returns:
+            'metric:dashboard_data', 'dashboard:{id}' and the store,
+            channel and day tags of the filters (see cache.filter_tags)
+        """
+        try:
+            start, end = parse_date_filters(
+                filters.get("start_date"),
+                filters.get("end_date"),
+                filters.get("range"),
+            )
+        except ValidationError:
+            start = end = None
+        return [
+            f"metric:{DASHBOARD_DATA_PREFIX}",
+            f"dashboard:{dashboard.id}",
+        ] + filter_tags({**filters, "start_date": start, "end_date": end})
+
+    @classmethod
+    def validator_key(
+        cls,
+        dashboard: Dashboard,
+        overrides: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Identity of a render, for HTTP validators (ETag).
+
+        Relative ranges are resolved, so the key moves with the window
+        even when no new sales change the data version.
+
+        Args:
+            dashboard: Saved dashboard
+            overrides: Request filters overriding the saved ones
+
+        Returns:
+            (key, filters with resolved start/end dates)
+
+        Raises:
+            ValidationError: If the filters hold invalid dates or ranges
+        """
+        filters = effective_filters(
+            (dashboard.config or {}).get("filters"), overrides
+        )
+        start, end = parse_date_filters(
+            filters.get("start_date"),
+            filters.get("end_date"),
+            filters.get("range"),
+        )
+        resolved = {**filters, "start_date": start, "end_date": end}
+        key = cls.payload_cache_key(dashboard, filters)
+        return f"{key}:{start}:{end}", resolved
+
+    async def render(
+        self,
+        dashboard: Dashboard,
+        overrides: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Compute every widget of a dashboard.
+
+        Args:
+            dashboard: Saved dashboard
+            overrides: Request filters overriding the saved ones
+
+        Returns:
+            Dashboard payload with per-widget data or errors
+        """
+        config = dashboard.config or {}
+        filters = effective_filters(config.get("filters"), overrides)
+
+        # Keys carry data versions: read them without blocking the loop
+        await data_versions.arefresh()
+        key = self.payload_cache_key(dashboard, filters)
+        cached = (await aget_cache_many([key]))[0]
+        if cached is not None:
+            cached["cached"] = True
+            return cached
+
+        widgets: List[Dict[str, Any]] = []
+        queries: List[Optional[BatchQuery]] = []
+        for widget in config.get("widgets") or []:
+            entry = {
+                "id": widget.get("id"),
+                "type": widget.get("type"),
+                "title": widget.get("title"),
+                "dataSource": widget.get("dataSource"),
+                "config": widget.get("config") or {},
+            }
+            widgets.append(entry)
+            try:
+                queries.append(widget_query(widget, filters))
+            except ValidationError as e:
+                entry.update(AnalyticsBatchService.describe_error(e))
+                queries.append(None)
+
+        results = await self.batch.execute([q for q in queries if q])
+        computed = iter(results)
+        for entry, query in zip(widgets, queries):
+            if query is None:
+                continue
+            result = next(computed)
+            entry["metric"] = result["metric"]
+            for field in ("status", "cached", "data", "error"):
+                if field in result:
+                    entry[field] = result[field]
+
+        payload = {
+            "dashboard_id": dashboard.id,
+            "name": dashboard.name,
+            "updated_at": (
+                dashboard.updated_at.isoformat()
+                if dashboard.updated_at
+                else None
+            ),
+            "filters": filters,
+            "layout": config.get("layout") or {},
+            "widgets": widgets,
+            "generated_at": datetime.now().isoformat(),
+        }
+
+        # Only cache complete renders; failed widgets are retried next time
+        if all(w.get("status") == "ok" for w in widgets):
+            await aset_cache_many(
+                [
+                    (
+                        key,
+                        payload,
+                        DASHBOARD_DATA_TTL,
+                        self.payload_tags(dashboard, filters),
+                    )
+                ]
+            )
+
+        logger.info(
+            "Dashboard data rendered",
+            extra={
+                "extra_data": {
+                    "dashboard_id": dashboard.id,
+                    "widgets": len(widgets),
+                }
+            },
+        )
+
+        payload["cached"] = False
+        return payload
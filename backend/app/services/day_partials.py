@@ -0,0 +1,423 @@
+"""
+Day-bucketed partial aggregates.
+
+Summary, revenue and channel performance over a date range are all merges
+of per-day partials: revenue, sales count and first/last sale of every
+channel on every day. Those partials are cached per (store, channel, day),
+so a range is assembled from the cached whole days and only the missing
+days, plus the partial days at either edge, are scanned. Sliding a 30-day
+window by one day scans one new day.
+
+Days that may still receive sales (see cache.touches_recent_data) are
+keyed by their store's data version and cached briefly; settled days are
+cached for CACHE_CLOSED_RANGE_TTL_SECONDS.
+
+The async paths compose on AsyncSession.run_sync, which runs on the event
+loop thread: they read the partials ahead with the asyncio client and
+write the scanned days after (see PrefetchedPartials), so composing makes
+no blocking Redis call there.
+"""
+
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.services import cache
+from app.services.query_planner import (
+    CHANNELS,
+    REVENUE,
+    SCAN_FILTERS,
+    SHARED_SCAN_METHODS,
+    PlannedQuery,
+    SharedScan,
+    _Totals,
+)
+from app.utils.time_buckets import ceil_to, floor_to
+
+PARTIAL_PREFIX = "day_partials"
+
+# One cached row: [channel_id, revenue, sales_count, first_sale, last_sale]
+PartialRow = List[Any]
+
+ONE_DAY = timedelta(days=1)
+ONE_MICROSECOND = timedelta(microseconds=1)
+
+
+def day_partial_key(
+    day: date, store_id: Optional[int], channel_id: Optional[int]
+) -> str:
+    """
+    Cache key of a day's partials for a store/channel filter.
+
+    Args:
+        day: Day
+        store_id: Store filter
+        channel_id: Channel filter
+
+    Returns:
+        Cache key; days touching recent data include the data version
+    """
+    key = (
+        f"v{settings.CACHE_SCHEMA_VERSION}:{PARTIAL_PREFIX}:"
+        f"{day.isoformat()}:{store_id or cache.ANY}:{channel_id or cache.ANY}"
+    )
+    version = cache.data_version_for({"end_date": day, "store_id": store_id})
+    return f"{key}:{version}" if version else key
+
+
+class PrefetchedPartials:
+    """Day partials read before a composition, and the writes it leaves."""
+
+    def __init__(self, cached: Dict[str, Optional[List[PartialRow]]]):
+        """
+        Initialize prefetched partials.
+
+        Args:
+            cached: Partial key -> cached rows (None when missing)
+        """
+        self.cached = cached
+        # (key, rows, ttl, tags) entries of the days scanned meanwhile
+        self.entries: List[tuple] = []
+
+    @classmethod
+    async def fetch(
+        cls, queries: Dict[str, PlannedQuery]
+    ) -> "PrefetchedPartials":
+        """
+        Read the partials a composition of queries needs, in one MGET.
+
+        Args:
+            queries: Query key -> (method name, kwargs) sharing a filter set
+
+        Returns:
+            Prefetched partials (empty if the queries cannot be composed)
+        """
+        await cache.data_versions.arefresh()
+        keys = partial_keys(queries)
+        return cls(dict(zip(keys, await cache.aget_cache_many(keys))))
+
+    async def store(self) -> None:
+        """Cache the days scanned by the composition, in one pipeline."""
+        if self.entries:
+            await cache.aset_cache_many(self.entries)
+            self.entries = []
+
+
+def _composable_days(
+    queries: Dict[str, PlannedQuery]
+) -> Optional[Tuple[Dict[str, Any], List[date]]]:
+    """
+    Filters and whole days of queries that day partials can answer.
+
+    Args:
+        queries: Query key -> (method name, kwargs) sharing a filter set
+
+    Returns:
+        (filters, whole days of the range), or None if the queries cannot
+        be composed (caching disabled, open or sub-day range, unsupported
+        method)
+    """
+    if not settings.CACHE_DAY_PARTIALS_ENABLED or not cache.redis_client:
+        return None
+    methods = {method_name for method_name, _ in queries.values()}
+    if not methods <= set(SHARED_SCAN_METHODS):
+        return None
+
+    first_kwargs = next(iter(queries.values()))[1]
+    filters = {name: first_kwargs.get(name) for name in SCAN_FILTERS}
+    start, end = filters["start_date"], filters["end_date"]
+    if not isinstance(start, datetime) or not isinstance(end, datetime):
+        return None
+
+    # Whole days inside [start, end]; an end at 23:59:59.999999 counts
+    first_day = ceil_to(start, "day")
+    last_day = floor_to(end + ONE_MICROSECOND, "day")
+    day_count = (last_day - first_day).days
+    if day_count < 1 or day_count > settings.CACHE_DAY_PARTIALS_MAX_DAYS:
+        return None
+    days = [(first_day + ONE_DAY * i).date() for i in range(day_count)]
+    return filters, days
+
+
+def partial_keys(queries: Dict[str, PlannedQuery]) -> List[str]:
+    """
+    Cache keys of the day partials a composition of queries reads.
+
+    Args:
+        queries: Query key -> (method name, kwargs) sharing a filter set
+
+    Returns:
+        Partial keys (empty if the queries cannot be composed)
+    """
+    composable = _composable_days(queries) if queries else None
+    if composable is None:
+        return []
+    filters, days = composable
+    return [
+        day_partial_key(day, filters["store_id"], filters["channel_id"])
+        for day in days
+    ]
+
+
+def compose_from_days(
+    db: Session,
+    queries: Dict[str, PlannedQuery],
+    prefetched: Optional[PrefetchedPartials] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Answer queries sharing a filter set from day partials.
+
+    Args:
+        db: Database session
+        queries: Query key -> (method name, kwargs); all must share
+            the same filter set
+        prefetched: Partials read ahead; when given, the partials are
+            read from it and scanned days left in its entries instead of
+            going through the sync cache client
+
+    Returns:
+        Query key -> result, or None if the queries cannot be composed
+        (caching disabled, open or sub-day range, unsupported method)
+    """
+    return DayPartials(db, prefetched).compose(queries)
+
+
+class DayPartials(SharedScan):
+    """Shared-scan results assembled from cached per-day partials."""
+
+    def __init__(
+        self, db: Session, prefetched: Optional[PrefetchedPartials] = None
+    ):
+        """
+        Initialize day partials.
+
+        Args:
+            db: Database session
+            prefetched: Partials read ahead (see compose_from_days)
+        """
+        super().__init__(db)
+        self.prefetched = prefetched
+
+    def _is_sqlite(self) -> bool:
+        """Check whether the session is bound to SQLite."""
+        try:
+            return "sqlite" in str(self.db.bind.url)
+        except AttributeError:
+            return True
+
+    def _period(self, day: str, group_by: str) -> str:
+        """Python equivalent of AnalyticsService._period_expr for a day."""
+        value = date.fromisoformat(day)
+        if self._is_sqlite():
+            if group_by == "week":
+                return value.strftime("%Y-%W")
+            if group_by == "month":
+                return value.strftime("%Y-%m")
+            return day
+        if group_by == "week":
+            return (value - timedelta(days=value.weekday())).isoformat()
+        if group_by == "month":
+            return value.replace(day=1).isoformat()
+        return day
+
+    def compose(
+        self, queries: Dict[str, PlannedQuery]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Assemble results from cached days, scanning only what is missing.
+
+        Args:
+            queries: Query key -> (method name, kwargs) sharing a filter set
+
+        Returns:
+            Query key -> result, or None if the queries cannot be composed
+        """
+        composable = _composable_days(queries)
+        if composable is None:
+            return None
+        filters, days = composable
+        start, end = filters["start_date"], filters["end_date"]
+        first_day = datetime.combine(days[0], datetime.min.time())
+        last_day = datetime.combine(days[-1] + ONE_DAY, datetime.min.time())
+        partials = self._cached_days(days, filters)
+
+        # Scan the edges and the runs of missing days
+        segments: List[Tuple[datetime, datetime]] = []
+        if start < first_day:
+            segments.append((start, first_day - ONE_MICROSECOND))
+        missing = [day for day in days if partials[day.isoformat()] is None]
+        for run_start, run_end in self._runs(missing):
+            segments.append(
+                (
+                    datetime.combine(run_start, datetime.min.time()),
+                    datetime.combine(run_end + ONE_DAY, datetime.min.time())
+                    - ONE_MICROSECOND,
+                )
+            )
+        if last_day <= end:
+            segments.append((last_day, end))
+
+        edges: Dict[str, List[PartialRow]] = {}
+        for segment_start, segment_end in segments:
+            for day, rows in self._scan_days(
+                filters, segment_start, segment_end
+            ).items():
+                if day in partials and partials[day] is None:
+                    partials[day] = rows
+                else:
+                    edges.setdefault(day, []).extend(rows)
+        for day in missing:
+            if partials[day.isoformat()] is None:
+                partials[day.isoformat()] = []
+        self._store_days(missing, partials, filters)
+
+        rows_by_day = [
+            (day, row)
+            for source in (partials, edges)
+            for day, rows in source.items()
+            for row in rows
+        ]
+        return self._merge(queries, rows_by_day)
+
+    @staticmethod
+    def _runs(days: List[date]) -> List[Tuple[date, date]]:
+        """Group sorted days into runs of consecutive days."""
+        runs: List[Tuple[date, date]] = []
+        for day in days:
+            if runs and runs[-1][1] + ONE_DAY == day:
+                runs[-1] = (runs[-1][0], day)
+            else:
+                runs.append((day, day))
+        return runs
+
+    def _cached_days(
+        self, days: List[date], filters: Dict[str, Any]
+    ) -> Dict[str, Optional[List[PartialRow]]]:
+        """Cached partials of every day (None when missing), one MGET."""
+        keys = [
+            day_partial_key(day, filters["store_id"], filters["channel_id"])
+            for day in days
+        ]
+        if self.prefetched is not None:
+            values = [self.prefetched.cached.get(key) for key in keys]
+        else:
+            values = cache.get_cache_many(keys)
+        return {day.isoformat(): rows for day, rows in zip(days, values)}
+
+    def _store_days(
+        self,
+        days: List[date],
+        partials: Dict[str, Optional[List[PartialRow]]],
+        filters: Dict[str, Any],
+    ) -> None:
+        """Cache freshly scanned days in one pipeline."""
+        store_id, channel_id = filters["store_id"], filters["channel_id"]
+        entries = []
+        for day in days:
+            entries.append(
+                (
+                    day_partial_key(day, store_id, channel_id),
+                    partials[day.isoformat()],
+                    cache.result_ttl(
+                        {"end_date": day},
+                        settings.CACHE_DAY_PARTIAL_TTL_SECONDS,
+                    ),
+                    [
+                        f"metric:{PARTIAL_PREFIX}",
+                        f"store:{store_id or cache.ANY}",
+                        f"channel:{channel_id or cache.ANY}",
+                        f"day:{day.isoformat()}",
+                    ],
+                )
+            )
+        if self.prefetched is not None:
+            self.prefetched.entries.extend(entries)
+        else:
+            cache.set_cache_many(entries)
+
+    def _scan_days(
+        self, filters: Dict[str, Any], start: datetime, end: datetime
+    ) -> Dict[str, List[PartialRow]]:
+        """Partials of [start, end] grouped by day and channel."""
+        facts = self._facts(
+            {
+                **{k: v for k, v in filters.items() if v is not None},
+                "start_date": start,
+                "end_date": end,
+            }
+        )
+        day_expr = self.analytics._period_expr(facts.c.bucket, "day")
+        statement = select(
+            day_expr.label("day"),
+            facts.c.channel_id,
+            func.sum(facts.c.total_amount).label("revenue"),
+            func.sum(facts.c.sales_count).label("sales_count"),
+            func.min(facts.c.first_sale_at).label("first_sale"),
+            func.max(facts.c.last_sale_at).label("last_sale"),
+        ).group_by(day_expr, facts.c.channel_id)
+
+        days: Dict[str, List[PartialRow]] = {}
+        for row in self.db.execute(statement):
+            if not row.sales_count:
+                continue
+            days.setdefault(str(row.day)[:10], []).append(
+                [
+                    row.channel_id,
+                    str(row.revenue) if row.revenue is not None else None,
+                    int(row.sales_count),
+                    _isoformat(row.first_sale),
+                    _isoformat(row.last_sale),
+                ]
+            )
+        return days
+
+    def _merge(
+        self,
+        queries: Dict[str, PlannedQuery],
+        rows_by_day: List[Tuple[str, PartialRow]],
+    ) -> Dict[str, Any]:
+        """Merge day partials into every query's result shape."""
+        results = {}
+        for key, (method_name, kwargs) in queries.items():
+            groups: Dict[Tuple, _Totals] = {}
+            group_by = kwargs.get("group_by", "day")
+            for day, row in rows_by_day:
+                channel_id, revenue, count, first, last = row
+                if method_name == REVENUE:
+                    group = (self._period(day, group_by),)
+                elif method_name == CHANNELS:
+                    group = (channel_id,)
+                else:
+                    group = ()
+                groups.setdefault(group, _Totals()).add(
+                    Decimal(revenue) if revenue is not None else None,
+                    count,
+                    _parse(first),
+                    _parse(last),
+                )
+
+            if method_name == REVENUE:
+                results[key] = self._revenue(groups)
+            elif method_name == CHANNELS:
+                results[key] = self._channels(groups)
+            else:
+                results[key] = self._summary(groups)
+        return results
+
+
+def _isoformat(value: Any) -> Optional[str]:
+    """Timestamp as ISO text (SQLite may already return text)."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return datetime.fromisoformat(str(value)).isoformat()
+
+
+def _parse(value: Optional[str]) -> Optional[datetime]:
+    """ISO text back to a timestamp."""
+    return datetime.fromisoformat(value) if value else None
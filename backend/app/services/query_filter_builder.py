@@ -6,12 +6,13 @@ This module provides a centralized way to apply common filters to SQLAlchemy\
 eliminating code duplication across multiple service methods.
 """
 
-from typing import Optional
+from typing import Any, Optional, Sequence
 from datetime import datetime
-from sqlalchemy import extract
 from sqlalchemy.orm import Query
 
+from app.config import settings
 from app.models.sale import Sale
+from app.models.sale_status import SaleStatus
 
 
 class QueryFilterBuilder:
@@ -28,6 +29,8 @@ class QueryFilterBuilder:
         day_of_week: Optional[int] = None,
         hour_start: Optional[int] = None,  # 0-23
         hour_end: Optional[int] = None,  # 0-23
+        status: Optional[str] = None,
+        partitioned: Sequence[Any] = (),
     ) -> Query:
         """
         Apply common filters to a Sale query.
@@ -41,6 +44,9 @@ class QueryFilterBuilder:
             day_of_week: Filter by day of week (0=Monday, 6=Sunday)
             hour_start: Filter by start hour (0-23)
             hour_end: Filter by end hour (0-23)
+            status: Filter by sale status (e.g. "COMPLETED")
+            partitioned: Joined child models partitioned by sale month
+                (ProductSale, Payment, DeliverySale)
 
         Returns:
             Filtered query
@@ -50,27 +56,30 @@ class QueryFilterBuilder:
             query = query.filter(Sale.created_at >= start_date)
         if end_date:
             query = query.filter(Sale.created_at <= end_date)
+        query = QueryFilterBuilder.apply_partition_bounds(
+            query, partitioned, start_date=start_date, end_date=end_date
+        )
 
         # Entity filters
         if store_id:
             query = query.filter(Sale.store_id == store_id)
         if channel_id:
             query = query.filter(Sale.channel_id == channel_id)
+        if status is not None:
+            query = query.filter(QueryFilterBuilder.status_condition(status))
 
-        # Temporal filters
+        # Temporal filters, on the generated calendar columns of sales
+        # (indexed with store/channel, unlike EXTRACT over created_at)
         if day_of_week is not None:
-            # PostgreSQL: EXTRACT(DOW FROM timestamp) returns 0-6 (0=Sunday)
-            # We convert: 0=Monday to 1=Sunday in PostgreSQL
-            # So: 0 (Monday) -> 1, 1 (Tuesday) -> 2, ..., 6 (Sunday) -> 0
+            # sale_dow follows PostgreSQL's DOW (0=Sunday); we convert
+            # 0 (Monday) -> 1, 1 (Tuesday) -> 2, ..., 6 (Sunday) -> 0
             pg_dow = (day_of_week + 1) % 7
-            query = query.filter(extract("dow", Sale.created_at) == pg_dow)
+            query = query.filter(Sale.sale_dow == pg_dow)
 
         if hour_start is not None:
-            query = query.filter(
-                extract("hour", Sale.created_at) >= hour_start
-            )
+            query = query.filter(Sale.sale_hour >= hour_start)
         if hour_end is not None:
-            query = query.filter(extract("hour", Sale.created_at) <= hour_end)
+            query = query.filter(Sale.sale_hour <= hour_end)
 
         return query
 
@@ -82,6 +91,8 @@ class QueryFilterBuilder:
         end_date: Optional[datetime] = None,
         store_id: Optional[int] = None,
         channel_id: Optional[int] = None,
+        status: Optional[str] = None,
+        partitioned: Sequence[Any] = (),
     ) -> Query:
         """
         Apply basic filters (without temporal filters).
@@ -92,6 +103,8 @@ class QueryFilterBuilder:
             end_date: Filter by end date
             store_id: Filter by store ID
             channel_id: Filter by channel ID
+            status: Filter by sale status (e.g. "COMPLETED")
+            partitioned: Joined child models partitioned by sale month
 
         Returns:
             Filtered query
@@ -102,4 +115,60 @@ class QueryFilterBuilder:
             end_date=end_date,
             store_id=store_id,
             channel_id=channel_id,
+            status=status,
+            partitioned=partitioned,
         )
+
+    @staticmethod
+    def status_condition(status: str) -> Any:
+        """
+        Build the predicate selecting sales with a given status.
+
+        Statuses with a code compare the indexed smallint sale_status_code
+        (what the partial COMPLETED/CANCELLED indexes are defined on);
+        any other status falls back to sale_status_desc.
+
+        Args:
+            status: Status description (e.g. "COMPLETED")
+
+        Returns:
+            SQLAlchemy boolean expression
+        """
+        code = SaleStatus.code_for(status)
+        if code is None:
+            return Sale.sale_status_desc == status
+        return Sale.sale_status_code == code
+
+    @staticmethod
+    def apply_partition_bounds(
+        query: Query,
+        models: Sequence[Any],
+        *,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> Query:
+        """
+        Bound child tables partitioned by sale month to the sales period.
+
+        Sales are pruned by their created_at filters; a child table joined
+        on sale_id is only pruned by a bound on its own partition key,
+        sale_created_at (a copy of its sale's created_at, so the bound
+        never changes the result). No-op unless SALES_PARTITIONING_ENABLED.
+
+        Args:
+            query: SQLAlchemy query to filter
+            models: Child models with a sale_created_at column
+            start_date: Filter by start date
+            end_date: Filter by end date
+
+        Returns:
+            Filtered query
+        """
+        if not settings.SALES_PARTITIONING_ENABLED:
+            return query
+        for model in models:
+            if start_date:
+                query = query.filter(model.sale_created_at >= start_date)
+            if end_date:
+                query = query.filter(model.sale_created_at <= end_date)
+        return query
@@ -0,0 +1,325 @@
+"""
+Shared-scan planning for analytics queries.
+
+Several dashboard widgets read the same completed sales with the same
+date/store/channel predicates and only differ in how they group them
+(summary, revenue by period, channel performance). The planner groups such
+queries by filter set and answers each group with a single scan of the
+sales facts:
+
+- On PostgreSQL the scan is one statement with GROUPING SETS, one set per
+  widget shape.
+- Elsewhere (SQLite) it groups by every dimension at once and rolls the
+  rows up in Python.
+
+Results are split back into exactly the shapes the individual
+AnalyticsService methods return.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select, literal, tuple_
+from sqlalchemy.orm import Session
+
+from app.models.channel import Channel
+from app.models.sale import Sale
+from app.services.analytics import AnalyticsService
+from app.services.query_filter_builder import QueryFilterBuilder
+
+# Methods that can be answered from a shared scan
+SUMMARY = "get_metrics_summary"
+REVENUE = "get_revenue"
+CHANNELS = "get_channel_performance"
+SHARED_SCAN_METHODS = (SUMMARY, REVENUE, CHANNELS)
+
+# Parameters forming the scan predicate; anything else shapes the result
+SCAN_FILTERS = ("start_date", "end_date", "store_id", "channel_id")
+
+STATUS = "COMPLETED"
+
+# (method name, kwargs) as produced by analytics_batch.resolve_query
+PlannedQuery = Tuple[str, Dict[str, Any]]
+
+
+def _filter_set(kwargs: Dict[str, Any]) -> Tuple:
+    """Hashable scan predicate of a query."""
+    return tuple(kwargs.get(name) for name in SCAN_FILTERS)
+
+
+def plan_queries(queries: Dict[str, PlannedQuery]) -> List[List[str]]:
+    """
+    Group queries that can share one scan.
+
+    Args:
+        queries: Query key -> (method name, kwargs)
+
+    Returns:
+        Groups of query keys, in first-seen order. Groups with more than
+        one key share a scan; the others run on their own.
+    """
+    groups: Dict[Any, List[str]] = {}
+    for key, (method_name, kwargs) in queries.items():
+        if method_name in SHARED_SCAN_METHODS:
+            group = ("shared", _filter_set(kwargs))
+        else:
+            group = ("single", key)
+        groups.setdefault(group, []).append(key)
+    return list(groups.values())
+
+
+def compute_shared(
+    db: Session, queries: Dict[str, PlannedQuery]
+) -> Dict[str, Any]:
+    """
+    Compute queries sharing a filter set with one scan.
+
+    Args:
+        db: Database session
+        queries: Query key -> (method name, kwargs); all must share
+            the same filter set
+
+    Returns:
+        Query key -> result
+    """
+    return SharedScan(db).execute(queries)
+
+
+class _Totals:
+    """Running aggregates of a group of sales."""
+
+    __slots__ = ("revenue", "count", "first", "last")
+
+    def __init__(self):
+        self.revenue = None
+        self.count = 0
+        self.first: Optional[datetime] = None
+        self.last: Optional[datetime] = None
+
+    def add(self, revenue, count, first, last) -> None:
+        """Merge an aggregated row."""
+        if revenue is not None:
+            self.revenue = (
+                revenue if self.revenue is None else self.revenue + revenue
+            )
+        self.count += int(count or 0)
+        if first is not None and (self.first is None or first < self.first):
+            self.first = first
+        if last is not None and (self.last is None or last > self.last):
+            self.last = last
+
+    @property
+    def total(self) -> float:
+        """Revenue as a float."""
+        return float(self.revenue) if self.revenue else 0
+
+    @property
+    def avg_ticket(self) -> float:
+        """Average revenue per sale."""
+        return self.total / self.count if self.revenue and self.count else 0
+
+
+class SharedScan:
+    """One scan of the completed sales answering several query shapes."""
+
+    def __init__(self, db: Session):
+        """
+        Initialize shared scan.
+
+        Args:
+            db: Database session
+        """
+        self.db = db
+        self.analytics = AnalyticsService(db)
+
+    def _uses_grouping_sets(self) -> bool:
+        """Whether the database supports GROUPING SETS."""
+        try:
+            return self.db.bind.dialect.name == "postgresql"
+        except AttributeError:
+            return False
+
+    def _facts(self, filters: Dict[str, Any]):
+        """Completed sales as facts: the rollup if usable, else raw sales."""
+        facts = self.analytics.rollups.sales_hourly_facts(
+            **filters, status=STATUS
+        )
+        if facts is not None:
+            return facts
+
+        raw = select(
+            Sale.channel_id,
+            Sale.created_at.label("bucket"),
+            literal(1).label("sales_count"),
+            Sale.total_amount,
+            Sale.created_at.label("first_sale_at"),
+            Sale.created_at.label("last_sale_at"),
+        )
+        raw = QueryFilterBuilder.apply_basic_filters(
+            raw, status=STATUS, **filters
+        )
+        return raw.subquery("sales_facts")
+
+    def execute(self, queries: Dict[str, PlannedQuery]) -> Dict[str, Any]:
+        """
+        Run the scan and split it into per-query results.
+
+        Args:
+            queries: Query key -> (method name, kwargs) sharing a filter set
+
+        Returns:
+            Query key -> result, shaped like the service method's result
+        """
+        first_kwargs = next(iter(queries.values()))[1]
+        filters = {
+            name: first_kwargs[name]
+            for name in SCAN_FILTERS
+            if first_kwargs.get(name) is not None
+        }
+        facts = self._facts(filters)
+
+        # Grouping dimensions and the set of dimensions each query needs
+        dims: Dict[str, Any] = {}
+        sets: Dict[str, Tuple[str, ...]] = {}
+        for key, (method_name, kwargs) in queries.items():
+            if method_name == REVENUE:
+                group_by = kwargs.get("group_by", "day")
+                name = f"period_{group_by}"
+                dims[name] = self.analytics._period_expr(
+                    facts.c.bucket, group_by
+                )
+                sets[key] = (name,)
+            elif method_name == CHANNELS:
+                dims["channel_id"] = facts.c.channel_id
+                sets[key] = ("channel_id",)
+            else:
+                sets[key] = ()
+
+        totals = self._scan(facts, dims, set(sets.values()))
+
+        results = {}
+        for key, (method_name, _kwargs) in queries.items():
+            groups = totals[sets[key]]
+            if method_name == REVENUE:
+                results[key] = self._revenue(groups)
+            elif method_name == CHANNELS:
+                results[key] = self._channels(groups)
+            else:
+                results[key] = self._summary(groups)
+        return results
+
+    def _scan(
+        self,
+        facts,
+        dims: Dict[str, Any],
+        grouping_sets: set,
+    ) -> Dict[Tuple[str, ...], Dict[Tuple, _Totals]]:
+        """
+        Aggregate the facts once for every grouping set.
+
+        Returns:
+            Grouping set -> group values -> totals
+        """
+        names = list(dims)
+        aggregates = [
+            func.sum(facts.c.total_amount).label("revenue"),
+            func.sum(facts.c.sales_count).label("sales_count"),
+            func.min(facts.c.first_sale_at).label("first_sale"),
+            func.max(facts.c.last_sale_at).label("last_sale"),
+        ]
+        columns = [dims[name].label(name) for name in names]
+        totals: Dict[Tuple[str, ...], Dict[Tuple, _Totals]] = {
+            dims_set: {} for dims_set in grouping_sets
+        }
+
+        if self._uses_grouping_sets():
+            flags = [
+                func.grouping(dims[name]).label(f"grouping_{name}")
+                for name in names
+            ]
+            statement = select(*columns, *flags, *aggregates).group_by(
+                func.grouping_sets(
+                    *(
+                        tuple_(*(dims[name] for name in dims_set))
+                        for dims_set in grouping_sets
+                    )
+                )
+            )
+            for row in self.db.execute(statement):
+                dims_set = tuple(
+                    name
+                    for name in names
+                    if getattr(row, f"grouping_{name}") == 0
+                )
+                group = tuple(getattr(row, name) for name in dims_set)
+                totals[dims_set].setdefault(group, _Totals()).add(
+                    row.revenue, row.sales_count, row.first_sale, row.last_sale
+                )
+            return totals
+
+        # No GROUPING SETS: group by every dimension, roll up here
+        statement = select(*columns, *aggregates)
+        if columns:
+            statement = statement.group_by(*(dims[name] for name in names))
+        for row in self.db.execute(statement):
+            if not row.sales_count:
+                continue
+            for dims_set, groups in totals.items():
+                group = tuple(getattr(row, name) for name in dims_set)
+                groups.setdefault(group, _Totals()).add(
+                    row.revenue, row.sales_count, row.first_sale, row.last_sale
+                )
+        return totals
+
+    @staticmethod
+    def _summary(groups: Dict[Tuple, _Totals]) -> Dict:
+        """Shape of AnalyticsService.get_metrics_summary."""
+        total = groups.get((), _Totals())
+        return {
+            "total_revenue": total.total,
+            "sales_count": total.count,
+            "avg_ticket": total.avg_ticket,
+            "first_sale": total.first.isoformat() if total.first else None,
+            "last_sale": total.last.isoformat() if total.last else None,
+        }
+
+    @staticmethod
+    def _revenue(groups: Dict[Tuple, _Totals]) -> List[Dict]:
+        """Shape of AnalyticsService.get_revenue."""
+        return [
+            {
+                "period": str(period)[:10],
+                "revenue": total.total,
+                "sales_count": total.count,
+                "avg_ticket": total.avg_ticket,
+            }
+            for (period,), total in sorted(
+                groups.items(), key=lambda item: str(item[0][0])
+            )
+            if total.count
+        ]
+
+    def _channels(self, groups: Dict[Tuple, _Totals]) -> List[Dict]:
+        """Shape of AnalyticsService.get_channel_performance."""
+        ids = [channel_id for (channel_id,) in groups if channel_id]
+        channels = {}
+        if ids:
+            channels = {
+                row.id: row
+                for row in self.db.query(
+                    Channel.id, Channel.name, Channel.type
+                ).filter(Channel.id.in_(ids))
+            }
+
+        rows = [
+            {
+                "channel_name": channels[channel_id].name,
+                "channel_type": channels[channel_id].type,
+                "total_revenue": total.total,
+                "sales_count": total.count,
+                "avg_ticket": total.avg_ticket,
+            }
+            for (channel_id,), total in groups.items()
+            if channel_id in channels and total.count
+        ]
+        return sorted(rows, key=lambda row: row["total_revenue"], reverse=True)
@@ -0,0 +1,443 @@
+"""
+Managed Redis connections.
+
+Clients share an explicit blocking connection pool with short connect,
+socket and checkout timeouts, and are guarded by a circuit breaker: after
+REDIS_BREAKER_FAILURES consecutive connection errors the breaker opens,
+the clients become falsy and every command fails fast with
+CircuitOpenError. Cache helpers check `if not redis_client` before talking
+to Redis, so while the breaker is open they go straight to the database
+path without waiting on sockets.
+
+A background thread pings Redis every REDIS_RECONNECT_INTERVAL_SECONDS
+while the breaker is open and closes it once Redis answers, so a Redis
+that is down at boot or dies later is picked up again without a restart.
+
+When every pooled connection is busy, a command waits up to
+REDIS_POOL_TIMEOUT_SECONDS for one and then fails with PoolExhaustedError.
+That is load, not an unreachable Redis, so it does not count toward the
+breaker.
+
+An asyncio client (redis.asyncio) is available for coroutines, over a
+pool of its own per event loop, guarded by the same breaker.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from functools import wraps
+from typing import Any, Callable, Dict, Optional
+
+import redis
+import redis.asyncio as aioredis
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Errors meaning Redis is unreachable (as opposed to a bad command)
+CONNECTION_ERRORS = (
+    redis.exceptions.ConnectionError,
+    redis.exceptions.TimeoutError,
+)
+
+
+# Message of the ConnectionError raised by a blocking pool checkout timeout
+NO_CONNECTION_AVAILABLE = "No connection available."
+
+
+class CircuitOpenError(redis.exceptions.ConnectionError):
+    """Raised instead of calling Redis while the circuit is open."""
+
+
+class PoolExhaustedError(redis.exceptions.ConnectionError):
+    """Raised when no pooled connection frees up in time."""
+
+
+def _is_pool_timeout(exc: redis.exceptions.ConnectionError) -> bool:
+    """Check whether a ConnectionError is a pool checkout timeout."""
+    return str(exc) == NO_CONNECTION_AVAILABLE
+
+
+class _BlockingPool(redis.BlockingConnectionPool):
+    """Blocking pool raising PoolExhaustedError on checkout timeouts."""
+
+    def get_connection(self, *args, **kwargs):
+        try:
+            return super().get_connection(*args, **kwargs)
+        except redis.exceptions.ConnectionError as e:
+            if _is_pool_timeout(e):
+                raise PoolExhaustedError(str(e)) from e
+            raise
+
+
+class _AsyncBlockingPool(aioredis.BlockingConnectionPool):
+    """asyncio blocking pool raising PoolExhaustedError on timeouts."""
+
+    async def get_connection(self, *args, **kwargs):
+        try:
+            return await super().get_connection(*args, **kwargs)
+        except redis.exceptions.ConnectionError as e:
+            if _is_pool_timeout(e):
+                raise PoolExhaustedError(str(e)) from e
+            raise
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+
+    def __init__(self, failure_threshold: int):
+        """
+        Initialize a closed breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self.trips = 0
+
+    @property
+    def state(self) -> str:
+        """Current state."""
+        return self.CLOSED if self._opened_at is None else self.OPEN
+
+    def allow(self) -> bool:
+        """Check whether calls may go through."""
+        return self._opened_at is None
+
+    def record_success(self) -> None:
+        """Reset the failure count."""
+        self._failures = 0
+
+    def record_failure(self) -> bool:
+        """
+        Count a failure.
+
+        Returns:
+            True if this failure opened the circuit
+        """
+        with self._lock:
+            self._failures += 1
+            if (
+                self._opened_at is None
+                and self._failures >= self.failure_threshold
+            ):
+                self._opened_at = time.monotonic()
+                self.trips += 1
+                return True
+            return False
+
+    def trip(self) -> bool:
+        """
+        Open the circuit now.
+
+        Returns:
+            True if it was closed
+        """
+        with self._lock:
+            if self._opened_at is not None:
+                return False
+            self._opened_at = time.monotonic()
+            self.trips += 1
+            return True
+
+    def reset(self) -> None:
+        """Close the circuit."""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Breaker state for monitoring."""
+        opened_at = self._opened_at
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "trips": self.trips,
+            "open_seconds": (
+                round(time.monotonic() - opened_at, 1)
+                if opened_at is not None
+                else 0
+            ),
+        }
+
+
+class _GuardedPipeline:
+    """Pipeline whose execute() goes through the breaker."""
+
+    def __init__(self, pipeline, manager: "RedisManager"):
+        self._pipeline = pipeline
+        self._manager = manager
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._pipeline, name)
+
+    def execute(self, *args, **kwargs) -> Any:
+        """Send the buffered commands."""
+        return self._manager.call(self._pipeline.execute, *args, **kwargs)
+
+
+class _AsyncGuardedPipeline:
+    """asyncio pipeline whose execute() goes through the breaker."""
+
+    def __init__(self, pipeline, manager: "RedisManager"):
+        self._pipeline = pipeline
+        self._manager = manager
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._pipeline, name)
+
+    async def execute(self, *args, **kwargs) -> Any:
+        """Send the buffered commands."""
+        return await self._manager.acall(
+            self._pipeline.execute, *args, **kwargs
+        )
+
+
+class ManagedRedis:
+    """
+    Redis client guarded by a circuit breaker.
+
+    Proxies redis.Redis; it is falsy while the circuit is open.
+    """
+
+    def __init__(self, client: redis.Redis, manager: "RedisManager"):
+        self._client = client
+        self._manager = manager
+
+    def __bool__(self) -> bool:
+        return self._manager.breaker.allow()
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+        if name == "pipeline":
+            return lambda *args, **kwargs: _GuardedPipeline(
+                attr(*args, **kwargs), self._manager
+            )
+
+        @wraps(attr)
+        def call(*args, **kwargs):
+            return self._manager.call(attr, *args, **kwargs)
+
+        return call
+
+
+class AsyncManagedRedis:
+    """
+    asyncio Redis client guarded by the same circuit breaker.
+
+    Commands are awaitable; it is falsy while the circuit is open.
+    """
+
+    def __init__(self, client: aioredis.Redis, manager: "RedisManager"):
+        self._client = client
+        self._manager = manager
+
+    def __bool__(self) -> bool:
+        return self._manager.breaker.allow()
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+        if name == "pipeline":
+            return lambda *args, **kwargs: _AsyncGuardedPipeline(
+                attr(*args, **kwargs), self._manager
+            )
+
+        @wraps(attr)
+        async def call(*args, **kwargs):
+            return await self._manager.acall(attr, *args, **kwargs)
+
+        return call
+
+
+class RedisManager:
+    """Owns the Redis pools, the circuit breaker and reconnection."""
+
+    def __init__(self, url: str):
+        """
+        Initialize the manager (no connection is made yet).
+
+        Args:
+            url: Redis URL
+        """
+        self.url = url
+        self.breaker = CircuitBreaker(settings.REDIS_BREAKER_FAILURES)
+        self.pool = _BlockingPool.from_url(url, **self._pool_options())
+        self.client = ManagedRedis(
+            redis.Redis(connection_pool=self.pool), self
+        )
+        # Event loop (None outside one) -> its asyncio client
+        self._async_clients: Dict[Any, AsyncManagedRedis] = {}
+        self._stop = threading.Event()
+        self._reconnector: Optional[threading.Thread] = None
+        self._reconnector_lock = threading.Lock()
+
+    @staticmethod
+    def _pool_options() -> Dict[str, Any]:
+        """Connection pool options shared by the sync and async pools."""
+        return {
+            # Values are binary frames (see cache_codec)
+            "decode_responses": False,
+            "max_connections": settings.REDIS_MAX_CONNECTIONS,
+            "timeout": settings.REDIS_POOL_TIMEOUT_SECONDS,
+            "socket_connect_timeout": settings.REDIS_CONNECT_TIMEOUT_SECONDS,
+            "socket_timeout": settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+            "socket_keepalive": True,
+            "health_check_interval": (
+                settings.REDIS_HEALTH_CHECK_INTERVAL_SECONDS
+            ),
+        }
+
+    def connect(self) -> ManagedRedis:
+        """
+        Check the connection once; if Redis is down, open the circuit.
+
+        Returns:
+            The managed client (falsy until Redis answers)
+        """
+        try:
+            self.client._client.ping()
+            logger.info(f"Redis connected: {self.url}")
+        except CONNECTION_ERRORS as e:
+            logger.warning(f"Redis not available: {e}")
+            if self.breaker.trip():
+                self._start_reconnector()
+        return self.client
+
+    def async_client(self) -> AsyncManagedRedis:
+        """
+        Get the asyncio client of the running event loop.
+
+        asyncio connections belong to the loop that opened them, so each
+        loop (the API's, or one started by a job with asyncio.run) gets a
+        client over a pool of its own, created on first use.
+
+        Returns:
+            The managed asyncio client
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        client = self._async_clients.get(loop)
+        if client is None:
+            # Forget the clients of loops that have finished
+            self._async_clients = {
+                owner: other
+                for owner, other in self._async_clients.items()
+                if owner is None or not owner.is_closed()
+            }
+            pool = _AsyncBlockingPool.from_url(
+                self.url, **self._pool_options()
+            )
+            client = AsyncManagedRedis(
+                aioredis.Redis(connection_pool=pool), self
+            )
+            self._async_clients[loop] = client
+        return client
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run a Redis command through the circuit breaker.
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError("Redis circuit open")
+        try:
+            result = fn(*args, **kwargs)
+        except PoolExhaustedError:
+            # Redis is up, this worker is just out of connections
+            raise
+        except CONNECTION_ERRORS:
+            self._record_failure()
+            raise
+        self.breaker.record_success()
+        return result
+
+    async def acall(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Await a Redis command through the circuit breaker.
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError("Redis circuit open")
+        try:
+            result = await fn(*args, **kwargs)
+        except PoolExhaustedError:
+            raise
+        except CONNECTION_ERRORS:
+            self._record_failure()
+            raise
+        self.breaker.record_success()
+        return result
+
+    def _record_failure(self) -> None:
+        """Count a connection failure; start reconnecting if it trips."""
+        if self.breaker.record_failure():
+            logger.warning(
+                "Redis circuit opened, bypassing cache until it reconnects"
+            )
+            self._start_reconnector()
+
+    def _start_reconnector(self) -> None:
+        """Start the background reconnection thread if not running."""
+        with self._reconnector_lock:
+            if self._reconnector is not None and self._reconnector.is_alive():
+                return
+            self._stop.clear()
+            self._reconnector = threading.Thread(
+                target=self._reconnect, name="redis-reconnect", daemon=True
+            )
+            self._reconnector.start()
+
+    def _reconnect(self) -> None:
+        """Ping Redis until it answers, then close the circuit."""
+        while not self._stop.wait(settings.REDIS_RECONNECT_INTERVAL_SECONDS):
+            try:
+                self.client._client.ping()
+            except CONNECTION_ERRORS:
+                continue
+            except Exception as e:
+                logger.error(f"Redis reconnect error: {e}")
+                continue
+            self.breaker.reset()
+            logger.info(f"Redis reconnected: {self.url}")
+            return
+
+    def stats(self) -> Dict[str, Any]:
+        """Breaker and pool usage for monitoring."""
+        return {
+            **self.breaker.stats(),
+            "max_connections": self.pool.max_connections,
+        }
+
+    async def close(self) -> None:
+        """Stop reconnecting and close every pooled connection."""
+        self._stop.set()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        client = self._async_clients.pop(loop, None)
+        if client is not None:
+            await client._client.connection_pool.disconnect()
+        self._async_clients = {}
+        self.pool.disconnect()
+
+
+redis_manager = RedisManager(settings.REDIS_URL)
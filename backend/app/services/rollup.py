@@ -0,0 +1,834 @@
+"""
+Incrementally maintained rollups backing the analytics aggregations.
+
+Rollups are refreshed from a high-water mark on sales.id: every refresh
+merges only the sales inserted since the previous one. Readers combine the
+rollup with the raw sales table for the parts of a request the rollup cannot
+answer (partial buckets at the range edges and sales above the watermark),
+so results always match a direct scan of the sales table.
+
+Sales that change after being merged are caught by recomputing buckets:
+- updates and deletes of merged sales (and of their product lines) are
+  logged in rollup_changes by database triggers (migration 009), and the
+  buckets of the logged sales are recomputed on the next refresh
+- a sale whose transaction commits after a higher id was merged is below
+  the watermark when it becomes visible; the buckets of the last
+  ROLLUP_LATE_SALE_IDS ids below the watermark are recomputed on every
+  refresh to pick it up
+
+A recomputed bucket is rebuilt from every sale in it up to the watermark,
+so recomputing is idempotent.
+"""
+
+from typing import Callable, Dict, List, Optional, Set
+from datetime import date, datetime
+
+from sqlalchemy import (
+    and_,
+    select,
+    func,
+    case,
+    literal,
+    or_,
+    union_all,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Subquery
+
+from app.config import settings
+from app.models.sale import Sale
+from app.models.product_sale import ProductSale
+from app.models.sales_hourly_rollup import SalesHourlyRollup
+from app.models.product_sales_daily_rollup import ProductSalesDailyRollup
+from app.models.rollup_change import RollupChange
+from app.models.rollup_watermark import RollupWatermark
+from app.services.query_filter_builder import QueryFilterBuilder
+from app.utils.time_buckets import BUCKET_UNITS, floor_to, ceil_to
+
+# Watermark names
+SALES_HOURLY = "sales_hourly"
+PRODUCT_SALES_DAILY = "product_sales_daily"
+
+# Width in hours of the product rollup hour bands (must divide 24)
+PRODUCT_HOUR_BAND_WIDTH = 3
+
+# Buckets recomputed per statement
+RECOMPUTE_BATCH_SIZE = 200
+
+
+class RollupService:
+    """Service for refreshing and reading analytics rollups."""
+
+    def __init__(self, db: Session):
+        """
+        Initialize rollup service.
+
+        Args:
+            db: Database session
+        """
+        self.db = db
+        # Days of the changes applied by the refreshes of this instance
+        self.changed_days: Set[date] = set()
+
+    def _is_sqlite(self) -> bool:
+        """Check whether the session is bound to SQLite."""
+        try:
+            db_url = str(self.db.bind.url)
+        except AttributeError:
+            db_url = "sqlite:///test.db"
+        return "sqlite" in db_url
+
+    def _insert(self, table):
+        """Get a dialect-specific INSERT supporting ON CONFLICT."""
+        if self._is_sqlite():
+            return sqlite.insert(table)
+        return postgresql.insert(table)
+
+    def _least(self, a, b):
+        """Dialect-specific scalar minimum of two values."""
+        return func.min(a, b) if self._is_sqlite() else func.least(a, b)
+
+    def _greatest(self, a, b):
+        """Dialect-specific scalar maximum of two values."""
+        return func.max(a, b) if self._is_sqlite() else func.greatest(a, b)
+
+    def _bucket(self, column, unit: str):
+        """Truncate a timestamp column to the hour or day."""
+        if self._is_sqlite():
+            # Keep SQLAlchemy's storage format so comparisons stay lexical
+            fmt = "%Y-%m-%d %H:00:00.000000"
+            if unit == "day":
+                fmt = "%Y-%m-%d 00:00:00.000000"
+            return func.strftime(fmt, column)
+        return func.date_trunc(unit, column)
+
+    # ------------------------------------------------------------------
+    # Watermarks
+    # ------------------------------------------------------------------
+
+    def get_watermark(self, name: str) -> Optional[int]:
+        """
+        Get the last sales.id merged into a rollup.
+
+        Args:
+            name: Rollup name
+
+        Returns:
+            Last merged sale id, or None if the rollup was never built
+        """
+        return (
+            self.db.query(RollupWatermark.last_sale_id)
+            .filter(RollupWatermark.name == name)
+            .scalar()
+        )
+
+    def _lock_watermark(self, name: str) -> RollupWatermark:
+        """Get (creating if needed) and lock a watermark row."""
+        watermark = (
+            self.db.query(RollupWatermark)
+            .filter(RollupWatermark.name == name)
+            .with_for_update()
+            .first()
+        )
+        if watermark is None:
+            watermark = RollupWatermark(name=name, last_sale_id=0)
+            self.db.add(watermark)
+            self.db.flush()
+        return watermark
+
+    def _refresh(
+        self,
+        name: str,
+        merge: Callable[[int, int], int],
+        recompute: Callable[[List[datetime], int], None],
+        unit: str,
+        batch_size: Optional[int] = None,
+    ) -> int:
+        """
+        Merge sales inserted since the last refresh into a rollup.
+
+        Each batch is merged and its watermark advanced in one transaction,
+        so an interrupted refresh can simply be run again. The buckets of
+        changed and late-committed sales are then recomputed (see
+        _recompute_dirty).
+
+        Args:
+            name: Watermark name
+            merge: Callable merging sales with low < id <= high
+            recompute: Callable rebuilding buckets from sales up to an id
+            unit: Bucket unit of the rollup ('hour' or 'day')
+            batch_size: Number of sale ids merged per transaction
+
+        Returns:
+            Number of sales merged
+        """
+        batch_size = batch_size or settings.ROLLUP_BATCH_SIZE
+        merged = 0
+
+        while True:
+            watermark = self._lock_watermark(name)
+            # Read under the lock, so concurrent refreshes agree on it
+            max_id = self.db.query(func.max(Sale.id)).scalar() or 0
+            low = watermark.last_sale_id
+            if low >= max_id:
+                break
+
+            high = min(low + batch_size, max_id)
+            merged += merge(low, high)
+            watermark.last_sale_id = high
+            watermark.refreshed_at = datetime.now()
+            self.db.commit()
+
+        self._recompute_dirty(watermark, recompute, unit)
+        self.db.commit()
+        return merged
+
+    def _recompute_dirty(
+        self,
+        watermark: RollupWatermark,
+        recompute: Callable[[List[datetime], int], None],
+        unit: str,
+    ) -> None:
+        """
+        Recompute the buckets of changed and late-committed sales.
+
+        The watermark row must be locked by the caller.
+
+        Args:
+            watermark: Locked watermark of the rollup
+            recompute: Callable rebuilding buckets from sales up to an id
+            unit: Bucket unit of the rollup
+        """
+        high = watermark.last_sale_id
+        if not high:
+            return
+
+        late_low = max(0, high - settings.ROLLUP_LATE_SALE_IDS)
+        moments = [
+            created_at
+            for (created_at,) in self.db.query(Sale.created_at).filter(
+                Sale.id > late_low,
+                Sale.id <= high,
+                Sale.created_at.isnot(None),
+            )
+        ]
+
+        changes = (
+            self.db.query(RollupChange.id, RollupChange.sale_created_at)
+            .filter(RollupChange.id > (watermark.last_change_id or 0))
+            .all()
+        )
+        if changes:
+            watermark.last_change_id = max(change.id for change in changes)
+            changed = [change.sale_created_at for change in changes]
+            self.changed_days.update(moment.date() for moment in changed)
+            moments.extend(changed)
+
+        buckets = sorted({floor_to(moment, unit) for moment in moments})
+        for start in range(0, len(buckets), RECOMPUTE_BATCH_SIZE):
+            recompute(buckets[start:start + RECOMPUTE_BATCH_SIZE], high)
+
+    @staticmethod
+    def _in_buckets(buckets: List[datetime], unit: str):
+        """Condition selecting sales created inside any of the buckets."""
+        width = BUCKET_UNITS[unit]
+        return or_(
+            *[
+                and_(
+                    Sale.created_at >= bucket,
+                    Sale.created_at < bucket + width,
+                )
+                for bucket in buckets
+            ]
+        )
+
+    def prune_changes(self) -> int:
+        """
+        Delete change log rows applied by every rollup.
+
+        Returns:
+            Number of rows deleted
+        """
+        applied = (
+            self.db.query(func.min(RollupWatermark.last_change_id))
+            .filter(
+                RollupWatermark.name.in_([SALES_HOURLY, PRODUCT_SALES_DAILY])
+            )
+            .scalar()
+        )
+        if not applied:
+            return 0
+        deleted = (
+            self.db.query(RollupChange)
+            .filter(RollupChange.id <= applied)
+            .delete(synchronize_session=False)
+        )
+        self.db.commit()
+        return deleted
+
+    def _rebuild(self, name: str, model, refresh: Callable[[], int]) -> int:
+        """Empty a rollup, reset its watermark and refresh it."""
+        self.db.query(model).delete()
+        self.db.query(RollupWatermark).filter(
+            RollupWatermark.name == name
+        ).delete()
+        # Changes logged so far are part of the rebuilt buckets
+        last_change_id = self.db.query(func.max(RollupChange.id)).scalar()
+        self.db.add(
+            RollupWatermark(
+                name=name, last_sale_id=0, last_change_id=last_change_id or 0
+            )
+        )
+        self.db.commit()
+        return refresh()
+
+    def _sales_in_range(self, low: int, high: int) -> int:
+        """Count sales with low < id <= high."""
+        return (
+            self.db.query(func.count(Sale.id))
+            .filter(Sale.id > low, Sale.id <= high)
+            .scalar()
+            or 0
+        )
+
+    def latest_sale_ids_by_store(self, after_id: int = 0) -> Dict[int, int]:
+        """
+        Get the highest sales.id of every store with sales after an id.
+
+        Args:
+            after_id: Only consider sales with a greater id
+
+        Returns:
+            Store id -> highest sale id
+        """
+        rows = (
+            self.db.query(Sale.store_id, func.max(Sale.id))
+            .filter(Sale.id > after_id)
+            .group_by(Sale.store_id)
+        )
+        return {
+            store_id: sale_id
+            for store_id, sale_id in rows
+            if store_id is not None
+        }
+
+    def refresh_all(self) -> int:
+        """
+        Refresh every rollup incrementally.
+
+        Returns:
+            Number of sales merged into the hourly rollup
+        """
+        merged = self.refresh_sales_hourly()
+        self.refresh_product_daily()
+        return merged
+
+    def rebuild_all(self) -> int:
+        """
+        Rebuild every rollup from scratch.
+
+        Returns:
+            Number of sales merged into the hourly rollup
+        """
+        merged = self.rebuild_sales_hourly()
+        self.rebuild_product_daily()
+        return merged
+
+    # ------------------------------------------------------------------
+    # Sales hourly rollup
+    # ------------------------------------------------------------------
+
+    def refresh_sales_hourly(self, batch_size: Optional[int] = None) -> int:
+        """
+        Merge sales inserted since the last refresh into the hourly rollup.
+
+        Args:
+            batch_size: Number of sale ids merged per transaction
+
+        Returns:
+            Number of sales merged
+        """
+        return self._refresh(
+            SALES_HOURLY,
+            self._merge_sales_hourly,
+            self._recompute_sales_hourly,
+            "hour",
+            batch_size,
+        )
+
+    def rebuild_sales_hourly(self) -> int:
+        """
+        Rebuild the hourly rollup from scratch.
+
+        Returns:
+            Number of sales merged
+        """
+        return self._rebuild(
+            SALES_HOURLY, SalesHourlyRollup, self.refresh_sales_hourly
+        )
+
+    def _merge_sales_hourly(self, low: int, high: int) -> int:
+        """
+        Upsert hourly aggregates for sales with low < id <= high.
+
+        Returns:
+            Number of sales in the id range
+        """
+        self._upsert_sales_hourly(Sale.id > low, Sale.id <= high)
+        return self._sales_in_range(low, high)
+
+    def _recompute_sales_hourly(
+        self, buckets: List[datetime], high: int
+    ) -> None:
+        """Rebuild hour buckets from their sales with id <= high."""
+        self.db.query(SalesHourlyRollup).filter(
+            SalesHourlyRollup.bucket_start.in_(buckets)
+        ).delete(synchronize_session=False)
+        self._upsert_sales_hourly(
+            Sale.id <= high, self._in_buckets(buckets, "hour")
+        )
+
+    def _upsert_sales_hourly(self, *conditions) -> None:
+        """Upsert hourly aggregates of the sales matching conditions."""
+        bucket = self._bucket(Sale.created_at, "hour")
+        source = (
+            select(
+                Sale.store_id,
+                Sale.channel_id,
+                Sale.sale_status_desc,
+                bucket.label("bucket_start"),
+                func.count(Sale.id),
+                func.sum(Sale.total_amount),
+                func.sum(func.coalesce(Sale.total_discount, 0)),
+                func.coalesce(func.sum(Sale.delivery_seconds), 0),
+                func.count(Sale.delivery_seconds),
+                func.min(Sale.created_at),
+                func.max(Sale.created_at),
+            )
+            .where(Sale.created_at.isnot(None), *conditions)
+            .group_by(
+                Sale.store_id,
+                Sale.channel_id,
+                Sale.sale_status_desc,
+                bucket,
+            )
+        )
+
+        rollup = SalesHourlyRollup.__table__
+        stmt = self._insert(rollup).from_select(
+            [
+                "store_id",
+                "channel_id",
+                "sale_status_desc",
+                "bucket_start",
+                "sales_count",
+                "total_amount",
+                "total_discount",
+                "delivery_seconds",
+                "delivery_count",
+                "first_sale_at",
+                "last_sale_at",
+            ],
+            source,
+        )
+        excluded = stmt.excluded
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[
+                rollup.c.store_id,
+                rollup.c.channel_id,
+                rollup.c.sale_status_desc,
+                rollup.c.bucket_start,
+            ],
+            set_={
+                "sales_count": rollup.c.sales_count + excluded.sales_count,
+                "total_amount": rollup.c.total_amount + excluded.total_amount,
+                "total_discount": (
+                    rollup.c.total_discount + excluded.total_discount
+                ),
+                "delivery_seconds": (
+                    rollup.c.delivery_seconds + excluded.delivery_seconds
+                ),
+                "delivery_count": (
+                    rollup.c.delivery_count + excluded.delivery_count
+                ),
+                "first_sale_at": self._least(
+                    rollup.c.first_sale_at, excluded.first_sale_at
+                ),
+                "last_sale_at": self._greatest(
+                    rollup.c.last_sale_at, excluded.last_sale_at
+                ),
+            },
+        )
+        self.db.execute(stmt)
+
+    def sales_hourly_facts(
+        self,
+        *,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        store_id: Optional[int] = None,
+        channel_id: Optional[int] = None,
+        status: Optional[str] = None,
+    ) -> Optional[Subquery]:
+        """
+        Build a sales fact source answering a filter set from the rollup.
+
+        Whole hours inside the range come from the rollup; the partial hours
+        at either edge and sales above the watermark come from the sales
+        table. Each raw sale is exposed as a one-sale bucket, so callers can
+        aggregate the result exactly as they would the rollup.
+
+        Columns: store_id, channel_id, sale_status_desc, bucket, sales_count,
+        total_amount, total_discount, delivery_seconds, delivery_count,
+        first_sale_at, last_sale_at.
+
+        Args:
+            start_date: Start date filter (inclusive)
+            end_date: End date filter (inclusive)
+            store_id: Store filter
+            channel_id: Channel filter
+            status: Sale status filter (None for all statuses)
+
+        Returns:
+            Fact subquery, or None if the rollup cannot be used
+        """
+        if not settings.ANALYTICS_ROLLUPS_ENABLED:
+            return None
+
+        watermark = self.get_watermark(SALES_HOURLY)
+        if watermark is None:
+            return None
+
+        # Whole hours fully inside [start_date, end_date]
+        interior_start = ceil_to(start_date, "hour") if start_date else None
+        interior_end = floor_to(end_date, "hour") if end_date else None
+        if (
+            interior_start is not None
+            and interior_end is not None
+            and interior_start >= interior_end
+        ):
+            # Range shorter than an hour: nothing to gain from the rollup
+            return None
+
+        rollup = SalesHourlyRollup
+        rollup_part = select(
+            rollup.store_id,
+            rollup.channel_id,
+            rollup.sale_status_desc,
+            rollup.bucket_start.label("bucket"),
+            rollup.sales_count,
+            rollup.total_amount,
+            rollup.total_discount,
+            rollup.delivery_seconds,
+            rollup.delivery_count,
+            rollup.first_sale_at,
+            rollup.last_sale_at,
+        )
+        if interior_start is not None:
+            rollup_part = rollup_part.where(
+                rollup.bucket_start >= interior_start
+            )
+        if interior_end is not None:
+            rollup_part = rollup_part.where(rollup.bucket_start < interior_end)
+        if store_id:
+            rollup_part = rollup_part.where(rollup.store_id == store_id)
+        if channel_id:
+            rollup_part = rollup_part.where(rollup.channel_id == channel_id)
+        if status is not None:
+            rollup_part = rollup_part.where(
+                rollup.sale_status_desc == status
+            )
+
+        raw_part = select(
+            Sale.store_id,
+            Sale.channel_id,
+            Sale.sale_status_desc,
+            Sale.created_at.label("bucket"),
+            literal(1).label("sales_count"),
+            Sale.total_amount,
+            func.coalesce(Sale.total_discount, 0).label("total_discount"),
+            func.coalesce(Sale.delivery_seconds, 0).label("delivery_seconds"),
+            case((Sale.delivery_seconds.isnot(None), 1), else_=0).label(
+                "delivery_count"
+            ),
+            Sale.created_at.label("first_sale_at"),
+            Sale.created_at.label("last_sale_at"),
+        )
+        raw_part = QueryFilterBuilder.apply_basic_filters(
+            raw_part,
+            start_date=start_date,
+            end_date=end_date,
+            store_id=store_id,
+            channel_id=channel_id,
+            status=status,
+        )
+
+        # Only what the rollup does not cover: edges and unmerged sales
+        uncovered = [Sale.id > watermark]
+        if interior_start is not None:
+            uncovered.append(Sale.created_at < interior_start)
+        if interior_end is not None:
+            uncovered.append(Sale.created_at >= interior_end)
+        raw_part = raw_part.where(or_(*uncovered))
+
+        return union_all(rollup_part, raw_part).subquery("sales_facts")
+
+    # ------------------------------------------------------------------
+    # Product daily rollup
+    # ------------------------------------------------------------------
+
+    def refresh_product_daily(self, batch_size: Optional[int] = None) -> int:
+        """
+        Merge sales inserted since the last refresh into the product rollup.
+
+        Args:
+            batch_size: Number of sale ids merged per transaction
+
+        Returns:
+            Number of sales merged
+        """
+        return self._refresh(
+            PRODUCT_SALES_DAILY,
+            self._merge_product_daily,
+            self._recompute_product_daily,
+            "day",
+            batch_size,
+        )
+
+    def rebuild_product_daily(self) -> int:
+        """
+        Rebuild the product daily rollup from scratch.
+
+        Returns:
+            Number of sales merged
+        """
+        return self._rebuild(
+            PRODUCT_SALES_DAILY,
+            ProductSalesDailyRollup,
+            self.refresh_product_daily,
+        )
+
+    def _merge_product_daily(self, low: int, high: int) -> int:
+        """
+        Upsert product daily aggregates for sales with low < id <= high.
+
+        Returns:
+            Number of sales in the id range
+        """
+        self._upsert_product_daily(Sale.id > low, Sale.id <= high)
+        return self._sales_in_range(low, high)
+
+    def _recompute_product_daily(
+        self, buckets: List[datetime], high: int
+    ) -> None:
+        """Rebuild day buckets from their sales with id <= high."""
+        self.db.query(ProductSalesDailyRollup).filter(
+            ProductSalesDailyRollup.bucket_date.in_(buckets)
+        ).delete(synchronize_session=False)
+        self._upsert_product_daily(
+            Sale.id <= high, self._in_buckets(buckets, "day")
+        )
+
+    def _upsert_product_daily(self, *conditions) -> None:
+        """Upsert product aggregates of the sales matching conditions."""
+        bucket = self._bucket(Sale.created_at, "day")
+        day_of_week = Sale.sale_dow
+        hour_band = (
+            Sale.sale_hour
+            // PRODUCT_HOUR_BAND_WIDTH
+            * PRODUCT_HOUR_BAND_WIDTH
+        )
+        source = (
+            select(
+                ProductSale.product_id,
+                Sale.store_id,
+                Sale.channel_id,
+                Sale.sale_status_desc,
+                bucket.label("bucket_date"),
+                hour_band.label("hour_band"),
+                day_of_week.label("day_of_week"),
+                func.sum(ProductSale.quantity),
+                func.sum(ProductSale.total_price),
+                func.sum(ProductSale.base_price),
+                func.count(ProductSale.id),
+            )
+            .join(Sale, Sale.id == ProductSale.sale_id)
+            .where(Sale.created_at.isnot(None), *conditions)
+            .group_by(
+                ProductSale.product_id,
+                Sale.store_id,
+                Sale.channel_id,
+                Sale.sale_status_desc,
+                bucket,
+                hour_band,
+                day_of_week,
+            )
+        )
+
+        rollup = ProductSalesDailyRollup.__table__
+        stmt = self._insert(rollup).from_select(
+            [
+                "product_id",
+                "store_id",
+                "channel_id",
+                "sale_status_desc",
+                "bucket_date",
+                "hour_band",
+                "day_of_week",
+                "quantity",
+                "total_price",
+                "base_price",
+                "line_count",
+            ],
+            source,
+        )
+        excluded = stmt.excluded
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[
+                rollup.c.product_id,
+                rollup.c.store_id,
+                rollup.c.channel_id,
+                rollup.c.sale_status_desc,
+                rollup.c.bucket_date,
+                rollup.c.hour_band,
+            ],
+            set_={
+                "quantity": rollup.c.quantity + excluded.quantity,
+                "total_price": rollup.c.total_price + excluded.total_price,
+                "base_price": rollup.c.base_price + excluded.base_price,
+                "line_count": rollup.c.line_count + excluded.line_count,
+            },
+        )
+        self.db.execute(stmt)
+
+    def product_daily_facts(
+        self,
+        *,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        store_id: Optional[int] = None,
+        channel_id: Optional[int] = None,
+        status: Optional[str] = None,
+        day_of_week: Optional[int] = None,
+        hour_start: Optional[int] = None,
+        hour_end: Optional[int] = None,
+    ) -> Optional[Subquery]:
+        """
+        Build a product sales fact source answering a filter set.
+
+        Whole days inside the range come from the product rollup; the
+        partial days at either edge and sales above the watermark come from
+        product_sales. Hour filters can only be served when they fall on
+        hour band boundaries.
+
+        Columns: product_id, store_id, channel_id, sale_status_desc, bucket,
+        quantity, total_price, base_price, line_count.
+
+        Args:
+            start_date: Start date filter (inclusive)
+            end_date: End date filter (inclusive)
+            store_id: Store filter
+            channel_id: Channel filter
+            status: Sale status filter (None for all statuses)
+            day_of_week: Day of week filter (0=Monday, 6=Sunday)
+            hour_start: Start hour filter (0-23)
+            hour_end: End hour filter (0-23)
+
+        Returns:
+            Fact subquery, or None if the rollup cannot be used
+        """
+        if not settings.ANALYTICS_ROLLUPS_ENABLED:
+            return None
+
+        width = PRODUCT_HOUR_BAND_WIDTH
+        if hour_start is not None and hour_start % width:
+            return None
+        if hour_end is not None and (hour_end + 1) % width:
+            return None
+
+        watermark = self.get_watermark(PRODUCT_SALES_DAILY)
+        if watermark is None:
+            return None
+
+        # Whole days fully inside [start_date, end_date]
+        interior_start = ceil_to(start_date, "day") if start_date else None
+        interior_end = floor_to(end_date, "day") if end_date else None
+        if (
+            interior_start is not None
+            and interior_end is not None
+            and interior_start >= interior_end
+        ):
+            # Range shorter than a day: nothing to gain from the rollup
+            return None
+
+        rollup = ProductSalesDailyRollup
+        rollup_part = select(
+            rollup.product_id,
+            rollup.store_id,
+            rollup.channel_id,
+            rollup.sale_status_desc,
+            rollup.bucket_date.label("bucket"),
+            rollup.quantity,
+            rollup.total_price,
+            rollup.base_price,
+            rollup.line_count,
+        )
+        if interior_start is not None:
+            rollup_part = rollup_part.where(
+                rollup.bucket_date >= interior_start
+            )
+        if interior_end is not None:
+            rollup_part = rollup_part.where(rollup.bucket_date < interior_end)
+        if store_id:
+            rollup_part = rollup_part.where(rollup.store_id == store_id)
+        if channel_id:
+            rollup_part = rollup_part.where(rollup.channel_id == channel_id)
+        if status is not None:
+            rollup_part = rollup_part.where(
+                rollup.sale_status_desc == status
+            )
+        if day_of_week is not None:
+            # Stored with the PostgreSQL convention (0=Sunday)
+            pg_dow = (day_of_week + 1) % 7
+            rollup_part = rollup_part.where(rollup.day_of_week == pg_dow)
+        if hour_start is not None:
+            rollup_part = rollup_part.where(rollup.hour_band >= hour_start)
+        if hour_end is not None:
+            rollup_part = rollup_part.where(
+                rollup.hour_band <= hour_end - width + 1
+            )
+
+        raw_part = select(
+            ProductSale.product_id,
+            Sale.store_id,
+            Sale.channel_id,
+            Sale.sale_status_desc,
+            Sale.created_at.label("bucket"),
+            ProductSale.quantity,
+            ProductSale.total_price,
+            ProductSale.base_price,
+            literal(1).label("line_count"),
+        ).join(Sale, Sale.id == ProductSale.sale_id)
+        raw_part = QueryFilterBuilder.apply_sale_filters(
+            raw_part,
+            start_date=start_date,
+            end_date=end_date,
+            store_id=store_id,
+            channel_id=channel_id,
+            day_of_week=day_of_week,
+            hour_start=hour_start,
+            hour_end=hour_end,
+            status=status,
+            partitioned=(ProductSale,),
+        )
+
+        # Only what the rollup does not cover: edges and unmerged sales
+        uncovered = [Sale.id > watermark]
+        if interior_start is not None:
+            uncovered.append(Sale.created_at < interior_start)
+        if interior_end is not None:
+            uncovered.append(Sale.created_at >= interior_end)
+        raw_part = raw_part.where(or_(*uncovered))
+
+        return union_all(rollup_part, raw_part).subquery("product_facts")
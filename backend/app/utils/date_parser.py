@@ -6,17 +6,153 @@ eliminating duplication across multiple API endpoints.
 """
 
 from typing import Optional, Tuple
-from datetime import datetime
+from datetime import datetime, timedelta
 
+from app.config import settings
 from app.core.exceptions import ValidationError
+from app.utils.time_buckets import BUCKET_UNITS, floor_to, is_aligned
 
 # Constants for timezone handling
 UTC_SUFFIX = "+00:00"
 
+# Relative ranges resolved server-side (see resolve_relative_range)
+RELATIVE_RANGES = (
+    "last_7d",
+    "last_30d",
+    "mtd",
+    "prev_month",
+    "same_period_last_year",
+)
+
+ONE_MICROSECOND = timedelta(microseconds=1)
+
+
+def _end_of(value: datetime, unit: str) -> datetime:
+    """Last microsecond of the bucket containing value."""
+    return floor_to(value, unit) + BUCKET_UNITS[unit] - ONE_MICROSECOND
+
+
+def _years_ago(value: datetime, years: int) -> datetime:
+    """Same moment `years` years earlier (Feb 29 becomes Feb 28)."""
+    try:
+        return value.replace(year=value.year - years)
+    except ValueError:
+        return value.replace(year=value.year - years, day=28)
+
+
+def resolve_relative_range(
+    token: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    now: Optional[datetime] = None,
+) -> Tuple[datetime, datetime]:
+    """
+    Resolve a relative range token into absolute, bucket-aligned dates.
+
+    Ranges start on a day boundary and end at the end of the current hour,
+    so every request within the same hour gets the same range (and cache
+    key). 'same_period_last_year' shifts the given range, or the last 30
+    days when none is given, back one year.
+
+    Args:
+        token: One of RELATIVE_RANGES
+        start: Start of the range to compare (same_period_last_year)
+        end: End of the range to compare (same_period_last_year)
+        now: Reference time (default: now)
+
+    Returns:
+        Tuple of (start_datetime, end_datetime), end inclusive
+
+    Raises:
+        ValidationError: If the token is unknown
+    """
+    now = now or datetime.now()
+    today = floor_to(now, "day")
+    current_end = _end_of(now, "hour")
+    month_start = today.replace(day=1)
+
+    if token == "last_7d":
+        return today - timedelta(days=6), current_end
+    if token == "last_30d":
+        return today - timedelta(days=29), current_end
+    if token == "mtd":
+        return month_start, current_end
+    if token == "prev_month":
+        previous = (month_start - timedelta(days=1)).replace(day=1)
+        return previous, month_start - ONE_MICROSECOND
+    if token == "same_period_last_year":
+        if start is None or end is None:
+            start, end = resolve_relative_range("last_30d", now=now)
+        return _years_ago(start, 1), _years_ago(end, 1)
+
+    raise ValidationError(
+        f"Período relativo inválido: {token} "
+        f"(use {', '.join(RELATIVE_RANGES)})",
+        field="range",
+    )
+
+
+def snap_range(
+    start: Optional[datetime], end: Optional[datetime], unit: str
+) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """
+    Widen a range to whole buckets.
+
+    The start moves down to its bucket boundary; an end inside a bucket
+    moves up to the bucket's last microsecond. Ends already on a boundary
+    are kept.
+
+    Args:
+        start: Range start
+        end: Range end (inclusive)
+        unit: Bucket unit ('hour' or 'day')
+
+    Returns:
+        Tuple of (start_datetime, end_datetime)
+    """
+    if start is not None:
+        start = floor_to(start, unit)
+    if end is not None and not is_aligned(end, unit):
+        end = _end_of(end, unit)
+    return start, end
+
+
+def apply_date_range(
+    start: Optional[datetime],
+    end: Optional[datetime],
+    date_range: Optional[str] = None,
+) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """
+    Apply a relative range token and the configured snapping.
+
+    A token replaces the absolute dates (except 'same_period_last_year',
+    which shifts them). Absolute dates are snapped to
+    ANALYTICS_DATE_SNAP buckets ('hour' or 'day') when configured, so
+    requests differing by seconds share cached results.
+
+    Args:
+        start: Parsed start date
+        end: Parsed end date
+        date_range: Relative range token (see RELATIVE_RANGES)
+
+    Returns:
+        Tuple of (start_datetime, end_datetime)
+
+    Raises:
+        ValidationError: If the token is unknown
+    """
+    if date_range:
+        return resolve_relative_range(date_range, start, end)
+    unit = settings.ANALYTICS_DATE_SNAP.lower()
+    if unit in BUCKET_UNITS:
+        return snap_range(start, end, unit)
+    return start, end
+
 
 def parse_date_filters(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
+    date_range: Optional[str] = None,
 ) -> Tuple[Optional[datetime], Optional[datetime]]:
     """
     Parse and validate date filters from string to datetime objects.
@@ -24,12 +160,14 @@ def parse_date_filters(
     Args:
         start_date: Start date string (YYYY-MM-DD or ISO format)
         end_date: End date string (YYYY-MM-DD or ISO format)
+        date_range: Relative range token (e.g. 'last_30d'), resolved
+            server-side (see apply_date_range)
 
     Returns:
         Tuple of (start_datetime, end_datetime), either can be None
 
     Raises:
-        ValidationError: If date format is invalid or start > end
+        ValidationError: If date format or token is invalid or start > end
     """
     start = None
     end = None
@@ -68,7 +206,7 @@ def parse_date_filters(
             "Data inicial deve ser anterior à data final", field="start_date"
         )
 
-    return start, end
+    return apply_date_range(start, end, date_range)
 
 
 def parse_single_date(
@@ -0,0 +1,68 @@
+"""
+Time bucket helpers shared by rollups and cache layers.
+
+Aggregated tables store data in fixed buckets (hours, days). These helpers
+compute bucket boundaries so callers can split a requested range into the
+part covered by whole buckets and the ragged edges around it.
+"""
+
+from datetime import datetime, timedelta
+
+# Supported bucket units and their length
+BUCKET_UNITS = {
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+
+
+def floor_to(value: datetime, unit: str) -> datetime:
+    """
+    Truncate a datetime to the start of its bucket.
+
+    Args:
+        value: Datetime to truncate
+        unit: Bucket unit ('hour' or 'day')
+
+    Returns:
+        Start of the bucket containing value
+    """
+    if unit not in BUCKET_UNITS:
+        raise ValueError(f"Unsupported bucket unit: {unit}")
+
+    value = value.replace(minute=0, second=0, microsecond=0)
+    if unit == "day":
+        value = value.replace(hour=0)
+    return value
+
+
+def ceil_to(value: datetime, unit: str) -> datetime:
+    """
+    Round a datetime up to the next bucket boundary.
+
+    Values already on a boundary are returned unchanged.
+
+    Args:
+        value: Datetime to round
+        unit: Bucket unit ('hour' or 'day')
+
+    Returns:
+        First bucket boundary greater than or equal to value
+    """
+    floored = floor_to(value, unit)
+    if floored == value:
+        return value
+    return floored + BUCKET_UNITS[unit]
+
+
+def is_aligned(value: datetime, unit: str) -> bool:
+    """
+    Check whether a datetime sits exactly on a bucket boundary.
+
+    Args:
+        value: Datetime to check
+        unit: Bucket unit ('hour' or 'day')
+
+    Returns:
+        True if value is the start of a bucket
+    """
+    return floor_to(value, unit) == value
@@ -0,0 +1,413 @@
+"""
+B-tree vs BRIN plans for the AnalyticsService queries.
+
+Seeds a scratch schema with sales in created_at order at a multiple of the
+data generator's volume (500k sales over 6 months for 50 stores, see
+DADOS.md; 10x by default, over the 12 months the long-range analyses
+span), then runs every analytics query with its default filters under
+EXPLAIN (ANALYZE, BUFFERS) twice, each time inside a rolled back
+transaction:
+
+- btree: the BRIN index on sales.created_at dropped
+- brin: the B-trees leading with sales.created_at dropped
+
+and prints execution time, shared buffers and the access path to sales.
+
+    cd backend
+    python -m benchmarks.brin_vs_btree --database-url postgresql://...
+    python -m benchmarks.brin_vs_btree --scale 1 --methods \\
+        get_store_growth_analysis,get_product_seasonality_analysis
+
+--existing benchmarks the database's own tables instead (e.g. after
+`generate_data.py --stores 500`); the index drops then lock sales for the
+duration of each variant, so never point it at a live database.
+"""
+
+import argparse
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.db.base import Base
+from app.models import Sale  # noqa: F401  (registers every table)
+from app.services.analytics import AnalyticsService
+
+SCHEMA = "brin_benchmark"
+
+# Generator volume (DADOS.md): 500k sales over 6 months
+GENERATOR_SALES_PER_MONTH = 500_000 // 6
+
+VARIANTS = ("btree", "brin")
+
+# (statement, parameters) as sent to the driver
+Statement = Tuple[str, Any]
+
+SEED = """
+INSERT INTO stores (id, name, is_active)
+    SELECT g, 'Loja ' || g, true FROM generate_series(1, 50) g;
+INSERT INTO channels (id, name, type)
+    SELECT g, 'Canal ' || g, 'D' FROM generate_series(1, 4) g;
+INSERT INTO customers (id, customer_name)
+    SELECT g, 'Cliente ' || g FROM generate_series(1, 10000) g;
+INSERT INTO products (id, name)
+    SELECT g, 'Produto ' || g FROM generate_series(1, 500) g;
+INSERT INTO payment_types (id, description)
+    SELECT g, 'Tipo ' || g FROM generate_series(1, 4) g;
+
+-- In created_at order, with a few minutes of out-of-order arrival
+INSERT INTO sales (
+    id, store_id, channel_id, customer_id, created_at, sale_status_desc,
+    total_amount_items, total_amount, total_discount, discount_reason,
+    production_seconds, delivery_seconds, origin
+)
+SELECT
+    g,
+    1 + g % 50,
+    1 + g % 4,
+    CASE WHEN g % 10 < 3 THEN NULL ELSE 1 + g % 10000 END,
+    date_trunc('hour', now()) - INTERVAL '{months} months'
+        + g * INTERVAL '{step} seconds' - (g % 7) * INTERVAL '1 minute',
+    CASE WHEN g % 20 = 0 THEN 'CANCELLED' ELSE 'COMPLETED' END,
+    20 + g % 80,
+    20 + g % 80,
+    CASE WHEN g % 10 = 0 THEN 5 ELSE 0 END,
+    CASE WHEN g % 10 = 0 THEN 'Cupom' END,
+    600 + g % 900,
+    CASE WHEN g % 4 = 0 THEN 1200 + g % 1800 END,
+    'POS'
+FROM generate_series(1, {sales}) g;
+
+INSERT INTO product_sales (
+    id, sale_id, sale_created_at, product_id, quantity, base_price,
+    total_price
+)
+SELECT g, s.id, s.created_at, 1 + g % 500, 1 + g % 3, 10, 10 * (1 + g % 3)
+FROM generate_series(1, {sales} * 2) g
+JOIN sales s ON s.id = 1 + (g - 1) / 2;
+
+INSERT INTO payments (
+    id, sale_id, sale_created_at, payment_type_id, value, is_online
+)
+SELECT id, id, created_at, 1 + id % 4, total_amount, id % 2 = 0
+FROM sales;
+
+INSERT INTO delivery_sales (
+    id, sale_id, sale_created_at, status, delivery_fee, courier_fee,
+    delivery_time_minutes
+)
+SELECT id / 3, id, created_at, 'DELIVERED', 5, 3, 20 + id % 40
+FROM sales WHERE id % 3 = 0;
+"""
+
+
+def seed(engine: Engine, scale: int, months: int) -> int:
+    """
+    Create the schema's tables and fill them, indexing afterwards.
+
+    Args:
+        engine: Engine on the scratch schema
+        scale: Multiple of the generator's monthly volume
+        months: Months of sales, ending now
+
+    Returns:
+        Number of sales
+    """
+    sales = scale * GENERATOR_SALES_PER_MONTH * months
+    step = months * 30 * 86400 / sales
+
+    Base.metadata.create_all(bind=engine)
+    indexes = [
+        index
+        for table in Base.metadata.sorted_tables
+        for index in table.indexes
+    ]
+    with engine.begin() as conn:
+        # Bulk load without index maintenance, then build them once
+        for index in indexes:
+            index.drop(conn)
+        conn.exec_driver_sql(
+            SEED.format(sales=sales, step=f"{step:.3f}", months=months)
+        )
+        for index in indexes:
+            index.create(conn)
+    with engine.connect().execution_options(
+        isolation_level="AUTOCOMMIT"
+    ) as conn:
+        conn.exec_driver_sql("VACUUM ANALYZE")
+    return sales
+
+
+def analytics_methods(names: Optional[List[str]] = None) -> List[str]:
+    """Names of the cached AnalyticsService query methods to run."""
+    methods = sorted(
+        name
+        for name, member in vars(AnalyticsService).items()
+        if name.startswith("get_") and hasattr(member, "__wrapped__")
+    )
+    if names:
+        unknown = set(names) - set(methods)
+        if unknown:
+            raise SystemExit(f"Unknown methods: {', '.join(sorted(unknown))}")
+        methods = [name for name in methods if name in names]
+    return methods
+
+
+def capture_statements(engine: Engine, method_name: str) -> List[Statement]:
+    """
+    Run an analytics method with its default filters and record its SQL.
+
+    Args:
+        engine: Engine to run on
+        method_name: AnalyticsService method
+
+    Returns:
+        SELECT statements and their parameters
+    """
+    method = getattr(AnalyticsService, method_name).__wrapped__
+    statements: List[Statement] = []
+
+    def capture(conn, cursor, statement, parameters, context, many):
+        statements.append((statement, parameters))
+
+    session = sessionmaker(bind=engine)()
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        method(AnalyticsService(session))
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+        session.close()
+
+    return [
+        (statement, parameters)
+        for statement, parameters in statements
+        if statement.lstrip().upper().startswith(("SELECT", "WITH"))
+    ]
+
+
+def created_at_indexes(conn: Connection, access_method: str) -> List[str]:
+    """Indexes of an access method on sales leading with created_at."""
+    rows = conn.execute(
+        text(
+            "SELECT c.relname FROM pg_index x "
+            "JOIN pg_class c ON c.oid = x.indexrelid "
+            "JOIN pg_am am ON am.oid = c.relam "
+            "JOIN pg_attribute a ON a.attrelid = x.indrelid "
+            "AND a.attnum = x.indkey[0] "
+            "WHERE x.indrelid = to_regclass('sales') "
+            "AND NOT x.indisprimary AND am.amname = :access_method "
+            "AND a.attname = 'created_at'"
+        ),
+        {"access_method": access_method},
+    )
+    return [row[0] for row in rows]
+
+
+def index_size(conn: Connection, index: str) -> int:
+    """Size in bytes of an index, over all partitions."""
+    return conn.execute(
+        text(
+            "SELECT COALESCE(sum(pg_relation_size(relid)), 0) "
+            "FROM pg_partition_tree(to_regclass(:index))"
+        ),
+        {"index": index},
+    ).scalar()
+
+
+def _sales_access(plan: Dict[str, Any]) -> List[str]:
+    """Scan nodes reading sales (or its partitions) in a plan tree."""
+    paths = []
+    relation = plan.get("Relation Name", "")
+    if relation == "sales" or relation.startswith("sales_"):
+        node = plan["Node Type"]
+        paths.append(f"{node} {plan.get('Index Name', '')}".strip())
+    elif plan.get("Node Type") == "Bitmap Index Scan" and plan.get(
+        "Index Name", ""
+    ).startswith("idx_sales_"):
+        paths.append(f"Bitmap Index Scan {plan['Index Name']}")
+    for child in plan.get("Plans", []):
+        paths.extend(_sales_access(child))
+    return paths
+
+
+def measure(
+    conn: Connection, statement: str, parameters: Any, runs: int
+) -> Dict[str, Any]:
+    """
+    EXPLAIN ANALYZE a statement and keep its fastest run.
+
+    Args:
+        conn: Connection (inside the variant's transaction)
+        statement: SQL statement
+        parameters: Driver parameters
+        runs: Number of runs
+
+    Returns:
+        Execution time (ms), shared buffers and sales access paths
+    """
+    best: Optional[Dict[str, Any]] = None
+    for _ in range(runs):
+        result = conn.exec_driver_sql(
+            f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}",
+            parameters or (),
+        ).scalar()[0]
+        plan = result["Plan"]
+        sample = {
+            "ms": result["Execution Time"],
+            "buffers": plan.get("Shared Hit Blocks", 0)
+            + plan.get("Shared Read Blocks", 0),
+            "access": sorted(set(_sales_access(plan))),
+        }
+        if best is None or sample["ms"] < best["ms"]:
+            best = sample
+    return best
+
+
+def run_variant(
+    engine: Engine,
+    variant: str,
+    statements: Dict[str, List[Statement]],
+    runs: int,
+) -> Dict[Tuple[str, int], Dict[str, Any]]:
+    """
+    Measure every statement with one kind of created_at index dropped.
+
+    Args:
+        engine: Engine to run on
+        variant: "btree" (BRIN dropped) or "brin" (B-trees dropped)
+        statements: Statements by method name
+        runs: Runs per statement
+
+    Returns:
+        Measurements by (method name, statement position)
+    """
+    dropped_method = "brin" if variant == "btree" else "btree"
+    results = {}
+    with engine.connect() as conn:
+        transaction = conn.begin()
+        try:
+            for index in created_at_indexes(conn, dropped_method):
+                conn.exec_driver_sql(f'DROP INDEX "{index}"')
+            for method_name, method_statements in statements.items():
+                for position, (statement, parameters) in enumerate(
+                    method_statements
+                ):
+                    results[(method_name, position)] = measure(
+                        conn, statement, parameters, runs
+                    )
+        finally:
+            transaction.rollback()
+    return results
+
+
+def report(
+    statements: Dict[str, List[Statement]],
+    results: Dict[str, Dict[Tuple[str, int], Dict[str, Any]]],
+) -> None:
+    """Print the measurements side by side."""
+    print(
+        f"{'method':<40} {'#':>2} {'btree ms':>10} {'brin ms':>10} "
+        f"{'btree buf':>10} {'brin buf':>10}"
+    )
+    for method_name, method_statements in statements.items():
+        for position in range(len(method_statements)):
+            btree = results["btree"][(method_name, position)]
+            brin = results["brin"][(method_name, position)]
+            print(
+                f"{method_name:<40} {position:>2} {btree['ms']:>10.1f} "
+                f"{brin['ms']:>10.1f} {btree['buffers']:>10} "
+                f"{brin['buffers']:>10}"
+            )
+            if btree["access"] != brin["access"]:
+                print(f"{'':<43} btree: {', '.join(btree['access'])}")
+                print(f"{'':<43} brin:  {', '.join(brin['access'])}")
+
+
+def main() -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(
+        description="Compare B-tree and BRIN plans of the analytics queries"
+    )
+    parser.add_argument(
+        "--database-url",
+        default=os.getenv("BENCHMARK_POSTGRES_URL", settings.DATABASE_URL),
+        help="PostgreSQL database to create the scratch schema in",
+    )
+    parser.add_argument(
+        "--scale",
+        type=int,
+        default=10,
+        help="Multiple of the data generator's sales volume",
+    )
+    parser.add_argument(
+        "--months", type=int, default=12, help="Months of sales to seed"
+    )
+    parser.add_argument(
+        "--runs", type=int, default=3, help="Runs per statement (fastest)"
+    )
+    parser.add_argument(
+        "--methods",
+        default="",
+        help="Comma-separated AnalyticsService methods (default: all)",
+    )
+    parser.add_argument(
+        "--existing",
+        action="store_true",
+        help="Benchmark the database's own tables instead of seeding",
+    )
+    parser.add_argument(
+        "--keep",
+        action="store_true",
+        help="Keep the scratch schema for another run",
+    )
+    args = parser.parse_args()
+
+    # Raw queries only: rollups would answer most methods without sales
+    settings.ANALYTICS_ROLLUPS_ENABLED = False
+    methods = analytics_methods(
+        [name for name in args.methods.split(",") if name]
+    )
+
+    admin = create_engine(args.database_url)
+    if args.existing:
+        engine = admin
+    else:
+        with admin.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        engine = create_engine(
+            args.database_url,
+            connect_args={"options": f"-csearch_path={SCHEMA}"},
+        )
+        sales = seed(engine, args.scale, args.months)
+        print(f"Seeded {sales:,} sales over {args.months} months")
+
+    try:
+        with engine.connect() as conn:
+            for access_method in ("btree", "brin"):
+                for index in created_at_indexes(conn, access_method):
+                    size = index_size(conn, index)
+                    print(f"{index} ({access_method}): {size / 1024:,.0f} KB")
+        print()
+
+        statements = {
+            name: capture_statements(engine, name) for name in methods
+        }
+        results = {
+            variant: run_variant(engine, variant, statements, args.runs)
+            for variant in VARIANTS
+        }
+        report(statements, results)
+    finally:
+        engine.dispose()
+        if not args.existing and not args.keep:
+            with admin.begin() as conn:
+                conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        admin.dispose()
+
+
+if __name__ == "__main__":
+    main()
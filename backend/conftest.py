@@ -2,6 +2,14 @@
 Pytest configuration.
 """
 
+import os
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+# Disable background jobs started by the application lifespan
+os.environ.setdefault("TESTING", "true")
+
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
@@ -9,6 +17,8 @@ from fastapi.testclient import TestClient
 
 from app.db.base import Base
 from app.main import app
+from app.services.analytics import AnalyticsService
+from app.services.cache import data_versions, local_cache
 
 # Import all models to ensure tables are created
 from app.models import (
@@ -32,6 +42,16 @@ from app.models import (
 )
 
 
+@pytest.fixture(autouse=True)
+def clear_local_cache():
+    """Start every test with an empty in-process cache."""
+    local_cache.clear()
+    data_versions.clear()
+    yield
+    local_cache.clear()
+    data_versions.clear()
+
+
 @pytest.fixture(scope="session")
 def test_db_url():
     """Test database URL."""
@@ -78,3 +98,80 @@ def client(db_session):
         yield test_client
 
     app.dependency_overrides.clear()
+
+
+# First day of the seeded sales (see sales_db)
+SALES_BASE_DATE = datetime(2024, 3, 1, 8, 0, 0)
+
+
+@pytest.fixture
+def sales_db(db_session, request):
+    """
+    Session with two stores, two channels and 40 days of mixed-status sales.
+
+    Parametrize indirectly with the number of sales (default 120).
+    """
+    count = getattr(request, "param", 120)
+    db_session.add_all(
+        [
+            Store(id=1, name="Loja 1"),
+            Store(id=2, name="Loja 2"),
+            Channel(id=1, name="Presencial", type="P"),
+            Channel(id=2, name="iFood", type="D"),
+        ]
+    )
+    db_session.add_all(
+        [
+            Sale(
+                id=i,
+                store_id=1 if i % 3 else 2,
+                channel_id=1 if i % 2 else 2,
+                total_amount=Decimal(str(20 + (i % 7) * 5)),
+                total_amount_items=Decimal(str(20 + (i % 7) * 5)),
+                created_at=SALES_BASE_DATE
+                + timedelta(days=i % 40, hours=i % 13, minutes=i % 60),
+                sale_status_desc="CANCELLED" if i % 6 == 0 else "COMPLETED",
+            )
+            for i in range(1, count + 1)
+        ]
+    )
+    db_session.flush()
+    return db_session
+
+
+def analytics_queries(**filters):
+    """Summary, revenue and channel queries for a filter set, by name."""
+    channel_filters = {k: v for k, v in filters.items() if k != "channel_id"}
+    queries = {
+        "summary": ("get_metrics_summary", dict(filters)),
+        "revenue_day": ("get_revenue", dict(filters)),
+        "revenue_week": ("get_revenue", {**filters, "group_by": "week"}),
+        "revenue_month": ("get_revenue", {**filters, "group_by": "month"}),
+    }
+    if "channel_id" not in filters:
+        # Channel performance takes no channel filter: separate filter set
+        queries["channels"] = ("get_channel_performance", channel_filters)
+    return queries
+
+
+def direct_results(db, queries):
+    """Results of calling each service method on its own, uncached."""
+    service = AnalyticsService(db)
+    with patch("app.services.cache.redis_client", None):
+        return {
+            key: getattr(AnalyticsService, method_name).__wrapped__(
+                service, **kwargs
+            )
+            for key, (method_name, kwargs) in queries.items()
+        }
+
+
+def rounded(value):
+    """Round floats recursively so two code paths compare equal."""
+    if isinstance(value, float):
+        return round(value, 6)
+    if isinstance(value, dict):
+        return {k: rounded(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [rounded(v) for v in value]
+    return value
@@ -0,0 +1,332 @@
+"""
+Tests for the analytics batch endpoint and service.
+"""
+
+import asyncio
+import json
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.v1.analytics import get_analytics_batch_service
+from app.config import settings
+from app.core.exceptions import ValidationError
+from app.main import app
+from app.models.channel import Channel
+from app.models.sale import Sale
+from app.models.store import Store
+from app.schemas.analytics import BatchQuery
+from app.services.analytics import AnalyticsService
+from app.services.analytics_batch import (
+    ANALYTICS_METRICS,
+    AnalyticsBatchService,
+    resolve_query,
+)
+from app.services.cache import make_entry, read_entry
+from app.services.cache_codec import decode
+
+
+@pytest.fixture
+def batch_db(db_session):
+    """Session with a store, a channel and a few sales."""
+    db_session.add_all(
+        [
+            Store(id=1, name="Loja 1"),
+            Channel(id=1, name="Presencial", type="P"),
+        ]
+    )
+    db_session.add_all(
+        [
+            Sale(
+                id=i,
+                store_id=1,
+                channel_id=1,
+                total_amount=Decimal("10.00") * i,
+                total_amount_items=Decimal("10.00") * i,
+                created_at=datetime(2024, 1, i, 12, 0),
+                sale_status_desc="COMPLETED",
+            )
+            for i in range(1, 4)
+        ]
+    )
+    db_session.flush()
+    return db_session
+
+
+@pytest.fixture
+def batch_service(batch_db):
+    """Batch service sharing the test session (one query at a time)."""
+
+    @contextmanager
+    def shared_session():
+        yield batch_db
+
+    return AnalyticsBatchService(
+        session_factory=shared_session, max_concurrency=1
+    )
+
+
+def _run(service, *queries):
+    """Execute queries given as (metric, params) pairs."""
+    return asyncio.run(
+        service.execute(
+            [
+                BatchQuery(id=str(i), metric=metric, params=params)
+                for i, (metric, params) in enumerate(queries)
+            ]
+        )
+    )
+
+
+def test_metrics_cover_cached_service_methods():
+    """Every cached AnalyticsService method is exposed as a metric."""
+    assert ANALYTICS_METRICS["revenue"] == "get_revenue"
+    assert ANALYTICS_METRICS["metrics_summary"] == "get_metrics_summary"
+    assert "period_expr" not in ANALYTICS_METRICS
+
+
+def test_resolve_query_parses_and_coerces_params():
+    """Dates are parsed and numeric params coerced to their types."""
+    method, kwargs = resolve_query(
+        "top_products",
+        {"start_date": "2024-01-01", "store_id": "2", "limit": 5},
+    )
+    assert method == "get_top_products"
+    assert kwargs == {
+        "start_date": datetime(2024, 1, 1),
+        "store_id": 2,
+        "limit": 5,
+    }
+
+
+def test_resolve_query_accepts_relative_range():
+    """A 'range' token is resolved into absolute dates."""
+    _method, kwargs = resolve_query("revenue", {"range": "prev_month"})
+    start, end = kwargs["start_date"], kwargs["end_date"]
+    assert (start.day, start.hour) == (1, 0)
+    assert (end + timedelta(microseconds=1)).day == 1
+
+
+@pytest.mark.parametrize(
+    "metric, params",
+    [
+        ("unknown", {}),
+        ("revenue", {"bogus": 1}),
+        ("revenue", {"start_date": "not-a-date"}),
+        ("top_products", {"limit": "many"}),
+        ("revenue", {"range": "last_century"}),
+    ],
+)
+def test_resolve_query_rejects_invalid_specs(metric, params):
+    """Invalid metrics and params raise validation errors."""
+    with pytest.raises(ValidationError):
+        resolve_query(metric, params)
+
+
+def test_execute_matches_service_results(batch_service, batch_db):
+    """Batch results equal direct service calls, in request order."""
+    results = _run(
+        batch_service,
+        ("metrics_summary", {"store_id": 1}),
+        ("revenue", {"start_date": "2024-01-01", "end_date": "2024-01-31"}),
+    )
+
+    direct = AnalyticsService(batch_db)
+    assert [r["id"] for r in results] == ["0", "1"]
+    assert all(r["status"] == "ok" and not r["cached"] for r in results)
+    assert results[0]["data"] == direct.get_metrics_summary(store_id=1)
+    assert results[1]["data"] == direct.get_revenue(
+        start_date=datetime(2024, 1, 1), end_date=datetime(2024, 1, 31)
+    )
+
+
+def test_execute_reports_per_item_errors(batch_service):
+    """A failing item does not fail the rest of the batch."""
+    results = _run(
+        batch_service,
+        ("unknown", {}),
+        ("metrics_summary", {}),
+    )
+
+    assert results[0]["status"] == "error"
+    assert results[0]["error"]["type"] == "ValidationError"
+    assert results[0]["error"]["status_code"] == 400
+    assert results[1]["status"] == "ok"
+    assert results[1]["data"]["sales_count"] == 3
+
+
+def test_execute_deduplicates_identical_queries(batch_service):
+    """Identical queries are computed once."""
+    with patch(
+        "app.services.analytics_batch.compute_metric",
+        return_value={"sales_count": 0},
+    ) as compute:
+        results = _run(
+            batch_service,
+            ("metrics_summary", {"store_id": 1}),
+            ("metrics_summary", {"store_id": "1"}),
+        )
+
+    assert compute.call_count == 1
+    assert results[0]["data"] == results[1]["data"]
+
+
+def _async_redis(mget):
+    """asyncio Redis mock answering MGET with a function of the keys."""
+    client = MagicMock()
+    client.mget = AsyncMock(side_effect=mget)
+    client.set = AsyncMock(return_value=True)
+    client.eval = AsyncMock(return_value=1)
+    client.pipeline.return_value.execute = AsyncMock(return_value=[])
+    return client
+
+
+def test_execute_uses_one_mget_and_pipelined_sets(batch_service):
+    """Lookups go through one MGET; misses are written back in a pipeline."""
+    summary_key = AnalyticsService.get_metrics_summary.cache_key(None)
+    cached = {"sales_count": 42}
+    mock_redis = _async_redis(
+        lambda keys: [
+            json.dumps(cached) if key == summary_key else None
+            for key in keys
+        ]
+    )
+    sync_redis = MagicMock()
+
+    with patch("app.services.cache.redis_client", sync_redis), patch(
+        "app.services.cache.async_redis_client", return_value=mock_redis
+    ):
+        results = _run(
+            batch_service,
+            ("metrics_summary", {}),
+            ("channel_performance", {}),
+        )
+
+    # One lookup for the batch, then the miss is checked under its lock
+    lookup, recheck = mock_redis.mget.await_args_list
+    assert len(lookup.args[0]) == 2
+    assert recheck.args[0] == [
+        AnalyticsService.get_channel_performance.cache_key(None)
+    ]
+    # Nothing blocks the event loop on the sync client
+    sync_redis.mget.assert_not_called()
+    sync_redis.pipeline.assert_not_called()
+    assert results[0] == {
+        "id": "0",
+        "metric": "metrics_summary",
+        "status": "ok",
+        "cached": True,
+        "data": cached,
+    }
+    assert results[1]["cached"] is False
+    pipe = mock_redis.pipeline.return_value
+    pipe.setex.assert_called_once()
+    pipe.execute.assert_awaited_once()
+
+
+def test_execute_computes_concurrent_batches_once(batch_service):
+    """Concurrent batches planning the same misses share one computation."""
+
+    async def run_concurrently():
+        queries = [BatchQuery(id="0", metric="metrics_summary", params={})]
+        return await asyncio.gather(
+            batch_service.execute(queries), batch_service.execute(queries)
+        )
+
+    with patch(
+        "app.services.analytics_batch.compute_metric",
+        return_value={"sales_count": 7},
+    ) as compute:
+        first, second = asyncio.run(run_concurrently())
+
+    assert compute.call_count == 1
+    assert first[0]["data"] == second[0]["data"] == {"sales_count": 7}
+
+
+def test_execute_waits_for_locked_misses(batch_service):
+    """A miss locked by another worker is read once that worker fills it."""
+    entry, _ttl = make_entry({"sales_count": 5}, 300)
+    lookups = []
+
+    def mget(keys):
+        lookups.append(keys)
+        # Filled by the lock holder after the batch lookup
+        return [None if len(lookups) == 1 else json.dumps(entry)] * len(keys)
+
+    mock_redis = _async_redis(mget)
+    mock_redis.set = AsyncMock(return_value=False)
+
+    with patch(
+        "app.services.cache.async_redis_client", return_value=mock_redis
+    ), patch(
+        "app.services.analytics_batch.compute_metric"
+    ) as compute, patch.object(
+        settings, "CACHE_LOCK_POLL_SECONDS", 0
+    ):
+        results = _run(batch_service, ("metrics_summary", {}))
+
+    compute.assert_not_called()
+    mock_redis.eval.assert_not_called()
+    assert results[0]["cached"] is True
+    assert results[0]["data"] == {"sales_count": 5}
+
+
+def test_execute_serves_stale_entries_and_refreshes(batch_service):
+    """Stale entries are returned and recomputed in the background."""
+    summary_key = AnalyticsService.get_metrics_summary.cache_key(None)
+    entry, _ttl = make_entry({"sales_count": 1}, 300)
+    entry["fresh_until"] = 0
+    mock_redis = MagicMock()
+    mock_redis.set.return_value = True
+    executor = MagicMock()
+    executor.submit.side_effect = lambda fn: fn()
+
+    with patch("app.services.cache.redis_client", mock_redis), patch(
+        "app.services.cache.async_redis_client",
+        return_value=_async_redis(lambda keys: [json.dumps(entry)]),
+    ), patch("app.services.cache.refresh_executor", executor):
+        results = _run(batch_service, ("metrics_summary", {}))
+
+    assert results[0]["cached"] is True
+    assert results[0]["data"] == {"sales_count": 1}
+    key, _ttl, stored = mock_redis.setex.call_args[0]
+    assert key == summary_key
+    assert read_entry(decode(stored))[0]["sales_count"] == 3
+
+
+def test_batch_endpoint(batch_service):
+    """The endpoint returns per-item results and a failure count."""
+    app.dependency_overrides[get_analytics_batch_service] = (
+        lambda: batch_service
+    )
+    try:
+        response = TestClient(app).post(
+            "/api/v1/analytics/batch",
+            json={
+                "queries": [
+                    {"id": "kpis", "metric": "metrics_summary"},
+                    {"id": "bad", "metric": "nope"},
+                ]
+            },
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["count"] == 2
+    assert body["failed"] == 1
+    assert body["results"][0]["id"] == "kpis"
+    assert body["results"][0]["data"]["sales_count"] == 3
+
+
+def test_batch_endpoint_rejects_empty_batch():
+    """An empty batch is a request validation error."""
+    response = TestClient(app).post(
+        "/api/v1/analytics/batch", json={"queries": []}
+    )
+    assert response.status_code == 422
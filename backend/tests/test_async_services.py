@@ -0,0 +1,271 @@
+"""
+Tests for the async database path.
+"""
+
+import asyncio
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.api.v1.analytics import get_analytics_service
+from app.core.executor import run_db
+from app.db.base import Base
+from app.db.session import (
+    create_async_session_factory,
+    get_async_database_url,
+)
+from app.models.channel import Channel
+from app.models.sale import Sale
+from app.models.store import Store
+from app.schemas.dashboard import DashboardConfig, DashboardCreate
+from app.services.analytics import AnalyticsService
+from app.services.analytics_batch import AnalyticsBatchService
+from app.services.async_services import (
+    AsyncAnalyticsService,
+    AsyncDashboardService,
+    AsyncSalesService,
+)
+from app.schemas.analytics import BatchQuery
+from app.services.cache import data_versions, make_entry
+from app.services.day_partials import PARTIAL_PREFIX
+
+pytest.importorskip("aiosqlite")
+
+
+async def _seeded_session_factory():
+    """In-memory async SQLite database with a few sales."""
+    factory = create_async_session_factory("sqlite+aiosqlite://")
+    async with factory.kw["bind"].begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with factory() as session:
+        session.add_all(
+            [
+                Store(id=1, name="Loja 1"),
+                Channel(id=1, name="Presencial", type="P"),
+            ]
+        )
+        session.add_all(
+            [
+                Sale(
+                    id=i,
+                    store_id=1,
+                    channel_id=1,
+                    total_amount=Decimal("25.00"),
+                    total_amount_items=Decimal("25.00"),
+                    created_at=datetime(2024, 1, 1 + i, 12, 0),
+                    sale_status_desc="COMPLETED",
+                )
+                for i in range(1, 6)
+            ]
+        )
+        await session.commit()
+    return factory
+
+
+def _loop_guarded_redis():
+    """Sync Redis mock recording the commands sent on an event loop."""
+    client = MagicMock()
+    on_loop = []
+
+    def guard(name):
+        def command(*args, **kwargs):
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                pass
+            else:
+                on_loop.append(name)
+            return MagicMock()
+        return command
+
+    for name in ("get", "mget", "set", "setex", "hgetall", "pipeline"):
+        getattr(client, name).side_effect = guard(name)
+    return client, on_loop
+
+
+def _async_redis():
+    """asyncio Redis mock missing every key."""
+    client = MagicMock()
+    client.mget = AsyncMock(side_effect=lambda keys: [None] * len(keys))
+    client.hgetall = AsyncMock(return_value={})
+    client.pipeline.return_value.execute = AsyncMock(return_value=[])
+    return client
+
+
+def test_async_database_url():
+    """Sync URLs map to their async drivers."""
+    assert get_async_database_url(
+        "postgresql://user:pw@host:5432/db"
+    ) == "postgresql+asyncpg://user:pw@host:5432/db"
+    assert get_async_database_url(
+        "sqlite:///./test.db"
+    ) == "sqlite+aiosqlite:///./test.db"
+
+
+def test_async_services_run_service_methods():
+    """Async services await the sync service logic on an AsyncSession."""
+
+    async def scenario():
+        factory = await _seeded_session_factory()
+        async with factory() as session:
+            analytics = AsyncAnalyticsService(session)
+            summary = await analytics.get_metrics_summary(store_id=1)
+            revenue = await run_db(analytics.get_revenue, store_id=1)
+            sales = await AsyncSalesService(session).get_sales_count()
+        await factory.kw["bind"].dispose()
+        return summary, revenue, sales
+
+    summary, revenue, sales = asyncio.run(scenario())
+    assert summary["sales_count"] == 5
+    assert summary["total_revenue"] == 125.0
+    assert len(revenue) == 5
+    assert sales == 5
+
+
+def test_concurrent_identical_misses_compute_once():
+    """Concurrent misses of a key share one computation, off the loop."""
+    original = AnalyticsService.get_metrics_summary.__wrapped__
+
+    async def scenario():
+        factory = await _seeded_session_factory()
+        async with factory() as first, factory() as second:
+            calls = [
+                AsyncAnalyticsService(session).get_metrics_summary(
+                    store_id=1
+                )
+                for session in (first, second)
+            ]
+            results = await asyncio.wait_for(asyncio.gather(*calls), 5)
+        await factory.kw["bind"].dispose()
+        return results
+
+    with patch(
+        "app.services.async_services.aget_cache_many",
+        AsyncMock(return_value=[None]),
+    ), patch(
+        "app.services.async_services.aset_cache_many", AsyncMock()
+    ) as stored, patch.object(
+        AnalyticsService.get_metrics_summary,
+        "__wrapped__",
+        side_effect=original,
+    ) as compute:
+        first, second = asyncio.run(scenario())
+
+    assert compute.call_count == 1
+    assert first == second
+    assert first["sales_count"] == 5
+    stored.assert_awaited_once()
+    key, _entry, _ttl, tags = stored.await_args[0][0][0]
+    assert key == AnalyticsService.get_metrics_summary.cache_key(
+        None, store_id=1
+    )
+    assert "store:1" in tags
+
+
+def test_cached_result_skips_database():
+    """A cached result is returned without running the method."""
+    entry, _ttl = make_entry({"sales_count": 42}, 300)
+
+    async def scenario():
+        return await AsyncAnalyticsService(db=None).get_metrics_summary()
+
+    with patch(
+        "app.services.async_services.aget_cache_many",
+        AsyncMock(return_value=[entry]),
+    ):
+        assert asyncio.run(scenario()) == {"sales_count": 42}
+
+
+def test_async_dashboard_service_commits():
+    """Writes through the async dashboard service are committed."""
+
+    async def scenario():
+        factory = await _seeded_session_factory()
+        async with factory() as session:
+            created = await AsyncDashboardService(session).create_dashboard(
+                DashboardCreate(
+                    name="Async", config=DashboardConfig(widgets=[])
+                )
+            )
+        async with factory() as session:
+            found = await AsyncDashboardService(session).get_dashboard(
+                created.id
+            )
+        await factory.kw["bind"].dispose()
+        return created, found
+
+    created, found = asyncio.run(scenario())
+    assert created.name == "Async"
+    assert found is not None and found.id == created.id
+
+
+def test_async_service_hides_private_members():
+    """Only public service methods are exposed."""
+    service = AsyncAnalyticsService(db=None)
+    with pytest.raises(AttributeError):
+        service._period_expr
+    with pytest.raises(AttributeError):
+        service.missing_method
+
+
+def test_dependency_falls_back_to_sync_service(db_session):
+    """Without an async session the sync service is used."""
+    service = get_analytics_service(db=db_session, async_db=None)
+    assert isinstance(service, AnalyticsService)
+
+
+@pytest.mark.parametrize("path", ["adapter", "batch"])
+def test_day_partials_stay_off_sync_client(path):
+    """Composing from day partials sends nothing to the sync client."""
+    filters = {
+        "start_date": datetime(2024, 1, 1),
+        "end_date": datetime(2024, 1, 10, 23, 59, 59, 999999),
+        "store_id": 1,
+    }
+
+    async def scenario():
+        factory = await _seeded_session_factory()
+        if path == "adapter":
+            async with factory() as session:
+                summary = await AsyncAnalyticsService(
+                    session
+                ).get_metrics_summary(**filters)
+        else:
+            batch = AnalyticsBatchService(async_session_factory=factory)
+            query = BatchQuery(
+                metric="metrics_summary",
+                params={
+                    "start_date": "2024-01-01",
+                    "end_date": "2024-01-10",
+                    "store_id": 1,
+                },
+            )
+            summary = (await batch.execute([query]))[0]["data"]
+        await factory.kw["bind"].dispose()
+        return summary
+
+    sync_redis, on_loop = _loop_guarded_redis()
+    async_redis = _async_redis()
+    data_versions.clear()
+    with patch("app.services.cache.redis_client", sync_redis), patch(
+        "app.services.cache.async_redis_client", return_value=async_redis
+    ):
+        summary = asyncio.run(scenario())
+    data_versions.clear()
+
+    assert summary["sales_count"] == 5
+    assert on_loop == []
+    # Partials read and the scanned days written through asyncio Redis
+    async_redis.hgetall.assert_awaited()
+    read = [key for call in async_redis.mget.await_args_list
+            for key in call[0][0]]
+    written = [
+        call[0][0]
+        for call in async_redis.pipeline.return_value.setex.call_args_list
+    ]
+    partials = [key for key in read if f":{PARTIAL_PREFIX}:" in key]
+    assert len(partials) >= 9
+    assert [key for key in written if key in partials] == partials
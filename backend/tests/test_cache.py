@@ -14,6 +14,8 @@ def test_get_cache_status(client):
     # When Redis is available, it returns status/connected_clients/etc
     # When Redis is not available, it returns status="disconnected" and message
     assert "status" in data
+    assert "hit_ratio" in data["l1"]
+    assert "hit_ratio" in data["l2"]
 
 
 def test_clear_cache(client):
@@ -36,6 +38,15 @@ def test_invalidate_cache_pattern(client):
     assert "keys" in data["message"].lower() or "pattern" in data["message"].lower()
 
 
+def test_invalidate_cache_tag(client):
+    """Test invalidate cache tag endpoint."""
+    response = client.post("/api/v1/cache/tags/store:1/invalidate")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["tag"] == "store:1"
+    assert data["deleted_keys"] == 0
+
+
 def test_invalidate_cache_pattern_with_special_chars(client):
     """Test invalidate cache pattern with special characters."""
     response = client.post("/api/v1/cache/invalidate/test*pattern")
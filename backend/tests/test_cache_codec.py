@@ -0,0 +1,94 @@
+"""
+Tests for the cached value codec.
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from app.services import cache_codec
+from app.services.cache_codec import (
+    HEADER_SIZE,
+    JSON,
+    LZ4,
+    MSGPACK,
+    NONE,
+    ORJSON,
+    ZLIB,
+    CodecError,
+    decode,
+    encode,
+)
+
+SMALL = {"total_revenue": 10.5, "sales_count": 3, "first_sale": None}
+LARGE = [
+    {"store_id": i, "month": f"2024-{i % 12 + 1:02d}", "revenue": i * 1.5}
+    for i in range(500)
+]
+
+AVAILABLE_SERIALIZERS = [
+    codec_id
+    for codec_id in (JSON, ORJSON, MSGPACK)
+    if cache_codec.SERIALIZERS[codec_id][0] is not None
+]
+AVAILABLE_COMPRESSIONS = [
+    codec_id
+    for codec_id in (ZLIB, LZ4)
+    if cache_codec.COMPRESSORS[codec_id][0] is not None
+]
+
+
+@pytest.mark.parametrize("serializer", AVAILABLE_SERIALIZERS)
+@pytest.mark.parametrize("compression", AVAILABLE_COMPRESSIONS)
+def test_round_trip(serializer, compression):
+    """Every installed codec combination decodes what it encodes."""
+    for value in (SMALL, LARGE):
+        assert decode(encode(value, serializer, compression)) == value
+
+
+def test_header_and_compression_threshold():
+    """Only payloads above the threshold are compressed."""
+    small = encode(SMALL, JSON, ZLIB)
+    assert small[:HEADER_SIZE] == bytes((0, 1, JSON, NONE))
+    assert small[HEADER_SIZE:] == json.dumps(
+        SMALL, separators=(",", ":")
+    ).encode()
+
+    large = encode(LARGE, JSON, ZLIB)
+    assert large[3] == ZLIB
+    assert len(large) < len(json.dumps(LARGE)) / 3
+
+
+def test_legacy_json_is_readable():
+    """Entries written as plain JSON text stay readable."""
+    assert decode(json.dumps(SMALL)) == SMALL
+    assert decode(json.dumps(LARGE).encode()) == LARGE
+
+
+def test_default_codec_keeps_json_semantics():
+    """Non-string keys come back as strings, as with json."""
+    assert decode(encode({1: "a", "b": [1, 2]})) == {"1": "a", "b": [1, 2]}
+
+
+def test_unknown_frames_are_rejected():
+    """Unknown versions and codecs raise CodecError."""
+    with pytest.raises(CodecError):
+        decode(bytes((0, 99, JSON, NONE)) + b"{}")
+    with pytest.raises(CodecError):
+        decode(bytes((0, 1, 42, NONE)) + b"{}")
+
+    frame = encode(LARGE, JSON, ZLIB)
+    with patch.dict(cache_codec.COMPRESSORS, {ZLIB: (None, None)}):
+        with pytest.raises(CodecError):
+            decode(frame)
+
+
+def test_configured_codec_must_be_installed():
+    """Explicit codec settings are validated."""
+    with patch.object(cache_codec.settings, "CACHE_SERIALIZER", "bogus"):
+        with pytest.raises(ValueError):
+            encode(SMALL)
+
+    with patch.object(cache_codec.settings, "CACHE_SERIALIZER", "json"):
+        assert encode(SMALL)[2] == JSON
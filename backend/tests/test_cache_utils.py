@@ -2,12 +2,40 @@
 Tests for cache utility functions (not endpoints).
 """
 
+import inspect
+import threading
+from contextlib import contextmanager
+import time
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 import json
+from datetime import datetime, timedelta, timezone
 
+from app.config import settings
 from app.services.cache import (
+    INVALIDATION_CHANNEL,
+    INVALIDATIONS,
+    bump_data_versions,
+    data_versions_key,
+    result_ttl,
+    touches_recent_data,
+    expand_tags,
+    invalidate_tags,
+    set_cache_many,
+    tag_key,
+    RELEASE_LOCK_SCRIPT,
+    InvalidationListener,
+    LocalCache,
+    apply_invalidation,
+    build_result_cache_key,
     cache_key,
+    compute_once,
+    detached_call,
+    get_cache_many,
+    local_cache,
+    make_entry,
+    read_entry,
+    single_flight,
     get_cache,
     set_cache,
     invalidate_cache,
@@ -15,6 +43,7 @@ from app.services.cache import (
     cache_result,
     redis_client,
 )
+from app.services.cache_codec import decode
 
 
 class TestCacheKey:
@@ -57,6 +86,72 @@ class TestCacheKey:
         assert "_" in key
 
 
+class TestResultCacheKey:
+    """Tests for canonical cache_result keys."""
+
+    @staticmethod
+    @cache_result(prefix="revenue", ttl=300)
+    def get_revenue(self, start_date=None, end_date=None, group_by="day"):
+        return []
+
+    def test_positional_and_keyword_calls_share_key(self):
+        """Arguments are bound to the signature before hashing."""
+        start, end = datetime(2024, 1, 1), datetime(2024, 1, 31)
+        key = self.get_revenue.cache_key
+        assert key(None, start, end) == key(
+            None, end_date=end, start_date=start
+        )
+
+    def test_defaults_and_none_are_canonical(self):
+        """Omitted defaults equal explicit ones; None is left out."""
+        key = self.get_revenue.cache_key
+        assert key(None) == key(None, group_by="day")
+        assert key(None) == key(None, start_date=None)
+        assert key(None) != key(None, group_by="month")
+
+    def test_datetimes_are_normalized(self):
+        """Aware datetimes key like their naive UTC equivalent."""
+        key = self.get_revenue.cache_key
+        aware = datetime(
+            2024, 1, 1, 3, tzinfo=timezone(timedelta(hours=3))
+        )
+        assert key(None, aware) == key(None, datetime(2024, 1, 1, 0))
+        assert key(None, datetime(2024, 1, 1)) != key(
+            None, datetime(2024, 1, 1, 0, 0, 1)
+        )
+
+    def test_key_is_versioned_and_fixed_length(self):
+        """Keys carry the schema version and a fixed-length digest."""
+        key = self.get_revenue.cache_key(None, datetime(2024, 1, 1))
+        version, prefix, digest = key.split(":")
+        assert version == "v1"
+        assert prefix == "revenue"
+        assert len(digest) == 20
+
+        with patch("app.services.cache.settings.CACHE_SCHEMA_VERSION", 2):
+            assert self.get_revenue.cache_key(
+                None, datetime(2024, 1, 1)
+            ) == f"v2:revenue:{digest}"
+
+    def test_invalid_arguments_raise(self):
+        """Arguments not matching the signature are rejected."""
+        signature = inspect.signature(lambda self, a: None)
+        with pytest.raises(TypeError):
+            build_result_cache_key(signature, "p", (None,), {"b": 1})
+
+    def test_decorator_uses_canonical_key(self):
+        """The decorator stores under the key its cache_key reports."""
+        mock_client = MagicMock()
+        mock_client.get.return_value = None
+        with patch("app.services.cache.redis_client", mock_client):
+            self.get_revenue(None, datetime(2024, 1, 1))
+
+        stored_key = mock_client.setex.call_args[0][0]
+        assert stored_key == self.get_revenue.cache_key(
+            None, start_date=datetime(2024, 1, 1), group_by="day"
+        )
+
+
 class TestCacheFunctions:
     """Tests for cache utility functions."""
 
@@ -66,9 +161,7 @@ class TestCacheFunctions:
         mock_client = MagicMock()
         mock_client.get.return_value = None
         mock_client.setex.return_value = True
-        mock_client.keys.return_value = []
-        mock_client.delete.return_value = 0
-        mock_client.flushdb.return_value = True
+        mock_client.scan_iter.return_value = iter([])
         mock_client.ping.return_value = True
         return mock_client
 
@@ -118,7 +211,7 @@ class TestCacheFunctions:
             call_args = mock_redis_client.setex.call_args
             assert call_args[0][0] == "test_key"
             assert call_args[0][1] == 300
-            assert json.loads(call_args[0][2]) == value
+            assert decode(call_args[0][2]) == value
 
     def test_set_cache_error(self, mock_redis_client):
         """Test set_cache when Redis raises an error."""
@@ -136,23 +229,31 @@ class TestCacheFunctions:
     def test_invalidate_cache_no_keys(self, mock_redis_client):
         """Test invalidate_cache when no keys match pattern."""
         with patch("app.services.cache.redis_client", mock_redis_client):
-            mock_redis_client.keys.return_value = []
+            mock_redis_client.scan_iter.return_value = iter([])
             result = invalidate_cache("pattern_*")
             assert result == 0
+            mock_redis_client.pipeline.assert_not_called()
 
     def test_invalidate_cache_success(self, mock_redis_client):
-        """Test invalidate_cache with matching keys."""
+        """Test invalidate_cache scans and unlinks matching keys."""
         with patch("app.services.cache.redis_client", mock_redis_client):
-            mock_redis_client.keys.return_value = ["key1", "key2", "key3"]
-            mock_redis_client.delete.return_value = 3
+            mock_redis_client.scan_iter.return_value = iter(
+                ["key1", "key2", "key3"]
+            )
+            pipe = mock_redis_client.pipeline.return_value
+            pipe.execute.return_value = [3]
             result = invalidate_cache("pattern_*")
             assert result == 3
-            mock_redis_client.delete.assert_called_once_with("key1", "key2", "key3")
+            mock_redis_client.scan_iter.assert_called_once_with(
+                match="pattern_*", count=1000
+            )
+            pipe.unlink.assert_called_once_with("key1", "key2", "key3")
+            mock_redis_client.keys.assert_not_called()
 
     def test_invalidate_cache_error(self, mock_redis_client):
         """Test invalidate_cache when Redis raises an error."""
         with patch("app.services.cache.redis_client", mock_redis_client):
-            mock_redis_client.keys.side_effect = Exception("Redis error")
+            mock_redis_client.scan_iter.side_effect = Exception("Redis error")
             result = invalidate_cache("pattern_*")
             assert result == 0
 
@@ -163,16 +264,34 @@ class TestCacheFunctions:
             assert result is False
 
     def test_clear_all_cache_success(self, mock_redis_client):
-        """Test clear_all_cache with successful operation."""
+        """Test clear_all_cache deletes results and keeps bookkeeping."""
+        mock_redis_client.scan_iter.return_value = iter(
+            [
+                b"v1:revenue:abc",
+                b"v1:tag:store:1",
+                b"v1:data_versions",
+                b"v1:dashboard_views",
+                b"v1:day_partials:def",
+            ]
+        )
+        pipe = mock_redis_client.pipeline.return_value
+        pipe.execute.return_value = [2]
         with patch("app.services.cache.redis_client", mock_redis_client):
-            result = clear_all_cache()
-            assert result is True
-            mock_redis_client.flushdb.assert_called_once()
+            with patch(
+                "app.services.cache.settings.CACHE_SCHEMA_VERSION", 1
+            ):
+                result = clear_all_cache()
+        assert result is True
+        mock_redis_client.flushdb.assert_not_called()
+        assert mock_redis_client.scan_iter.call_args[1]["match"] == "v1:*"
+        pipe.unlink.assert_called_once_with(
+            b"v1:revenue:abc", b"v1:day_partials:def"
+        )
 
     def test_clear_all_cache_error(self, mock_redis_client):
         """Test clear_all_cache when Redis raises an error."""
         with patch("app.services.cache.redis_client", mock_redis_client):
-            mock_redis_client.flushdb.side_effect = Exception("Redis error")
+            mock_redis_client.scan_iter.side_effect = Exception("Redis error")
             result = clear_all_cache()
             assert result is False
 
@@ -271,3 +390,521 @@ class TestCacheResultDecorator:
             assert result1["call_count"] == 1
             assert result2["call_count"] == 2  # Called again because no cache
 
+
+class TestSingleFlight:
+    """Tests for stampede protection on cache misses."""
+
+    def test_concurrent_misses_compute_once(self):
+        """Concurrent callers in one process share one computation."""
+        release = threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            release.wait(5)
+            return {"value": 42}
+
+        results = []
+        with patch("app.services.cache.redis_client", None):
+            threads = [
+                threading.Thread(
+                    target=lambda: results.append(
+                        compute_once("sf_key", 60, compute)
+                    )
+                )
+                for _ in range(5)
+            ]
+            for thread in threads:
+                thread.start()
+            time.sleep(0.2)
+            release.set()
+            for thread in threads:
+                thread.join(5)
+
+        assert len(calls) == 1
+        assert results == [{"value": 42}] * 5
+        assert single_flight.in_flight() == 0
+
+    def test_errors_reach_every_caller(self):
+        """A failed computation is not cached and not left in flight."""
+        with patch("app.services.cache.redis_client", None):
+            with pytest.raises(ValueError):
+                compute_once("sf_error", 60, Mock(side_effect=ValueError))
+        assert single_flight.in_flight() == 0
+
+    def test_lock_holder_computes_and_releases(self):
+        """The lock owner computes, caches and releases its own lock."""
+        mock_client = MagicMock()
+        mock_client.get.return_value = None
+        mock_client.set.return_value = True
+        with patch("app.services.cache.redis_client", mock_client):
+            result = compute_once("sf_owner", 60, lambda: [1, 2])
+
+        assert result == [1, 2]
+        lock_args = mock_client.set.call_args
+        assert lock_args[0][0] == "lock:sf_owner"
+        assert lock_args[1]["nx"] is True
+        token = lock_args[0][1]
+        key, ttl, stored = mock_client.setex.call_args[0]
+        assert (key, ttl) == ("sf_owner", 60 + settings.CACHE_STALE_SECONDS)
+        assert read_entry(decode(stored)) == ([1, 2], False)
+        mock_client.eval.assert_called_once_with(
+            RELEASE_LOCK_SCRIPT, 1, "lock:sf_owner", token
+        )
+
+    def test_waits_for_other_worker(self):
+        """Without the lock, the value filled by its holder is served."""
+        mock_client = MagicMock()
+        mock_client.set.return_value = None
+        mock_client.get.side_effect = [None, None, json.dumps({"v": 1})]
+        compute = Mock()
+        with patch("app.services.cache.redis_client", mock_client):
+            result = compute_once("sf_wait", 60, compute)
+
+        assert result == {"v": 1}
+        compute.assert_not_called()
+        mock_client.eval.assert_not_called()
+
+    def test_computes_when_wait_times_out(self):
+        """A stuck lock holder does not block callers forever."""
+        mock_client = MagicMock()
+        mock_client.set.return_value = None
+        mock_client.get.return_value = None
+        with patch("app.services.cache.redis_client", mock_client), patch(
+            "app.services.cache.settings.CACHE_LOCK_WAIT_SECONDS", 0.1
+        ):
+            result = compute_once("sf_timeout", 60, lambda: "fresh")
+
+        assert result == "fresh"
+        mock_client.setex.assert_called_once()
+
+
+class TestStaleWhileRevalidate:
+    """Tests for soft-expired cache entries."""
+
+    @pytest.fixture
+    def mock_redis_client(self):
+        """Mock Redis client whose lock is always free."""
+        mock_client = MagicMock()
+        mock_client.set.return_value = True
+        return mock_client
+
+    @pytest.fixture
+    def inline_refresh(self):
+        """Run background refreshes synchronously."""
+        executor = MagicMock()
+        executor.submit.side_effect = lambda fn: fn()
+        with patch("app.services.cache.refresh_executor", executor):
+            yield executor
+
+    def test_entry_expiry(self):
+        """Entries are fresh for their TTL and live longer in Redis."""
+        entry, hard_ttl = make_entry({"a": 1}, 60)
+        assert hard_ttl == 60 + settings.CACHE_STALE_SECONDS
+        assert read_entry(entry) == ({"a": 1}, False)
+
+        entry["fresh_until"] = time.time() - 1
+        assert read_entry(entry) == ({"a": 1}, True)
+
+        # Values cached before entries existed count as fresh
+        assert read_entry([1, 2]) == ([1, 2], False)
+
+    def test_stale_value_served_and_refreshed(
+        self, mock_redis_client, inline_refresh
+    ):
+        """A stale hit returns immediately and recomputes in background."""
+        entry, _ttl = make_entry({"old": True}, 60)
+        entry["fresh_until"] = time.time() - 1
+        mock_redis_client.get.return_value = json.dumps(entry)
+        compute = Mock(return_value={"new": True})
+
+        @cache_result(prefix="swr", ttl=60)
+        def cached_function(self):
+            return compute()
+
+        with patch("app.services.cache.redis_client", mock_redis_client):
+            result = cached_function(None)
+
+        assert result == {"old": True}
+        compute.assert_called_once()
+        _key, _ttl, stored = mock_redis_client.setex.call_args[0]
+        assert read_entry(decode(stored)) == ({"new": True}, False)
+        mock_redis_client.eval.assert_called_once()
+
+    def test_fresh_value_not_refreshed(
+        self, mock_redis_client, inline_refresh
+    ):
+        """Fresh hits never schedule a refresh."""
+        entry, _ttl = make_entry({"fresh": True}, 60)
+        mock_redis_client.get.return_value = json.dumps(entry)
+
+        @cache_result(prefix="swr", ttl=60)
+        def cached_function(self):
+            raise AssertionError("should not be called")
+
+        with patch("app.services.cache.redis_client", mock_redis_client):
+            assert cached_function(None) == {"fresh": True}
+        inline_refresh.submit.assert_not_called()
+
+    def test_refresh_deduplicated_by_lock(
+        self, mock_redis_client, inline_refresh
+    ):
+        """No refresh is scheduled while another caller holds the lock."""
+        entry, _ttl = make_entry("stale", 60)
+        entry["fresh_until"] = 0
+        mock_redis_client.get.return_value = json.dumps(entry)
+        mock_redis_client.set.return_value = None
+
+        @cache_result(prefix="swr", ttl=60)
+        def cached_function(self):
+            return "new"
+
+        with patch("app.services.cache.redis_client", mock_redis_client):
+            assert cached_function(None) == "stale"
+        inline_refresh.submit.assert_not_called()
+
+    def test_detached_call_uses_new_session(self):
+        """Service methods are recomputed on a service with its own session."""
+
+        class Service:
+            def __init__(self, db):
+                self.db = db
+
+            def method(self, value):
+                return (self.db, value)
+
+        new_session = MagicMock()
+
+        @contextmanager
+        def fake_scope():
+            yield new_session
+
+        call = detached_call(Service.method, (Service("request"), 3), {})
+        with patch("app.db.session.session_scope", fake_scope):
+            assert call() == (new_session, 3)
+
+
+class TestLocalCache:
+    """Tests for the in-process L1 cache."""
+
+    def test_lru_bounded_by_entries(self):
+        """The least recently used entry is evicted first."""
+        cache = LocalCache(max_entries=2, max_bytes=1000)
+        cache.set("a", "1", 60)
+        cache.set("b", "2", 60)
+        cache.get("a")
+        cache.set("c", "3", 60)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+        assert cache.get("c") == "3"
+        assert cache.stats()["evictions"] == 1
+
+    def test_lru_bounded_by_bytes(self):
+        """Entries are evicted to stay under the byte budget."""
+        cache = LocalCache(max_entries=100, max_bytes=20)
+        cache.set("a", "x" * 8, 60)
+        cache.set("b", "y" * 8, 60)
+        assert cache.stats()["bytes"] == 18
+        cache.set("c", "z" * 8, 60)
+
+        assert cache.get("a") is None
+        assert cache.stats()["bytes"] == 18
+        # Values larger than the whole budget are never stored
+        cache.set("big", "w" * 50, 60)
+        assert cache.get("big") is None
+
+    def test_entries_expire(self):
+        """Entries are dropped after their local TTL."""
+        cache = LocalCache(max_entries=10, max_bytes=1000)
+        cache.set("a", "1", 0.05)
+        time.sleep(0.1)
+        assert cache.get("a") is None
+        assert cache.stats()["entries"] == 0
+
+    def test_reads_hit_l1_after_first_redis_read(self):
+        """A Redis hit is served locally afterwards."""
+        mock_client = MagicMock()
+        mock_client.get.return_value = json.dumps({"a": 1})
+        with patch("app.services.cache.redis_client", mock_client):
+            assert get_cache("hot") == {"a": 1}
+            assert get_cache("hot") == {"a": 1}
+
+        mock_client.get.assert_called_once_with("hot")
+
+    def test_mget_only_fetches_l1_misses(self):
+        """MGET asks Redis only for keys missing locally."""
+        local_cache.set("local", json.dumps(1), 60)
+        mock_client = MagicMock()
+        mock_client.mget.return_value = [json.dumps(2), None]
+        with patch("app.services.cache.redis_client", mock_client):
+            values = get_cache_many(["local", "remote", "missing"])
+
+        assert values == [1, 2, None]
+        mock_client.mget.assert_called_once_with(["remote", "missing"])
+
+    def test_invalidate_drops_local_copies_and_broadcasts(self):
+        """Invalidation clears L1 here and is published to other workers."""
+        local_cache.set("v1:revenue:abc", "[]", 60)
+        local_cache.set("v1:summary:abc", "{}", 60)
+        mock_client = MagicMock()
+        mock_client.scan_iter.return_value = iter([])
+        with patch("app.services.cache.redis_client", mock_client):
+            invalidate_cache("v1:revenue:*")
+
+        assert local_cache.get("v1:revenue:abc") is None
+        assert local_cache.get("v1:summary:abc") == "{}"
+        mock_client.publish.assert_called_once_with(
+            INVALIDATION_CHANNEL, json.dumps({"pattern": "v1:revenue:*"})
+        )
+
+    def test_apply_invalidation_messages(self):
+        """Published messages drop matching keys, or everything."""
+        local_cache.set("a:1", "1", 60)
+        local_cache.set("b:1", "1", 60)
+        apply_invalidation(json.dumps({"pattern": "a:*"}))
+        assert local_cache.get("a:1") is None
+        assert local_cache.get("b:1") == "1"
+
+        apply_invalidation(json.dumps({"pattern": None}))
+        assert local_cache.get("b:1") is None
+
+        # Garbage is ignored
+        apply_invalidation("not json")
+
+    def test_listener_applies_published_messages(self):
+        """The listener thread applies messages from the channel."""
+        local_cache.set("k", "1", 60)
+        listener = InvalidationListener()
+        message = {"type": "message", "data": json.dumps({"pattern": "k"})}
+        mock_client = MagicMock()
+        pubsub = mock_client.pubsub.return_value
+
+        def get_message(timeout):
+            listener._stop.set()
+            return message
+
+        pubsub.get_message.side_effect = get_message
+        with patch("app.services.cache.redis_client", mock_client):
+            assert listener.start()
+            listener._thread.join(2)
+            listener.stop()
+
+        pubsub.subscribe.assert_called_once_with(INVALIDATION_CHANNEL)
+        assert local_cache.get("k") is None
+
+
+class TestCacheTags:
+    """Tests for tag-based invalidation."""
+
+    @staticmethod
+    @cache_result(prefix="revenue", ttl=300)
+    def get_revenue(
+        self, start_date=None, end_date=None, store_id=None, channel_id=None
+    ):
+        return []
+
+    def test_result_tags(self):
+        """Results are tagged by metric, store, channel and day."""
+        tags = self.get_revenue.cache_tags(
+            None,
+            start_date=datetime(2024, 1, 30, 10),
+            end_date=datetime(2024, 2, 1),
+            store_id=3,
+        )
+        assert tags == [
+            "metric:revenue",
+            "store:3",
+            "channel:any",
+            "day:2024-01-30",
+            "day:2024-01-31",
+            "day:2024-02-01",
+        ]
+
+    def test_open_or_long_ranges_tagged_any_day(self):
+        """Unbounded and very long ranges are tagged 'day:any'."""
+        tags = self.get_revenue.cache_tags
+        assert tags(None)[-1] == "day:any"
+        assert tags(None, start_date=datetime(2024, 1, 1))[-1] == "day:any"
+        assert tags(
+            None,
+            start_date=datetime(2023, 1, 1),
+            end_date=datetime(2024, 1, 1),
+        )[-1] == "day:any"
+
+    def test_expand_tags(self):
+        """Dimension tags include the entries not filtered on them."""
+        tags = expand_tags(["store:3", "metric:revenue", "day:2024-01-01"])
+        assert tags == [
+            "store:3",
+            "store:any",
+            "metric:revenue",
+            "day:2024-01-01",
+            "day:any",
+        ]
+
+    def test_set_registers_tags(self):
+        """Writes add the key to its tag sets and extend their TTL."""
+        mock_client = MagicMock()
+        with patch("app.services.cache.redis_client", mock_client):
+            set_cache_many([("k1", 1, 60, ["store:1"]), ("k2", 2, 60)])
+
+        pipe = mock_client.pipeline.return_value
+        pipe.sadd.assert_called_once_with(tag_key("store:1"), "k1")
+        pipe.expire.assert_any_call(tag_key("store:1"), 60, nx=True)
+        pipe.expire.assert_any_call(tag_key("store:1"), 60, gt=True)
+        assert pipe.setex.call_count == 2
+
+    def test_decorator_registers_tags(self):
+        """cache_result misses are registered under their tags."""
+        mock_client = MagicMock()
+        mock_client.get.return_value = None
+        mock_client.set.return_value = True
+        with patch("app.services.cache.redis_client", mock_client):
+            self.get_revenue(None, store_id=2)
+
+        pipe = mock_client.pipeline.return_value
+        registered = {call[0][0] for call in pipe.sadd.call_args_list}
+        assert registered == {
+            tag_key(tag)
+            for tag in ("metric:revenue", "store:2", "channel:any", "day:any")
+        }
+
+    def test_invalidate_tags_unlinks_members(self):
+        """Members of the tag sets are unlinked in one pipeline."""
+        local_cache.set("k1", "1", 60)
+        mock_client = MagicMock()
+        pipe = mock_client.pipeline.return_value
+        pipe.execute.side_effect = [
+            [{b"k1", b"k2"}, {b"k2", b"k3"}],  # SMEMBERS
+            [3],  # UNLINK keys
+            [2],  # UNLINK tag sets
+        ]
+        with patch("app.services.cache.redis_client", mock_client):
+            deleted = invalidate_tags(["store:1"])
+
+        assert deleted == 3
+        pipe.smembers.assert_any_call(tag_key("store:1"))
+        pipe.smembers.assert_any_call(tag_key("store:any"))
+        pipe.unlink.assert_any_call("k1", "k2", "k3")
+        mock_client.keys.assert_not_called()
+        mock_client.scan_iter.assert_not_called()
+        assert local_cache.get("k1") is None
+        mock_client.publish.assert_called_once_with(
+            INVALIDATION_CHANNEL, json.dumps({"keys": ["k1", "k2", "k3"]})
+        )
+        mock_client.hincrby.assert_called_once_with(
+            data_versions_key(), INVALIDATIONS, 1
+        )
+
+
+class TestDataVersions:
+    """Tests for data-version keyed results."""
+
+    @staticmethod
+    @cache_result(prefix="revenue", ttl=300)
+    def get_revenue(self, start_date=None, end_date=None, store_id=None):
+        return []
+
+    @pytest.fixture
+    def mock_client(self):
+        """Redis mock backed by an in-memory data version hash."""
+        stored = {}
+        mock_client = MagicMock()
+        mock_client.hgetall.side_effect = lambda key: {
+            field.encode(): value.encode() for field, value in stored.items()
+        }
+        mock_client.hset.side_effect = (
+            lambda key, mapping: stored.update(mapping)
+        )
+        with patch("app.services.cache.redis_client", mock_client):
+            yield mock_client
+
+    def test_touches_recent_data(self):
+        """Open and recent ranges touch recent data; old ones do not."""
+        today = datetime.now()
+        assert touches_recent_data(None)
+        assert touches_recent_data(today)
+        assert touches_recent_data(today.date().isoformat())
+        assert touches_recent_data("not a date")
+        assert not touches_recent_data(datetime(2024, 1, 31))
+        assert not touches_recent_data("2024-01-31")
+
+    def test_bump_writes_store_and_global_versions(self, mock_client):
+        """Each store and 'all' get '{max sale id}:{ingest time}'."""
+        assert bump_data_versions({1: 120, 2: 95})
+
+        key, = mock_client.hset.call_args[0]
+        mapping = mock_client.hset.call_args[1]["mapping"]
+        assert key == data_versions_key()
+        assert set(mapping) == {"1", "2", "all"}
+        assert mapping["1"].startswith("120:")
+        assert mapping["all"].startswith("120:")
+
+        assert not bump_data_versions({})
+
+    def test_recent_keys_follow_store_version(self, mock_client):
+        """New data moves only the affected stores' recent keys."""
+        today = datetime.now()
+
+        def recent(store_id=None):
+            return self.get_revenue.cache_key(
+                None,
+                start_date=today - timedelta(days=7),
+                end_date=today,
+                store_id=store_id,
+            )
+
+        def historical(store_id=None):
+            return self.get_revenue.cache_key(
+                None,
+                start_date=datetime(2024, 1, 1),
+                end_date=datetime(2024, 1, 31),
+                store_id=store_id,
+            )
+
+        before = [recent(1), recent(2), recent(), historical(1)]
+        bump_data_versions({1: 120})
+        after = [recent(1), recent(2), recent(), historical(1)]
+
+        assert after[0] != before[0]
+        assert after[1] == before[1]
+        assert after[2] != before[2]
+        assert after[3] == before[3]
+
+        # Versions are re-read at most once per poll interval
+        assert mock_client.hgetall.call_count == 2
+
+
+class TestAdaptiveTTL:
+    """Tests for TTLs by range settlement."""
+
+    def test_result_ttl(self):
+        """Closed ranges get the long TTL; open ranges keep theirs."""
+        closed = settings.CACHE_CLOSED_RANGE_TTL_SECONDS
+        assert result_ttl({"end_date": datetime(2024, 3, 31)}, 300) == closed
+        assert result_ttl({"end_date": datetime.now()}, 300) == 300
+        assert result_ttl({"start_date": datetime(2024, 3, 1)}, 300) == 300
+
+    def test_decorator_stores_closed_ranges_longer(self):
+        """Misses over closed ranges are written with the long TTL."""
+        mock_client = MagicMock()
+        mock_client.get.return_value = None
+        mock_client.set.return_value = True
+
+        @cache_result(prefix="ttl", ttl=60)
+        def cached_function(self, start_date=None, end_date=None):
+            return {"rows": []}
+
+        with patch("app.services.cache.redis_client", mock_client):
+            cached_function(None, end_date=datetime(2024, 3, 31))
+            closed_ttl = mock_client.setex.call_args[0][1]
+            cached_function(None, end_date=datetime.now())
+            open_ttl = mock_client.setex.call_args[0][1]
+
+        stale = settings.CACHE_STALE_SECONDS
+        assert closed_ttl == settings.CACHE_CLOSED_RANGE_TTL_SECONDS + stale
+        assert open_ttl == 60 + stale
+        assert cached_function.cache_ttl_for(
+            None, end_date="2024-03-31"
+        ) == settings.CACHE_CLOSED_RANGE_TTL_SECONDS
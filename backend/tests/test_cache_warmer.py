@@ -0,0 +1,135 @@
+"""
+Tests for the cache warmer job.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.jobs import cache_warmer
+from app.jobs.cache_warmer import plan_warmup, top_store_ids, warm_cache
+from app.models.channel import Channel
+from app.models.dashboard import Dashboard
+from app.models.sale import Sale
+from app.models.store import Store
+from app.services.dashboard_data import (
+    dashboard_views_key,
+    most_viewed_dashboards,
+    record_dashboard_view,
+)
+
+
+@pytest.fixture
+def warm_db(db_session):
+    """Session with three dashboards and recent sales in two stores."""
+    now = datetime.now()
+    db_session.add_all(
+        [
+            Store(id=1, name="Loja 1"),
+            Store(id=2, name="Loja 2"),
+            Channel(id=1, name="Presencial", type="P"),
+            Dashboard(id=1, name="Default", config={}, is_default=True),
+            Dashboard(id=2, name="Other", config={}),
+            Dashboard(id=3, name="Popular", config={}),
+        ]
+    )
+    db_session.add_all(
+        [
+            Sale(
+                id=i,
+                store_id=2 if i % 4 else 1,
+                channel_id=1,
+                total_amount=Decimal("10.00"),
+                total_amount_items=Decimal("10.00"),
+                created_at=now - timedelta(days=i % 5),
+                sale_status_desc="COMPLETED",
+            )
+            for i in range(1, 21)
+        ]
+    )
+    db_session.flush()
+    return db_session
+
+
+def test_top_store_ids(warm_db):
+    """Stores are ranked by recent sales."""
+    assert top_store_ids(warm_db, 5) == [2, 1]
+    assert top_store_ids(warm_db, 1) == [2]
+    assert top_store_ids(warm_db, 0) == []
+
+
+def test_plan_warmup(warm_db):
+    """Default and most viewed dashboards, then the top stores."""
+    with patch(
+        "app.jobs.cache_warmer.most_viewed_dashboards",
+        return_value=[3, 1, 999],
+    ), patch.multiple(
+        cache_warmer.settings,
+        CACHE_WARM_RANGES="last_7d, mtd",
+        CACHE_WARM_STORES=1,
+    ):
+        targets = plan_warmup(warm_db)
+
+    assert [(d.id, overrides) for d, overrides in targets] == [
+        (1, {}),
+        (1, {"range": "last_7d"}),
+        (1, {"range": "mtd"}),
+        (3, {}),
+        (3, {"range": "last_7d"}),
+        (3, {"range": "mtd"}),
+        (1, {"range": "last_7d", "store_id": 2}),
+        (1, {"range": "mtd", "store_id": 2}),
+    ]
+
+
+def test_warm_cache_renders_every_target():
+    """Every target is rendered; failures are counted and skipped."""
+    dashboard = Dashboard(id=1, name="Default", config={})
+    targets = [(dashboard, {}), (dashboard, {"range": "mtd"}), (dashboard, {})]
+    render = AsyncMock(
+        side_effect=[{"cached": False}, RuntimeError("boom"), {"cached": True}]
+    )
+
+    with patch("app.services.cache.redis_client", MagicMock()), patch(
+        "app.jobs.cache_warmer._load_plan", return_value=targets
+    ), patch(
+        "app.jobs.cache_warmer.DashboardDataService.render", render
+    ):
+        counts = asyncio.run(warm_cache(batch=MagicMock()))
+
+    assert counts == {"rendered": 1, "cached": 1, "failed": 1}
+    render.assert_any_await(dashboard, {"range": "mtd"})
+
+
+def test_warm_cache_needs_redis():
+    """Without Redis there is nothing to warm."""
+    with patch("app.jobs.cache_warmer._load_plan") as load_plan:
+        counts = asyncio.run(warm_cache())
+
+    assert counts == {"rendered": 0, "cached": 0, "failed": 0}
+    load_plan.assert_not_called()
+
+
+def test_dashboard_views():
+    """Views are counted in a sorted set and read back by rank."""
+    mock_client = MagicMock()
+    mock_client.zrevrange.return_value = [b"3", b"1"]
+    async_client = MagicMock()
+    async_client.zincrby = AsyncMock()
+
+    with patch("app.services.cache.redis_client", mock_client), patch(
+        "app.services.cache.async_redis_client", return_value=async_client
+    ):
+        asyncio.run(record_dashboard_view(3))
+        assert most_viewed_dashboards(2) == [3, 1]
+
+    async_client.zincrby.assert_awaited_once_with(
+        dashboard_views_key(), 1, 3
+    )
+    mock_client.zincrby.assert_not_called()
+    mock_client.zrevrange.assert_called_once_with(
+        dashboard_views_key(), 0, 1
+    )
@@ -0,0 +1,110 @@
+"""
+Tests for the generated calendar columns of sales.
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+from unittest.mock import patch
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.config import settings
+from app.models.channel import Channel
+from app.models.sale import Sale
+from app.models.store import Store
+from app.services.analytics import AnalyticsService
+from app.services.query_filter_builder import QueryFilterBuilder
+
+
+def _add_sales(db, moments, status="COMPLETED"):
+    """Add one sale per timestamp."""
+    db.add_all(
+        [
+            Store(id=1, name="Loja 1"),
+            Channel(id=1, name="iFood", type="D"),
+        ]
+    )
+    for i, moment in enumerate(moments, start=1):
+        db.add(
+            Sale(
+                id=i,
+                store_id=1,
+                channel_id=1,
+                created_at=moment,
+                sale_status_desc=status,
+                total_amount_items=Decimal("40.00"),
+                total_amount=Decimal("40.00"),
+            )
+        )
+    db.commit()
+
+
+def test_calendar_columns_are_generated(db_session):
+    """The database fills the calendar parts of created_at."""
+    # A Sunday night
+    _add_sales(db_session, [datetime(2024, 6, 9, 21, 30)])
+
+    sale = db_session.get(Sale, 1)
+
+    assert sale.sale_date == date(2024, 6, 9)
+    assert sale.sale_dow == 0
+    assert sale.sale_hour == 21
+    assert sale.sale_week == date(2024, 6, 3)
+    assert sale.sale_month == date(2024, 6, 1)
+
+
+def test_filters_use_calendar_columns():
+    """Day of week and hour filters compare columns, not EXTRACT."""
+    query = QueryFilterBuilder.apply_sale_filters(
+        select(Sale.id), day_of_week=3, hour_start=18, hour_end=23
+    )
+    sql = str(query.compile(dialect=postgresql.dialect()))
+
+    assert "EXTRACT" not in sql
+    assert "sales.sale_dow =" in sql
+    assert "sales.sale_hour >=" in sql
+    assert "sales.sale_hour <=" in sql
+
+
+def test_thursday_night_filter(db_session):
+    """day_of_week uses 0=Monday and matches the generated DOW."""
+    _add_sales(
+        db_session,
+        [
+            datetime(2024, 6, 6, 20, 0),  # Thursday night
+            datetime(2024, 6, 6, 12, 0),  # Thursday lunch
+            datetime(2024, 6, 7, 20, 0),  # Friday night
+        ],
+    )
+
+    query = QueryFilterBuilder.apply_sale_filters(
+        db_session.query(Sale.id), day_of_week=3, hour_start=18
+    )
+
+    assert [row.id for row in query.all()] == [1]
+
+
+def test_heatmap_and_cancellations_group_on_columns(db_session):
+    """Heatmap and cancellations by hour read the generated columns."""
+    _add_sales(
+        db_session,
+        [datetime(2024, 6, 6, 20, 0), datetime(2024, 6, 6, 20, 45)],
+        status="CANCELLED",
+    )
+    service = AnalyticsService(db_session)
+
+    with patch.object(settings, "ANALYTICS_ROLLUPS_ENABLED", False):
+        heatmap = AnalyticsService.get_peak_hours_heatmap.__wrapped__(
+            service
+        )
+        cancellations = (
+            AnalyticsService.get_cancellations_analysis.__wrapped__(service)
+        )
+
+    assert [(c["day"], c["hour"], c["sales_count"]) for c in heatmap] == [
+        (4, 20, 2)
+    ]
+    assert cancellations["cancellations_by_hour"] == [
+        {"hour": 20, "cancellation_count": 2}
+    ]
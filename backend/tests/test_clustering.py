@@ -0,0 +1,63 @@
+"""
+Tests for the BRIN index and the sales clustering job.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+
+from app.jobs import clustering
+from app.jobs.clustering import (
+    BRIN_INDEX,
+    brin_index_sql,
+    needs_clustering,
+)
+from app.models.sale import Sale
+
+
+def test_brin_index_matches_model():
+    """The job creates the same BRIN index the model declares."""
+    index = next(i for i in Sale.__table__.indexes if i.name == BRIN_INDEX)
+    ddl = str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+
+    assert "USING brin (created_at)" in ddl
+    assert "pages_per_range = 32" in ddl
+    assert ddl.split(" ON ")[1] in brin_index_sql()
+    assert brin_index_sql(concurrently=True).startswith(
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {BRIN_INDEX} "
+    )
+
+
+def test_needs_clustering_thresholds():
+    """Only tables that drifted from created_at order are rewritten."""
+    assert needs_clustering(0.5, 0.9) is True
+    assert needs_clustering(0.99, 0.9) is False
+    # Descending order prunes as well as ascending order
+    assert needs_clustering(-0.99, 0.9) is False
+    # No statistics: empty or never analyzed
+    assert needs_clustering(None, 0.9) is False
+
+
+
+@pytest.mark.parametrize("holds_lock", [True, False])
+def test_loop_only_checks_order(holds_lock):
+    """The API process never clusters, and only the lock holder checks."""
+    with patch.object(
+        clustering.JobLock, "acquire", return_value=holds_lock
+    ), patch.object(
+        clustering, "check_physical_order", return_value={}
+    ) as check, patch.object(
+        clustering, "maintain_physical_order"
+    ) as maintain, patch.object(
+        clustering.asyncio,
+        "sleep",
+        AsyncMock(side_effect=asyncio.CancelledError),
+    ):
+        with pytest.raises(asyncio.CancelledError):
+            asyncio.run(clustering.run_clustering_loop(60))
+
+    assert check.call_count == int(holds_lock)
+    maintain.assert_not_called()
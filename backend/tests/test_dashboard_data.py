@@ -0,0 +1,359 @@
+"""
+Tests for server-side dashboard data resolution.
+"""
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from decimal import Decimal
+from fnmatch import fnmatch
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.api.v1.analytics import get_analytics_batch_service
+from app.config import settings
+from app.main import app
+from app.models.channel import Channel
+from app.models.sale import Sale
+from app.models.store import Store
+from app.services.analytics_batch import AnalyticsBatchService
+from app.services.cache import clear_all_cache, invalidate_tags, tag_key
+from app.services.cache_codec import decode
+from app.services.dashboard_data import effective_filters, widget_query
+
+FILTERS = {"start_date": "2024-01-01", "end_date": "2024-01-31"}
+
+WIDGETS = [
+    {"id": "w_revenue", "type": "chart", "title": "Faturamento",
+     "dataSource": "revenue", "config": {"groupBy": "month"}},
+    {"id": "w_total", "type": "card", "title": "Faturamento Total",
+     "dataSource": "summary", "config": {"metric": "total_revenue"}},
+    {"id": "w_count", "type": "card", "title": "Total de Vendas",
+     "dataSource": "summary", "config": {"metric": "sales_count"}},
+    {"id": "w_unknown", "type": "card", "title": "?",
+     "dataSource": "nope", "config": {}},
+]
+
+# Widgets that all render, so the payload is cached
+COMPLETE_WIDGETS = [w for w in WIDGETS if w["dataSource"] != "nope"]
+
+
+class _MemoryRedis:
+    """Dict-backed stand-in for the Redis commands of the cache."""
+
+    def __init__(self):
+        self.values = {}
+        self.sets = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    def setex(self, key, ttl, value):
+        self.values[key] = value
+        return True
+
+    def sadd(self, name, *members):
+        self.sets.setdefault(name, set()).update(members)
+        return len(members)
+
+    def expire(self, *args, **kwargs):
+        return True
+
+    def smembers(self, name):
+        return set(self.sets.get(name, ()))
+
+    def unlink(self, *keys):
+        return sum(
+            self.values.pop(key, None) is not None
+            or self.sets.pop(key, None) is not None
+            for key in keys
+        )
+
+    def scan_iter(self, match, count=None):
+        return [
+            key
+            for key in [*self.values, *self.sets]
+            if fnmatch(key, match)
+        ]
+
+    def hincrby(self, *args):
+        return 1
+
+    def hgetall(self, name):
+        return {}
+
+    def publish(self, *args):
+        return 0
+
+    def zincrby(self, *args):
+        return 1
+
+    def pipeline(self, transaction=True):
+        return _MemoryPipeline(self)
+
+
+class _MemoryPipeline:
+    """Queues _MemoryRedis commands until execute."""
+
+    def __init__(self, redis):
+        self._redis = redis
+        self._calls = []
+
+    def __getattr__(self, name):
+        command = getattr(self._redis, name)
+        return lambda *args, **kwargs: self._calls.append(
+            (command, args, kwargs)
+        )
+
+    def execute(self):
+        return [command(*a, **kw) for command, a, kw in self._calls]
+
+
+class _AsyncMemoryRedis:
+    """asyncio view of a _MemoryRedis."""
+
+    def __init__(self, redis):
+        self._redis = redis
+
+    def __getattr__(self, name):
+        command = getattr(self._redis, name)
+
+        async def call(*args, **kwargs):
+            return command(*args, **kwargs)
+        return call
+
+    def pipeline(self, transaction=True):
+        pipe = self._redis.pipeline(transaction)
+
+        async def execute():
+            return _MemoryPipeline.execute(pipe)
+        pipe.execute = execute
+        return pipe
+
+
+@pytest.fixture
+def data_client(client, db_session):
+    """Client whose batch service shares the test session."""
+    db_session.add_all(
+        [
+            Store(id=1, name="Loja 1"),
+            Channel(id=1, name="Presencial", type="P"),
+        ]
+    )
+    db_session.add_all(
+        [
+            Sale(
+                id=i,
+                store_id=1,
+                channel_id=1,
+                total_amount=Decimal("10.00"),
+                total_amount_items=Decimal("10.00"),
+                created_at=datetime(2024, 1, i, 12, 0),
+                sale_status_desc="COMPLETED",
+            )
+            for i in range(1, 5)
+        ]
+    )
+    db_session.flush()
+
+    @contextmanager
+    def shared_session():
+        yield db_session
+
+    app.dependency_overrides[get_analytics_batch_service] = (
+        lambda: AnalyticsBatchService(
+            session_factory=shared_session, max_concurrency=1
+        )
+    )
+    return client
+
+
+def _create_dashboard(client, **config):
+    """Create a dashboard and return its JSON."""
+    response = client.post(
+        "/api/v1/dashboards",
+        json={"name": "Data", "config": {"widgets": WIDGETS, **config}},
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_widget_query_maps_config_and_filters():
+    """Widget config and accepted dashboard filters become params."""
+    query = widget_query(WIDGETS[0], {**FILTERS, "store_id": 2})
+    assert query.id == "w_revenue"
+    assert query.metric == "revenue"
+    assert query.params == {"group_by": "month", "store_id": 2, **FILTERS}
+
+    # Channel performance takes no channel filter
+    channels = widget_query(
+        {"id": "c", "dataSource": "channels"}, {"channel_id": 1}
+    )
+    assert channels.params == {}
+
+
+def test_effective_filters_default_period_and_overrides():
+    """Missing dates default to the last 30 days; overrides win."""
+    filters = effective_filters({"store_id": 1, "unknown": "x"})
+    today = datetime.now().date()
+    assert filters == {
+        "store_id": 1,
+        "start_date": (today - timedelta(days=30)).isoformat(),
+        "end_date": today.isoformat(),
+    }
+
+    filters = effective_filters(FILTERS, {"store_id": 3, "channel_id": None})
+    assert filters == {**FILTERS, "store_id": 3}
+
+
+def test_dashboard_data_resolves_widgets(data_client):
+    """Every widget gets its data; unsupported widgets get an error."""
+    dashboard = _create_dashboard(data_client, filters=FILTERS)
+
+    response = data_client.get(f"/api/v1/dashboards/{dashboard['id']}/data")
+    assert response.status_code == 200
+    body = response.json()
+
+    assert body["dashboard_id"] == dashboard["id"]
+    assert body["filters"] == FILTERS
+    assert body["cached"] is False
+    widgets = {w["id"]: w for w in body["widgets"]}
+    assert [w["id"] for w in body["widgets"]] == [w["id"] for w in WIDGETS]
+
+    assert widgets["w_revenue"]["status"] == "ok"
+    assert widgets["w_revenue"]["data"][0]["revenue"] == 40.0
+    assert widgets["w_total"]["data"]["sales_count"] == 4
+    assert widgets["w_count"]["data"] == widgets["w_total"]["data"]
+    assert widgets["w_unknown"]["status"] == "error"
+
+
+def test_dashboard_data_applies_overrides(data_client):
+    """Request filters override the saved ones."""
+    dashboard = _create_dashboard(data_client, filters=FILTERS)
+
+    response = data_client.get(
+        f"/api/v1/dashboards/{dashboard['id']}/data"
+        "?start_date=2024-01-03&end_date=2024-01-31"
+    )
+    widgets = {w["id"]: w for w in response.json()["widgets"]}
+    assert widgets["w_total"]["data"]["sales_count"] == 2
+
+
+def test_dashboard_data_not_found(data_client):
+    """Unknown dashboards return 404."""
+    response = data_client.get("/api/v1/dashboards/99999/data")
+    assert response.status_code == 404
+
+
+def test_shared_dashboard_data(data_client):
+    """Shared dashboards resolve by token."""
+    dashboard = _create_dashboard(data_client, filters=FILTERS)
+    shared = data_client.post(f"/api/v1/dashboards/{dashboard['id']}/share")
+    token = shared.json()["share_token"]
+
+    response = data_client.get(f"/api/v1/dashboards/share/{token}/data")
+    assert response.status_code == 200
+    assert response.json()["dashboard_id"] == dashboard["id"]
+
+    missing = data_client.get("/api/v1/dashboards/share/invalid/data")
+    assert missing.status_code == 404
+
+
+def test_shared_dashboard_data_not_modified(data_client):
+    """A current If-None-Match is answered without rendering."""
+    dashboard = _create_dashboard(data_client, filters=FILTERS)
+    shared = data_client.post(f"/api/v1/dashboards/{dashboard['id']}/share")
+    url = f"/api/v1/dashboards/share/{shared.json()['share_token']}/data"
+
+    first = data_client.get(url)
+    etag = first.headers["etag"]
+
+    with patch(
+        "app.services.dashboard_data.DashboardDataService.render"
+    ) as render:
+        response = data_client.get(url, headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    render.assert_not_called()
+
+
+def test_dashboard_data_payload_is_cached(data_client):
+    """Complete renders are cached under the dashboard's updated_at."""
+    response = data_client.post(
+        "/api/v1/dashboards",
+        json={"name": "Cached", "config": {"widgets": COMPLETE_WIDGETS}},
+    )
+    dashboard = response.json()
+    url = f"/api/v1/dashboards/{dashboard['id']}/data"
+
+    redis = _MemoryRedis()
+    sync_redis = MagicMock()
+    with patch("app.services.cache.redis_client", sync_redis), patch(
+        "app.services.cache.async_redis_client",
+        return_value=_AsyncMemoryRedis(redis),
+    ):
+        first = data_client.get(url).json()
+        second = data_client.get(url).json()
+
+    prefix = (
+        f"v{settings.CACHE_SCHEMA_VERSION}:dashboard_data:{dashboard['id']}:"
+    )
+    [key] = [key for key in redis.values if key.startswith(prefix)]
+    assert decode(redis.values[key])["widgets"] == first["widgets"]
+    assert key in redis.sets[tag_key(f"dashboard:{dashboard['id']}")]
+    assert first["cached"] is False
+    assert second["cached"] is True
+    assert second["widgets"] == first["widgets"]
+    # Payload lookups and the view counter stay off the sync client
+    # (widgets computed in worker threads may still use it)
+    sync_keys = [
+        key
+        for call in sync_redis.mget.call_args_list
+        for key in call.args[0]
+    ] + [call.args[0] for call in sync_redis.get.call_args_list]
+    assert not [key for key in sync_keys if key.startswith(prefix)]
+    sync_redis.zincrby.assert_not_called()
+
+
+def test_dashboard_data_payload_is_invalidated(data_client):
+    """Clearing the cache and invalidating tags drop rendered payloads."""
+    dashboard = data_client.post(
+        "/api/v1/dashboards",
+        json={
+            "name": "Invalidated",
+            "config": {"widgets": COMPLETE_WIDGETS, "filters": FILTERS},
+        },
+    ).json()
+    url = f"/api/v1/dashboards/{dashboard['id']}/data"
+    prefix = f"v{settings.CACHE_SCHEMA_VERSION}:dashboard_data:"
+
+    def payload_keys():
+        return [key for key in redis.values if key.startswith(prefix)]
+
+    redis = _MemoryRedis()
+    with patch("app.services.cache.redis_client", redis), patch(
+        "app.services.cache.async_redis_client",
+        return_value=_AsyncMemoryRedis(redis),
+    ):
+        for invalidate in (
+            clear_all_cache,
+            lambda: invalidate_tags(["day:2024-01-15"]),
+            # Payloads over every store are dropped with any store
+            lambda: invalidate_tags(["store:3"]),
+        ):
+            assert data_client.get(url).json()["cached"] is False
+            assert len(payload_keys()) == 1
+            assert data_client.get(url).json()["cached"] is True
+
+            invalidate()
+
+            assert payload_keys() == []
+
+        # Days outside the filtered range keep the payload
+        data_client.get(url)
+        invalidate_tags(["day:2023-12-31", "day:2024-02-01"])
+        assert len(payload_keys()) == 1
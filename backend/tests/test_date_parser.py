@@ -0,0 +1,130 @@
+"""
+Tests for date filter parsing and relative ranges.
+"""
+
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from app.core.exceptions import ValidationError
+from app.services.dashboard_data import effective_filters
+from app.utils.date_parser import (
+    RELATIVE_RANGES,
+    parse_date_filters,
+    resolve_relative_range,
+    snap_range,
+)
+
+NOW = datetime(2024, 3, 15, 14, 23, 11, 500)
+END_OF_HOUR = datetime(2024, 3, 15, 14, 59, 59, 999999)
+
+
+@pytest.mark.parametrize(
+    "token, expected",
+    [
+        ("last_7d", (datetime(2024, 3, 9), END_OF_HOUR)),
+        ("last_30d", (datetime(2024, 2, 15), END_OF_HOUR)),
+        ("mtd", (datetime(2024, 3, 1), END_OF_HOUR)),
+        (
+            "prev_month",
+            (datetime(2024, 2, 1), datetime(2024, 2, 29, 23, 59, 59, 999999)),
+        ),
+        (
+            "same_period_last_year",
+            (datetime(2023, 2, 15), datetime(2023, 3, 15, 14, 59, 59, 999999)),
+        ),
+    ],
+)
+def test_relative_ranges(token, expected):
+    """Tokens resolve to day-aligned starts and end-of-hour ends."""
+    assert resolve_relative_range(token, now=NOW) == expected
+
+
+def test_same_period_last_year_shifts_given_range():
+    """The comparison range is the given one, a year earlier."""
+    assert resolve_relative_range(
+        "same_period_last_year",
+        start=datetime(2024, 2, 29),
+        end=datetime(2024, 3, 10),
+    ) == (datetime(2023, 2, 28), datetime(2023, 3, 10))
+
+
+def test_requests_within_an_hour_share_a_range():
+    """Every request in the same hour gets identical dates."""
+    later = NOW.replace(minute=58, second=2)
+    for token in RELATIVE_RANGES:
+        assert resolve_relative_range(token, now=NOW) == (
+            resolve_relative_range(token, now=later)
+        )
+
+
+def test_unknown_token_is_rejected():
+    """Unknown tokens raise a validation error."""
+    with pytest.raises(ValidationError):
+        parse_date_filters(date_range="last_century")
+
+
+def test_snap_range():
+    """Starts move down, unaligned ends up to the end of their bucket."""
+    assert snap_range(NOW, NOW, "hour") == (
+        datetime(2024, 3, 15, 14),
+        END_OF_HOUR,
+    )
+    assert snap_range(NOW, datetime(2024, 3, 20), "day") == (
+        datetime(2024, 3, 15),
+        datetime(2024, 3, 20),
+    )
+
+
+def test_absolute_dates_snapped_when_configured():
+    """ANALYTICS_DATE_SNAP snaps absolute dates; 'none' keeps them."""
+    start, end = "2024-03-01T10:15:00", "2024-03-10T08:01:02"
+    assert parse_date_filters(start, end) == (
+        datetime(2024, 3, 1, 10, 15),
+        datetime(2024, 3, 10, 8, 1, 2),
+    )
+    with patch(
+        "app.utils.date_parser.settings.ANALYTICS_DATE_SNAP", "hour"
+    ):
+        assert parse_date_filters(start, end) == (
+            datetime(2024, 3, 1, 10),
+            datetime(2024, 3, 10, 8, 59, 59, 999999),
+        )
+
+
+def test_dashboard_range_filter():
+    """Dashboard ranges and absolute dates replace each other."""
+    saved = {"range": "last_7d"}
+    assert effective_filters(saved) == saved
+    assert effective_filters(
+        saved, {"start_date": "2024-01-01", "end_date": "2024-01-31"}
+    ) == {"start_date": "2024-01-01", "end_date": "2024-01-31"}
+    assert effective_filters(
+        {"start_date": "2024-01-01"}, {"range": "mtd"}
+    ) == {"range": "mtd"}
+
+
+def test_analytics_endpoint_accepts_range(client):
+    """Analytics endpoints take a 'range' query parameter."""
+    response = client.get(
+        "/api/v1/analytics/summary", params={"range": "last_30d"}
+    )
+    assert response.status_code == 200
+
+    response = client.get(
+        "/api/v1/analytics/revenue", params={"range": "last_century"}
+    )
+    assert response.status_code == 422
+
+
+@pytest.mark.parametrize(
+    "endpoint",
+    ["channels", "summary", "products-margin", "promotions", "anomalies"],
+)
+def test_analytics_endpoint_rejects_bad_range(client, endpoint):
+    """A bad range reaches the validation handler instead of a 500."""
+    response = client.get(
+        f"/api/v1/analytics/{endpoint}", params={"range": "last_century"}
+    )
+    assert response.status_code == 422
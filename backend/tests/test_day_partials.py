@@ -0,0 +1,123 @@
+"""
+Tests for day-bucketed partial aggregates.
+"""
+
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.services.analytics import AnalyticsService
+from app.services.day_partials import (
+    DayPartials,
+    compose_from_days,
+    day_partial_key,
+)
+from app.services.rollup import RollupService
+from conftest import analytics_queries, direct_results, rounded
+
+
+@pytest.fixture
+def fake_redis():
+    """Redis mock backed by a dict."""
+    stored = {}
+    client = MagicMock()
+    client.hgetall.return_value = {}
+    client.mget.side_effect = lambda keys: [stored.get(k) for k in keys]
+    pipe = client.pipeline.return_value
+    pipe.setex.side_effect = lambda key, ttl, value: stored.update(
+        {key: value}
+    )
+    pipe.execute.return_value = []
+    client.stored = stored
+    with patch("app.services.cache.redis_client", client):
+        yield client
+
+
+RANGE = {
+    "start_date": datetime(2024, 3, 5, 10, 30),
+    "end_date": datetime(2024, 3, 30, 15, 20),
+}
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        RANGE,
+        {**RANGE, "store_id": 1},
+        {**RANGE, "channel_id": 2},
+        {
+            "start_date": datetime(2024, 3, 2),
+            "end_date": datetime(2024, 3, 31, 23, 59, 59, 999999),
+        },
+    ],
+)
+def test_composed_results_match_service(sales_db, fake_redis, filters):
+    """Merged day partials equal a direct scan, cold and warm."""
+    queries = analytics_queries(**filters)
+    expected = rounded(direct_results(sales_db, queries))
+
+    assert rounded(compose_from_days(sales_db, queries)) == expected
+    assert fake_redis.stored
+    assert rounded(compose_from_days(sales_db, queries)) == expected
+
+
+def test_sliding_window_scans_one_day(sales_db, fake_redis):
+    """Moving a whole-day window by a day scans only the new day."""
+    day = timedelta(days=1)
+    window = {
+        "start_date": datetime(2024, 3, 2),
+        "end_date": datetime(2024, 3, 31, 23, 59, 59, 999999),
+    }
+    compose_from_days(sales_db, analytics_queries(**window))
+
+    shifted = {name: value + day for name, value in window.items()}
+    with patch.object(
+        DayPartials,
+        "_scan_days",
+        autospec=True,
+        side_effect=DayPartials._scan_days,
+    ) as scan:
+        results = compose_from_days(sales_db, analytics_queries(**shifted))
+
+    scan.assert_called_once()
+    _self, _filters, start, end = scan.call_args[0]
+    assert (start, end) == (datetime(2024, 4, 1), shifted["end_date"])
+    assert rounded(results) == rounded(
+        direct_results(sales_db, analytics_queries(**shifted))
+    )
+
+
+def test_service_methods_use_day_partials(sales_db, fake_redis):
+    """Cached service methods compose from (and fill) day partials."""
+    RollupService(sales_db).rebuild_all()
+    service = AnalyticsService(sales_db)
+    summary = AnalyticsService.get_metrics_summary.__wrapped__(
+        service, **RANGE
+    )
+
+    key = day_partial_key(datetime(2024, 3, 10).date(), None, None)
+    assert key in fake_redis.stored
+    assert rounded(summary) == rounded(
+        direct_results(sales_db, {"s": ("get_metrics_summary", RANGE)})["s"]
+    )
+
+
+def test_not_composable(sales_db, fake_redis):
+    """Open, sub-day and unsupported queries fall back to a scan."""
+    open_range = {"start_date": datetime(2024, 3, 5)}
+    same_day = {
+        "start_date": datetime(2024, 3, 5, 10),
+        "end_date": datetime(2024, 3, 5, 18),
+    }
+    assert compose_from_days(sales_db, analytics_queries(**open_range)) is None
+    assert compose_from_days(sales_db, analytics_queries(**same_day)) is None
+    assert (
+        compose_from_days(
+            sales_db, {"top": ("get_top_products", dict(RANGE))}
+        )
+        is None
+    )
+
+    with patch("app.services.cache.redis_client", None):
+        assert compose_from_days(sales_db, analytics_queries(**RANGE)) is None
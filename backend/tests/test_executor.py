@@ -0,0 +1,78 @@
+"""
+Tests for the blocking database call executor.
+"""
+
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.executor import DBExecutor
+from app.main import app
+
+
+@pytest.fixture
+def executor():
+    """Small executor shut down after each test."""
+    executor = DBExecutor(max_workers=2)
+    yield executor
+    executor.shutdown()
+
+
+def test_run_returns_result_and_records_stats(executor):
+    """Calls run on the pool and are counted."""
+    result = asyncio.run(executor.run(lambda a, b=0: a + b, 2, b=3))
+
+    assert result == 5
+    stats = executor.stats()
+    assert stats["max_workers"] == 2
+    assert stats["completed"] == 1
+    assert stats["failed"] == 0
+    assert stats["queue_depth"] == 0
+    assert stats["active"] == 0
+
+
+def test_run_propagates_exceptions(executor):
+    """Exceptions raised on the worker reach the caller."""
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        asyncio.run(executor.run(fail))
+    assert executor.stats()["failed"] == 1
+
+
+def test_blocking_call_does_not_block_event_loop(executor):
+    """The event loop keeps serving while a slow call runs."""
+
+    async def scenario():
+        slow = asyncio.ensure_future(executor.run(time.sleep, 0.3))
+        started = time.perf_counter()
+        await asyncio.sleep(0.01)
+        elapsed = time.perf_counter() - started
+        await slow
+        return elapsed
+
+    assert asyncio.run(scenario()) < 0.2
+
+
+def test_calls_beyond_pool_size_queue(executor):
+    """Calls above max_workers wait in the queue and report wait time."""
+
+    async def scenario():
+        calls = [executor.run(time.sleep, 0.1) for _ in range(4)]
+        await asyncio.gather(*calls)
+
+    asyncio.run(scenario())
+    stats = executor.stats()
+    assert stats["completed"] == 4
+    assert stats["max_wait_ms"] >= 50
+
+
+def test_health_reports_executor_stats():
+    """Health check exposes executor metrics."""
+    response = TestClient(app).get("/api/v1/health")
+    assert response.status_code == 200
+    assert "queue_depth" in response.json()["db_executor"]
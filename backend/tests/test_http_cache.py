@@ -0,0 +1,195 @@
+"""
+Tests for HTTP conditional caching (ETag / Cache-Control).
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastapi import Request
+
+from app.config import settings
+from app.core.http_cache import HttpCache, etag_matches
+from app.services.analytics import AnalyticsService
+
+SUMMARY_URL = "/api/v1/analytics/summary"
+CLOSED_RANGE = {"start_date": "2024-01-01", "end_date": "2024-01-31"}
+
+
+def test_etag_matches():
+    """If-None-Match lists, weak tags and '*' are honoured."""
+    assert etag_matches('"a"', '"a"')
+    assert etag_matches('"x", W/"a"', '"a"')
+    assert etag_matches("*", '"a"')
+    assert not etag_matches('"b"', '"a"')
+    assert not etag_matches(None, '"a"')
+
+
+def test_closed_range_not_modified_without_computing(client):
+    """A current ETag over a closed range skips the service call."""
+    first = client.get(SUMMARY_URL, params=CLOSED_RANGE)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert (
+        f"max-age={settings.HTTP_CACHE_CLOSED_MAX_AGE_SECONDS}"
+        in first.headers["cache-control"]
+    )
+    assert "stale-while-revalidate" in first.headers["cache-control"]
+
+    with patch(
+        "app.api.v1.analytics.run_db", new_callable=AsyncMock
+    ) as run_db:
+        second = client.get(
+            SUMMARY_URL,
+            params=CLOSED_RANGE,
+            headers={"If-None-Match": etag},
+        )
+
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == etag
+    run_db.assert_not_awaited()
+
+    other = client.get(
+        SUMMARY_URL,
+        params={**CLOSED_RANGE, "store_id": 1},
+        headers={"If-None-Match": etag},
+    )
+    assert other.status_code == 200
+    assert other.headers["etag"] != etag
+
+
+def test_closed_range_etag_follows_invalidations(client):
+    """Invalidating cached results changes closed-range ETags."""
+    with patch(
+        "app.services.cache.invalidation_generation", return_value="3"
+    ):
+        first = client.get(SUMMARY_URL, params=CLOSED_RANGE)
+        same = client.get(
+            SUMMARY_URL,
+            params=CLOSED_RANGE,
+            headers={"If-None-Match": first.headers["etag"]},
+        )
+    with patch(
+        "app.services.cache.invalidation_generation", return_value="4"
+    ):
+        changed = client.get(
+            SUMMARY_URL,
+            params=CLOSED_RANGE,
+            headers={"If-None-Match": first.headers["etag"]},
+        )
+
+    assert same.status_code == 304
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != first.headers["etag"]
+
+
+def test_open_range_etag_follows_data_version(client):
+    """Open ranges are keyed by the store's data version."""
+    params = {"store_id": 1}
+    with patch(
+        "app.services.cache.data_version_for", return_value="10:1"
+    ):
+        first = client.get(SUMMARY_URL, params=params)
+        same = client.get(
+            SUMMARY_URL,
+            params=params,
+            headers={"If-None-Match": first.headers["etag"]},
+        )
+    with patch(
+        "app.services.cache.data_version_for", return_value="11:2"
+    ):
+        changed = client.get(
+            SUMMARY_URL,
+            params=params,
+            headers={"If-None-Match": first.headers["etag"]},
+        )
+
+    assert same.status_code == 304
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != first.headers["etag"]
+    assert (
+        f"max-age={settings.HTTP_CACHE_MAX_AGE_SECONDS},"
+        in first.headers["cache-control"]
+    )
+
+
+def test_open_range_without_version_hashes_body(client):
+    """Without a data version the ETag comes from the body."""
+    first = client.get(SUMMARY_URL)
+    second = client.get(
+        SUMMARY_URL, headers={"If-None-Match": first.headers["etag"]}
+    )
+
+    assert first.status_code == 200
+    assert second.status_code == 304
+
+
+def test_reference_data_etag(client):
+    """Stores and channels answer 304 while unchanged."""
+    for url in ("/api/v1/stores", "/api/v1/channels"):
+        first = client.get(url)
+        assert first.status_code == 200
+        second = client.get(
+            url, headers={"If-None-Match": first.headers["etag"]}
+        )
+        assert second.status_code == 304
+
+
+def test_disabled(client):
+    """HTTP_CACHE_ENABLED=false sends plain responses."""
+    with patch.object(settings, "HTTP_CACHE_ENABLED", False):
+        response = client.get(SUMMARY_URL, params=CLOSED_RANGE)
+
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+    assert "cache-control" not in response.headers
+
+
+def _request(if_none_match=None):
+    """GET request for the summary endpoint."""
+    headers = []
+    if if_none_match:
+        headers.append((b"if-none-match", if_none_match.encode()))
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "scheme": "http",
+            "server": ("testserver", 80),
+            "root_path": "",
+            "path": SUMMARY_URL,
+            "query_string": b"",
+            "headers": headers,
+        }
+    )
+
+
+def test_check_reads_validators_without_blocking():
+    """Data versions behind an ETag are read through the asyncio client."""
+    sync_redis = MagicMock()
+    async_redis = MagicMock()
+    async_redis.hgetall = AsyncMock(
+        return_value={b"1": b"10:1", b"invalidations": b"2"}
+    )
+    params = {"store_id": 1}
+
+    async def check(if_none_match=None):
+        http_cache = HttpCache(_request(if_none_match))
+        current = await http_cache.check_result(
+            AnalyticsService.get_metrics_summary, params
+        )
+        return current, http_cache.etag
+
+    with patch("app.services.cache.redis_client", sync_redis), patch(
+        "app.services.cache.async_redis_client", return_value=async_redis
+    ):
+        current, etag = asyncio.run(check())
+        same, same_etag = asyncio.run(check(etag))
+
+    # An open range with a known version gets a key-derived ETag
+    assert etag is not None
+    assert not current
+    assert same
+    assert same_etag == etag
+    async_redis.hgetall.assert_awaited()
+    sync_redis.hgetall.assert_not_called()
@@ -0,0 +1,48 @@
+"""
+Tests for the advisory locks electing the worker that runs a job.
+"""
+
+import os
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
+
+from app.jobs.locks import JobLock, job_lock_key
+
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+
+def test_lock_keys_are_stable_and_distinct():
+    """Every worker derives the same key for a job, and one per job."""
+    assert job_lock_key("rollups") == job_lock_key("rollups")
+    assert job_lock_key("rollups") != job_lock_key("cache_warmer")
+    assert -(2**63) <= job_lock_key("rollups") < 2**63
+
+
+def test_lock_granted_off_postgres():
+    """A single process without advisory locks always runs its jobs."""
+    lock = JobLock("rollups", bind=create_engine("sqlite://"))
+
+    assert lock.acquire() is True
+    lock.release()
+
+
+@pytest.mark.skipif(not POSTGRES_URL, reason="TEST_POSTGRES_URL not set")
+def test_one_worker_holds_the_lock():
+    """A second worker runs the job only once the first lets it go."""
+    bind = create_engine(POSTGRES_URL, poolclass=NullPool)
+    first = JobLock("test_job", bind=bind)
+    second = JobLock("test_job", bind=bind)
+    try:
+        assert first.acquire() is True
+        assert second.acquire() is False
+        # The holder keeps running the job at every interval
+        assert first.acquire() is True
+
+        first.release()
+        assert second.acquire() is True
+    finally:
+        first.release()
+        second.release()
+        bind.dispose()
@@ -0,0 +1,175 @@
+"""
+Tests for monthly sales partitioning and its maintenance job.
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+from unittest.mock import patch
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.config import settings
+from app.jobs.partitions import (
+    _detached_day_tags,
+    add_months,
+    create_partition_sql,
+    is_partitioned,
+    partition_month,
+    partition_name,
+)
+from app.models.channel import Channel
+from app.models.payment import Payment
+from app.models.product import Product
+from app.models.product_sale import ProductSale
+from app.models.sale import Sale
+from app.models.store import Store
+from app.services.analytics import AnalyticsService
+from app.services.query_filter_builder import QueryFilterBuilder
+
+START = datetime(2024, 3, 1)
+END = datetime(2024, 3, 31, 23, 59, 59)
+
+
+def _compiled(query):
+    """SQL text of a statement."""
+    return str(query.compile(dialect=postgresql.dialect()))
+
+
+def test_month_arithmetic_and_names():
+    """Months roll over years; names round-trip to their month."""
+    assert add_months(date(2024, 11, 1), 3) == date(2025, 2, 1)
+    assert add_months(date(2024, 1, 1), -1) == date(2023, 12, 1)
+    assert partition_name("sales", date(2024, 6, 1)) == "sales_p2024_06"
+    assert partition_month("sales", "sales_p2024_06") == date(2024, 6, 1)
+    assert partition_month("sales", "sales_default") is None
+    assert partition_month("sales", "product_sales_p2024_06") is None
+
+
+def test_create_partition_sql():
+    """A month partition covers [first day, first day of next month)."""
+    sql = create_partition_sql("payments", date(2024, 12, 1))
+
+    assert 'CREATE TABLE IF NOT EXISTS "payments_p2024_12"' in sql
+    assert 'PARTITION OF "payments"' in sql
+    assert "FROM ('2024-12-01') TO ('2025-01-01')" in sql
+
+
+def test_detached_day_tags_cover_sales_months():
+    """Every day of a detached sales month is invalidated."""
+    tags = _detached_day_tags(
+        ["payments_p2024_02", "sales_p2024_02", "sales_default"]
+    )
+
+    assert len(tags) == 29
+    assert tags[0] == "day:2024-02-01"
+    assert tags[-1] == "day:2024-02-29"
+
+
+def test_partition_bounds_follow_setting():
+    """Children get sale_created_at bounds only when partitioning is on."""
+    query = select(Sale.id).join(Payment, Payment.sale_id == Sale.id)
+
+    with patch.object(settings, "SALES_PARTITIONING_ENABLED", False):
+        plain = QueryFilterBuilder.apply_basic_filters(
+            query, start_date=START, end_date=END, partitioned=(Payment,)
+        )
+    with patch.object(settings, "SALES_PARTITIONING_ENABLED", True):
+        bounded = QueryFilterBuilder.apply_basic_filters(
+            query, start_date=START, end_date=END, partitioned=(Payment,)
+        )
+
+    assert "sale_created_at" not in _compiled(plain)
+    assert "payments.sale_created_at >=" in _compiled(bounded)
+    assert "payments.sale_created_at <=" in _compiled(bounded)
+
+
+def test_partitioned_queries_match(db_session):
+    """Bounding the children on their sale's date keeps the results."""
+    db_session.add_all(
+        [
+            Store(id=1, name="Loja 1"),
+            Channel(id=1, name="Presencial", type="P"),
+            Product(id=1, name="X-Burger"),
+        ]
+    )
+    for i, day in enumerate((2, 15, 28), start=1):
+        created_at = datetime(2024, 3, day, 12, 0)
+        db_session.add(
+            Sale(
+                id=i,
+                store_id=1,
+                channel_id=1,
+                created_at=created_at,
+                sale_status_desc="COMPLETED",
+                total_amount_items=Decimal("30.00"),
+                total_amount=Decimal("30.00"),
+            )
+        )
+        db_session.add(
+            ProductSale(
+                id=i,
+                sale_id=i,
+                sale_created_at=created_at,
+                product_id=1,
+                quantity=2,
+                base_price=15.0,
+                total_price=30.0,
+            )
+        )
+    db_session.commit()
+
+    service = AnalyticsService(db_session)
+    method = AnalyticsService.get_products_margin.__wrapped__
+    with patch.object(settings, "SALES_PARTITIONING_ENABLED", False):
+        plain = method(service, start_date=START, end_date=END)
+    with patch.object(settings, "SALES_PARTITIONING_ENABLED", True):
+        bounded = method(service, start_date=START, end_date=END)
+
+    assert bounded == plain
+    assert bounded[0]["total_quantity"] == 6
+
+
+def test_children_get_sale_created_at_on_insert(db_session):
+    """Children inserted without sale_created_at copy it from the sale."""
+    created_at = datetime(2024, 3, 9, 20, 30)
+    db_session.add_all(
+        [
+            Store(id=1, name="Loja 1"),
+            Channel(id=1, name="Presencial", type="P"),
+            Product(id=1, name="X-Burger"),
+            Sale(
+                id=1,
+                store_id=1,
+                channel_id=1,
+                created_at=created_at,
+                sale_status_desc="COMPLETED",
+                total_amount_items=Decimal("30.00"),
+                total_amount=Decimal("30.00"),
+            ),
+        ]
+    )
+    db_session.commit()
+
+    # Linked by sale_id only (sale not loaded) or through the relationship
+    product_sale = ProductSale(
+        sale_id=1,
+        product_id=1,
+        quantity=2,
+        base_price=15.0,
+        total_price=30.0,
+    )
+    payment = Payment(sale=db_session.get(Sale, 1), value=Decimal("30.00"))
+    db_session.add_all([product_sale, payment])
+    db_session.commit()
+
+    assert product_sale.sale_created_at == created_at
+    assert payment.sale_created_at == created_at
+    assert db_session.get(
+        ProductSale, (product_sale.id, created_at)
+    ) is product_sale
+
+
+def test_not_partitioned_off_postgres(db_session):
+    """Maintenance is a no-op on databases without partitioning."""
+    assert is_partitioned(db_session) is False
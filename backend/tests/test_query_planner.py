@@ -0,0 +1,235 @@
+"""
+Tests for the shared-scan query planner.
+"""
+
+import asyncio
+import os
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import create_engine, make_url, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import asyncpg
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+from app.models.channel import Channel
+from app.models.sale import Sale
+from app.models.store import Store
+from app.schemas.analytics import BatchQuery
+from app.services.analytics_batch import AnalyticsBatchService
+from app.services.query_planner import (
+    SharedScan,
+    compute_shared,
+    plan_queries,
+)
+from app.services.rollup import RollupService
+from conftest import analytics_queries, direct_results, rounded
+
+# Fewer sales than the sales_db default: no ties in the channel ranking
+EIGHTY_SALES = pytest.mark.parametrize("sales_db", [80], indirect=True)
+
+# Database the asyncpg test may create a scratch schema in
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+SCHEMA = "planner_tests"
+
+
+def test_plan_groups_queries_by_filter_set():
+    """Shared-scan queries with equal predicates form one group."""
+    january = {"start_date": datetime(2024, 1, 1)}
+    groups = plan_queries(
+        {
+            "a": ("get_metrics_summary", january),
+            "b": ("get_revenue", {**january, "group_by": "month"}),
+            "c": ("get_top_products", january),
+            "d": ("get_channel_performance", january),
+            "e": ("get_metrics_summary", {"store_id": 1}),
+        }
+    )
+    assert groups == [["a", "b", "d"], ["c"], ["e"]]
+
+
+@EIGHTY_SALES
+@pytest.mark.parametrize(
+    "filters",
+    [
+        {},
+        {"store_id": 1},
+        {"channel_id": 2},
+        {
+            "start_date": datetime(2024, 3, 5, 10, 30),
+            "end_date": datetime(2024, 3, 30, 15, 20),
+        },
+    ],
+)
+def test_shared_scan_matches_service_methods(sales_db, filters):
+    """One scan returns exactly what the individual methods return."""
+    queries = analytics_queries(**filters)
+
+    assert rounded(compute_shared(sales_db, queries)) == rounded(
+        direct_results(sales_db, queries)
+    )
+
+
+@EIGHTY_SALES
+def test_shared_scan_uses_rollup(sales_db):
+    """The scan reads the hourly rollup when it is available."""
+    RollupService(sales_db).rebuild_all()
+    queries = analytics_queries(start_date=datetime(2024, 3, 3, 9, 10))
+
+    with patch.object(
+        RollupService,
+        "sales_hourly_facts",
+        autospec=True,
+        side_effect=RollupService.sales_hourly_facts,
+    ) as facts:
+        shared = compute_shared(sales_db, queries)
+
+    assert facts.call_count == 1
+    assert rounded(shared) == rounded(direct_results(sales_db, queries))
+
+
+@EIGHTY_SALES
+def test_shared_scan_empty_range(sales_db):
+    """Filter sets without sales give the methods' empty results."""
+    queries = analytics_queries(start_date=datetime(2030, 1, 1))
+    assert compute_shared(sales_db, queries) == direct_results(sales_db, queries)
+
+
+def test_postgres_scan_uses_grouping_sets():
+    """On PostgreSQL every shape comes from one GROUPING SETS statement."""
+    db = MagicMock()
+    db.bind.dialect.name = "postgresql"
+    db.bind.url = "postgresql://localhost/test"
+    db.execute.return_value = []
+
+    with patch(
+        "app.services.rollup.settings.ANALYTICS_ROLLUPS_ENABLED", False
+    ):
+        results = SharedScan(db).execute(analytics_queries(store_id=1))
+
+    db.execute.assert_called_once()
+    sql = str(
+        db.execute.call_args[0][0].compile(dialect=postgresql.dialect())
+    )
+    assert "GROUPING SETS" in sql
+    assert "grouping(" in sql
+    assert results["summary"]["sales_count"] == 0
+    assert results["revenue_day"] == []
+
+
+def test_postgres_scan_inlines_period_units():
+    """Under asyncpg the grouped periods are the selected expressions."""
+    db = MagicMock()
+    db.bind.dialect.name = "postgresql"
+    db.bind.url = "postgresql+asyncpg://localhost/test"
+    db.execute.return_value = []
+
+    with patch(
+        "app.services.rollup.settings.ANALYTICS_ROLLUPS_ENABLED", False
+    ):
+        SharedScan(db).execute(analytics_queries(store_id=1))
+
+    compiled = db.execute.call_args[0][0].compile(dialect=asyncpg.dialect())
+    sql = str(compiled)
+    units = {"day", "week", "month"}
+    for unit in units:
+        assert f"date_trunc('{unit}'," in sql
+    assert not units & set(map(str, compiled.params.values()))
+
+
+@pytest.mark.skipif(not POSTGRES_URL, reason="TEST_POSTGRES_URL not set")
+def test_grouping_sets_scan_on_asyncpg():
+    """The GROUPING SETS scan runs on asyncpg and matches the methods."""
+    admin = create_engine(POSTGRES_URL)
+    with admin.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    engine = create_engine(
+        POSTGRES_URL, connect_args={"options": f"-csearch_path={SCHEMA}"}
+    )
+    async_engine = create_async_engine(
+        make_url(POSTGRES_URL).set(drivername="postgresql+asyncpg"),
+        connect_args={"server_settings": {"search_path": SCHEMA}},
+    )
+    queries = analytics_queries(store_id=1)
+
+    async def scan():
+        async with AsyncSession(async_engine) as session:
+            return await session.run_sync(
+                lambda db: SharedScan(db).execute(queries)
+            )
+
+    try:
+        Base.metadata.create_all(bind=engine)
+        with Session(engine) as db, patch(
+            "app.services.rollup.settings.ANALYTICS_ROLLUPS_ENABLED", False
+        ):
+            db.add_all(
+                [
+                    Store(id=1, name="Loja 1"),
+                    Channel(id=1, name="Presencial", type="P"),
+                ]
+            )
+            db.add_all(
+                [
+                    Sale(
+                        id=i,
+                        store_id=1,
+                        channel_id=1,
+                        total_amount=Decimal("10.00") * i,
+                        total_amount_items=Decimal("10.00") * i,
+                        created_at=(
+                            datetime(2024, 1, 1) + timedelta(hours=7 * i)
+                        ),
+                        sale_status_desc="COMPLETED",
+                    )
+                    for i in range(1, 61)
+                ]
+            )
+            db.commit()
+            expected = direct_results(db, queries)
+            shared = asyncio.run(scan())
+    finally:
+        asyncio.run(async_engine.dispose())
+        engine.dispose()
+        with admin.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        admin.dispose()
+
+    assert rounded(shared) == rounded(expected)
+    assert shared["revenue_month"]
+
+
+@EIGHTY_SALES
+def test_batch_merges_shared_queries(sales_db):
+    """The batch service answers a shared filter set with one scan."""
+
+    @contextmanager
+    def shared_session():
+        yield sales_db
+
+    service = AnalyticsBatchService(
+        session_factory=shared_session, max_concurrency=1
+    )
+    queries = [
+        BatchQuery(id="kpis", metric="metrics_summary"),
+        BatchQuery(id="revenue", metric="revenue"),
+        BatchQuery(id="channels", metric="channel_performance"),
+        BatchQuery(id="products", metric="top_products"),
+    ]
+
+    with patch(
+        "app.services.analytics_batch.compute_shared",
+        side_effect=compute_shared,
+    ) as shared:
+        results = asyncio.run(service.execute(queries))
+
+    assert shared.call_count == 1
+    assert len(shared.call_args[0][1]) == 3
+    assert all(r["status"] == "ok" for r in results)
+    assert results[0]["data"]["sales_count"] == 67
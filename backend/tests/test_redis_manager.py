@@ -0,0 +1,191 @@
+"""
+Tests for the managed Redis client and its circuit breaker.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+import redis
+
+from app.services import cache
+from app.services.redis_manager import (
+    CircuitBreaker,
+    CircuitOpenError,
+    PoolExhaustedError,
+    RedisManager,
+)
+
+
+@pytest.fixture
+def manager():
+    """Manager whose underlying client is a mock (no sockets)."""
+    manager = RedisManager("redis://localhost:6399")
+    manager.client._client = MagicMock()
+    with patch.object(manager, "_start_reconnector"):
+        yield manager
+
+
+def test_breaker_opens_after_consecutive_failures():
+    """Only consecutive failures count; reset closes the circuit."""
+    breaker = CircuitBreaker(failure_threshold=2)
+    assert not breaker.record_failure()
+    breaker.record_success()
+    assert not breaker.record_failure()
+    assert breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    breaker.reset()
+    assert breaker.allow()
+    assert breaker.stats()["trips"] == 1
+
+
+def test_open_circuit_fails_fast(manager):
+    """After the threshold, commands fail without touching Redis."""
+    raw = manager.client._client
+    raw.get.side_effect = redis.exceptions.ConnectionError("down")
+
+    for _ in range(manager.breaker.failure_threshold):
+        with pytest.raises(redis.exceptions.ConnectionError):
+            manager.client.get("key")
+
+    assert not manager.client
+    manager._start_reconnector.assert_called_once()
+
+    raw.get.reset_mock()
+    with pytest.raises(CircuitOpenError):
+        manager.client.get("key")
+    raw.get.assert_not_called()
+
+
+def test_command_errors_do_not_trip(manager):
+    """Errors other than connection failures leave the circuit closed."""
+    manager.client._client.incr.side_effect = redis.exceptions.ResponseError(
+        "not an integer"
+    )
+    for _ in range(manager.breaker.failure_threshold + 1):
+        with pytest.raises(redis.exceptions.ResponseError):
+            manager.client.incr("key")
+
+    assert manager.client
+
+
+def test_pipeline_execute_is_guarded(manager):
+    """Pipeline failures count toward the breaker."""
+    pipe = manager.client._client.pipeline.return_value
+    pipe.execute.side_effect = redis.exceptions.TimeoutError()
+
+    for _ in range(manager.breaker.failure_threshold):
+        p = manager.client.pipeline(transaction=False)
+        p.setex("key", 10, b"value")
+        with pytest.raises(redis.exceptions.TimeoutError):
+            p.execute()
+
+    pipe.setex.assert_called_with("key", 10, b"value")
+    assert not manager.client
+
+
+def test_exhausted_pool_does_not_trip():
+    """An exhausted pool waits briefly and does not trip the breaker."""
+    with patch.object(cache.settings, "REDIS_MAX_CONNECTIONS", 1), \
+            patch.object(cache.settings, "REDIS_POOL_TIMEOUT_SECONDS", 0.01):
+        manager = RedisManager("redis://localhost:6399")
+    manager.pool.pool.get_nowait()  # the only connection is checked out
+
+    with patch.object(manager, "_start_reconnector") as reconnect:
+        for _ in range(manager.breaker.failure_threshold + 1):
+            with pytest.raises(PoolExhaustedError):
+                manager.client.get("key")
+
+    assert manager.client
+    reconnect.assert_not_called()
+
+
+def test_async_pipeline_execute_is_guarded(manager):
+    """asyncio pipeline failures count toward the breaker."""
+    async_client = manager.async_client()
+    async_client._client = MagicMock()
+    pipe = async_client._client.pipeline.return_value
+    pipe.execute = AsyncMock(side_effect=redis.exceptions.TimeoutError())
+
+    async def run():
+        for _ in range(manager.breaker.failure_threshold):
+            p = async_client.pipeline(transaction=False)
+            p.setex("key", 10, b"value")
+            with pytest.raises(redis.exceptions.TimeoutError):
+                await p.execute()
+
+    asyncio.run(run())
+    pipe.setex.assert_called_with("key", 10, b"value")
+    assert not manager.client
+
+
+def test_async_client_per_event_loop(manager):
+    """Each event loop gets its own asyncio client."""
+
+    async def current():
+        return manager.async_client()
+
+    first = asyncio.run(current())
+    second = asyncio.run(current())
+
+    assert first is not second
+    assert first._client.connection_pool is not (
+        second._client.connection_pool
+    )
+
+
+def test_down_at_boot_reconnects_in_background():
+    """A Redis down at boot is picked up once a ping succeeds."""
+    manager = RedisManager("redis://localhost:6399")
+    manager.client._client = MagicMock()
+    manager.client._client.ping.side_effect = [
+        redis.exceptions.ConnectionError("down"),
+        redis.exceptions.ConnectionError("still down"),
+        True,
+    ]
+
+    with patch.object(
+        cache.settings, "REDIS_RECONNECT_INTERVAL_SECONDS", 0.01
+    ):
+        client = manager.connect()
+        assert not client
+        manager._reconnector.join(timeout=2)
+
+    assert client
+    assert manager.client._client.ping.call_count == 3
+
+
+def test_async_client_shares_breaker(manager):
+    """The asyncio client fails fast once the circuit is open."""
+    async_client = manager.async_client()
+    async_client._client = MagicMock()
+    async_client._client.get = AsyncMock(
+        side_effect=redis.exceptions.ConnectionError("down")
+    )
+
+    async def run():
+        for _ in range(manager.breaker.failure_threshold):
+            with pytest.raises(redis.exceptions.ConnectionError):
+                await async_client.get("key")
+        with pytest.raises(CircuitOpenError):
+            await async_client.get("key")
+
+    asyncio.run(run())
+    assert not async_client
+    assert not manager.client
+    assert async_client._client.get.await_count == (
+        manager.breaker.failure_threshold
+    )
+
+
+def test_cache_bypasses_open_circuit(manager):
+    """Cache helpers skip Redis entirely while the circuit is open."""
+    manager.breaker.trip()
+    with patch("app.services.cache.redis_client", manager.client):
+        assert cache.get_cache("key") is None
+        assert cache.set_cache("key", {"a": 1}, 60) is False
+
+    manager.client._client.get.assert_not_called()
+    manager.client._client.setex.assert_not_called()
@@ -0,0 +1,320 @@
+"""
+Tests for the incrementally maintained analytics rollups.
+"""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app.models.channel import Channel
+from app.models.product import Product
+from app.models.product_sale import ProductSale
+from app.models.product_sales_daily_rollup import ProductSalesDailyRollup
+from app.models.rollup_change import RollupChange
+from app.models.sale import Sale
+from app.models.sales_hourly_rollup import SalesHourlyRollup
+from app.models.store import Store
+from app.services.analytics import AnalyticsService
+from app.services.rollup import (
+    RollupService,
+    SALES_HOURLY,
+    PRODUCT_SALES_DAILY,
+)
+from conftest import rounded
+
+BASE_DATE = datetime(2024, 3, 1, 8, 0, 0)
+
+
+def _add_sales(db, first_id, count):
+    """Add sales spread over several days, hours and statuses."""
+    sales = []
+    for i in range(first_id, first_id + count):
+        amount = Decimal(str(20 + (i % 7) * 5))
+        sales.append(
+            Sale(
+                id=i,
+                store_id=1 if i % 3 else 2,
+                channel_id=1 if i % 2 else 2,
+                total_amount_items=amount,
+                total_amount=amount,
+                total_discount=Decimal("1.50") if i % 4 == 0 else 0,
+                created_at=BASE_DATE
+                + timedelta(days=i % 5, hours=i % 13, minutes=(i * 7) % 60),
+                sale_status_desc="CANCELLED" if i % 6 == 0 else "COMPLETED",
+                delivery_seconds=1200 + i * 10 if i % 2 == 0 else None,
+            )
+        )
+    db.add_all(sales)
+    db.flush()
+
+
+def _add_product_sales(db, first_sale_id, count):
+    """Add one or two product lines to each sale."""
+    lines = []
+    for i in range(first_sale_id, first_sale_id + count):
+        for product_id in {1 + i % 4, 1 + (i * 3) % 4}:
+            base_price = 8.0 + product_id * 3.5 + (i % 3)
+            quantity = float(1 + (i + product_id) % 3)
+            lines.append(
+                ProductSale(
+                    sale_id=i,
+                    product_id=product_id,
+                    quantity=quantity,
+                    base_price=base_price,
+                    total_price=base_price * quantity,
+                )
+            )
+    db.add_all(lines)
+    db.flush()
+
+
+@pytest.fixture
+def rollup_db(db_session):
+    """Session with stores, channels and sales."""
+    db_session.add_all(
+        [
+            Store(id=1, name="Loja 1"),
+            Store(id=2, name="Loja 2"),
+            Channel(id=1, name="Presencial", type="P"),
+            Channel(id=2, name="iFood", type="D"),
+        ]
+    )
+    _add_sales(db_session, 1, 120)
+    return db_session
+
+
+@pytest.fixture
+def product_rollup_db(rollup_db):
+    """Session with sales and their product lines."""
+    rollup_db.add_all(
+        [
+            Product(id=1, name="Hambúrguer", cost=10.00),
+            Product(id=2, name="Batata Frita", cost=4.00),
+            Product(id=3, name="Refrigerante", cost=2.00),
+            Product(id=4, name="Sorvete", cost=3.00),
+        ]
+    )
+    _add_product_sales(rollup_db, 1, 120)
+    return rollup_db
+
+
+def _snapshot(service, **filters):
+    """Collect the rollup-backed analytics for a filter set."""
+    channel_filters = {
+        k: v for k, v in filters.items() if k != "channel_id"
+    }
+    return rounded({
+        "revenue": service.get_revenue(**filters),
+        "revenue_month": service.get_revenue(group_by="month", **filters),
+        "summary": service.get_metrics_summary(**filters),
+        "heatmap": service.get_peak_hours_heatmap(**filters),
+        "channels": service.get_channel_performance(**channel_filters),
+    })
+
+
+FILTER_SETS = [
+    {},
+    {"store_id": 1},
+    {"channel_id": 2},
+    {
+        "start_date": datetime(2024, 3, 2, 10, 30),
+        "end_date": datetime(2024, 3, 4, 15, 20),
+    },
+    {
+        "start_date": datetime(2024, 3, 2),
+        "end_date": datetime(2024, 3, 4),
+        "store_id": 2,
+    },
+    {
+        "start_date": datetime(2024, 3, 3, 9, 10),
+        "end_date": datetime(2024, 3, 3, 9, 50),
+    },
+]
+
+
+def test_facts_unavailable_before_first_refresh(rollup_db):
+    """Rollup is not used until it has been built."""
+    service = RollupService(rollup_db)
+    assert service.get_watermark(SALES_HOURLY) is None
+    assert service.sales_hourly_facts() is None
+
+
+def test_refresh_merges_all_sales(rollup_db):
+    """A refresh merges every sale and advances the watermark."""
+    service = RollupService(rollup_db)
+    merged = service.refresh_sales_hourly(batch_size=25)
+
+    assert merged == 120
+    assert service.get_watermark(SALES_HOURLY) == 120
+    total = sum(
+        row.sales_count for row in rollup_db.query(SalesHourlyRollup).all()
+    )
+    assert total == 120
+
+    # Nothing new to merge
+    assert service.refresh_sales_hourly() == 0
+
+
+@pytest.mark.parametrize("filters", FILTER_SETS)
+def test_rollup_matches_raw_scan(rollup_db, filters):
+    """Rollup-backed results match a direct scan of the sales table."""
+    analytics = AnalyticsService(rollup_db)
+    expected = _snapshot(analytics, **filters)
+
+    RollupService(rollup_db).refresh_sales_hourly(batch_size=40)
+    assert _snapshot(analytics, **filters) == expected
+
+
+def test_rollup_includes_sales_above_watermark(rollup_db):
+    """Sales inserted after a refresh are read from the sales table."""
+    rollups = RollupService(rollup_db)
+    rollups.refresh_sales_hourly()
+
+    _add_sales(rollup_db, 121, 30)
+    analytics = AnalyticsService(rollup_db)
+    with_tail = _snapshot(analytics)
+
+    rollups.refresh_sales_hourly()
+    assert rollups.get_watermark(SALES_HOURLY) == 150
+    assert _snapshot(analytics) == with_tail
+    assert with_tail["summary"]["sales_count"] == sum(
+        1 for i in range(1, 151) if i % 6 != 0
+    )
+
+
+def test_latest_sale_ids_by_store(rollup_db):
+    """Highest sale id per store, optionally after a watermark."""
+    rollups = RollupService(rollup_db)
+    latest = rollups.latest_sale_ids_by_store()
+
+    rows = rollup_db.query(Sale.store_id, Sale.id).all()
+    assert latest == {
+        store_id: max(i for s, i in rows if s == store_id)
+        for store_id in {s for s, _ in rows}
+    }
+    last_id = max(latest.values())
+    assert rollups.latest_sale_ids_by_store(after_id=last_id) == {}
+
+
+def _product_snapshot(service, **filters):
+    """Collect the product rollup-backed analytics for a filter set."""
+    temporal = {"day_of_week", "hour_start", "hour_end"}
+    basic = {k: v for k, v in filters.items() if k not in temporal}
+
+    def by_name(rows):
+        return sorted(rows, key=lambda row: row["product_name"])
+
+    return rounded({
+        "top": by_name(service.get_top_products(limit=50, **filters)),
+        "margin": by_name(service.get_products_margin(limit=50, **basic)),
+        "inventory": by_name(
+            service.get_inventory_turnover_analysis(limit=50, **basic)
+        ),
+    })
+
+
+PRODUCT_FILTER_SETS = FILTER_SETS + [
+    {"day_of_week": 5},
+    {"hour_start": 9, "hour_end": 14},
+    {
+        "start_date": datetime(2024, 3, 1, 12, 0),
+        "end_date": datetime(2024, 3, 5),
+        "hour_start": 12,
+        "hour_end": 17,
+        "day_of_week": 6,
+    },
+]
+
+
+def test_product_refresh_merges_all_lines(product_rollup_db):
+    """A refresh merges every product line and advances the watermark."""
+    service = RollupService(product_rollup_db)
+    assert service.product_daily_facts() is None
+
+    service.refresh_product_daily(batch_size=30)
+
+    assert service.get_watermark(PRODUCT_SALES_DAILY) == 120
+    rows = product_rollup_db.query(ProductSalesDailyRollup).all()
+    assert sum(row.line_count for row in rows) == (
+        product_rollup_db.query(ProductSale).count()
+    )
+    assert {row.hour_band for row in rows} <= set(range(0, 24, 3))
+
+
+@pytest.mark.parametrize("filters", PRODUCT_FILTER_SETS)
+def test_product_rollup_matches_raw_scan(product_rollup_db, filters):
+    """Product rollup-backed results match a scan of product_sales."""
+    analytics = AnalyticsService(product_rollup_db)
+    expected = _product_snapshot(analytics, **filters)
+    assert expected["top"]
+
+    RollupService(product_rollup_db).refresh_all()
+    assert _product_snapshot(analytics, **filters) == expected
+
+
+def test_product_facts_require_band_aligned_hours(product_rollup_db):
+    """Hour filters not on a band boundary fall back to product_sales."""
+    service = RollupService(product_rollup_db)
+    service.refresh_product_daily()
+
+    assert service.product_daily_facts(hour_start=9, hour_end=11) is not None
+    assert service.product_daily_facts(hour_start=10) is None
+    assert service.product_daily_facts(hour_end=12) is None
+
+
+def test_refresh_recomputes_logged_changes(product_rollup_db):
+    """Buckets of sales in the change log are rebuilt on refresh."""
+    rollups = RollupService(product_rollup_db)
+    rollups.refresh_all()
+
+    # What the migration 009 triggers log for an update and a delete
+    changed = product_rollup_db.get(Sale, 7)
+    changed.sale_status_desc = "CANCELLED"
+    changed.total_amount = Decimal("99.90")
+    deleted = product_rollup_db.get(Sale, 8)
+    product_rollup_db.query(ProductSale).filter(
+        ProductSale.sale_id == deleted.id
+    ).delete()
+    product_rollup_db.add_all(
+        [
+            RollupChange(sale_created_at=changed.created_at),
+            RollupChange(sale_created_at=deleted.created_at),
+        ]
+    )
+    product_rollup_db.delete(deleted)
+    product_rollup_db.flush()
+
+    analytics = AnalyticsService(product_rollup_db)
+    rollups.refresh_all()
+    with_rollup = (_snapshot(analytics), _product_snapshot(analytics))
+
+    RollupService(product_rollup_db).rebuild_all()
+    assert (_snapshot(analytics), _product_snapshot(analytics)) == with_rollup
+    assert rollups.changed_days == {
+        changed.created_at.date(),
+        deleted.created_at.date(),
+    }
+    assert product_rollup_db.query(RollupChange).count() == 2
+    assert rollups.prune_changes() == 2
+
+
+def test_refresh_includes_late_committed_sales(rollup_db):
+    """A sale committed after a higher id was merged is still counted."""
+    rollup_db.query(Sale).filter(Sale.id == 100).delete()
+    rollup_db.flush()
+    rollups = RollupService(rollup_db)
+    rollups.refresh_sales_hourly()
+    assert rollups.get_watermark(SALES_HOURLY) == 120
+
+    # Id 100 was allocated before 120 but its transaction commits later
+    _add_sales(rollup_db, 100, 1)
+    assert rollups.refresh_sales_hourly() == 0
+
+    with_rollup = _snapshot(AnalyticsService(rollup_db))
+    RollupService(rollup_db).rebuild_sales_hourly()
+    assert _snapshot(AnalyticsService(rollup_db)) == with_rollup
+    total = sum(
+        row.sales_count for row in rollup_db.query(SalesHourlyRollup).all()
+    )
+    assert total == 120
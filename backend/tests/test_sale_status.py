@@ -0,0 +1,99 @@
+"""
+Tests for the compact sale status codes.
+"""
+
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.models.channel import Channel
+from app.models.sale import Sale
+from app.models.sale_status import SaleStatus
+from app.models.store import Store
+from app.services.query_filter_builder import QueryFilterBuilder
+
+
+def _compiled(query):
+    """SQL text of a statement, with literal values."""
+    return str(
+        query.compile(
+            dialect=postgresql.dialect(),
+            compile_kwargs={"literal_binds": True},
+        )
+    )
+
+
+def _add_sales(db, statuses):
+    """Add one sale per status."""
+    db.add_all(
+        [
+            Store(id=1, name="Loja 1"),
+            Channel(id=1, name="Presencial", type="P"),
+        ]
+    )
+    for i, status in enumerate(statuses, start=1):
+        db.add(
+            Sale(
+                id=i,
+                store_id=1,
+                channel_id=1,
+                created_at=datetime(2024, 5, i, 12, 0),
+                sale_status_desc=status,
+                total_amount_items=Decimal("25.00"),
+                total_amount=Decimal("25.00"),
+            )
+        )
+    db.commit()
+
+
+def test_status_code_is_generated(db_session):
+    """The database derives the code from the status description."""
+    _add_sales(db_session, ["COMPLETED", "CANCELLED", "PENDING"])
+
+    codes = [
+        db_session.get(Sale, i).sale_status_code for i in range(1, 4)
+    ]
+
+    assert codes == [
+        SaleStatus.COMPLETED,
+        SaleStatus.CANCELLED,
+        SaleStatus.OTHER,
+    ]
+
+
+def test_status_filter_compares_code():
+    """Known statuses filter on the code, others on the description."""
+    completed = QueryFilterBuilder.apply_basic_filters(
+        select(Sale.id), status="COMPLETED"
+    )
+    pending = QueryFilterBuilder.apply_basic_filters(
+        select(Sale.id), status="PENDING"
+    )
+
+    assert "sales.sale_status_code = 1" in _compiled(completed)
+    assert "sale_status_desc" not in _compiled(completed)
+    assert "sales.sale_status_desc = 'PENDING'" in _compiled(pending)
+
+
+def test_status_filter_selects_matching_sales(db_session):
+    """Filtering by status returns the same sales as the description."""
+    _add_sales(db_session, ["COMPLETED", "CANCELLED", "COMPLETED"])
+
+    for status, expected in (("COMPLETED", [1, 3]), ("CANCELLED", [2])):
+        query = QueryFilterBuilder.apply_basic_filters(
+            db_session.query(Sale.id).order_by(Sale.id), status=status
+        )
+        assert [row.id for row in query.all()] == expected
+
+
+def test_lookup_is_seeded(db_session):
+    """Creating the tables from the models fills the lookup."""
+    rows = db_session.query(SaleStatus).order_by(SaleStatus.code).all()
+
+    assert [(row.code, row.description) for row in rows] == [
+        (0, "OTHER"),
+        (1, "COMPLETED"),
+        (2, "CANCELLED"),
+    ]
@@ -97,6 +97,14 @@ CREATE TABLE customers (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Compact sale status codes (see migrations/007_sale_status_codes.sql)
+CREATE TABLE sale_statuses (
+    code SMALLINT PRIMARY KEY,
+    description VARCHAR(100) NOT NULL UNIQUE
+);
+INSERT INTO sale_statuses (code, description) VALUES
+    (0, 'OTHER'), (1, 'COMPLETED'), (2, 'CANCELLED');
+
 CREATE TABLE sales (
     id SERIAL PRIMARY KEY,
     store_id INTEGER NOT NULL REFERENCES stores(id),
@@ -109,6 +117,8 @@ CREATE TABLE sales (
     created_at TIMESTAMP NOT NULL,
     customer_name VARCHAR(100),
     sale_status_desc VARCHAR(100) NOT NULL,
+    sale_status_code SMALLINT REFERENCES sale_statuses(code)
+        GENERATED ALWAYS AS (CASE sale_status_desc WHEN 'COMPLETED' THEN 1 WHEN 'CANCELLED' THEN 2 ELSE 0 END) STORED,
     
     -- Financial values
     total_amount_items DECIMAL(10,2) NOT NULL,
@@ -127,12 +137,20 @@ CREATE TABLE sales (
     -- Metadata
     discount_reason VARCHAR(300),
     increase_reason VARCHAR(300),
-    origin VARCHAR(100) DEFAULT 'POS'
+    origin VARCHAR(100) DEFAULT 'POS',
+
+    -- Calendar parts of created_at (see migrations/006_sales_calendar_columns.sql)
+    sale_date DATE GENERATED ALWAYS AS (CAST(created_at AS DATE)) STORED,
+    sale_dow SMALLINT GENERATED ALWAYS AS (CAST(EXTRACT(DOW FROM created_at) AS SMALLINT)) STORED,
+    sale_hour SMALLINT GENERATED ALWAYS AS (CAST(EXTRACT(HOUR FROM created_at) AS SMALLINT)) STORED,
+    sale_week DATE GENERATED ALWAYS AS (CAST(date_trunc('week', created_at) AS DATE)) STORED,
+    sale_month DATE GENERATED ALWAYS AS (CAST(date_trunc('month', created_at) AS DATE)) STORED
 );
 
 CREATE TABLE product_sales (
     id SERIAL PRIMARY KEY,
     sale_id INTEGER NOT NULL REFERENCES sales(id) ON DELETE CASCADE,
+    sale_created_at TIMESTAMP,  -- sales.created_at (partition key, migration 005)
     product_id INTEGER NOT NULL REFERENCES products(id),
     quantity FLOAT NOT NULL,
     base_price FLOAT NOT NULL,
@@ -168,6 +186,7 @@ CREATE TABLE item_item_product_sales (
 CREATE TABLE delivery_sales (
     id SERIAL PRIMARY KEY,
     sale_id INTEGER NOT NULL REFERENCES sales(id) ON DELETE CASCADE,
+    sale_created_at TIMESTAMP,  -- sales.created_at (partition key, migration 005)
     courier_id VARCHAR(100),
     courier_name VARCHAR(100),
     courier_phone VARCHAR(100),
@@ -208,6 +227,7 @@ CREATE TABLE payment_types (
 CREATE TABLE payments (
     id SERIAL PRIMARY KEY,
     sale_id INTEGER NOT NULL REFERENCES sales(id) ON DELETE CASCADE,
+    sale_created_at TIMESTAMP,  -- sales.created_at (partition key, migration 005)
     payment_type_id INTEGER REFERENCES payment_types(id),
     value DECIMAL(10,2) NOT NULL,
     is_online BOOLEAN DEFAULT false,
@@ -234,6 +254,56 @@ CREATE TABLE coupon_sales (
     target VARCHAR(100),
     sponsorship VARCHAR(100)
 );
+
+-- Analytics indexes (see migrations/004_analytics_indexes.sql)
+CREATE INDEX IF NOT EXISTS idx_sales_created_store_channel
+    ON sales(created_at, store_id, channel_id, sale_status_code);
+CREATE INDEX IF NOT EXISTS idx_sales_store_created
+    ON sales(store_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_sales_completed_created
+    ON sales(created_at, store_id, channel_id)
+    INCLUDE (total_amount, total_discount, delivery_seconds)
+    WHERE sale_status_code = 1;
+CREATE INDEX IF NOT EXISTS idx_sales_completed_store_created
+    ON sales(store_id, created_at)
+    INCLUDE (channel_id, total_amount, total_discount, delivery_seconds)
+    WHERE sale_status_code = 1;
+CREATE INDEX IF NOT EXISTS idx_sales_cancelled_created
+    ON sales(created_at, store_id)
+    WHERE sale_status_code = 2;
+CREATE INDEX IF NOT EXISTS idx_sales_created_brin
+    ON sales USING brin (created_at)
+    WITH (pages_per_range = 32, autosummarize = on);
+CREATE INDEX IF NOT EXISTS idx_sales_customer_created
+    ON sales(customer_id, created_at)
+    WHERE customer_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_sales_store_dow_hour
+    ON sales(store_id, sale_dow, sale_hour, created_at);
+CREATE INDEX IF NOT EXISTS idx_sales_channel_dow_hour
+    ON sales(channel_id, sale_dow, sale_hour, created_at);
+CREATE INDEX IF NOT EXISTS idx_product_sales_sale
+    ON product_sales(sale_id);
+CREATE INDEX IF NOT EXISTS idx_product_sales_product_sale
+    ON product_sales(product_id, sale_id);
+CREATE INDEX IF NOT EXISTS idx_item_product_sales_product_sale
+    ON item_product_sales(product_sale_id);
+CREATE INDEX IF NOT EXISTS idx_item_product_sales_item
+    ON item_product_sales(item_id);
+CREATE INDEX IF NOT EXISTS idx_item_item_product_sales_parent
+    ON item_item_product_sales(item_product_sale_id);
+CREATE INDEX IF NOT EXISTS idx_delivery_sales_sale
+    ON delivery_sales(sale_id);
+CREATE INDEX IF NOT EXISTS idx_delivery_addresses_sale
+    ON delivery_addresses(sale_id);
+CREATE INDEX IF NOT EXISTS idx_delivery_addresses_delivery_sale
+    ON delivery_addresses(delivery_sale_id);
+CREATE INDEX IF NOT EXISTS idx_payments_sale
+    ON payments(sale_id);
+CREATE INDEX IF NOT EXISTS idx_payments_payment_type
+    ON payments(payment_type_id);
+CREATE INDEX IF NOT EXISTS idx_coupon_sales_sale
+    ON coupon_sales(sale_id);
+
 -- Dashboards table
 CREATE TABLE IF NOT EXISTS dashboards (
     id SERIAL PRIMARY KEY,
@@ -254,3 +324,56 @@ CREATE INDEX IF NOT EXISTS idx_dashboards_user_id ON dashboards(user_id);
 CREATE INDEX IF NOT EXISTS idx_dashboards_is_default ON dashboards(is_default);
 CREATE INDEX IF NOT EXISTS idx_dashboards_share_token ON dashboards(share_token);
 CREATE INDEX IF NOT EXISTS idx_dashboards_is_shared ON dashboards(is_shared);
+
+-- Analytics rollups (see migrations/002_sales_hourly_rollup.sql)
+CREATE TABLE IF NOT EXISTS sales_hourly_rollup (
+    store_id INTEGER NOT NULL,
+    channel_id INTEGER NOT NULL,
+    sale_status_desc VARCHAR(100) NOT NULL,
+    bucket_start TIMESTAMP NOT NULL,
+    sales_count INTEGER NOT NULL DEFAULT 0,
+    total_amount DECIMAL(14,2) NOT NULL DEFAULT 0,
+    total_discount DECIMAL(14,2) NOT NULL DEFAULT 0,
+    delivery_seconds DECIMAL(16,0) NOT NULL DEFAULT 0,
+    delivery_count INTEGER NOT NULL DEFAULT 0,
+    first_sale_at TIMESTAMP,
+    last_sale_at TIMESTAMP,
+    PRIMARY KEY (store_id, channel_id, sale_status_desc, bucket_start)
+);
+CREATE INDEX IF NOT EXISTS idx_sales_hourly_rollup_bucket
+    ON sales_hourly_rollup(bucket_start);
+
+CREATE TABLE IF NOT EXISTS rollup_watermarks (
+    name VARCHAR(100) PRIMARY KEY,
+    last_sale_id INTEGER NOT NULL DEFAULT 0,
+    last_change_id BIGINT NOT NULL DEFAULT 0,
+    refreshed_at TIMESTAMP
+);
+
+-- Sales changed after being merged into the rollups; the triggers that
+-- fill it are in migrations/009_rollup_change_log.sql
+CREATE TABLE IF NOT EXISTS rollup_changes (
+    id BIGSERIAL PRIMARY KEY,
+    sale_created_at TIMESTAMP NOT NULL,
+    changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS product_sales_daily_rollup (
+    product_id INTEGER NOT NULL,
+    store_id INTEGER NOT NULL,
+    channel_id INTEGER NOT NULL,
+    sale_status_desc VARCHAR(100) NOT NULL,
+    bucket_date TIMESTAMP NOT NULL,
+    hour_band INTEGER NOT NULL,
+    day_of_week INTEGER NOT NULL,
+    quantity FLOAT NOT NULL DEFAULT 0,
+    total_price FLOAT NOT NULL DEFAULT 0,
+    base_price FLOAT NOT NULL DEFAULT 0,
+    line_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (
+        product_id, store_id, channel_id, sale_status_desc,
+        bucket_date, hour_band
+    )
+);
+CREATE INDEX IF NOT EXISTS idx_product_sales_daily_rollup_date
+    ON product_sales_daily_rollup(bucket_date, product_id);
@@ -4,6 +4,7 @@ God Level Coder Challenge - Data Generator
 Generates realistic restaurant data based on Arcca's actual models
 """
 
+import os
 import random
 import argparse
 from datetime import datetime, timedelta
@@ -618,10 +619,11 @@ def insert_sales_batch(cursor, sales_batch, items, option_groups):
         for prod_data in sale['products']:
             cursor.execute("""
                 INSERT INTO product_sales (
-                    sale_id, product_id, quantity, base_price, total_price
-                ) VALUES (%s,%s,%s,%s,%s) RETURNING id
+                    sale_id, sale_created_at, product_id,
+                    quantity, base_price, total_price
+                ) VALUES (%s,%s,%s,%s,%s,%s) RETURNING id
             """, (
-                sale_id, prod_data['product_id'],
+                sale_id, sale['created_at'], prod_data['product_id'],
                 prod_data['quantity'], prod_data['base_price'],
                 prod_data['total_price']
             ))
@@ -646,11 +648,12 @@ def insert_sales_batch(cursor, sales_batch, items, option_groups):
             d = sale['delivery']
             cursor.execute("""
                 INSERT INTO delivery_sales (
-                    sale_id, courier_name, courier_phone, courier_type,
-                    delivery_type, status, delivery_fee, courier_fee
-                ) VALUES (%s,%s,%s,%s,%s,%s,%s,%s) RETURNING id
+                    sale_id, sale_created_at, courier_name, courier_phone,
+                    courier_type, delivery_type, status, delivery_fee,
+                    courier_fee
+                ) VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s) RETURNING id
             """, (
-                sale_id, d['courier_name'], d['courier_phone'],
+                sale_id, sale['created_at'], d['courier_name'], d['courier_phone'],
                 d['courier_type'], d['delivery_type'], d['status'],
                 d['delivery_fee'], d['courier_fee']
             ))
@@ -681,30 +684,46 @@ def insert_sales_batch(cursor, sales_batch, items, option_groups):
             result = cursor.fetchone()
             if result:
                 cursor.execute("""
-                    INSERT INTO payments (sale_id, payment_type_id, value)
-                    VALUES (%s,%s,%s)
-                """, (sale_id, result[0], Decimal(str(payment['value']))))
+                    INSERT INTO payments (
+                        sale_id, sale_created_at, payment_type_id, value
+                    ) VALUES (%s,%s,%s,%s)
+                """, (
+                    sale_id, sale['created_at'], result[0],
+                    Decimal(str(payment['value']))
+                ))
 
 
 def create_indexes(conn):
-    """Create performance indexes"""
+    """Create the analytics indexes (migrations/004_analytics_indexes.sql)"""
     print("Creating indexes...")
     cursor = conn.cursor()
-    
-    # Additional indexes
-    indexes = [
-        "CREATE INDEX IF NOT EXISTS idx_sales_date_status ON sales(DATE(created_at), sale_status_desc)",
-        "CREATE INDEX IF NOT EXISTS idx_product_sales_product_sale ON product_sales(product_id, sale_id)",
-    ]
-    
-    for idx in indexes:
-        try:
-            cursor.execute(idx)
-        except:
-            pass
-    
-    
+    cursor.execute(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+        "WHERE partrelid = to_regclass('sales'))"
+    )
+    if cursor.fetchone()[0]:
+        # Built on the partitioned tables by migrations/005_partition_sales.sql
+        print("✓ Indexes already on the partitioned tables")
+        return
+
+    path = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        'migrations', '004_analytics_indexes.sql'
+    )
+    with open(path) as f:
+        sql = '\n'.join(
+            line for line in f if not line.lstrip().startswith('--')
+        )
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
     conn.commit()
+    conn.autocommit = True
+    cursor = conn.cursor()
+    for statement in sql.split(';'):
+        if statement.strip():
+            cursor.execute(statement)
+    conn.autocommit = False
+
     print("✓ Indexes created")
 
 
@@ -0,0 +1,32 @@
+-- Migration 002: Hourly sales rollup
+-- Pre-aggregated sales fact (store x channel x status x hour) refreshed
+-- incrementally from a high-water mark on sales.id by the backend
+-- (app.jobs.rollups). It's idempotent - safe to run multiple times.
+--
+-- After applying, build the rollup once:
+--   docker compose exec backend python -m app.jobs.rollups --rebuild
+
+CREATE TABLE IF NOT EXISTS sales_hourly_rollup (
+    store_id INTEGER NOT NULL,
+    channel_id INTEGER NOT NULL,
+    sale_status_desc VARCHAR(100) NOT NULL,
+    bucket_start TIMESTAMP NOT NULL,
+    sales_count INTEGER NOT NULL DEFAULT 0,
+    total_amount DECIMAL(14,2) NOT NULL DEFAULT 0,
+    total_discount DECIMAL(14,2) NOT NULL DEFAULT 0,
+    delivery_seconds DECIMAL(16,0) NOT NULL DEFAULT 0,
+    delivery_count INTEGER NOT NULL DEFAULT 0,
+    first_sale_at TIMESTAMP,
+    last_sale_at TIMESTAMP,
+    PRIMARY KEY (store_id, channel_id, sale_status_desc, bucket_start)
+);
+
+-- Range scans by period (all stores) are the most common access path
+CREATE INDEX IF NOT EXISTS idx_sales_hourly_rollup_bucket
+    ON sales_hourly_rollup(bucket_start);
+
+CREATE TABLE IF NOT EXISTS rollup_watermarks (
+    name VARCHAR(100) PRIMARY KEY,
+    last_sale_id INTEGER NOT NULL DEFAULT 0,
+    refreshed_at TIMESTAMP
+);
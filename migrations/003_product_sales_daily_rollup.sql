@@ -0,0 +1,29 @@
+-- Migration 003: Daily product sales rollup
+-- Pre-aggregated product fact (product x store x channel x status x day x
+-- 3-hour band) refreshed incrementally from a high-water mark on sales.id by
+-- the backend (app.jobs.rollups). It's idempotent - safe to run multiple times.
+--
+-- After applying, build the rollup once:
+--   docker compose exec backend python -m app.jobs.rollups --rebuild
+
+CREATE TABLE IF NOT EXISTS product_sales_daily_rollup (
+    product_id INTEGER NOT NULL,
+    store_id INTEGER NOT NULL,
+    channel_id INTEGER NOT NULL,
+    sale_status_desc VARCHAR(100) NOT NULL,
+    bucket_date TIMESTAMP NOT NULL,
+    hour_band INTEGER NOT NULL,
+    day_of_week INTEGER NOT NULL,
+    quantity FLOAT NOT NULL DEFAULT 0,
+    total_price FLOAT NOT NULL DEFAULT 0,
+    base_price FLOAT NOT NULL DEFAULT 0,
+    line_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (
+        product_id, store_id, channel_id, sale_status_desc,
+        bucket_date, hour_band
+    )
+);
+
+-- Range scans by period (all products) are the most common access path
+CREATE INDEX IF NOT EXISTS idx_product_sales_daily_rollup_date
+    ON product_sales_daily_rollup(bucket_date, product_id);
@@ -0,0 +1,82 @@
+-- Migration 004: Analytics index pack
+-- Indexes behind the access paths of every AnalyticsService method:
+-- period scans on sales (optionally by store/channel), per-status partial
+-- indexes for the COMPLETED/CANCELLED filters every query applies, and
+-- foreign-key indexes for the joins from sales to its child tables.
+-- It's idempotent - safe to run multiple times.
+--
+-- CONCURRENTLY keeps sales writable while the indexes build; run this file
+-- with psql (not inside a transaction block). Plan regressions are caught
+-- by backend/tests/test_query_plans.py (set TEST_POSTGRES_URL).
+
+-- DATE(created_at) cannot serve the ORM's `created_at >= ?` predicates
+DROP INDEX CONCURRENTLY IF EXISTS idx_sales_date_status;
+
+-- sales: period scans, with store/channel/status as index conditions
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_sales_created_store_channel
+    ON sales(created_at, store_id, channel_id, sale_status_desc);
+
+-- sales: one store over a period
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_sales_store_created
+    ON sales(store_id, created_at);
+
+-- sales: completed sales (revenue, products, channels, deliveries...)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_sales_completed_created
+    ON sales(created_at, store_id, channel_id)
+    WHERE sale_status_desc = 'COMPLETED';
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_sales_completed_store_created
+    ON sales(store_id, created_at)
+    WHERE sale_status_desc = 'COMPLETED';
+
+-- sales: cancellations analysis
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_sales_cancelled_created
+    ON sales(created_at, store_id)
+    WHERE sale_status_desc = 'CANCELLED';
+
+-- sales: customer insights (frequency, recency per customer)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_sales_customer_created
+    ON sales(customer_id, created_at)
+    WHERE customer_id IS NOT NULL;
+
+-- Child tables: joins from sales and between line items
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_product_sales_sale
+    ON product_sales(sale_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_product_sales_product_sale
+    ON product_sales(product_id, sale_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_item_product_sales_product_sale
+    ON item_product_sales(product_sale_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_item_product_sales_item
+    ON item_product_sales(item_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_item_item_product_sales_parent
+    ON item_item_product_sales(item_product_sale_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_delivery_sales_sale
+    ON delivery_sales(sale_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_delivery_addresses_sale
+    ON delivery_addresses(sale_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_delivery_addresses_delivery_sale
+    ON delivery_addresses(delivery_sale_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_payments_sale
+    ON payments(sale_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_payments_payment_type
+    ON payments(payment_type_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_coupon_sales_sale
+    ON coupon_sales(sale_id);
+
+-- Fresh statistics so the planner picks the new indexes right away
+ANALYZE sales;
+ANALYZE product_sales;
+ANALYZE item_product_sales;
+ANALYZE delivery_sales;
+ANALYZE delivery_addresses;
+ANALYZE payments;
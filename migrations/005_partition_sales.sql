@@ -0,0 +1,238 @@
+-- Migration 005: Monthly range partitioning of sales and its children
+-- Turns sales into a table partitioned by RANGE (created_at), one
+-- partition per month plus a default partition, and partitions
+-- product_sales, payments and delivery_sales the same way on a new
+-- sale_created_at column (the created_at of their sale). Queries bounded
+-- on created_at then only read the months they touch, and old months can
+-- be detached without deleting rows. It's idempotent - it does nothing
+-- once sales is partitioned.
+--
+-- Rows are copied into the new tables in one transaction holding ACCESS
+-- EXCLUSIVE locks on the four tables: run it in a maintenance window.
+--
+-- Every unique constraint of a partitioned table must include its
+-- partition key, so primary keys become (id, created_at) and
+-- (id, sale_created_at), and the children reference sales by
+-- (sale_id, sale_created_at). Foreign keys from item_product_sales,
+-- delivery_addresses and coupon_sales into these tables can no longer be
+-- expressed and are dropped (their indexes stay).
+--
+-- Months ahead are created (and old months detached) by:
+--   docker compose exec backend python -m app.jobs.partitions
+-- Then set SALES_PARTITIONING_ENABLED=true so the children are pruned too.
+
+-- Children carry the created_at of their sale (the partition key)
+ALTER TABLE product_sales ADD COLUMN IF NOT EXISTS sale_created_at TIMESTAMP;
+ALTER TABLE payments ADD COLUMN IF NOT EXISTS sale_created_at TIMESTAMP;
+ALTER TABLE delivery_sales ADD COLUMN IF NOT EXISTS sale_created_at TIMESTAMP;
+
+-- One month of a partitioned table, named <table>_pYYYY_MM
+CREATE OR REPLACE FUNCTION pg_temp.create_month_partition(
+    parent TEXT, first_day DATE
+) RETURNS VOID AS $$
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF %I '
+        'FOR VALUES FROM (%L) TO (%L)',
+        parent || '_p' || to_char(first_day, 'YYYY_MM'),
+        parent,
+        first_day,
+        (first_day + INTERVAL '1 month')::DATE
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    tbl TEXT;
+    fk RECORD;
+    seq TEXT;
+    cols TEXT;
+    source_cols TEXT;
+    first_month DATE;
+    last_month DATE;
+    month_start DATE;
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_partitioned_table
+        WHERE partrelid = 'sales'::regclass
+    ) THEN
+        RAISE NOTICE 'sales is already partitioned, skipping';
+        RETURN;
+    END IF;
+
+    LOCK TABLE sales, product_sales, payments, delivery_sales
+        IN ACCESS EXCLUSIVE MODE;
+
+    IF EXISTS (SELECT 1 FROM sales WHERE created_at IS NULL) THEN
+        RAISE EXCEPTION 'sales without created_at cannot be partitioned';
+    END IF;
+
+    -- Foreign keys into the tables being replaced
+    FOR fk IN
+        SELECT conrelid::regclass AS rel, conname
+        FROM pg_constraint
+        WHERE contype = 'f'
+          AND confrelid IN (
+              'sales'::regclass,
+              'product_sales'::regclass,
+              'payments'::regclass,
+              'delivery_sales'::regclass
+          )
+    LOOP
+        EXECUTE format(
+            'ALTER TABLE %s DROP CONSTRAINT %I', fk.rel, fk.conname
+        );
+    END LOOP;
+
+    -- Existing months up to three months ahead (the job keeps it going)
+    first_month := date_trunc(
+        'month', COALESCE((SELECT MIN(created_at) FROM sales), now())
+    )::DATE;
+    last_month := GREATEST(
+        date_trunc('month', now() + INTERVAL '3 months')::DATE,
+        date_trunc('month', (SELECT MAX(created_at) FROM sales))::DATE
+    );
+
+    FOREACH tbl IN ARRAY ARRAY[
+        'sales', 'product_sales', 'payments', 'delivery_sales'
+    ] LOOP
+        EXECUTE format(
+            'ALTER TABLE %I RENAME TO %I', tbl, tbl || '_unpartitioned'
+        );
+        EXECUTE format(
+            'CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING GENERATED) '
+            'PARTITION BY RANGE (%I)',
+            tbl,
+            tbl || '_unpartitioned',
+            CASE WHEN tbl = 'sales' THEN 'created_at'
+                 ELSE 'sale_created_at' END
+        );
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF %I DEFAULT', tbl || '_default', tbl
+        );
+        month_start := first_month;
+        WHILE month_start <= last_month LOOP
+            PERFORM pg_temp.create_month_partition(tbl, month_start);
+            month_start := (month_start + INTERVAL '1 month')::DATE;
+        END LOOP;
+    END LOOP;
+
+    -- Stored columns only: generated ones (006) are recomputed
+    SELECT string_agg(quote_ident(attname), ', ' ORDER BY attnum)
+    INTO cols
+    FROM pg_attribute
+    WHERE attrelid = 'sales_unpartitioned'::regclass
+      AND attnum > 0
+      AND NOT attisdropped
+      AND attgenerated = '';
+
+    EXECUTE format(
+        'INSERT INTO sales (%s) SELECT %s FROM sales_unpartitioned',
+        cols, cols
+    );
+
+    -- Children get sale_created_at from their sale while being copied
+    FOREACH tbl IN ARRAY ARRAY[
+        'product_sales', 'payments', 'delivery_sales'
+    ] LOOP
+        SELECT
+            string_agg(quote_ident(attname), ', ' ORDER BY attnum),
+            string_agg('c.' || quote_ident(attname), ', ' ORDER BY attnum)
+        INTO cols, source_cols
+        FROM pg_attribute
+        WHERE attrelid = (tbl || '_unpartitioned')::regclass
+          AND attnum > 0
+          AND NOT attisdropped
+          AND attgenerated = ''
+          AND attname <> 'sale_created_at';
+
+        EXECUTE format(
+            'INSERT INTO %I (%s, sale_created_at) '
+            'SELECT %s, s.created_at FROM %I c '
+            'JOIN sales s ON s.id = c.sale_id',
+            tbl, cols, source_cols, tbl || '_unpartitioned'
+        );
+    END LOOP;
+
+    -- Drop the old tables, keeping their id sequences
+    FOREACH tbl IN ARRAY ARRAY[
+        'product_sales', 'payments', 'delivery_sales', 'sales'
+    ] LOOP
+        seq := pg_get_serial_sequence(tbl || '_unpartitioned', 'id');
+        IF seq IS NOT NULL THEN
+            EXECUTE format('ALTER SEQUENCE %s OWNED BY NONE', seq);
+        END IF;
+        EXECUTE format('DROP TABLE %I', tbl || '_unpartitioned');
+        IF seq IS NOT NULL THEN
+            EXECUTE format('ALTER SEQUENCE %s OWNED BY %I.id', seq, tbl);
+        END IF;
+    END LOOP;
+
+    -- Keys. sale_created_at becomes NOT NULL with the primary keys and is
+    -- not filled by the database: a BEFORE ROW trigger of a partitioned
+    -- table runs after the row was routed on that very column, and cannot
+    -- move it out of the default partition. Inserts must supply it; the
+    -- ORM copies it from the sale (app.models.sale.fill_sale_created_at).
+    ALTER TABLE sales ADD PRIMARY KEY (id, created_at);
+    ALTER TABLE product_sales ADD PRIMARY KEY (id, sale_created_at);
+    ALTER TABLE payments ADD PRIMARY KEY (id, sale_created_at);
+    ALTER TABLE delivery_sales ADD PRIMARY KEY (id, sale_created_at);
+
+    ALTER TABLE sales
+        ADD FOREIGN KEY (store_id) REFERENCES stores(id),
+        ADD FOREIGN KEY (sub_brand_id) REFERENCES sub_brands(id),
+        ADD FOREIGN KEY (customer_id) REFERENCES customers(id),
+        ADD FOREIGN KEY (channel_id) REFERENCES channels(id);
+
+    ALTER TABLE product_sales
+        ADD CONSTRAINT product_sales_sale_fkey
+            FOREIGN KEY (sale_id, sale_created_at)
+            REFERENCES sales(id, created_at) ON DELETE CASCADE,
+        ADD FOREIGN KEY (product_id) REFERENCES products(id);
+
+    ALTER TABLE payments
+        ADD CONSTRAINT payments_sale_fkey
+            FOREIGN KEY (sale_id, sale_created_at)
+            REFERENCES sales(id, created_at) ON DELETE CASCADE,
+        ADD FOREIGN KEY (payment_type_id) REFERENCES payment_types(id);
+
+    ALTER TABLE delivery_sales
+        ADD CONSTRAINT delivery_sales_sale_fkey
+            FOREIGN KEY (sale_id, sale_created_at)
+            REFERENCES sales(id, created_at) ON DELETE CASCADE;
+
+    -- Indexes of 004_analytics_indexes.sql, built on every partition
+    CREATE INDEX idx_sales_created_store_channel
+        ON sales(created_at, store_id, channel_id, sale_status_desc);
+    CREATE INDEX idx_sales_store_created
+        ON sales(store_id, created_at);
+    CREATE INDEX idx_sales_completed_created
+        ON sales(created_at, store_id, channel_id)
+        WHERE sale_status_desc = 'COMPLETED';
+    CREATE INDEX idx_sales_completed_store_created
+        ON sales(store_id, created_at)
+        WHERE sale_status_desc = 'COMPLETED';
+    CREATE INDEX idx_sales_cancelled_created
+        ON sales(created_at, store_id)
+        WHERE sale_status_desc = 'CANCELLED';
+    CREATE INDEX idx_sales_customer_created
+        ON sales(customer_id, created_at)
+        WHERE customer_id IS NOT NULL;
+    CREATE INDEX idx_product_sales_sale
+        ON product_sales(sale_id);
+    CREATE INDEX idx_product_sales_product_sale
+        ON product_sales(product_id, sale_id);
+    CREATE INDEX idx_delivery_sales_sale
+        ON delivery_sales(sale_id);
+    CREATE INDEX idx_payments_sale
+        ON payments(sale_id);
+    CREATE INDEX idx_payments_payment_type
+        ON payments(payment_type_id);
+END;
+$$;
+
+ANALYZE sales;
+ANALYZE product_sales;
+ANALYZE payments;
+ANALYZE delivery_sales;
@@ -0,0 +1,88 @@
+-- Migration 007: Compact sale status codes
+-- A SMALLINT code for sales.sale_status_desc, with its sale_statuses lookup
+-- table, so status filters compare a 2-byte integer instead of a VARCHAR
+-- and the COMPLETED/CANCELLED partial indexes are narrow and covering.
+-- It's idempotent - safe to run multiple times.
+--
+-- The code is a stored generated column: adding it backfills every row and
+-- the database keeps it in sync on insert/update. Adding it rewrites sales
+-- (every partition, when partitioned by 005) under an ACCESS EXCLUSIVE
+-- lock: run it in a maintenance window. The indexes are built without
+-- CONCURRENTLY, which partitioned tables do not support.
+--
+-- A new status with a code of its own needs a sale_statuses row, a new
+-- WHEN in the expression below (drop and re-add the column) and an entry
+-- in app.models.sale_status.SALE_STATUS_CODES. Until then it is OTHER (0).
+
+CREATE TABLE IF NOT EXISTS sale_statuses (
+    code SMALLINT PRIMARY KEY,
+    description VARCHAR(100) NOT NULL UNIQUE
+);
+
+INSERT INTO sale_statuses (code, description) VALUES
+    (0, 'OTHER'),
+    (1, 'COMPLETED'),
+    (2, 'CANCELLED')
+ON CONFLICT (code) DO NOTHING;
+
+ALTER TABLE sales
+    ADD COLUMN IF NOT EXISTS sale_status_code SMALLINT
+        GENERATED ALWAYS AS (
+            CASE sale_status_desc
+                WHEN 'COMPLETED' THEN 1
+                WHEN 'CANCELLED' THEN 2
+                ELSE 0
+            END
+        ) STORED;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint
+        WHERE conname = 'sales_sale_status_code_fkey'
+    ) THEN
+        ALTER TABLE sales
+            ADD CONSTRAINT sales_sale_status_code_fkey
+            FOREIGN KEY (sale_status_code) REFERENCES sale_statuses(code);
+    END IF;
+END $$;
+
+-- Status indexes from 004/005 are defined on sale_status_desc, which the
+-- services no longer filter on: drop them so they are rebuilt on the code
+DO $$
+DECLARE
+    idx RECORD;
+BEGIN
+    FOR idx IN
+        SELECT c.relname
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE i.indrelid = 'sales'::regclass
+          AND NOT i.indisprimary
+          AND pg_get_indexdef(i.indexrelid) LIKE '%sale_status_desc%'
+    LOOP
+        EXECUTE format('DROP INDEX %I', idx.relname);
+    END LOOP;
+END $$;
+
+CREATE INDEX IF NOT EXISTS idx_sales_created_store_channel
+    ON sales(created_at, store_id, channel_id, sale_status_code);
+
+-- COMPLETED-only analytics: period (and store/channel) scans answered from
+-- the index alone, with the summed columns in INCLUDE
+CREATE INDEX IF NOT EXISTS idx_sales_completed_created
+    ON sales(created_at, store_id, channel_id)
+    INCLUDE (total_amount, total_discount, delivery_seconds)
+    WHERE sale_status_code = 1;
+
+CREATE INDEX IF NOT EXISTS idx_sales_completed_store_created
+    ON sales(store_id, created_at)
+    INCLUDE (channel_id, total_amount, total_discount, delivery_seconds)
+    WHERE sale_status_code = 1;
+
+CREATE INDEX IF NOT EXISTS idx_sales_cancelled_created
+    ON sales(created_at, store_id)
+    WHERE sale_status_code = 2;
+
+ANALYZE sale_statuses;
+ANALYZE sales;
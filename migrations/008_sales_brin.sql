@@ -0,0 +1,22 @@
+-- Migration 008: BRIN index on sales.created_at
+-- sales rows arrive roughly in created_at order, so a BRIN index (one
+-- min/max summary per 32 heap pages) prunes long date ranges - the
+-- 12-month store growth and seasonality analyses - with an index of a few
+-- pages, next to the created_at B-trees from 004/007.
+-- It's idempotent - safe to run multiple times.
+--
+-- autosummarize keeps new pages summarized as sales are inserted. The
+-- index is built without CONCURRENTLY, which partitioned tables do not
+-- support; a BRIN build is a single fast pass over sales.
+--
+-- BRIN is only as selective as the table is ordered. Re-cluster drifted
+-- tables (or months, when partitioned) with:
+--     python -m app.jobs.clustering
+-- Compare B-tree and BRIN plans with:
+--     python -m benchmarks.brin_vs_btree
+
+CREATE INDEX IF NOT EXISTS idx_sales_created_brin
+    ON sales USING brin (created_at)
+    WITH (pages_per_range = 32, autosummarize = on);
+
+ANALYZE sales;
@@ -0,0 +1,80 @@
+-- Migration 009: Rollup change log
+-- The rollups (002/003) merge sales by id above a watermark, so a sale
+-- edited or deleted after being merged would stay in them with its old
+-- values. These triggers log the created_at of every such sale in
+-- rollup_changes; the next refresh recomputes its hour and day buckets
+-- (app.services.rollup) and invalidates the cached results of those days.
+-- It's idempotent - safe to run multiple times.
+--
+-- Only sales at or below a watermark are logged: anything above it has not
+-- been merged yet. Applied rows are pruned by the rollup job.
+
+CREATE TABLE IF NOT EXISTS rollup_changes (
+    id BIGSERIAL PRIMARY KEY,
+    sale_created_at TIMESTAMP NOT NULL,
+    changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+ALTER TABLE rollup_watermarks
+    ADD COLUMN IF NOT EXISTS last_change_id BIGINT NOT NULL DEFAULT 0;
+
+-- Sales updated or deleted after being merged
+CREATE OR REPLACE FUNCTION log_sale_rollup_change() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD IS NOT DISTINCT FROM NEW THEN
+        RETURN NULL;
+    END IF;
+    IF OLD.created_at IS NULL OR OLD.id > (
+        SELECT COALESCE(MAX(last_sale_id), 0) FROM rollup_watermarks
+    ) THEN
+        RETURN NULL;
+    END IF;
+
+    INSERT INTO rollup_changes (sale_created_at) VALUES (OLD.created_at);
+    IF TG_OP = 'UPDATE' AND NEW.created_at IS DISTINCT FROM OLD.created_at
+            AND NEW.created_at IS NOT NULL THEN
+        INSERT INTO rollup_changes (sale_created_at)
+        VALUES (NEW.created_at);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS sales_rollup_change ON sales;
+CREATE TRIGGER sales_rollup_change
+    AFTER UPDATE OR DELETE ON sales
+    FOR EACH ROW
+    EXECUTE FUNCTION log_sale_rollup_change();
+
+-- Product lines added, edited or removed on sales already merged
+CREATE OR REPLACE FUNCTION log_product_sale_rollup_change()
+RETURNS trigger AS $$
+DECLARE
+    line product_sales%ROWTYPE;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        line := OLD;
+    ELSE
+        line := NEW;
+    END IF;
+
+    IF line.sale_id > (
+        SELECT COALESCE(MAX(last_sale_id), 0) FROM rollup_watermarks
+        WHERE name = 'product_sales_daily'
+    ) THEN
+        RETURN NULL;
+    END IF;
+
+    -- A line deleted with its sale is logged by the sales trigger
+    INSERT INTO rollup_changes (sale_created_at)
+    SELECT created_at FROM sales
+    WHERE id = line.sale_id AND created_at IS NOT NULL;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS product_sales_rollup_change ON product_sales;
+CREATE TRIGGER product_sales_rollup_change
+    AFTER INSERT OR UPDATE OR DELETE ON product_sales
+    FOR EACH ROW
+    EXECUTE FUNCTION log_product_sale_rollup_change();
@@ -23,11 +23,13 @@ docker compose exec -T postgres psql -U challenge challenge_db < database-schema
     echo "⚠️  Alguns erros podem ser esperados se as tabelas já existem"
 }
 
-# Aplicar migração completa de dashboards (idempotente)
-echo "📋 Aplicando migração completa de dashboards..."
-docker compose exec -T postgres psql -U challenge challenge_db < migrations/001_complete_dashboards_schema.sql || {
-    echo "⚠️  Verificando se é erro esperado..."
-}
+# Aplicar migrações numeradas em ordem (todas idempotentes)
+for migration in migrations/[0-9][0-9][0-9]_*.sql; do
+    echo "📋 Aplicando migração $(basename "$migration")..."
+    docker compose exec -T postgres psql -U challenge challenge_db < "$migration" || {
+        echo "⚠️  Verificando se é erro esperado..."
+    }
+done
 
 # Aplicar outras migrações (idempotentes)
 if [ -f "migrations/add_is_default_to_dashboards.sql" ]; then
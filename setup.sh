@@ -54,12 +54,12 @@ echo ""
 
 # 6. Executar migrations
 echo "🔄 Passo 6/7: Executando migrations..."
-echo "   Aplicando migração completa de dashboards (idempotente)..."
-if [ -f "migrations/001_complete_dashboards_schema.sql" ]; then
-  docker compose exec -T postgres psql -U challenge challenge_db < migrations/001_complete_dashboards_schema.sql || {
+echo "   Aplicando migrações numeradas (idempotentes)..."
+for migration in migrations/[0-9][0-9][0-9]_*.sql; do
+  docker compose exec -T postgres psql -U challenge challenge_db < "$migration" || {
     echo "   ⚠️  Alguns campos podem já existir (isso é normal)"
   }
-fi
+done
 
 # Aplicar outras migrações específicas (idempotentes)
 if [ -f "migrations/add_is_default_to_dashboards.sql" ]; then